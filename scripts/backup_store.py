@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Content-addressed backup store shared by the STIG hardening and recovery scripts.
+
+Backups are keyed by full path and content hash instead of by basename, so
+/etc/default/grub and /etc/grub.d/grub no longer overwrite each other:
+
+    <root>/objects/<sha[:2]>/<sha>    file content, stored once, read-only
+    <root>/index.jsonl                append-only history: path, sha256, mode,
+                                      owner, stat signature, time
+    <root>/latest/<full path>         hard link to the newest backup of a path
+                                      (for manual recovery from a console)
+
+A file whose stat signature or hash matches its last backup is not copied
+again. restore() puts back every file under a path prefix as it was at a
+point in time, e.g. all of /etc/sudoers* in one call.
+
+Usage:
+    store = BackupStore(Path('/tmp/stig_backups'))
+    store.backup(Path('/etc/sudoers'))
+    store.restore('/etc/sudoers')                      # latest backups
+    store.restore('/etc/sudoers', at=datetime(...))    # as of a point in time
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKUP_ROOT = Path('/tmp/stig_backups')
+
+INDEX_NAME = 'index.jsonl'
+
+
+def file_sha256(file_path: Path) -> str:
+    """Return the SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def as_utc(value: datetime) -> datetime:
+    """Return a datetime in UTC; naive values (older index entries, --at) are local time."""
+    return value.astimezone(timezone.utc)
+
+
+class BackupStore:
+    """Backups of individual files keyed by full path and content hash."""
+
+    def __init__(self, root: Path = DEFAULT_BACKUP_ROOT):
+        self.root = Path(root)
+        self.index_path = self.root / INDEX_NAME
+        # Files may be backed up from several worker threads
+        self._lock = threading.Lock()
+        # path -> index entries, oldest first
+        self.history: Dict[str, List[Dict]] = {}
+        self._load()
+
+    def _load(self) -> None:
+        """Read the index; a torn last line from a crash is ignored."""
+        if not self.index_path.exists():
+            return
+        with open(self.index_path, 'r') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.history.setdefault(entry['path'], []).append(entry)
+
+    def _blob_path(self, sha256: str) -> Path:
+        return self.root / 'objects' / sha256[:2] / sha256
+
+    def _latest_link(self, path: str) -> Path:
+        return self.root / 'latest' / path.lstrip('/')
+
+    def backup(self, file_path: Path) -> Optional[str]:
+        """
+        Back up a file unless its last backup has the same content and mode.
+
+        Returns:
+            SHA-256 of the backed-up content, or None if the file doesn't exist
+        """
+        file_path = Path(file_path).absolute()
+        path = str(file_path)
+        with self._lock:
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                return None
+            signature = [st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns]
+            entries = self.history.get(path)
+            last = entries[-1] if entries else None
+            if last and last['stat'] == signature:
+                logger.debug(f"{path} unchanged since its last backup")
+                return last['sha256']
+
+            sha256 = file_sha256(file_path)
+            mode = st.st_mode & 0o7777
+            if last and last['sha256'] == sha256 and last['mode'] == mode:
+                # Touched but not changed; skip hashing it again this run
+                last['stat'] = signature
+                logger.debug(f"{path} content unchanged since its last backup")
+                return sha256
+
+            blob = self._blob_path(sha256)
+            if not blob.exists():
+                blob.parent.mkdir(parents=True, exist_ok=True)
+                tmp_blob = blob.with_suffix('.tmp')
+                shutil.copyfile(file_path, tmp_blob)
+                os.chmod(tmp_blob, 0o400)
+                os.replace(tmp_blob, blob)
+
+            link = self._latest_link(path)
+            link.parent.mkdir(parents=True, exist_ok=True)
+            tmp_link = link.with_name(f".{link.name}.tmp")
+            if tmp_link.exists():
+                tmp_link.unlink()
+            os.link(blob, tmp_link)
+            os.replace(tmp_link, link)
+
+            entry = {
+                'path': path,
+                'sha256': sha256,
+                'mode': mode,
+                'uid': st.st_uid,
+                'gid': st.st_gid,
+                'stat': signature,
+                'time': datetime.now(timezone.utc).isoformat(),
+            }
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+            self.history.setdefault(path, []).append(entry)
+            logger.debug(f"Backed up {path} as {sha256[:12]}")
+            return sha256
+
+    def latest(self, file_path: Path) -> Optional[Dict]:
+        """Return the newest backup entry of a path, or None if it was never backed up."""
+        with self._lock:
+            entries = self.history.get(str(Path(file_path).absolute()))
+            return dict(entries[-1]) if entries else None
+
+    def entries(self, prefix: str = '/', at: Optional[datetime] = None) -> List[Dict]:
+        """
+        Return the newest backup of each path under a prefix, as of a point in time.
+
+        Args:
+            prefix: Path prefix, e.g. "/etc/sudoers" matches /etc/sudoers and /etc/sudoers.d/*
+            at: Only consider backups taken at or before this time (default: all);
+                naive times are local time
+        """
+        if at is not None:
+            at = as_utc(at)
+        selected = []
+        with self._lock:
+            for path in sorted(self.history):
+                if not path.startswith(prefix):
+                    continue
+                candidates = [
+                    entry for entry in self.history[path]
+                    if at is None or as_utc(datetime.fromisoformat(entry['time'])) <= at
+                ]
+                if candidates:
+                    selected.append(candidates[-1])
+        return selected
+
+    def restore(self, prefix: str, at: Optional[datetime] = None, dry_run: bool = False) -> List[Dict]:
+        """
+        Restore every backed-up file under a prefix, atomically per file.
+
+        Files whose current content and mode already match are left alone.
+
+        Returns:
+            The entries restored (or that would be, with dry_run)
+        """
+        return self.restore_entries(self.entries(prefix, at), dry_run=dry_run)
+
+    def restore_entries(self, entries: List[Dict], dry_run: bool = False) -> List[Dict]:
+        """
+        Restore the given backup entries (from entries() or latest()), atomically per file.
+
+        Files whose current content and mode already match are left alone.
+
+        Returns:
+            The entries restored (or that would be, with dry_run)
+        """
+        restored = []
+        for entry in entries:
+            file_path = Path(entry['path'])
+            try:
+                if file_path.is_file() and (file_path.stat().st_mode & 0o7777) == entry['mode'] \
+                        and file_sha256(file_path) == entry['sha256']:
+                    continue
+            except OSError:
+                pass
+            restored.append(entry)
+            if dry_run:
+                continue
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_name(f".{file_path.name}.restore")
+            shutil.copyfile(self._blob_path(entry['sha256']), tmp_path)
+            os.chmod(tmp_path, entry['mode'])
+            try:
+                os.chown(tmp_path, entry['uid'], entry['gid'])
+            except PermissionError:
+                pass
+            os.replace(tmp_path, file_path)
+            logger.info(f"Restored {file_path} from backup {entry['sha256'][:12]} ({entry['time']})")
+        return restored
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for the CUI vault GET /cui/{record_id} database path.
+
+Compares the record lookup before and after connection pooling:
+
+  per-request  new connection per request, plain parameterized query, close
+               (what vault-api-get-endpoint.py did before pooling)
+  pooled       the endpoint's own helpers from vault_db.py: the process-wide
+               pool with idle health checks (get_db_connection) and the
+               prepared statement reused per connection (fetch_cui_record)
+
+Runs against a local PostgreSQL when --dsn is given. Otherwise a SQLite
+stand-in is substituted behind the pool's connect function only; the pool,
+health checks and PREPARE/EXECUTE lookup are the shipped code either way.
+SQLite connections are in-process, so the stand-in understates what a new
+PostgreSQL connection costs (TCP setup, authentication, backend startup);
+--connect-delay adds a fixed setup cost per new connection to model it.
+vault_db.py needs psycopg2 in both modes.
+
+Usage:
+  python3 scripts/benchmark-vault-get-endpoint.py [--requests 5000] [--concurrency 8]
+  python3 scripts/benchmark-vault-get-endpoint.py --dsn "dbname=cuivault_bench user=postgres host=localhost"
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+# vault_db.py sits in the repository root, next to vault-api-get-endpoint.py
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    import psycopg2.pool
+    import vault_db
+except ImportError as e:
+    sys.exit(f"ERROR: {e}. The benchmark drives vault_db.py, which needs psycopg2 "
+             "(pip install psycopg2-binary).")
+
+# Plain lookup of the connection-per-request endpoint
+LOOKUP_SQL = "SELECT id, ciphertext, nonce, tag, created_at FROM public.cui_records WHERE id = %s"
+
+
+class SqliteCursor:
+    """psycopg2-style cursor over SQLite, translating PREPARE/EXECUTE and placeholders."""
+
+    PREPARE = re.compile(r'^\s*PREPARE\s+(\w+)\s+AS\s+(.*)$', re.IGNORECASE | re.DOTALL)
+    EXECUTE = re.compile(r'^\s*EXECUTE\s+(\w+)\s*\((.*)\)\s*$', re.IGNORECASE | re.DOTALL)
+
+    def __init__(self, conn: 'SqliteConnection'):
+        self.conn = conn
+        self._cursor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql: str, params=()):
+        prepare = self.PREPARE.match(sql)
+        if prepare:
+            # $1 -> ? (the lookup binds its parameters in order); the statement
+            # is compiled, and cached by sqlite3, on first EXECUTE
+            self.conn.statements[prepare.group(1)] = re.sub(r'\$\d+', '?', prepare.group(2))
+            return
+        execute = self.EXECUTE.match(sql)
+        if execute:
+            sql = self.conn.statements[execute.group(1)]
+        else:
+            sql = sql.replace('%s', '?')
+        try:
+            self._cursor = self.conn.db.execute(sql, params)
+        except sqlite3.Error as e:
+            # vault_db handles psycopg2 errors only
+            raise psycopg2.OperationalError(str(e)) from e
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+
+class SqliteConnection:
+    """Just enough of a psycopg2 VaultConnection over SQLite for vault_db's pool and lookup."""
+
+    info = SimpleNamespace(transaction_status=psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def __init__(self, path: Path, connect_delay: float = 0.0):
+        if connect_delay:
+            time.sleep(connect_delay)
+        # The vault table lives in the "public" schema
+        self.db = sqlite3.connect(":memory:", check_same_thread=False, isolation_level=None)
+        self.db.execute("ATTACH DATABASE ? AS public", (str(path),))
+        self.closed = 0
+        self.autocommit = True
+        self.prepared = set()
+        self.statements = {}
+        self.last_checked = time.monotonic()
+
+    def cursor(self) -> SqliteCursor:
+        return SqliteCursor(self)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.db.close()
+        self.closed = 1
+
+
+def seed_sqlite(path: Path, records: int, size: int) -> List[str]:
+    """Create and fill the SQLite stand-in's cui_records table."""
+    conn = sqlite3.connect(path)
+    conn.execute("DROP TABLE IF EXISTS cui_records")
+    conn.execute(
+        "CREATE TABLE cui_records (id TEXT PRIMARY KEY, ciphertext BLOB, nonce BLOB, "
+        "tag BLOB, created_at TEXT)"
+    )
+    ids = [str(uuid.uuid4()) for _ in range(records)]
+    now = datetime.now(timezone.utc).isoformat()
+    conn.executemany(
+        "INSERT INTO cui_records VALUES (?, ?, ?, ?, ?)",
+        [(record_id, os.urandom(size), os.urandom(12), os.urandom(16), now) for record_id in ids]
+    )
+    conn.commit()
+    conn.close()
+    return ids
+
+
+def seed_postgres(dsn: str, records: int, size: int) -> List[str]:
+    """Create and fill public.cui_records in a local PostgreSQL database."""
+    conn = psycopg2.connect(dsn)
+    with conn, conn.cursor() as cur:
+        cur.execute("DROP TABLE IF EXISTS public.cui_records")
+        cur.execute(
+            "CREATE TABLE public.cui_records (id uuid PRIMARY KEY, ciphertext bytea, "
+            "nonce bytea, tag bytea, created_at timestamptz DEFAULT now())"
+        )
+        ids = [str(uuid.uuid4()) for _ in range(records)]
+        cur.executemany(
+            "INSERT INTO public.cui_records (id, ciphertext, nonce, tag) VALUES (%s, %s, %s, %s)",
+            [(record_id, os.urandom(size), os.urandom(12), os.urandom(16)) for record_id in ids]
+        )
+    conn.close()
+    return ids
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted samples."""
+    index = max(0, min(len(samples) - 1, int(round(pct / 100 * len(samples))) - 1))
+    return samples[index]
+
+
+def run_load(request: Callable[[str], object], ids: List[str], requests: int, concurrency: int) -> Dict:
+    """Issue requests from concurrent workers and summarize their latency."""
+    picks = [random.choice(ids) for _ in range(requests)]
+
+    def timed(record_id: str):
+        started = time.perf_counter()
+        try:
+            row = request(record_id)
+        except psycopg2.pool.PoolError:
+            # The endpoint fails the request when the pool is exhausted
+            return None
+        if row is None:
+            raise RuntimeError(f"Record {record_id} not found")
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(timed, picks))
+    wall = time.perf_counter() - started
+    latencies = sorted(latency for latency in outcomes if latency is not None)
+    if not latencies:
+        raise RuntimeError("Every request failed: connection pool exhausted")
+    return {
+        'requests': requests,
+        'errors': len(outcomes) - len(latencies),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'throughput_rps': round(len(latencies) / wall, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the CUI vault GET lookup: connection per request vs pooled + prepared"
+    )
+    parser.add_argument("--dsn", help="PostgreSQL DSN (default: SQLite stand-in)")
+    parser.add_argument("--sqlite-path", type=Path, default=None,
+                        help="SQLite stand-in database file (default: temporary file)")
+    parser.add_argument("--records", type=int, default=1000, help="Records to seed (default: 1000)")
+    parser.add_argument("--record-size", type=int, default=4096,
+                        help="Ciphertext bytes per record (default: 4096)")
+    parser.add_argument("--requests", type=int, default=5000, help="Requests per mode (default: 5000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--connect-delay", type=float, default=0.0,
+                        help="Seconds added to each new SQLite connection to model PostgreSQL "
+                             "connection setup (default: 0)")
+    parser.add_argument("--json", type=Path, default=None, help="Also write the results as JSON here")
+    args = parser.parse_args()
+
+    tmp_dir = None
+    if args.dsn:
+        backend = "postgresql"
+        print(f"Seeding {args.records} records of {args.record_size} bytes ({backend})...")
+        ids = seed_postgres(args.dsn, args.records, args.record_size)
+        connect = psycopg2.connect
+        connect_kwargs = {"dsn": args.dsn}
+    else:
+        backend = "sqlite"
+        if args.sqlite_path is None:
+            tmp_dir = tempfile.TemporaryDirectory()
+            args.sqlite_path = Path(tmp_dir.name) / "cui_vault_bench.db"
+        print(f"Seeding {args.records} records of {args.record_size} bytes ({backend})...")
+        ids = seed_sqlite(args.sqlite_path, args.records, args.record_size)
+        connect = SqliteConnection
+        connect_kwargs = {"path": args.sqlite_path, "connect_delay": args.connect_delay}
+
+    def per_request(record_id: str):
+        conn = connect(**connect_kwargs)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(LOOKUP_SQL, (record_id,))
+                return cur.fetchone()
+        finally:
+            conn.close()
+
+    # The endpoint's pool and lookup; only the connect function differs for SQLite
+    vault_db.init_db_pool(connect=connect, **connect_kwargs)
+
+    def pooled(record_id: str):
+        with vault_db.get_db_connection() as conn:
+            return vault_db.fetch_cui_record(conn, record_id)
+
+    if args.concurrency > vault_db.DB_POOL_MAX:
+        print(f"Note: concurrency {args.concurrency} exceeds DB_POOL_MAX={vault_db.DB_POOL_MAX}; "
+              "pooled requests beyond it fail as in the endpoint and are counted as errors")
+
+    results = {}
+    try:
+        for mode, request in (('per-request', per_request), ('pooled', pooled)):
+            # Warm up caches so both modes are measured in steady state
+            run_load(request, ids, min(200, args.requests), args.concurrency)
+            results[mode] = run_load(request, ids, args.requests, args.concurrency)
+    finally:
+        vault_db.close_db_pool()
+        if tmp_dir:
+            tmp_dir.cleanup()
+
+    print(f"\nBackend: {backend}  Requests: {args.requests}  Concurrency: {args.concurrency}  "
+          f"Pool: {vault_db.DB_POOL_MIN}-{vault_db.DB_POOL_MAX}")
+    print(f"{'Mode':<12} {'p50 ms':>10} {'p99 ms':>10} {'mean ms':>10} {'req/s':>10} {'errors':>8}")
+    for mode, stats in results.items():
+        print(f"{mode:<12} {stats['p50_ms']:>10.3f} {stats['p99_ms']:>10.3f} "
+              f"{stats['mean_ms']:>10.3f} {stats['throughput_rps']:>10.1f} {stats['errors']:>8}")
+    before, after = results['per-request'], results['pooled']
+    if after['p50_ms'] > 0 and after['p99_ms'] > 0:
+        print(f"Speedup: p50 {before['p50_ms'] / after['p50_ms']:.1f}x, "
+              f"p99 {before['p99_ms'] / after['p99_ms']:.1f}x")
+
+    if args.json:
+        report = {
+            'backend': backend,
+            'concurrency': args.concurrency,
+            'connect_delay': args.connect_delay,
+            'results': results,
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,22 +7,59 @@ for CMMC 2.0 Level 2 assessment.
 
 Usage:
     sudo python3 cmmc_hardening_validation_evidence.py [--output-dir <path>]
+    sudo python3 cmmc_hardening_validation_evidence.py --bundle [<path>] [--signing-key <pem>]
+    sudo python3 cmmc_hardening_validation_evidence.py --monitor [--db <path>]
+
+With --bundle every evidence artifact, report and relevant log is streamed
+into a compressed ZIP as it is produced, with a SHA-256 manifest signed by
+the given key (scripts/evidence_bundle.py).
+
+In monitor mode the script keeps running, watches the files each validator
+depends on (inotify, or mtime polling where unavailable), re-runs only the
+affected validators and appends their results to a SQLite time series.
+
+Deployment:
+    This script imports helper modules from scripts/ (command_probes.py,
+    evidence_bundle.py, sshd_config.py) that must sit in the same directory.
+    Copy the whole scripts/ directory to the host, not this file alone.
 """
 
 import argparse
+import ctypes
+import ctypes.util
 import json
 import logging
 import os
+import select
+import sqlite3
+import struct
 import subprocess
 import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+# Modules this script needs next to it on the host (see "Deployment" above)
+HELPER_MODULES = ('command_probes.py', 'evidence_bundle.py', 'sshd_config.py')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+try:
+    # Shared memo of read-only probe output (scripts/command_probes.py)
+    from command_probes import PROBES, files_fingerprint
+    from evidence_bundle import EvidenceBundle
+    from sshd_config import SshdConfig, confirm_with_sshd
+except ImportError as e:
+    sys.exit(f"ERROR: {e}. Deploy {Path(__file__).name} with {', '.join(HELPER_MODULES)} "
+             f"in the same directory.")
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
@@ -39,26 +76,97 @@ class ValidationResult:
         self.timestamp = datetime.now().isoformat()
 
 
+# Default number of validators run at the same time
+DEFAULT_VALIDATION_WORKERS = 4
+
+# Default per-validator time limit in seconds
+DEFAULT_VALIDATOR_TIMEOUT = 120
+
+# Extra seconds a validator gets after its commands are cut off to write its evidence
+VALIDATOR_GRACE_PERIOD = 5
+
+# Longest wait between checks while a submitted validator has not started yet
+VALIDATOR_START_POLL = 0.5
+
+
+@dataclass
+class ValidatorSpec:
+    """A validator of the engine, with the validators it must run after."""
+    name: str
+    method: str
+    depends_on: Tuple[str, ...] = ()
+    timeout: Optional[float] = None  # Seconds; None uses the engine default
+    # Files and directories whose changes re-run the validator in monitor mode
+    watch: Tuple[str, ...] = ()
+
+
+# Validators in report order. Independent validators run concurrently;
+# AIDE and ClamAV scan the filesystem and get a longer time limit.
+VALIDATORS = [
+    ValidatorSpec('ssh_hardening', 'validate_ssh_hardening',
+                  watch=('/etc/ssh/sshd_config', '/etc/ssh/sshd_config.d')),
+    ValidatorSpec('fail2ban', 'validate_fail2ban', watch=('/etc/fail2ban',)),
+    ValidatorSpec('firewall', 'validate_firewall', watch=('/etc/ufw',)),
+    ValidatorSpec('log_rotation', 'validate_log_rotation',
+                  watch=('/etc/logrotate.conf', '/etc/logrotate.d')),
+    ValidatorSpec('ntp', 'validate_ntp',
+                  watch=('/etc/chrony', '/etc/systemd/timesyncd.conf')),
+    ValidatorSpec('sudo_logging', 'validate_sudo_logging',
+                  watch=('/etc/sudoers', '/etc/sudoers.d')),
+    ValidatorSpec('fips', 'validate_fips'),
+    ValidatorSpec('clamav', 'validate_clamav', timeout=600, watch=('/etc/clamav',)),
+    ValidatorSpec('aide', 'validate_aide', timeout=900,
+                  watch=('/etc/aide', '/var/lib/aide')),
+    ValidatorSpec('service_minimization', 'validate_service_minimization',
+                  watch=('/etc/systemd/system',)),
+]
+
+# Monitor mode defaults (seconds)
+DEFAULT_POLL_INTERVAL = 5
+DEFAULT_FULL_SWEEP_INTERVAL = 3600
+# Changes arriving within this window are validated together
+MONITOR_DEBOUNCE = 1.0
+
+# Logs streamed into the evidence bundle, if present
+BUNDLE_LOG_FILES = [
+    '/var/log/auth.log',
+    '/var/log/sudo.log',
+    '/var/log/fail2ban.log',
+    '/var/log/ufw.log',
+    '/var/log/clamav/clamav.log',
+    '/var/log/aide/aide.log',
+]
+
+
 class CMMCValidationEvidenceGenerator:
     """Validate hardening and generate assessment evidence."""
     
-    def __init__(self, output_dir: Path):
+    def __init__(self, output_dir: Path, workers: int = DEFAULT_VALIDATION_WORKERS,
+                 default_timeout: float = DEFAULT_VALIDATOR_TIMEOUT,
+                 bundle: Optional[EvidenceBundle] = None):
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.results: List[ValidationResult] = []
         self.evidence_files: List[str] = []
+        self.workers = max(1, workers)
+        self.default_timeout = default_timeout
+        self.timings: Dict[str, float] = {}
+        # Archive each evidence file is streamed into as it is saved
+        self.bundle = bundle
+        # Per-validator state: the deadline bounding its commands and the
+        # evidence files it saved (added to evidence_files in report order)
+        self._local = threading.local()
         
     def run_command(self, command: str, capture_output: bool = True) -> Tuple[bool, str]:
         """Run a shell command and return success status and output."""
+        deadline = getattr(self._local, 'deadline', None)
+        timeout = max(0.1, deadline - time.monotonic()) if deadline is not None else None
         try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=capture_output,
-                text=True,
-                check=False
-            )
+            # Validators share read-only probes through the per-run cache
+            result = PROBES.run(command, timeout=timeout)
             return result.returncode == 0, result.stdout if capture_output else ""
+        except subprocess.TimeoutExpired:
+            return False, f"Command timed out: {command}"
         except Exception as e:
             return False, str(e)
     
@@ -67,43 +175,64 @@ class CMMCValidationEvidenceGenerator:
         evidence_path = self.output_dir / filename
         with open(evidence_path, 'w') as f:
             f.write(content)
-        self.evidence_files.append(str(evidence_path))
+        saved = getattr(self._local, 'evidence', None)
+        (saved if saved is not None else self.evidence_files).append(str(evidence_path))
+        if self.bundle:
+            self.bundle.add_file(evidence_path, arcname=filename)
         return evidence_path
     
+    def bundle_large_evidence(self, include_aide_report: bool = False):
+        """
+        Stream large evidence straight into the bundle, without loose copies.
+        
+        Args:
+            include_aide_report: Also run `aide --check` and stream its report
+                (reads the whole filesystem, can take a long time)
+        """
+        if not self.bundle:
+            return
+        for log_file in BUNDLE_LOG_FILES:
+            if Path(log_file).exists():
+                self.bundle.add_file(Path(log_file), arcname=f"logs{log_file}")
+        self.bundle.add_command_output('sshd_effective_config.txt', 'sshd -T 2>&1')
+        if include_aide_report:
+            self.bundle.add_command_output('aide_check_report.txt', 'aide --check 2>&1')
+    
     def validate_ssh_hardening(self) -> ValidationResult:
         """Validate SSH hardening (3.1.13, 3.13.9)."""
         control_id = "3.1.13,3.13.9"
         logger.info(f"Validating SSH hardening (CMMC {control_id})")
         
         sshd_config = Path('/etc/ssh/sshd_config')
-        if not sshd_config.exists():
+        try:
+            # Effective settings, including Include drop-ins that override the main file
+            effective = SshdConfig.load(sshd_config).effective()
+        except OSError:
             return ValidationResult(
                 control_id, "SSH Configuration File", "fail",
                 "SSH config file not found"
             )
         
-        # Read SSH config
-        with open(sshd_config, 'r') as f:
-            ssh_config = f.read()
-        
         # Check critical settings
+        required = {
+            'Protocol': '2',
+            'PasswordAuthentication': 'no',
+            'PubkeyAuthentication': 'yes',
+            'UsePAM': 'yes',
+            'PermitRootLogin': 'no',
+            'ClientAliveInterval': '300',
+            'ClientAliveCountMax': '2',
+            'MaxAuthTries': '3',
+        }
         checks = {
-            'Protocol 2': 'Protocol 2' in ssh_config or 'Protocol 2' in ssh_config,
-            'PasswordAuthentication no': 'PasswordAuthentication no' in ssh_config or 'PasswordAuthentication\tno' in ssh_config,
-            'PubkeyAuthentication yes': 'PubkeyAuthentication yes' in ssh_config or 'PubkeyAuthentication\tyes' in ssh_config,
-            'UsePAM yes': 'UsePAM yes' in ssh_config or 'UsePAM\tyes' in ssh_config,
-            'PermitRootLogin no': 'PermitRootLogin no' in ssh_config or 'PermitRootLogin\tno' in ssh_config,
-            'ClientAliveInterval 300': 'ClientAliveInterval 300' in ssh_config or 'ClientAliveInterval\t300' in ssh_config,
-            'ClientAliveCountMax 2': 'ClientAliveCountMax 2' in ssh_config or 'ClientAliveCountMax\t2' in ssh_config,
-            'MaxAuthTries 3': 'MaxAuthTries 3' in ssh_config or 'MaxAuthTries\t3' in ssh_config,
+            f'{key} {value}': effective.get(key.lower(), '').lower() == value.lower()
+            for key, value in required.items()
         }
         
-        # Test SSH config syntax
-        success, output = self.run_command("sshd -t 2>&1")
-        ssh_syntax_valid = success
-        
-        # Get detailed SSH config
-        success, sshd_t_output = self.run_command("sshd -T")
+        # One sshd -T run tests the syntax and confirms the parsed values
+        ssh_syntax_valid, mismatches, sshd_t_output = confirm_with_sshd(
+            {key: effective[key.lower()] for key in required if key.lower() in effective}, self.run_command
+        )
         
         # Count passed checks
         passed = sum(1 for v in checks.values() if v)
@@ -123,14 +252,16 @@ Configuration Checks:
         for check_name, check_result in checks.items():
             evidence_content += f"  {'✓' if check_result else '✗'} {check_name}: {'PASS' if check_result else 'FAIL'}\n"
         
-        evidence_content += f"\nPassed: {passed}/{total}\n\n"
-        evidence_content += "Full SSH Configuration (sshd -T):\n"
+        evidence_content += f"\nPassed: {passed}/{total}\n"
+        if mismatches:
+            evidence_content += f"sshd -T differs from parsed config for: {', '.join(mismatches)}\n"
+        evidence_content += "\nFull SSH Configuration (sshd -T):\n"
         evidence_content += "-" * 80 + "\n"
         evidence_content += sshd_t_output
         
         evidence_path = self.save_evidence('ssh_hardening_validation.txt', evidence_content)
         
-        status = 'pass' if passed == total and ssh_syntax_valid else 'fail'
+        status = 'pass' if passed == total and ssh_syntax_valid and not mismatches else 'fail'
         details = f"SSH hardening validation: {passed}/{total} checks passed. Syntax valid: {ssh_syntax_valid}"
         
         return ValidationResult(control_id, "SSH Hardening", status, details, str(evidence_path))
@@ -606,35 +737,138 @@ Disabled Services:
         
         return ValidationResult(control_id, "Service Minimization", status, details, str(evidence_path))
     
-    def run_all_validations(self) -> List[ValidationResult]:
-        """Run all validation checks."""
-        logger.info("Starting CMMC 2.0 Level 2 hardening validation")
-        
-        validations = [
-            self.validate_ssh_hardening,
-            self.validate_fail2ban,
-            self.validate_firewall,
-            self.validate_log_rotation,
-            self.validate_ntp,
-            self.validate_sudo_logging,
-            self.validate_fips,
-            self.validate_clamav,
-            self.validate_aide,
-            self.validate_service_minimization,
-        ]
+    def _run_validator(self, spec: ValidatorSpec, timeout: float,
+                       started: Dict[str, float]) -> Tuple[ValidationResult, List[str]]:
+        """
+        Run one validator on a worker thread; returns its result and evidence files.
         
-        for validation_func in validations:
+        The time limit counts from when the validator starts, recorded in
+        started for the scheduler, not from when it was submitted.
+        """
+        start = time.monotonic()
+        started[spec.name] = start
+        self._local.deadline = start + timeout
+        self._local.evidence = []
+        try:
             try:
-                result = validation_func()
-                self.results.append(result)
-                logger.info(f"{result.control_id}: {result.check_name} - {result.status.upper()}")
+                result = getattr(self, spec.method)()
             except Exception as e:
                 logger.error(f"Error in validation: {e}")
-                self.results.append(ValidationResult(
+                result = ValidationResult(
                     "ERROR", "Validation Error", "fail",
                     f"Exception during validation: {e}"
-                ))
+                )
+            return result, self._local.evidence
+        finally:
+            self.timings[spec.name] = time.monotonic() - start
+            self._local.deadline = None
+            self._local.evidence = None
+    
+    def iter_validations(self, validators: Optional[List[ValidatorSpec]] = None) -> Iterator[ValidationResult]:
+        """
+        Run validators on a bounded thread pool, yielding results in declaration order.
+        
+        A validator starts once every validator it depends on has finished. Each
+        result is yielded as soon as it and all validators declared before it are
+        done, so callers can report while slower validators are still running.
+        Commands of a validator are cut off at its time limit, counted from when
+        it starts; a validator that still has not returned shortly after fails
+        with a timeout result. Its worker thread is abandoned, and the pool is
+        replaced so the hung thread doesn't hold a slot other validators need.
+        """
+        validators = validators if validators is not None else VALIDATORS
+        names = {spec.name for spec in validators}
+        for spec in validators:
+            unknown = set(spec.depends_on) - names
+            if unknown:
+                raise ValueError(f"Validator {spec.name} depends on unknown validators: {sorted(unknown)}")
+        
+        pending = list(validators)
+        finished: Dict[str, ValidationResult] = {}
+        evidence: Dict[str, List[str]] = {}
+        running = {}  # future -> spec
+        started: Dict[str, float] = {}  # validator name -> start time, set by the worker
+        next_index = 0
+        
+        def give_up_at(spec: ValidatorSpec) -> Optional[float]:
+            start = started.get(spec.name)
+            if start is None:
+                return None
+            return start + (spec.timeout or self.default_timeout) + VALIDATOR_GRACE_PERIOD
+        
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='validator')
+        try:
+            while pending or running:
+                # Start every ready validator, in declaration order
+                for spec in [s for s in pending if all(d in finished for d in s.depends_on)]:
+                    if len(running) >= self.workers:
+                        break
+                    pending.remove(spec)
+                    future = executor.submit(
+                        self._run_validator, spec, spec.timeout or self.default_timeout, started
+                    )
+                    running[future] = spec
+                
+                if not running:
+                    raise ValueError(f"Validator dependency cycle: {[s.name for s in pending]}")
+                
+                deadlines = [give_up_at(spec) for spec in running.values()]
+                known = [deadline for deadline in deadlines if deadline is not None]
+                timeout = max(0, min(known) - time.monotonic()) if known else VALIDATOR_START_POLL
+                if len(known) < len(deadlines):
+                    timeout = min(timeout, VALIDATOR_START_POLL)
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    spec = running.pop(future)
+                    finished[spec.name], evidence[spec.name] = future.result()
+                
+                # Give up on validators past their deadline; the worker thread
+                # finishes on its own once its current command is cut off
+                now = time.monotonic()
+                abandoned = False
+                for future, spec in list(running.items()):
+                    deadline = give_up_at(spec)
+                    if deadline is not None and deadline <= now and not future.done():
+                        del running[future]
+                        abandoned = True
+                        limit = spec.timeout or self.default_timeout
+                        logger.error(f"Validator {spec.name} timed out after {limit:.0f}s")
+                        finished[spec.name] = ValidationResult(
+                            "ERROR", "Validation Error", "fail",
+                            f"Validator {spec.name} timed out after {limit:.0f}s"
+                        )
+                if abandoned:
+                    # The hung threads keep their pool slots; start later validators on
+                    # a fresh pool (validators still running finish on the old one)
+                    executor.shutdown(wait=False)
+                    executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='validator')
+                
+                # Release results that complete the declaration-order prefix
+                while next_index < len(validators) and validators[next_index].name in finished:
+                    name = validators[next_index].name
+                    next_index += 1
+                    result = finished[name]
+                    self.results.append(result)
+                    self.evidence_files.extend(evidence.get(name, []))
+                    logger.info(f"{result.control_id}: {result.check_name} - {result.status.upper()}")
+                    yield result
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def run_all_validations(self, on_result: Optional[Callable[[ValidationResult], None]] = None) -> List[ValidationResult]:
+        """Run all validation checks."""
+        logger.info(f"Starting CMMC 2.0 Level 2 hardening validation ({self.workers} workers)")
+        start = time.monotonic()
+        
+        for result in self.iter_validations():
+            if on_result:
+                on_result(result)
         
+        slowest = max(self.timings.values(), default=0.0)
+        logger.info(f"Validation finished in {time.monotonic() - start:.1f}s "
+                    f"(slowest validator {slowest:.1f}s, sum {sum(self.timings.values()):.1f}s)")
+        logger.info(PROBES.summary())
         return self.results
     
     def generate_summary_report(self):
@@ -681,6 +915,8 @@ Disabled Services:
         
         logger.info(f"Summary report saved to {summary_path}")
         self.evidence_files.append(str(summary_path))
+        if self.bundle:
+            self.bundle.add_file(summary_path)
     
     def generate_json_report(self):
         """Generate JSON report for programmatic access."""
@@ -714,6 +950,271 @@ Disabled Services:
         
         logger.info(f"JSON report saved to {json_path}")
         self.evidence_files.append(str(json_path))
+        if self.bundle:
+            self.bundle.add_file(json_path)
+
+
+class ValidationStore:
+    """Time series of validation results in a local SQLite database."""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS validation_results (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp TEXT NOT NULL,
+            validator TEXT NOT NULL,
+            control_id TEXT NOT NULL,
+            check_name TEXT NOT NULL,
+            status TEXT NOT NULL,
+            previous_status TEXT,
+            drift INTEGER NOT NULL DEFAULT 0,
+            details TEXT,
+            evidence TEXT,
+            trigger TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_validation_results_validator
+            ON validation_results (validator, id);
+    """
+    
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.executescript(self.SCHEMA)
+    
+    def last_status(self, validator: str) -> Optional[str]:
+        """Return the most recent recorded status of a validator."""
+        row = self.conn.execute(
+            "SELECT status FROM validation_results WHERE validator = ? ORDER BY id DESC LIMIT 1",
+            (validator,)
+        ).fetchone()
+        return row[0] if row else None
+    
+    def record(self, validator: str, result: ValidationResult, trigger: str) -> Optional[str]:
+        """
+        Append a result; returns the previous status if the status drifted.
+        """
+        previous = self.last_status(validator)
+        drift = previous is not None and previous != result.status
+        self.conn.execute(
+            "INSERT INTO validation_results (timestamp, validator, control_id, check_name, status, "
+            "previous_status, drift, details, evidence, trigger) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (result.timestamp, validator, result.control_id, result.check_name, result.status,
+             previous, int(drift), result.details, result.evidence, trigger)
+        )
+        self.conn.commit()
+        return previous if drift else None
+    
+    def close(self):
+        self.conn.close()
+
+
+def _watch_matches(watch_path: str, changed_path: str) -> bool:
+    """Check whether a changed path is (or is inside) a watched path."""
+    return changed_path == watch_path or changed_path.startswith(watch_path.rstrip('/') + '/')
+
+
+class PollingWatcher:
+    """Detect changes to watched paths (and everything under them) by comparing stat fingerprints."""
+    
+    def __init__(self, paths: List[str], interval: float = DEFAULT_POLL_INTERVAL):
+        self.paths = sorted(set(paths))
+        self.interval = interval
+        self._fingerprints = {path: files_fingerprint([path], recursive=True) for path in self.paths}
+    
+    def wait(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds; return the watched paths that changed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                fingerprint = files_fingerprint([path], recursive=True)
+                if fingerprint != self._fingerprints[path]:
+                    self._fingerprints[path] = fingerprint
+                    changed.add(path)
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+    
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Detect changes to watched paths with Linux inotify (via libc, no extra packages)."""
+    
+    IN_MODIFY = 0x002
+    IN_ATTRIB = 0x004
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_DELETE_SELF = 0x400
+    IN_MOVE_SELF = 0x800
+    IN_CLOEXEC = 0o2000000
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+                  IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+    EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+    
+    def __init__(self, paths: List[str]):
+        """
+        Raises:
+            OSError: If inotify is not available
+        """
+        self.paths = sorted(set(paths))
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._dirs: Dict[int, str] = {}
+        self._refresh_watches()
+    
+    def _watch_dir(self, path: str) -> str:
+        """Directory to watch for a path: itself, or the nearest existing ancestor."""
+        candidate = path if os.path.isdir(path) else os.path.dirname(path)
+        while candidate and not os.path.isdir(candidate):
+            candidate = os.path.dirname(candidate)
+        return candidate or '/'
+    
+    def _add_watch(self, directory: str):
+        wd = self._libc.inotify_add_watch(self.fd, directory.encode(), self.WATCH_MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+        else:
+            logger.debug(f"Cannot watch {directory}: {os.strerror(ctypes.get_errno())}")
+    
+    def _refresh_watches(self):
+        """
+        (Re)add directory watches; newly created directories get their own watch.
+        
+        inotify watches aren't recursive, so every subdirectory of a watched
+        directory (e.g. /etc/fail2ban/jail.d) is watched as well.
+        """
+        for path in self.paths:
+            directory = self._watch_dir(path)
+            self._add_watch(directory)
+            if directory != path:
+                continue
+            for root, dirs, _ in os.walk(directory):
+                for name in dirs:
+                    self._add_watch(os.path.join(root, name))
+    
+    def wait(self, timeout: float) -> Set[str]:
+        """Wait up to timeout seconds; return the watched paths that changed."""
+        readable, _, _ = select.select([self.fd], [], [], max(0, timeout))
+        if not readable:
+            return set()
+        data = os.read(self.fd, 64 * 1024)
+        
+        changed = set()
+        offset = 0
+        while offset + self.EVENT_HEADER.size <= len(data):
+            wd, mask, _, name_len = self.EVENT_HEADER.unpack_from(data, offset)
+            offset += self.EVENT_HEADER.size
+            name = data[offset:offset + name_len].split(b'\0', 1)[0].decode(errors='replace')
+            offset += name_len
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            event_path = os.path.join(directory, name) if name else directory
+            for path in self.paths:
+                # Events on the path, inside it, or creating one of its ancestors
+                if _watch_matches(path, event_path) or _watch_matches(event_path, path):
+                    changed.add(path)
+        
+        self._refresh_watches()
+        return changed
+    
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(paths: List[str], use_inotify: bool = True,
+                   poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """Return an inotify watcher, falling back to mtime polling."""
+    if use_inotify:
+        try:
+            watcher = InotifyWatcher(paths)
+            logger.info(f"Watching {len(watcher.paths)} paths with inotify")
+            return watcher
+        except (OSError, AttributeError) as e:
+            logger.warning(f"inotify unavailable ({e}) - falling back to polling")
+    watcher = PollingWatcher(paths, poll_interval)
+    logger.info(f"Polling {len(watcher.paths)} paths every {poll_interval}s")
+    return watcher
+
+
+class DriftMonitor:
+    """Re-run the validators affected by file changes and record the results."""
+    
+    def __init__(self, generator: CMMCValidationEvidenceGenerator, store: ValidationStore,
+                 watcher, full_sweep_interval: float = DEFAULT_FULL_SWEEP_INTERVAL,
+                 validators: Optional[List[ValidatorSpec]] = None):
+        self.generator = generator
+        self.store = store
+        self.watcher = watcher
+        self.full_sweep_interval = full_sweep_interval
+        self.validators = validators if validators is not None else VALIDATORS
+    
+    def affected_validators(self, changed: Set[str]) -> List[ValidatorSpec]:
+        """Return the validators watching any of the changed paths, in report order."""
+        return [spec for spec in self.validators if set(spec.watch) & changed]
+    
+    def run_cycle(self, validators: List[ValidatorSpec], trigger: str) -> int:
+        """
+        Run a subset of validators and record their results.
+        
+        Returns:
+            Number of validators whose status drifted
+        """
+        names = {spec.name for spec in validators}
+        # Dependencies outside the subset already ran in an earlier cycle
+        subset = [replace(spec, depends_on=tuple(d for d in spec.depends_on if d in names))
+                  for spec in validators]
+        
+        # Service state and files may have changed since the last cycle
+        PROBES.invalidate()
+        self.generator.results = []
+        self.generator.evidence_files = []
+        
+        drifted = 0
+        for spec, result in zip(subset, self.generator.iter_validations(subset)):
+            previous = self.store.record(spec.name, result, trigger)
+            if previous is not None:
+                drifted += 1
+                logger.warning(f"DRIFT: {spec.name} ({result.control_id}) {previous.upper()} -> "
+                               f"{result.status.upper()}: {result.details}")
+        return drifted
+    
+    def run(self, max_cycles: Optional[int] = None):
+        """Monitor until interrupted (or for max_cycles change/sweep cycles)."""
+        logger.info(f"Drift monitor started - recording to {self.store.db_path}")
+        self.run_cycle(self.validators, 'initial')
+        next_sweep = time.monotonic() + self.full_sweep_interval
+        cycles = 0
+        while max_cycles is None or cycles < max_cycles:
+            changed = self.watcher.wait(max(0, next_sweep - time.monotonic()))
+            if changed:
+                # Let bursts of writes (editors, package installs) settle
+                time.sleep(MONITOR_DEBOUNCE)
+                changed |= self.watcher.wait(0)
+                validators = self.affected_validators(changed)
+                trigger = f"change: {', '.join(sorted(changed))}"
+            elif time.monotonic() >= next_sweep:
+                # Validators without watched files (e.g. FIPS, service state) drift too
+                validators = self.validators
+                trigger = 'periodic sweep'
+                next_sweep = time.monotonic() + self.full_sweep_interval
+            else:
+                continue
+            
+            if validators:
+                logger.info(f"Re-running {len(validators)} validator(s) ({trigger})")
+                self.run_cycle(validators, trigger)
+            cycles += 1
 
 
 def main():
@@ -747,8 +1248,78 @@ Validated Controls:
         default=Path('/opt/compliance/validation-evidence'),
         help='Directory to store validation evidence (default: /opt/compliance/validation-evidence)'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_VALIDATION_WORKERS,
+        help=f'Maximum validators run at the same time (default: {DEFAULT_VALIDATION_WORKERS})'
+    )
+    parser.add_argument(
+        '--validator-timeout',
+        type=float,
+        default=DEFAULT_VALIDATOR_TIMEOUT,
+        help=f'Time limit in seconds for validators without their own (default: {DEFAULT_VALIDATOR_TIMEOUT})'
+    )
+    parser.add_argument(
+        '--monitor',
+        action='store_true',
+        help='Keep running and re-validate when watched configuration files change'
+    )
+    parser.add_argument(
+        '--db',
+        type=Path,
+        default=None,
+        help='SQLite database for monitor results (default: <output-dir>/validation_history.db)'
+    )
+    parser.add_argument(
+        '--poll-interval',
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f'Polling interval in seconds when inotify is unavailable (default: {DEFAULT_POLL_INTERVAL})'
+    )
+    parser.add_argument(
+        '--full-sweep-interval',
+        type=float,
+        default=DEFAULT_FULL_SWEEP_INTERVAL,
+        help=f'Seconds between full validation sweeps in monitor mode (default: {DEFAULT_FULL_SWEEP_INTERVAL})'
+    )
+    parser.add_argument(
+        '--no-inotify',
+        action='store_true',
+        help='Use mtime polling instead of inotify in monitor mode'
+    )
+    parser.add_argument(
+        '--bundle',
+        type=Path,
+        nargs='?',
+        const=True,
+        default=None,
+        metavar='PATH',
+        help='Stream all evidence into a hashed ZIP bundle as it is produced '
+             '(default path: <output-dir>/cmmc_evidence_<timestamp>.zip)'
+    )
+    parser.add_argument(
+        '--signing-key',
+        type=Path,
+        default=None,
+        help='PEM private key used to sign the bundle manifest (openssl dgst -sha256 -sign)'
+    )
+    parser.add_argument(
+        '--include-aide-report',
+        action='store_true',
+        help='Run aide --check and stream its report into the bundle'
+    )
     
     args = parser.parse_args()
+    if args.monitor:
+        # Monitor mode records results in its database and never writes a bundle
+        bundle_options = [
+            flag for flag, value in (('--bundle', args.bundle), ('--signing-key', args.signing_key),
+                                     ('--include-aide-report', args.include_aide_report))
+            if value
+        ]
+        if bundle_options:
+            parser.error(f"{', '.join(bundle_options)} can't be combined with --monitor")
     
     # Check if running as root (some checks require root)
     if os.geteuid() != 0:
@@ -757,15 +1328,54 @@ Validated Controls:
         if response.lower() != 'yes':
             sys.exit(0)
     
+    bundle = None
+    if args.bundle:
+        bundle_path = args.bundle if isinstance(args.bundle, Path) else (
+            args.output_dir / f"cmmc_evidence_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        )
+        bundle = EvidenceBundle(bundle_path, signing_key=args.signing_key)
+    
     # Initialize generator
-    generator = CMMCValidationEvidenceGenerator(args.output_dir)
+    generator = CMMCValidationEvidenceGenerator(
+        args.output_dir, workers=args.workers, default_timeout=args.validator_timeout, bundle=bundle
+    )
+    
+    if args.monitor:
+        store = ValidationStore(args.db or args.output_dir / 'validation_history.db')
+        watcher = create_watcher(
+            [path for spec in VALIDATORS for path in spec.watch],
+            use_inotify=not args.no_inotify, poll_interval=args.poll_interval
+        )
+        try:
+            DriftMonitor(generator, store, watcher, args.full_sweep_interval).run()
+        except KeyboardInterrupt:
+            logger.info("Drift monitor stopped")
+        finally:
+            watcher.close()
+            store.close()
+        return
+    
+    def print_result(result: ValidationResult):
+        status_symbol = {
+            'pass': '✓',
+            'fail': '✗',
+            'warning': '⚠',
+            'n/a': '-'
+        }.get(result.status, '?')
+        print(f"{status_symbol} {result.control_id}: {result.check_name} - {result.status.upper()}")
+        print(f"   {result.details}")
     
-    # Run all validations
-    results = generator.run_all_validations()
+    # Run all validations, reporting each result as soon as it is in order
+    print("\nDetailed Results:")
+    print("-" * 80)
+    generator.bundle_large_evidence(include_aide_report=args.include_aide_report)
+    results = generator.run_all_validations(on_result=print_result)
     
     # Generate reports
     generator.generate_summary_report()
     generator.generate_json_report()
+    if bundle:
+        bundle.close()
     
     # Print summary
     print("\n" + "=" * 80)
@@ -782,23 +1392,13 @@ Validated Controls:
     print(f"Passed: {status_counts['pass']}")
     print(f"Failed: {status_counts['fail']}")
     print(f"Warnings: {status_counts['warning']}")
-    print("\nDetailed Results:")
-    print("-" * 80)
-    
-    for result in results:
-        status_symbol = {
-            'pass': '✓',
-            'fail': '✗',
-            'warning': '⚠',
-            'n/a': '-'
-        }.get(result.status, '?')
-        print(f"{status_symbol} {result.control_id}: {result.check_name} - {result.status.upper()}")
-        print(f"   {result.details}")
     
     print("\n" + "=" * 80)
     print(f"Evidence directory: {args.output_dir}")
     print(f"Summary report: {args.output_dir / 'validation_summary.txt'}")
     print(f"JSON report: {args.output_dir / 'validation_results.json'}")
+    if bundle:
+        print(f"Evidence bundle: {bundle.path}")
     print("=" * 80)
 
 
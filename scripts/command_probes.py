@@ -0,0 +1,409 @@
+#!/usr/bin/env python3
+"""
+Shared command probe layer for the hardening and validation scripts.
+
+harden_ubuntu_cmmc.py, harden_ubuntu_stig.py and
+cmmc_hardening_validation_evidence.py run the same read-only probes
+(`systemctl is-active ssh`, `sshd -T`, `dpkg -l`, `systemctl list-unit-files`)
+many times per run, each one a `shell=True` fork. Their run_command methods
+go through the process-wide PROBES cache instead:
+
+- Read-only commands are memoized for the run. Each entry records the
+  resources it reads (e.g. "ssh", "apt", "systemd:ssh", "file:/etc/...")
+  and a fingerprint of the files behind them, so an entry is refreshed
+  when a config file is edited directly from Python.
+- Any other command runs uncached and invalidates the entries whose
+  resources it touches; commands whose effect can't be classified
+  (package changes, update-grub, ...) clear the whole cache.
+
+Usage:
+    from command_probes import PROBES
+    result = PROBES.run("systemctl is-active ssh")  # subprocess.CompletedProcess
+    logger.info(PROBES.summary())
+"""
+
+import os
+import re
+import shlex
+import subprocess
+import threading
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Read-only programs, with the subcommands/flags that make them read-only
+# (None: every invocation is read-only)
+READ_ONLY_COMMANDS = {
+    'systemctl': {'is-active', 'is-enabled', 'is-failed', 'status', 'show', 'cat',
+                  'list-unit-files', 'list-units'},
+    'sshd': {'-T', '-t'},
+    'dpkg': {'-l', '-s', '-L', '-S', '--list', '--status', '--get-selections'},
+    'dpkg-query': None,
+    'apt-cache': {'policy', 'show', 'search', 'depends', 'rdepends'},
+    'ufw': {'status'},
+    'fail2ban-client': {'status'},
+    'openssl': {'list', 'version'},
+    'clamscan': {'--version'},
+    'aide': {'--version'},
+    'logrotate': {'-d', '--debug'},
+    'auditctl': {'-l', '-s'},
+    'which': None,
+    'grep': None,
+    'egrep': None,
+    'cat': None,
+    'test': None,
+    'stat': None,
+    'ls': None,
+    'head': None,
+    'tail': None,
+    'wc': None,
+    'cut': None,
+    'sort': None,
+    'uniq': None,
+    'id': None,
+    'getent': None,
+}
+
+# Read-only programs whose output changes on its own (clock, disk usage):
+# never cached, but running them doesn't invalidate anything either
+VOLATILE_COMMANDS = {
+    'timedatectl': {'status', 'show', 'show-timesync', 'timesync-status'},
+    'chronyc': {'tracking', 'sources', 'sourcestats'},
+    'df': None,
+    'uptime': None,
+}
+
+# Resources read or changed by a program; systemctl units map separately
+PROGRAM_RESOURCES = {
+    'sshd': {'ssh'},
+    'dpkg': {'apt'},
+    'dpkg-query': {'apt'},
+    'apt': {'apt'},
+    'apt-get': {'apt'},
+    'apt-cache': {'apt'},
+    'ufw': {'ufw'},
+    'fail2ban-client': {'fail2ban'},
+    'sysctl': {'sysctl'},
+    'aide': {'aide'},
+    'aideinit': {'aide'},
+    'clamscan': {'clamav'},
+    'freshclam': {'clamav'},
+    'auditctl': {'audit'},
+    'augenrules': {'audit'},
+    'logrotate': {'logrotate'},
+    'timedatectl': {'time'},
+    'chronyc': {'time'},
+}
+
+# Services whose state is also visible through other probes
+SERVICE_RESOURCES = {
+    'ssh': 'ssh',
+    'sshd': 'ssh',
+    'fail2ban': 'fail2ban',
+    'ufw': 'ufw',
+    'chrony': 'time',
+    'chronyd': 'time',
+    'systemd-timesyncd': 'time',
+    'clamav-daemon': 'clamav',
+    'auditd': 'audit',
+}
+
+# Files behind a resource: cached output is only reused while they are unchanged
+RESOURCE_FILES = {
+    'ssh': ['/etc/ssh/sshd_config', '/etc/ssh/sshd_config.d'],
+    'apt': ['/var/lib/dpkg/status'],
+    'fail2ban': ['/etc/fail2ban/jail.local', '/etc/fail2ban/jail.d'],
+    'logrotate': ['/etc/logrotate.conf', '/etc/logrotate.d'],
+    'systemd': ['/etc/systemd/system'],
+}
+
+# Mutating programs whose side effects reach beyond their resources
+# (package scripts restart services, replace binaries and config files)
+CLEAR_ALL_RESOURCES = {'apt'}
+
+# Flags that make a read-only program read whole directory trees (short
+# flags, long flags); such probes fingerprint subdirectories too
+RECURSIVE_FLAGS = {
+    'grep': ({'r', 'R'}, {'--recursive', '--dereference-recursive'}),
+    'egrep': ({'r', 'R'}, {'--recursive', '--dereference-recursive'}),
+    'ls': ({'R'}, {'--recursive'}),
+}
+
+# Redirections that don't write files
+_HARMLESS_REDIRECT = re.compile(r'\d?>&\d|&?\d?>\s*/dev/null')
+_SEGMENT_SPLIT = re.compile(r'\|\||&&|[|;]')
+
+
+def _tokens(segment: str) -> List[str]:
+    """Split a pipeline segment into words, dropping sudo and redirections."""
+    try:
+        words = shlex.split(_HARMLESS_REDIRECT.sub(' ', segment))
+    except ValueError:
+        words = segment.split()
+    while words and words[0] == 'sudo':
+        words = words[1:]
+    return words
+
+
+def _systemctl_units(args: List[str]) -> List[str]:
+    """Return the units named by systemctl arguments (after the verb)."""
+    words = [arg for arg in args if not arg.startswith('-')]
+    return [re.sub(r'\.service$', '', unit) for unit in words[1:]]
+
+
+def command_resources(command: str) -> Set[str]:
+    """
+    Return the resources a shell command reads or changes.
+
+    Resources are tags such as "ssh", "apt", "systemd:ssh" (or "systemd:*"
+    for unit-less systemctl calls) and "file:<path>". An empty set means
+    the command's effect is unknown.
+    """
+    resources: Set[str] = set()
+    for segment in _SEGMENT_SPLIT.split(command):
+        words = _tokens(segment)
+        if not words:
+            continue
+        program = os.path.basename(words[0])
+        resources |= PROGRAM_RESOURCES.get(program, set())
+        if program == 'systemctl':
+            units = _systemctl_units(words[1:])
+            if not units:
+                resources.add('systemd:*')
+            for unit in units:
+                resources.add(f'systemd:{unit}')
+                if unit in SERVICE_RESOURCES:
+                    resources.add(SERVICE_RESOURCES[unit])
+        for word in words[1:]:
+            if word.startswith('/') and word != '/dev/null':
+                # Cut globs so /etc/ssh/sshd_config.d/*.conf maps to the directory
+                path = re.split(r'[*?\[]', word)[0].rstrip('/')
+                if path:
+                    resources.add(f'file:{path}')
+    return resources
+
+
+def is_read_only(command: str, volatile: bool = False) -> bool:
+    """
+    Return True if every part of a shell command is a known read-only probe.
+
+    Args:
+        command: Shell command
+        volatile: Also accept read-only programs whose output changes over time
+    """
+    if '$(' in command or '`' in command or '<(' in command:
+        return False
+    if '>' in _HARMLESS_REDIRECT.sub(' ', command):
+        return False
+    segments = [_tokens(segment) for segment in _SEGMENT_SPLIT.split(command)]
+    if not any(segments):
+        return False
+    for words in segments:
+        if not words:
+            continue
+        program = os.path.basename(words[0])
+        if program == 'sysctl':
+            # Reads name keys; writes use -w, -p, --system or key=value
+            if any(w in ('-w', '-p', '--system', '--load', '--write') or '=' in w for w in words[1:]):
+                return False
+            continue
+        if program in READ_ONLY_COMMANDS:
+            allowed = READ_ONLY_COMMANDS[program]
+        elif volatile and program in VOLATILE_COMMANDS:
+            allowed = VOLATILE_COMMANDS[program]
+        else:
+            return False
+        if allowed is None:
+            continue
+        if program == 'systemctl':
+            verb = next((w for w in words[1:] if not w.startswith('-')), '')
+            if verb not in allowed:
+                return False
+        elif not any(w in allowed for w in words[1:]):
+            return False
+    return True
+
+
+def reads_recursively(command: str) -> bool:
+    """Return True if a shell command reads directories recursively (e.g. grep -r, ls -R)."""
+    for segment in _SEGMENT_SPLIT.split(command):
+        words = _tokens(segment)
+        if not words:
+            continue
+        flags = RECURSIVE_FLAGS.get(os.path.basename(words[0]))
+        if not flags:
+            continue
+        short_flags, long_flags = flags
+        for word in words[1:]:
+            if word.startswith('--'):
+                if word in long_flags:
+                    return True
+            elif word.startswith('-') and short_flags & set(word[1:]):
+                return True
+    return False
+
+
+def resources_overlap(first: Set[str], second: Set[str]) -> bool:
+    """Check whether two resource sets touch the same thing."""
+    for a in first:
+        for b in second:
+            if a == b:
+                return True
+            if a.startswith('systemd:') and b.startswith('systemd:') and '*' in (a[8:], b[8:]):
+                return True
+            if a.startswith('file:') and b.startswith('file:'):
+                pa, pb = a[5:], b[5:]
+                if pa.startswith(pb + '/') or pb.startswith(pa + '/'):
+                    return True
+    return False
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """Return the change fingerprint of a path, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+
+
+def files_fingerprint(paths: List[str], recursive: bool = False) -> Tuple:
+    """
+    Fingerprint files (and the entries of directories) by their stat data.
+
+    Args:
+        paths: Files and directories
+        recursive: Include entries of subdirectories too, not just direct entries
+    """
+    fingerprint = []
+    for path in sorted(paths):
+        fingerprint.append((path, _stat_key(path)))
+        if not os.path.isdir(path):
+            continue
+        for root, dirs, names in os.walk(path):
+            dirs.sort()
+            for entry in sorted(dirs + names):
+                entry_path = os.path.join(root, entry)
+                fingerprint.append((entry_path, _stat_key(entry_path)))
+            if not recursive:
+                break
+    return tuple(fingerprint)
+
+
+class CommandProbeCache:
+    """Per-run memo of read-only command output, invalidated by mutating commands."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # command -> (resources, file fingerprint, result)
+        self._entries: Dict[str, Tuple[FrozenSet[str], Tuple, subprocess.CompletedProcess]] = {}
+        # Bumped on every invalidation so probes racing a mutation aren't stored
+        self._generation = 0
+        self.stats = {
+            'probes': 0,         # read-only commands requested
+            'hits': 0,           # probes answered from the cache (forks avoided)
+            'stale': 0,          # cached probes refreshed because their files changed
+            'uncached': 0,       # mutating or volatile commands run directly
+            'invalidations': 0,  # cache entries dropped by mutating commands
+        }
+
+    def _dependency_files(self, resources: Set[str]) -> List[str]:
+        """Return the files whose changes invalidate a probe reading these resources."""
+        paths = set()
+        for resource in resources:
+            if resource.startswith('file:'):
+                paths.add(resource[5:])
+            elif resource.startswith('systemd:'):
+                paths.update(RESOURCE_FILES['systemd'])
+            else:
+                paths.update(RESOURCE_FILES.get(resource, []))
+        return sorted(paths)
+
+    def run(self, command: str, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        """
+        Run a shell command, answering read-only probes from the cache.
+
+        Args:
+            command: Shell command, run with shell=True
+            timeout: Seconds before the command is killed (raises TimeoutExpired)
+
+        Returns:
+            CompletedProcess with text stdout and stderr (shared for cache hits;
+            treat it as read-only)
+        """
+        if not is_read_only(command):
+            with self._lock:
+                self.stats['uncached'] += 1
+            if is_read_only(command, volatile=True):
+                return self._execute(command, timeout)
+            try:
+                return self._execute(command, timeout)
+            finally:
+                self.invalidate(command_resources(command))
+
+        resources = command_resources(command)
+        dependency_files = self._dependency_files(resources)
+        # A recursive read goes stale when any file below its directories changes
+        fingerprint = files_fingerprint(dependency_files, recursive=reads_recursively(command))
+        # Edits of the dependency files through other commands invalidate too
+        resources = frozenset(resources | {f'file:{path}' for path in dependency_files})
+        with self._lock:
+            self.stats['probes'] += 1
+            entry = self._entries.get(command)
+            if entry is not None:
+                if entry[1] == fingerprint:
+                    self.stats['hits'] += 1
+                    return entry[2]
+                self.stats['stale'] += 1
+            generation = self._generation
+
+        result = self._execute(command, timeout)
+        with self._lock:
+            if self._generation == generation:
+                self._entries[command] = (resources, fingerprint, result)
+        return result
+
+    def _execute(self, command: str, timeout: Optional[float]) -> subprocess.CompletedProcess:
+        """Fork the command."""
+        return subprocess.run(
+            command,
+            shell=True,
+            capture_output=True,
+            text=True,
+            check=False,
+            timeout=timeout
+        )
+
+    def invalidate(self, resources: Optional[Set[str]] = None) -> int:
+        """
+        Drop cached probes that read any of the given resources.
+
+        Args:
+            resources: Resources changed by a mutation; None or an empty set
+                (unknown effect) and package changes clear the whole cache
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            self._generation += 1
+            if not resources or resources & CLEAR_ALL_RESOURCES:
+                dropped = list(self._entries)
+            else:
+                dropped = [
+                    command for command, (entry_resources, _, _) in self._entries.items()
+                    if resources_overlap(set(entry_resources), resources)
+                ]
+            for command in dropped:
+                del self._entries[command]
+            self.stats['invalidations'] += len(dropped)
+            return len(dropped)
+
+    def summary(self) -> str:
+        """One-line summary of the forks avoided this run."""
+        s = self.stats
+        return (f"Command probes: {s['hits']} forks avoided "
+                f"({s['hits']}/{s['probes']} read-only probes cached, {s['stale']} refreshed, "
+                f"{s['uncached']} uncached commands, {s['invalidations']} invalidations)")
+
+
+# Shared by every script in the process
+PROBES = CommandProbeCache()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Streaming, hashed evidence bundle for CMMC assessment packages.
+
+Evidence artifacts are streamed into a compressed ZIP archive as they are
+produced, instead of being collected as loose files and archived by hand:
+
+- Producers (validators on worker threads) only enqueue artifacts; a single
+  writer thread streams them into the archive in chunks, so neither the
+  bundle nor any large artifact is ever held in memory.
+- SHA-256 hashes of files are computed on a thread pool, in parallel with
+  compression. Command output (e.g. `aide --check`) is piped straight into
+  the archive and hashed as it streams.
+- On close, manifest.json (path, size, SHA-256 of every artifact) is added
+  and, given a PEM private key, signed with `openssl dgst -sha256 -sign`
+  as manifest.json.sig.
+
+Verify a bundle with:
+    unzip bundle.zip manifest.json manifest.json.sig
+    openssl dgst -sha256 -verify signing-pub.pem -signature manifest.json.sig manifest.json
+    sha256sum <artifact>  # compare with manifest.json
+"""
+
+import hashlib
+import json
+import logging
+import queue
+import subprocess
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bytes read per chunk when streaming or hashing
+CHUNK_SIZE = 1024 * 1024
+
+# Artifacts waiting to be written; producers block beyond this instead of buffering
+MAX_PENDING_ARTIFACTS = 64
+
+DEFAULT_HASH_WORKERS = 4
+
+MANIFEST_NAME = 'manifest.json'
+SIGNATURE_NAME = 'manifest.json.sig'
+
+
+def hash_file_prefix(path: Path, size: int) -> str:
+    """Return the SHA-256 of the first `size` bytes of a file."""
+    digest = hashlib.sha256()
+    remaining = size
+    with open(path, 'rb') as f:
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+class EvidenceBundle:
+    """ZIP evidence archive written by a background thread, with a hashed manifest."""
+
+    def __init__(self, path: Path, signing_key: Optional[Path] = None,
+                 hash_workers: int = DEFAULT_HASH_WORKERS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.signing_key = signing_key
+        self._zip = zipfile.ZipFile(self.path, 'w', compression=zipfile.ZIP_DEFLATED, allowZip64=True)
+        self._queue: queue.Queue = queue.Queue(maxsize=MAX_PENDING_ARTIFACTS)
+        self._hashers = ThreadPoolExecutor(max_workers=hash_workers, thread_name_prefix='evidence-hash')
+        self._lock = threading.Lock()
+        # arcname -> manifest entry; 'sha256' is a Future until resolved
+        self._entries: Dict[str, Dict] = {}
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='evidence-writer', daemon=True)
+        self._writer.start()
+
+    def _reserve(self, arcname: str) -> str:
+        """Claim an archive name, suffixing duplicates (re-run validators)."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Evidence bundle {self.path} is closed")
+            name, counter = arcname, 1
+            while name in self._entries:
+                counter += 1
+                stem, dot, ext = arcname.rpartition('.')
+                name = f"{stem}.{counter}.{ext}" if dot else f"{arcname}.{counter}"
+            self._entries[name] = {}
+            return name
+
+    def add_file(self, path: Path, arcname: Optional[str] = None) -> Optional[str]:
+        """
+        Queue a file for the archive.
+
+        The file is captured at its current size, so growing logs are archived
+        and hashed consistently.
+
+        Returns:
+            Archive name of the artifact, or None if the file can't be read
+        """
+        path = Path(path)
+        try:
+            size = path.stat().st_size
+        except OSError as e:
+            logger.warning(f"Skipping evidence {path}: {e}")
+            return None
+        name = self._reserve(arcname or path.name)
+        self._entries[name].update({
+            'path': name,
+            'source': str(path),
+            'size': size,
+            'sha256': self._hashers.submit(hash_file_prefix, path, size),
+        })
+        self._queue.put(('file', name, path, size))
+        return name
+
+    def add_command_output(self, arcname: str, command: str) -> str:
+        """Queue a command whose output is streamed straight into the archive."""
+        name = self._reserve(arcname)
+        self._entries[name].update({'path': name, 'source': f"command: {command}"})
+        self._queue.put(('command', name, command, None))
+        return name
+
+    def _write_loop(self):
+        """Stream queued artifacts into the archive until closed."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind, name, source, size = item
+            if self._error is not None:
+                continue
+            try:
+                if kind == 'file':
+                    self._write_file(name, source, size)
+                else:
+                    self._write_command(name, source)
+            except BaseException as e:
+                logger.error(f"Failed to add {name} to evidence bundle: {e}")
+                self._error = e
+
+    def _write_file(self, name: str, path: Path, size: int):
+        remaining = size
+        with open(path, 'rb') as src, self._zip.open(name, 'w', force_zip64=True) as dst:
+            while remaining > 0:
+                chunk = src.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+    def _write_command(self, name: str, command: str):
+        digest = hashlib.sha256()
+        size = 0
+        process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        with self._zip.open(name, 'w', force_zip64=True) as dst:
+            for chunk in iter(lambda: process.stdout.read(CHUNK_SIZE), b''):
+                dst.write(chunk)
+                digest.update(chunk)
+                size += len(chunk)
+        process.stdout.close()
+        returncode = process.wait()
+        self._entries[name].update({'size': size, 'sha256': digest.hexdigest(), 'returncode': returncode})
+
+    def _sign(self, data: bytes) -> Optional[bytes]:
+        """Sign manifest bytes with the PEM private key via openssl."""
+        result = subprocess.run(
+            ['openssl', 'dgst', '-sha256', '-sign', str(self.signing_key)],
+            input=data, capture_output=True, check=False
+        )
+        if result.returncode != 0:
+            logger.error(f"Failed to sign evidence manifest: {result.stderr.decode(errors='replace')}")
+            return None
+        return result.stdout
+
+    def close(self) -> Dict:
+        """
+        Finish writing, add the (signed) manifest and close the archive.
+
+        Returns:
+            The manifest
+
+        Raises:
+            Exception: The first error raised while writing an artifact
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"Evidence bundle {self.path} is already closed")
+            self._closed = True
+        self._queue.put(None)
+        self._writer.join()
+        self._hashers.shutdown(wait=True)
+
+        try:
+            if self._error is not None:
+                raise self._error
+
+            files: List[Dict] = []
+            for name in sorted(self._entries):
+                entry = dict(self._entries[name])
+                if isinstance(entry.get('sha256'), Future):
+                    entry['sha256'] = entry['sha256'].result()
+                files.append(entry)
+            manifest = {
+                'created': datetime.now().isoformat(),
+                'algorithm': 'sha256',
+                'file_count': len(files),
+                'files': files,
+            }
+            manifest_bytes = json.dumps(manifest, indent=2).encode()
+            self._zip.writestr(MANIFEST_NAME, manifest_bytes)
+
+            if self.signing_key:
+                signature = self._sign(manifest_bytes)
+                if signature:
+                    self._zip.writestr(SIGNATURE_NAME, signature)
+                    manifest['signed'] = True
+            else:
+                logger.warning("No signing key given - evidence manifest is unsigned")
+            logger.info(f"Evidence bundle written: {self.path} ({len(files)} artifacts, "
+                        f"manifest sha256 {hashlib.sha256(manifest_bytes).hexdigest()[:16]})")
+            return manifest
+        finally:
+            self._zip.close()
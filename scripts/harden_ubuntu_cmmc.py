@@ -15,25 +15,48 @@ CRITICAL SAFETY RULES:
 
 Usage:
     sudo python3 harden_ubuntu_cmmc.py [--dry-run] [--skip-approval] [--evidence-dir <path>]
+
+Deployment:
+    This script imports helper modules from scripts/ (command_probes.py,
+    sshd_config.py, backup_store.py) that must sit in the same directory.
+    Copy the whole scripts/ directory to the host, not this file alone.
 """
 
 import argparse
 import json
 import logging
 import os
+import re
 import shutil
-import subprocess
+import stat
 import sys
+import threading
+import time
 import urllib.request
-from dataclasses import dataclass, asdict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+
+# Modules this script needs next to it on the host (see "Deployment" above)
+HELPER_MODULES = ('command_probes.py', 'sshd_config.py', 'backup_store.py')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+try:
+    # Shared memo of read-only probe output (scripts/command_probes.py)
+    from command_probes import PROBES
+    from sshd_config import SshdConfig, confirm_with_sshd
+    # Content-addressed file backups for snapshots and rollback
+    from backup_store import BackupStore
+except ImportError as e:
+    sys.exit(f"ERROR: {e}. Deploy {Path(__file__).name} with {', '.join(HELPER_MODULES)} "
+             f"in the same directory.")
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
@@ -80,166 +103,396 @@ class HardeningResult:
     timestamp: str
 
 
+@dataclass
+class HardeningPhase:
+    """A hardening phase and the shared resources it changes."""
+    name: str
+    method: str
+    # Phases sharing a resource run in declaration order; '*' conflicts with all
+    resources: Tuple[str, ...] = ()
+    # Phases that must finish first, in addition to resource conflicts
+    after: Tuple[str, ...] = ()
+    # Started ahead of other ready phases so slow installs overlap the rest
+    long_running: bool = False
+    # Optional step without ordering constraints, started in the background
+    # as soon as hardening begins (e.g. downloading packages). It must not
+    # change the system: rollback only restores files
+    prepare: Optional[str] = None
+
+
+# Hardening phases in report order. apt/dpkg commands are serialized by
+# CMMCHardener.run_command (the apt lock), so package-installing phases don't
+# need to exclude each other for their whole duration.
+HARDENING_PHASES = [
+    HardeningPhase('SSH Hardening', 'harden_ssh', ('sshd',)),
+    HardeningPhase('fail2ban', 'harden_fail2ban', ('fail2ban',)),
+    HardeningPhase('Log Rotation', 'harden_logging', ('logrotate', 'rsyslog')),
+    HardeningPhase('NTP Configuration', 'harden_ntp', ('time',)),
+    HardeningPhase('Sudo Logging', 'harden_sudo', ('sudoers', 'rsyslog')),
+    HardeningPhase('Service Minimization', 'minimize_services', ('services',)),
+    HardeningPhase('FIPS Verification', 'verify_fips'),
+    HardeningPhase('ClamAV Installation', 'harden_clamav', ('clamav',), long_running=True),
+    # The AIDE baseline must capture the hardened configuration, so the
+    # database is only initialized after the config phases. The packages are
+    # downloaded in the background from the start but only installed by the
+    # phase itself, so a rollback before it leaves no packages behind
+    HardeningPhase('AIDE Installation', 'harden_aide', ('aide',),
+                   after=('SSH Hardening', 'fail2ban', 'Log Rotation', 'NTP Configuration',
+                          'Sudo Logging', 'Service Minimization', 'ClamAV Installation'),
+                   prepare='download_aide_package'),
+    HardeningPhase('UFW Firewall', 'harden_firewall', ('*',)),  # Last - requires approval
+]
+
+# Default number of phases run at the same time
+DEFAULT_PHASE_WORKERS = 4
+
+# Package manager commands that take the dpkg lock
+APT_COMMAND_PATTERN = re.compile(r'(^|[;&|]\s*)(sudo\s+)?(\S*/)?(apt-get|apt|dpkg|aideinit)\s')
+
+
+@dataclass
+class PhasePlan:
+    """Scheduling state of a hardening phase."""
+    index: int
+    phase: HardeningPhase
+    depends_on: Set[int] = field(default_factory=set)
+
+
+def phases_conflict(first: HardeningPhase, second: HardeningPhase) -> bool:
+    """Check whether two phases touch a shared resource."""
+    if '*' in first.resources or '*' in second.resources:
+        return True
+    return bool(set(first.resources) & set(second.resources))
+
+
 class CloudPlatformDetector:
-    """Detect cloud platform environment."""
+    """
+    Detect cloud platform environment.
     
-    @staticmethod
-    def detect_platform() -> Optional[str]:
+    DMI vendor strings from /sys/class/dmi/id identify most cloud VMs without
+    any network access. Otherwise the GCP, AWS and Azure metadata endpoints
+    are probed concurrently, so detection takes at most one probe timeout.
+    The result is cached in memory and in a small state file with a TTL.
+    """
+    
+    # (platform, display name, metadata URL, request headers)
+    METADATA_ENDPOINTS = [
+        ('gcp', 'Google Cloud Platform (GCP)',
+         'http://metadata.google.internal/computeMetadata/v1/instance/', {'Metadata-Flavor': 'Google'}),
+        ('aws', 'Amazon Web Services (AWS)',
+         'http://169.254.169.254/latest/meta-data/', {}),
+        ('azure', 'Microsoft Azure',
+         'http://169.254.169.254/metadata/instance?api-version=2021-02-01', {'Metadata': 'true'}),
+    ]
+    PROBE_TIMEOUT = 2
+    
+    DMI_DIR = Path('/sys/class/dmi/id')
+    # (DMI file, lowercase marker, platform); Azure VMs carry a fixed asset
+    # tag that distinguishes them from other Hyper-V guests
+    DMI_MARKERS = [
+        ('product_name', 'google compute engine', 'gcp'),
+        ('sys_vendor', 'google', 'gcp'),
+        ('sys_vendor', 'amazon ec2', 'aws'),
+        ('bios_vendor', 'amazon ec2', 'aws'),
+        ('bios_version', 'amazon', 'aws'),
+        ('chassis_asset_tag', '7783-7084-3265-9085-8269-3286-77', 'azure'),
+    ]
+    
+    STATE_FILE = Path('/var/cache/cmmc_hardening/cloud_platform.json')
+    STATE_TTL = 3600  # seconds
+    
+    _detected: Optional[Tuple[Optional[str]]] = None
+    
+    @classmethod
+    def detect_platform(cls, use_cache: bool = True) -> Optional[str]:
         """Detect if running on cloud platform (GCP, AWS, Azure)."""
-        # GCP detection
+        if use_cache:
+            if cls._detected is not None:
+                return cls._detected[0]
+            cached = cls._read_state()
+            if cached is not None:
+                cls._detected = cached
+                platform = cached[0]
+                logger.info(f"Using cached cloud platform detection: {platform or 'none'}")
+                return platform
+        
+        source = 'dmi'
+        platform = cls.detect_from_dmi()
+        if platform is None:
+            source = 'metadata'
+            platform = cls.probe_metadata()
+        
+        if platform:
+            name = next(name for key, name, _, _ in cls.METADATA_ENDPOINTS if key == platform)
+            logger.info(f"Detected {name} (via {source})")
+        else:
+            logger.info("No cloud platform detected - assuming bare metal or unsupported cloud")
+        
+        cls._detected = (platform,)
+        cls._write_state(platform, source)
+        return platform
+    
+    @classmethod
+    def detect_from_dmi(cls) -> Optional[str]:
+        """Identify the platform from DMI vendor strings, without network access."""
+        for file_name, marker, platform in cls.DMI_MARKERS:
+            try:
+                value = (cls.DMI_DIR / file_name).read_text().strip().lower()
+            except OSError:
+                continue
+            if marker in value:
+                return platform
+        return None
+    
+    @classmethod
+    def probe_metadata(cls) -> Optional[str]:
+        """Probe all metadata endpoints concurrently and return the first platform to answer."""
+        def probe(endpoint) -> Optional[str]:
+            platform, _, url, headers = endpoint
+            try:
+                req = urllib.request.Request(url, headers=headers)
+                with urllib.request.urlopen(req, timeout=cls.PROBE_TIMEOUT) as response:
+                    if response.status == 200:
+                        return platform
+            except Exception:
+                pass
+            return None
+        
+        executor = ThreadPoolExecutor(max_workers=len(cls.METADATA_ENDPOINTS))
         try:
-            req = urllib.request.Request(
-                'http://metadata.google.internal/computeMetadata/v1/instance/',
-                headers={'Metadata-Flavor': 'Google'}
-            )
-            with urllib.request.urlopen(req, timeout=2) as response:
-                if response.status == 200:
-                    logger.info("Detected Google Cloud Platform (GCP)")
-                    return 'gcp'
-        except Exception:
-            pass
-        
-        # AWS detection
+            futures = [executor.submit(probe, endpoint) for endpoint in cls.METADATA_ENDPOINTS]
+            for future in as_completed(futures):
+                platform = future.result()
+                if platform:
+                    return platform
+            return None
+        finally:
+            # Don't wait for the probes that are still timing out
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    @classmethod
+    def _boot_id(cls) -> str:
+        """Return the kernel boot id (cached results never survive a reboot)."""
         try:
-            req = urllib.request.Request('http://169.254.169.254/latest/meta-data/')
-            with urllib.request.urlopen(req, timeout=2) as response:
-                if response.status == 200:
-                    logger.info("Detected Amazon Web Services (AWS)")
-                    return 'aws'
-        except Exception:
-            pass
-        
-        # Azure detection
+            return Path('/proc/sys/kernel/random/boot_id').read_text().strip()
+        except OSError:
+            return ''
+    
+    @classmethod
+    def _read_state(cls) -> Optional[Tuple[Optional[str]]]:
+        """Read a fresh detection result from the state file, if any."""
         try:
-            req = urllib.request.Request(
-                'http://169.254.169.254/metadata/instance?api-version=2021-02-01',
-                headers={'Metadata': 'true'}
-            )
-            with urllib.request.urlopen(req, timeout=2) as response:
-                if response.status == 200:
-                    logger.info("Detected Microsoft Azure")
-                    return 'azure'
-        except Exception:
-            pass
-        
-        logger.info("No cloud platform detected - assuming bare metal or unsupported cloud")
-        return None
+            with open(cls.STATE_FILE, 'r') as f:
+                state = json.load(f)
+            if time.time() - state['detected_at'] > cls.STATE_TTL or state.get('boot_id') != cls._boot_id():
+                return None
+            return (state['platform'],)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
     
-    @staticmethod
-    def is_cloud_environment() -> bool:
+    @classmethod
+    def _write_state(cls, platform: Optional[str], source: str) -> None:
+        """Save the detection result to the state file (best effort)."""
+        try:
+            cls.STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(cls.STATE_FILE, 'w') as f:
+                json.dump({
+                    'platform': platform,
+                    'source': source,
+                    'detected_at': time.time(),
+                    'boot_id': cls._boot_id(),
+                }, f)
+        except OSError as e:
+            logger.debug(f"Could not save cloud platform state to {cls.STATE_FILE}: {e}")
+    
+    @classmethod
+    def is_cloud_environment(cls) -> bool:
         """Check if running in cloud environment."""
-        return CloudPlatformDetector.detect_platform() is not None
+        return cls.detect_platform() is not None
 
 
 class TransactionalSafety:
-    """Transactional safety with snapshots and rollback."""
+    """
+    Transactional safety with snapshots and rollback.
+    
+    Snapshot and tracked file contents live in the shared content-addressed
+    backup store (scripts/backup_store.py) under the snapshot directory, so
+    unchanged files cost no space or copying across runs. Each snapshot
+    manifest maps full paths to their store entries.
+    
+    Rollback restores only snapshot and tracked files whose content differs,
+    and removes only files this script created (tracked as absent before it
+    wrote them). Files that appear for other reasons, such as package
+    conffiles installed during the run, and symlinks are left alone.
+    """
+    
+    CRITICAL_FILES = [
+        Path('/etc/ssh/sshd_config'),
+        Path('/etc/default/grub'),
+        Path('/etc/ufw/ufw.conf'),
+        Path('/etc/ufw/user.rules'),
+        Path('/etc/logrotate.conf'),
+        Path('/etc/rsyslog.conf'),
+        Path('/etc/sudoers'),
+        Path('/etc/fail2ban/jail.local'),
+        Path('/etc/fail2ban/jail.conf'),
+    ]
+    
+    # Directories whose regular files are snapshotted as a whole
+    CRITICAL_DIRECTORIES = [
+        Path('/etc/pam.d'),
+        Path('/etc/ssh/sshd_config.d'),  # Include drop-ins rewritten by harden_ssh
+    ]
     
     def __init__(self, snapshot_dir: Path):
         self.snapshot_dir = snapshot_dir
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
         self.snapshot_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         self.snapshot_path = self.snapshot_dir / f"snapshot_{self.snapshot_timestamp}"
+        self.store = BackupStore(self.snapshot_dir)
         self.changes_log: List[Dict] = []
-        
+        # Files backed up right before the script wrote them:
+        # path -> store entry, or None if the file didn't exist yet
+        self.tracked: Dict[str, Optional[Dict]] = {}
+        # Phases run on several threads
+        self._lock = threading.Lock()
+    
+    def _snapshot_targets(self) -> Tuple[List[Path], List[str]]:
+        """Return the files to snapshot and the critical files that don't exist."""
+        files = []
+        for directory in self.CRITICAL_DIRECTORIES:
+            if directory.is_dir():
+                for root, _, names in os.walk(directory):
+                    files.extend(Path(root) / name for name in sorted(names))
+        missing = []
+        for file_path in self.CRITICAL_FILES:
+            if file_path.exists():
+                files.append(file_path)
+            else:
+                missing.append(str(file_path))
+        return files, missing
+    
     def create_snapshot(self) -> bool:
         """Create snapshot of critical files before changes."""
         logger.info(f"Creating snapshot in {self.snapshot_path}")
         self.snapshot_path.mkdir(parents=True, exist_ok=True)
         
-        critical_files = [
-            Path('/etc/ssh/sshd_config'),
-            Path('/etc/default/grub'),
-            Path('/etc/ufw/ufw.conf'),
-            Path('/etc/ufw/user.rules'),
-            Path('/etc/logrotate.conf'),
-            Path('/etc/rsyslog.conf'),
-            Path('/etc/sudoers'),
-            Path('/etc/fail2ban/jail.local'),
-            Path('/etc/fail2ban/jail.conf'),
-        ]
-        
-        # Backup PAM files
-        pam_dir = Path('/etc/pam.d')
-        if pam_dir.exists():
-            pam_backup = self.snapshot_path / 'pam.d'
-            shutil.copytree(pam_dir, pam_backup, dirs_exist_ok=True)
-            logger.info(f"Backed up PAM directory to {pam_backup}")
-        
-        for file_path in critical_files:
-            if file_path.exists():
-                backup_path = self.snapshot_path / file_path.name
-                try:
-                    shutil.copy2(file_path, backup_path)
-                    logger.debug(f"Backed up {file_path} to {backup_path}")
-                except Exception as e:
-                    logger.error(f"Failed to backup {file_path}: {e}")
-                    return False
+        files, missing = self._snapshot_targets()
+        entries = {}
+        symlinks = {}
+        for file_path in files:
+            try:
+                st = file_path.lstat()
+                if stat.S_ISLNK(st.st_mode):
+                    # Recorded, never restored or removed by rollback
+                    symlinks[str(file_path)] = os.readlink(file_path)
+                    continue
+                if not stat.S_ISREG(st.st_mode):
+                    logger.debug(f"Skipping non-regular file {file_path}")
+                    continue
+                self.store.backup(file_path)
+                entries[str(file_path)] = self.store.latest(file_path)
+                logger.debug(f"Backed up {file_path} ({entries[str(file_path)]['sha256'][:12]})")
+            except Exception as e:
+                logger.error(f"Failed to backup {file_path}: {e}")
+                return False
         
-        # Create snapshot manifest
+        # Create snapshot manifest (full original paths -> backup store entries)
         manifest = {
             'timestamp': self.snapshot_timestamp,
-            'files_backed_up': [str(f) for f in critical_files if f.exists()],
-            'pam_backed_up': pam_dir.exists()
+            'store': str(self.snapshot_dir),
+            'files': entries,
+            'symlinks': symlinks,
+            'directories': [str(d) for d in self.CRITICAL_DIRECTORIES if d.is_dir()],
+            'missing_files': missing,
+            'files_backed_up': [str(f) for f in self.CRITICAL_FILES if str(f) in entries],
+            'pam_backed_up': Path('/etc/pam.d').is_dir(),
         }
         manifest_path = self.snapshot_path / 'manifest.json'
         with open(manifest_path, 'w') as f:
             json.dump(manifest, f, indent=2)
         
-        logger.info(f"Snapshot created successfully: {self.snapshot_path}")
+        logger.info(f"Snapshot created successfully: {self.snapshot_path} "
+                    f"({len(entries)} files, {len(symlinks)} symlinks recorded)")
+        return True
+    
+    def track(self, file_path: Path) -> bool:
+        """
+        Back up a file the script is about to write, so rollback can undo the write.
+        
+        A file that doesn't exist yet is recorded as absent; if the script then
+        logs it as created, rollback removes it.
+        """
+        path = str(file_path)
+        with self._lock:
+            if path in self.tracked:
+                return True
+        try:
+            entry = None
+            if file_path.is_symlink():
+                logger.debug(f"Not tracking symlink {file_path}")
+                return True
+            if file_path.exists():
+                self.store.backup(file_path)
+                entry = self.store.latest(file_path)
+        except Exception as e:
+            logger.error(f"Failed to backup {file_path}: {e}")
+            return False
+        with self._lock:
+            self.tracked.setdefault(path, entry)
         return True
     
     def rollback(self) -> bool:
         """Restore from snapshot on failure."""
-        if not self.snapshot_path.exists():
+        manifest_path = self.snapshot_path / 'manifest.json'
+        if not manifest_path.exists():
             logger.error("No snapshot found for rollback")
             return False
         
-        logger.warning("ROLLING BACK to snapshot - restoring original files")
+        logger.warning("ROLLING BACK to snapshot - restoring changed files")
         
-        manifest_path = self.snapshot_path / 'manifest.json'
-        if manifest_path.exists():
-            with open(manifest_path, 'r') as f:
-                manifest = json.load(f)
-            
-            # Restore PAM directory
-            if manifest.get('pam_backed_up'):
-                pam_backup = self.snapshot_path / 'pam.d'
-                if pam_backup.exists():
-                    pam_dir = Path('/etc/pam.d')
-                    # Remove existing and restore
-                    for file in pam_dir.glob('*'):
-                        if file.is_file():
-                            file.unlink()
-                    shutil.copytree(pam_backup, pam_dir, dirs_exist_ok=True)
-                    logger.info("Restored PAM directory")
-        
-        # Restore individual files
-        for file_name in os.listdir(self.snapshot_path):
-            if file_name == 'manifest.json' or file_name == 'pam.d':
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        with self._lock:
+            tracked = dict(self.tracked)
+            created = {change['file'] for change in self.changes_log if change['type'] == 'created'}
+        
+        # Snapshot content wins over content tracked later in the run
+        entries = {path: entry for path, entry in tracked.items() if entry is not None}
+        entries.update(manifest.get('files', {}))
+        symlinks = set(manifest.get('symlinks', {}))
+        
+        restorable = []
+        for path_str, entry in entries.items():
+            if os.path.islink(path_str) or path_str in symlinks:
+                logger.info(f"Leaving symlink {path_str} alone")
                 continue
-            
-            backup_file = self.snapshot_path / file_name
-            if backup_file.is_file():
-                # Find original location
-                for critical_path in [
-                    Path('/etc/ssh/sshd_config'),
-                    Path('/etc/default/grub'),
-                    Path('/etc/ufw/ufw.conf'),
-                    Path('/etc/ufw/user.rules'),
-                    Path('/etc/logrotate.conf'),
-                    Path('/etc/rsyslog.conf'),
-                    Path('/etc/sudoers'),
-                    Path('/etc/fail2ban/jail.local'),
-                    Path('/etc/fail2ban/jail.conf'),
-                ]:
-                    if critical_path.name == file_name:
-                        try:
-                            shutil.copy2(backup_file, critical_path)
-                            logger.info(f"Restored {critical_path}")
-                        except Exception as e:
-                            logger.error(f"Failed to restore {critical_path}: {e}")
-        
-        logger.info("Rollback completed")
+            restorable.append(entry)
+        
+        restored = 0
+        for entry in restorable:
+            try:
+                if self.store.restore_entries([entry]):
+                    restored += 1
+                    logger.info(f"Restored {entry['path']}")
+            except Exception as e:
+                logger.error(f"Failed to restore {entry['path']}: {e}")
+        
+        # Remove only files this script created: absent when tracked, logged as created
+        removed = 0
+        for path_str, entry in tracked.items():
+            if entry is not None or path_str not in created or path_str in entries:
+                continue
+            if os.path.isfile(path_str) and not os.path.islink(path_str):
+                try:
+                    os.unlink(path_str)
+                    removed += 1
+                    logger.info(f"Removed {path_str} (created by this run)")
+                except OSError as e:
+                    logger.error(f"Failed to remove {path_str}: {e}")
+        
+        logger.info(f"Rollback completed ({restored} files restored, {removed} removed, "
+                    f"{len(restorable) - restored} unchanged)")
         return True
     
     def log_change(self, control_id: str, file_path: str, change_type: str, description: str):
@@ -308,13 +561,20 @@ class SafetyGuards:
 class CMMCHardener:
     """Implement CMMC 2.0 Level 2 controls."""
     
-    def __init__(self, safety: TransactionalSafety, evidence_dir: Path, dry_run: bool = False):
+    def __init__(self, safety: TransactionalSafety, evidence_dir: Path, dry_run: bool = False,
+                 workers: int = DEFAULT_PHASE_WORKERS):
         self.safety = safety
         self.evidence_dir = evidence_dir
         self.evidence_dir.mkdir(parents=True, exist_ok=True)
         self.dry_run = dry_run
+        self.workers = max(1, workers)
         self.results: List[HardeningResult] = []
         self.platform = CloudPlatformDetector.detect_platform()
+        # Phase name -> seconds, and total wall time of run_all_hardening
+        self.phase_timings: Dict[str, float] = {}
+        self.wall_seconds = 0.0
+        # Concurrent phases must not run apt/dpkg at the same time
+        self._apt_lock = threading.Lock()
         
     def run_command(self, command: str, check: bool = True) -> Tuple[bool, str]:
         """Run a shell command and return success status and output."""
@@ -322,20 +582,21 @@ class CMMCHardener:
             logger.info(f"DRY RUN: Would execute: {command}")
             return True, "DRY RUN"
         
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=check
-            )
-            return True, result.stdout
-        except subprocess.CalledProcessError as e:
-            return False, e.stderr
+        # Read-only probes (e.g. the SSH check of every validate_phase) are
+        # answered from the shared per-run cache
+        if APT_COMMAND_PATTERN.search(command):
+            with self._apt_lock:
+                result = PROBES.run(command)
+        else:
+            result = PROBES.run(command)
+        if check and result.returncode != 0:
+            return False, result.stderr
+        return True, result.stdout
     
     def backup_file(self, file_path: Path) -> bool:
-        """Backup a file before modification."""
+        """Backup a file before modification, for rollback and as evidence."""
+        if not self.dry_run and not self.safety.track(file_path):
+            return False
         if not file_path.exists():
             return True
         
@@ -348,7 +609,7 @@ class CMMCHardener:
             logger.error(f"Failed to backup {file_path}: {e}")
             return False
     
-    def validate_phase(self, phase_name: str) -> bool:
+    def validate_phase(self, phase_name: str, expected_ssh_settings: Optional[Dict[str, str]] = None) -> bool:
         """Validate system after each hardening phase."""
         logger.info(f"Validating phase: {phase_name}")
         
@@ -358,12 +619,17 @@ class CMMCHardener:
             logger.error("SSH service is not active - validation failed")
             return False
         
-        # Check for configuration errors
+        # Check for configuration errors; sshd -T also confirms the effective
+        # values computed in-process by the sshd_config parser
         if phase_name == "ssh":
-            success, output = self.run_command("sshd -t", check=False)
+            expected = expected_ssh_settings or {}
+            success, mismatches, output = confirm_with_sshd(expected, self.run_command)
             if not success:
                 logger.error(f"SSH configuration test failed: {output}")
                 return False
+            if mismatches:
+                logger.error(f"SSH effective settings differ from sshd_config: {', '.join(mismatches)}")
+                return False
         
         logger.info(f"Phase validation passed: {phase_name}")
         return True
@@ -376,7 +642,12 @@ class CMMCHardener:
         sshd_config = Path('/etc/ssh/sshd_config')
         self.backup_file(sshd_config)
         
-        if not sshd_config.exists():
+        try:
+            config = SshdConfig.load(sshd_config)
+        except OSError:
+            config = None
+        
+        if config is None:
             return HardeningResult(
                 control_id=control_id,
                 control_name="SSH Hardening",
@@ -386,10 +657,6 @@ class CMMCHardener:
                 timestamp=datetime.now().isoformat()
             )
         
-        # Read current config
-        with open(sshd_config, 'r') as f:
-            lines = f.readlines()
-        
         # Cloud-safe SSH hardening (preserves OS Login and Google Cloud Console SSH)
         # Note: Must include protocols/ciphers that Google Cloud Console browser SSH requires
         ssh_settings = {
@@ -409,50 +676,21 @@ class CMMCHardener:
             'KexAlgorithms': 'curve25519-sha256@libssh.org,diffie-hellman-group16-sha512,diffie-hellman-group-exchange-sha256,diffie-hellman-group14-sha256,diffie-hellman-group14-sha1,ecdh-sha2-nistp256'
         }
         
-        new_lines = []
-        configured_keys = set()
-        config_changed = False
-        
-        for line in lines:
-            line_stripped = line.strip()
-            if not line_stripped or line_stripped.startswith('#'):
-                new_lines.append(line)
-                continue
-            
-            # Check if this line sets a config we want to override
-            key_found = False
-            for key, value in ssh_settings.items():
-                if line_stripped.startswith(key):
-                    # Check if value needs to be changed
-                    current_value = line_stripped[len(key):].strip()
-                    if current_value != value:
-                        config_changed = True
-                        new_lines.append(f"{key} {value}\n")
-                    else:
-                        new_lines.append(line)  # Keep existing if correct
-                    configured_keys.add(key)
-                    key_found = True
-                    break
-            
-            if not key_found:
-                new_lines.append(line)
-        
-        # Add any missing settings
-        for key, value in ssh_settings.items():
-            if key not in configured_keys:
-                new_lines.append(f"{key} {value}\n")
-                config_changed = True
+        # Rewrite the lines that take effect, including Include drop-ins
+        # (e.g. sshd_config.d/50-cloud-init.conf) that override the main file
+        config_changed = config.set_global(ssh_settings)
         
         # Only write if config changed (idempotency)
         if not self.dry_run:
             if config_changed:
-                with open(sshd_config, 'w') as f:
-                    f.writelines(new_lines)
-                
-                self.safety.log_change(control_id, str(sshd_config), 'modified', 'SSH hardening applied')
+                for changed_file in config.changed_files:
+                    if changed_file != sshd_config:
+                        self.backup_file(changed_file)
+                for written in config.save():
+                    self.safety.log_change(control_id, str(written), 'modified', 'SSH hardening applied')
                 
                 # Validate SSH config
-                if not self.validate_phase("ssh"):
+                if not self.validate_phase("ssh", {key: config.get(key) for key in ssh_settings}):
                     return HardeningResult(
                         control_id=control_id,
                         control_name="SSH Hardening",
@@ -852,6 +1090,19 @@ Defaults syslog=auth
             timestamp=datetime.now().isoformat()
         )
     
+    def download_aide_package(self) -> bool:
+        """Download the AIDE packages into the apt cache ahead of the AIDE phase."""
+        success, _ = self.run_command("which aide", check=False)
+        if success and not self.dry_run:
+            return True
+        # Download only: installing here would leave packages behind if an
+        # earlier phase fails and the run is rolled back
+        success, output = self.run_command("apt-get install -y --download-only aide aide-common")
+        if not success:
+            # harden_aide downloads again and reports the failure
+            logger.warning(f"Background AIDE download failed: {output}")
+        return success
+    
     def harden_aide(self) -> HardeningResult:
         """Install and configure AIDE for file integrity monitoring (3.14.5)."""
         control_id = "3.14.5"
@@ -1024,51 +1275,12 @@ Defaults syslog=auth
             logger.error("Failed to create snapshot - aborting")
             return []
         
+        start = time.monotonic()
         try:
             # Run hardening phases
-            phases = [
-                ('SSH Hardening', self.harden_ssh),
-                ('fail2ban', self.harden_fail2ban),
-                ('Log Rotation', self.harden_logging),
-                ('NTP Configuration', self.harden_ntp),
-                ('Sudo Logging', self.harden_sudo),
-                ('Service Minimization', self.minimize_services),
-                ('FIPS Verification', self.verify_fips),
-                ('ClamAV Installation', self.harden_clamav),
-                ('AIDE Installation', self.harden_aide),
-                ('UFW Firewall', self.harden_firewall),  # Last - requires approval
-            ]
-            
-            for phase_name, phase_func in phases:
-                logger.info(f"Running phase: {phase_name}")
-                try:
-                    result = phase_func()
-                    self.results.append(result)
-                    
-                    if result.status == 'failed':
-                        logger.error(f"Phase {phase_name} failed: {result.message}")
-                        if not self.dry_run:
-                            logger.error("Rolling back changes...")
-                            self.safety.rollback()
-                        break
-                    elif result.status == 'requires_approval':
-                        logger.warning(f"Phase {phase_name} requires approval: {result.message}")
-                        # Continue with other phases
-                    else:
-                        logger.info(f"Phase {phase_name} completed: {result.message}")
-                    
-                    # Validate after each phase
-                    if not self.validate_phase(phase_name.lower().replace(' ', '_')):
-                        logger.error(f"Validation failed after {phase_name} - rolling back")
-                        if not self.dry_run:
-                            self.safety.rollback()
-                        break
-                
-                except Exception as e:
-                    logger.error(f"Error in phase {phase_name}: {e}")
-                    if not self.dry_run:
-                        self.safety.rollback()
-                    break
+            self.run_phases(HARDENING_PHASES)
+            self.wall_seconds = time.monotonic() - start
+            self.print_phase_timings()
             
             # Save results
             self.save_results()
@@ -1080,6 +1292,129 @@ Defaults syslog=auth
         
         return self.results
     
+    def plan_phases(self, phases: List[HardeningPhase]) -> List[PhasePlan]:
+        """Build the phase DAG: each phase depends on earlier conflicting phases."""
+        names = {phase.name: index for index, phase in enumerate(phases)}
+        plans = []
+        for index, phase in enumerate(phases):
+            plan = PhasePlan(index, phase)
+            for earlier in range(index):
+                if phases_conflict(phases[earlier], phase):
+                    plan.depends_on.add(earlier)
+            for name in phase.after:
+                if names.get(name, index) >= index:
+                    raise ValueError(f"Phase {phase.name} must come after {name}")
+                plan.depends_on.add(names[name])
+            plans.append(plan)
+        return plans
+    
+    def _run_phase(self, phase: HardeningPhase, prepared) -> Tuple[HardeningResult, bool]:
+        """Run one phase on a worker thread; returns its result and whether validation passed."""
+        if prepared is not None:
+            # Wait for the background step of this phase (e.g. package install)
+            prepared.result()
+        
+        logger.info(f"Running phase: {phase.name}")
+        start = time.monotonic()
+        try:
+            result = getattr(self, phase.method)()
+            if result.status == 'failed':
+                return result, True
+            # Validate after each phase
+            return result, self.validate_phase(phase.name.lower().replace(' ', '_'))
+        finally:
+            self.phase_timings[phase.name] = time.monotonic() - start
+    
+    def _run_prepare(self, phase: HardeningPhase):
+        """Run the background step of a phase; failures are left to the phase itself."""
+        try:
+            getattr(self, phase.prepare)()
+        except Exception as e:
+            logger.warning(f"Background step for {phase.name} failed: {e}")
+    
+    def run_phases(self, phases: List[HardeningPhase]):
+        """
+        Run hardening phases concurrently along their dependency DAG.
+        
+        Ready phases start in declaration order (long-running ones first) on a
+        bounded pool. After the first failure no new phase starts; running
+        phases finish, then the snapshot is rolled back once. Results are
+        recorded in declaration order.
+        """
+        plans = self.plan_phases(phases)
+        pending = {plan.index: plan for plan in plans}
+        done: Set[int] = set()
+        finished: Dict[int, HardeningResult] = {}
+        failed = False
+        
+        # One extra worker per background step so they never hold up phases
+        background = [plan.phase for plan in plans if plan.phase.prepare]
+        executor = ThreadPoolExecutor(max_workers=self.workers + len(background),
+                                      thread_name_prefix='phase')
+        prepared = {phase.name: executor.submit(self._run_prepare, phase) for phase in background}
+        running = {}  # future -> plan
+        try:
+            while (pending and not failed) or running:
+                if not failed:
+                    ready = [plan for plan in pending.values() if plan.depends_on <= done]
+                    ready.sort(key=lambda plan: (not plan.phase.long_running, plan.index))
+                    for plan in ready[:max(0, self.workers - len(running))]:
+                        del pending[plan.index]
+                        future = executor.submit(self._run_phase, plan.phase, prepared.get(plan.phase.name))
+                        running[future] = plan
+                
+                if not running:
+                    break
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                
+                for future in completed:
+                    plan = running.pop(future)
+                    phase_name = plan.phase.name
+                    done.add(plan.index)
+                    try:
+                        result, valid = future.result()
+                    except Exception as e:
+                        logger.error(f"Error in phase {phase_name}: {e}")
+                        failed = True
+                        continue
+                    finished[plan.index] = result
+                    
+                    if result.status == 'failed':
+                        logger.error(f"Phase {phase_name} failed: {result.message}")
+                        failed = True
+                    elif not valid:
+                        logger.error(f"Validation failed after {phase_name} - rolling back")
+                        failed = True
+                    elif result.status == 'requires_approval':
+                        logger.warning(f"Phase {phase_name} requires approval: {result.message}")
+                        # Continue with other phases
+                    else:
+                        logger.info(f"Phase {phase_name} completed: {result.message} "
+                                    f"({self.phase_timings.get(phase_name, 0):.1f}s)")
+        except KeyboardInterrupt:
+            logger.warning("Interrupted - waiting for running phases before rolling back")
+            failed = True
+            raise
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.results.extend(finished[index] for index in sorted(finished))
+            if failed and not self.dry_run:
+                logger.error("Rolling back changes...")
+                self.safety.rollback()
+        
+        if pending:
+            logger.warning(f"Skipped {len(pending)} phase(s) after failure: "
+                           f"{', '.join(plan.phase.name for plan in pending.values())}")
+    
+    def print_phase_timings(self):
+        """Log per-phase timings, slowest first."""
+        if not self.phase_timings:
+            return
+        total = sum(self.phase_timings.values())
+        logger.info(f"Phase timings (wall {self.wall_seconds:.1f}s, sum of phases {total:.1f}s):")
+        for name, seconds in sorted(self.phase_timings.items(), key=lambda item: -item[1]):
+            logger.info(f"  {seconds:8.1f}s  {name}")
+    
     def pre_flight_check(self) -> bool:
         """Verify system is ready for hardening."""
         logger.info("Running pre-flight checks...")
@@ -1125,6 +1460,8 @@ Defaults syslog=auth
             'platform': self.platform,
             'dry_run': self.dry_run,
             'results': [asdict(r) for r in self.results],
+            'phase_timings': self.phase_timings,
+            'wall_seconds': self.wall_seconds,
             'changes_log': self.safety.changes_log
         }
         
@@ -1203,6 +1540,17 @@ CMMC 2.0 Level 2 Controls Implemented:
         default=Path('/opt/compliance/hardening-evidence'),
         help='Directory to store evidence files (default: /opt/compliance/hardening-evidence)'
     )
+    parser.add_argument(
+        '--redetect-platform',
+        action='store_true',
+        help=f'Ignore the cached cloud platform detection ({CloudPlatformDetector.STATE_FILE})'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_PHASE_WORKERS,
+        help=f'Maximum hardening phases run at the same time (default: {DEFAULT_PHASE_WORKERS})'
+    )
     
     args = parser.parse_args()
     
@@ -1211,8 +1559,8 @@ CMMC 2.0 Level 2 Controls Implemented:
         logger.error("This script must be run as root or with sudo")
         sys.exit(1)
     
-    # Detect cloud platform
-    platform = CloudPlatformDetector.detect_platform()
+    # Detect cloud platform (cached for CMMCHardener and later runs)
+    platform = CloudPlatformDetector.detect_platform(use_cache=not args.redetect_platform)
     if platform:
         logger.info(f"Running on {platform.upper()} - cloud-safe hardening will be applied")
     else:
@@ -1225,10 +1573,11 @@ CMMC 2.0 Level 2 Controls Implemented:
     # Initialize components
     snapshot_dir = Path('/tmp/hardening-snapshot')
     safety = TransactionalSafety(snapshot_dir)
-    hardener = CMMCHardener(safety, args.evidence_dir, args.dry_run)
+    hardener = CMMCHardener(safety, args.evidence_dir, args.dry_run, workers=args.workers)
     
     # Run hardening
     results = hardener.run_all_hardening()
+    logger.info(PROBES.summary())
     
     # Print summary
     print("\n" + "=" * 80)
@@ -7,29 +7,78 @@ hardening configurations to the system based on the STIG requirements.
 
 Usage:
     sudo python3 harden_ubuntu_stig.py --stig-file <path> [--log-file <path>]
+                                       [--parse-cache-dir <path>] [--no-parse-cache]
+                                       [--workers <n>] [--dry-run] [--timing-report <path>]
+                                       [--no-package-batch] [--journal <path>] [--resume]
+
+Every rule's progress is appended to a journal. After an interrupted run
+(SSH drop, reboot, apt lock timeout), --resume skips rules the journal shows
+as applied with unchanged fix input and re-applies only the remaining ones,
+including any rule that was in flight.
+
+Deployment:
+    This script imports helper modules that must sit in the same directory:
+    command_probes.py and backup_store.py from scripts/, and xccdf_reader.py
+    from stig_generator/app/parsers/. Copy the whole scripts/ directory plus
+    xccdf_reader.py to the host, not this file alone.
 """
 
 import argparse
 import getpass
+import hashlib
+import json
 import logging
 import os
 import re
-import shutil
 import subprocess
 import sys
+import threading
+import time
 import xml.etree.ElementTree as ET
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
 )
 logger = logging.getLogger(__name__)
 
+# Modules this script needs next to it on the host
+HELPER_MODULES = ('xccdf_reader.py', 'command_probes.py', 'backup_store.py')
+
+# Helper modules deployed next to this script (see "Deployment" above).
+# The XCCDF reader is found in the repository checkout when run from it.
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent / "stig_generator" / "app" / "parsers"))
+try:
+    # Shared streaming XCCDF reader (stig_generator/app/parsers/xccdf_reader.py)
+    from xccdf_reader import load_rule_index
+    # Shared memo of read-only probe output (scripts/command_probes.py)
+    from command_probes import PROBES
+    # Content-addressed file backups, also read by restore_sudo_access.py
+    from backup_store import DEFAULT_BACKUP_ROOT, BackupStore
+except ImportError as e:
+    sys.exit(f"ERROR: {e}. Deploy {Path(__file__).name} with {', '.join(HELPER_MODULES)} "
+             f"in the same directory.")
+
+# Cached rule indexes, keyed by STIG file hash
+DEFAULT_PARSE_CACHE_DIR = Path('/var/cache/ubuntu_stig_hardening')
+
+# Rules fixed concurrently by default; conflicting rules always serialize
+DEFAULT_FIX_WORKERS = 4
+
+# Append-only record of per-rule progress, read by --resume
+DEFAULT_JOURNAL_PATH = Path('/var/lib/ubuntu_stig_hardening/journal.jsonl')
+
+# Journal records are fsynced in batches of this many, or after this many seconds
+JOURNAL_FSYNC_BATCH = 16
+JOURNAL_FSYNC_INTERVAL = 2.0
+
 
 @dataclass
 class StigRule:
@@ -44,76 +93,42 @@ class StigRule:
 
 
 class StigParser:
-    """Parser for XCCDF STIG XML files."""
-    
-    XCCDF_NS = "http://checklists.nist.gov/xccdf/1.1"
+    """Parser for XCCDF STIG XML files (XCCDF 1.1 and 1.2)."""
     
-    def __init__(self, xml_file: Path):
+    def __init__(self, xml_file: Path, cache_dir: Optional[Path] = DEFAULT_PARSE_CACHE_DIR):
         self.xml_file = xml_file
+        self.cache_dir = cache_dir
         self.rules: List[StigRule] = []
         
     def parse(self) -> List[StigRule]:
-        """Parse the STIG XML file and extract all rules."""
+        """
+        Parse the STIG XML file and extract all rules.
+
+        Uses the shared streaming XCCDF reader; the rule index is cached by
+        the SHA-256 of the STIG file, so repeated runs skip XML parsing.
+        """
         logger.info(f"Parsing STIG file: {self.xml_file}")
         
         try:
-            tree = ET.parse(self.xml_file)
-            root = tree.getroot()
+            index = load_rule_index(self.xml_file, cache_dir=self.cache_dir)
         except ET.ParseError as e:
             logger.error(f"Failed to parse XML: {e}")
             raise
         
-        # Register namespace
-        ET.register_namespace('xccdf', self.XCCDF_NS)
-        
-        # Find all Group elements (each contains a Rule)
-        groups = root.findall(f".//{{{self.XCCDF_NS}}}Group")
-        if not groups:
-            # Try without namespace
-            groups = root.findall(".//Group")
+        if index.from_cache:
+            logger.info(f"Using cached rule index for {index.sha256[:12]} from {self.cache_dir}")
+        logger.info(f"Found {len(index.rules)} rules")
         
-        logger.info(f"Found {len(groups)} groups")
-        
-        for group in groups:
-            rule = group.find(f"{{{self.XCCDF_NS}}}Rule")
-            if rule is None:
-                rule = group.find("Rule")
-            
-            if rule is None:
-                continue
-            
-            rule_id = rule.get("id", "")
-            severity = rule.get("severity", "medium")
-            version_elem = rule.find(f"{{{self.XCCDF_NS}}}version")
-            version = version_elem.text if version_elem is not None else ""
-            
-            title_elem = rule.find(f"{{{self.XCCDF_NS}}}title")
-            title = title_elem.text if title_elem is not None else ""
-            
-            # Get fixtext
-            fix_elem = rule.find(f".//{{{self.XCCDF_NS}}}fixtext")
-            if fix_elem is None:
-                fix_elem = rule.find(".//fixtext")
-            fix_text = fix_elem.text if fix_elem is not None else ""
-            
-            # Get check content
-            check_elem = rule.find(f".//{{{self.XCCDF_NS}}}check//{{{self.XCCDF_NS}}}check-content")
-            if check_elem is None:
-                check_elem = rule.find(".//check//check-content")
-            check_content = check_elem.text if check_elem is not None else ""
-            
-            # Extract vulnerability ID from Group
-            vuln_id = group.get("id", "")
-            
-            if fix_text:
+        for rule in index.rules.values():
+            if rule.fix_text:
                 stig_rule = StigRule(
-                    rule_id=rule_id,
-                    vuln_id=vuln_id,
-                    title=title,
-                    severity=severity,
-                    fix_text=fix_text,
-                    check_content=check_content,
-                    version=version
+                    rule_id=rule.rule_id,
+                    vuln_id=rule.group_id,  # Vulnerability ID from the Group
+                    title=rule.title,
+                    severity=rule.severity or "medium",
+                    fix_text=rule.fix_text,
+                    check_content=rule.check_content,
+                    version=rule.version
                 )
                 self.rules.append(stig_rule)
         
@@ -353,22 +368,198 @@ class CommandExtractor:
             return 'generic'
         
         return None
+    
+    def resources_for(self, cmd: Dict) -> Set[str]:
+        """
+        Return the system resources a classified command touches.
+        
+        Resources are "apt", "sysctl", "grub", "ufw", "systemd:<unit>" and
+        "file:<path>". "systemd:*" covers every unit, "file:/" every file and
+        "exclusive" conflicts with everything. Fixes whose resources conflict
+        (see resources_conflict) must not run concurrently.
+        """
+        cmd_type = cmd['type']
+        command = cmd['command']
+        
+        if cmd_type in ('package_install', 'package_remove'):
+            # The dpkg lock; package scripts also write config files and start units
+            return {'apt', 'systemd:*', 'file:/'}
+        
+        if cmd_type in ('grub_config', 'grub_update', 'grub_password'):
+            return set(GRUB_RESOURCES)
+        
+        if cmd_type == 'sysctl':
+            return set(SYSCTL_RESOURCES)
+        
+        if cmd_type == 'systemctl':
+            action, units = self._systemctl_args(command)
+            if not units or action in ('daemon-reload', 'kill'):
+                resources = {'systemd:*'}
+            else:
+                resources = {f"systemd:{re.sub(r'[.]service$', '', unit)}" for unit in units}
+            # (Re)starting a unit loads its configuration
+            if action in ('start', 'restart', 'reload', 'try-restart', 'reload-or-restart', 'kill'):
+                resources.add('file:/etc')
+            return resources
+        
+        if cmd_type == 'firewall_config':
+            return {'ufw', 'file:/etc/ufw', 'file:/etc/default/ufw'}
+        
+        if cmd_type in ('file_edit', 'file_append', 'file_permissions', 'file_create',
+                        'ssh_config', 'pam_config', 'apt_config'):
+            paths = self._command_paths(command) or ['/']
+            resources = {f"file:{path}" for path in paths}
+            # Files owned by another serialized resource join that resource
+            for path in paths:
+                if path.startswith(('/etc/sysctl.conf', '/etc/sysctl.d')):
+                    resources |= SYSCTL_RESOURCES
+                elif path.startswith(('/etc/default/grub', '/etc/grub.d', '/boot/grub')):
+                    resources |= GRUB_RESOURCES
+                elif path.startswith('/etc/apt'):
+                    resources.add('apt')
+            return resources
+        
+        # Generic commands: known tools, audit rule lines and bare paths
+        line = re.sub(r'^sudo\s+', '', command).strip()
+        words = line.split()
+        tool = words[0] if words else ''
+        if tool in GENERIC_TOOL_RESOURCES:
+            return set(GENERIC_TOOL_RESOURCES[tool])
+        if line.startswith(('-a ', '-w ')):
+            return set(AUDIT_RESOURCES)
+        if tool.startswith('/'):
+            return {f"file:{path}" for path in self._command_paths(line)}
+        
+        # Unknown commands could touch anything
+        return {'exclusive'}
+    
+    def _systemctl_args(self, command: str) -> Tuple[str, List[str]]:
+        """Split a systemctl command into its action and unit names, skipping flags."""
+        words = command.split()
+        if 'systemctl' not in words:
+            return '', []
+        positional = []
+        skip_value = False
+        for word in words[words.index('systemctl') + 1:]:
+            if word in ('&&', '||', ';', '|'):
+                break
+            if skip_value:
+                skip_value = False
+            elif word in ('-s', '--signal', '-t', '--type', '-H', '--host', '-M', '--machine'):
+                skip_value = True
+            elif not word.startswith('-'):
+                positional.append(word)
+        if not positional:
+            return '', []
+        return positional[0].lower(), positional[1:]
+    
+    def _command_paths(self, command: str) -> List[str]:
+        """Return the absolute paths in a command, truncated before any glob component."""
+        paths = []
+        for token in re.findall(r'(?:^|[\s\'"=>(])(/[^\s\'";|)]*)', command):
+            # Skip find -perm modes such as "/022"
+            if re.fullmatch(r'/[0-7]+', token):
+                continue
+            parts = []
+            for part in token.split('/')[1:]:
+                if not part or any(char in part for char in '*?[{$'):
+                    break
+                parts.append(part)
+            paths.append('/' + '/'.join(parts))
+        return paths
+
+
+# "kernel.dmesg_restrict = 1" style sysctl settings in fix text. Values may be
+# paths or pipes ("kernel.core_pattern = |/bin/false") or several numbers
+# ("net.ipv4.ip_local_port_range = 32768 60999"); trailing punctuation and
+# quotes from the surrounding prose are not part of the value.
+SYSCTL_PARAM_PATTERN = re.compile(
+    r'\b((?:kernel|net|vm|fs|dev|user|abi|crypto)(?:\.\w+)+)\s*=\s*'
+    r'([^\s"\'`]*[^\s"\'`.,;:](?:[ \t]+-?\d+)*)'
+)
+
+# Resources held by any fix touching sysctl or GRUB configuration
+SYSCTL_RESOURCES = frozenset({'sysctl', 'file:/etc/sysctl.d', 'file:/etc/sysctl.conf'})
+GRUB_RESOURCES = frozenset({'grub', 'file:/etc/default/grub', 'file:/etc/grub.d', 'file:/boot/grub'})
+AUDIT_RESOURCES = frozenset({'audit', 'file:/etc/audit'})
+ACCOUNT_RESOURCES = frozenset({
+    'file:/etc/passwd', 'file:/etc/shadow', 'file:/etc/group', 'file:/etc/gshadow',
+    'file:/etc/default/useradd', 'file:/etc/login.defs',
+})
+
+# Resources of generic commands by tool; tools not listed run exclusively
+# (e.g. aideinit, which snapshots the whole file system)
+GENERIC_TOOL_RESOURCES = {
+    'augenrules': AUDIT_RESOURCES,
+    'auditctl': AUDIT_RESOURCES,
+    'dconf': frozenset({'file:/etc/dconf'}),
+    'timedatectl': frozenset({'timedate', 'file:/etc/localtime', 'file:/etc/timezone'}),
+    'passwd': ACCOUNT_RESOURCES,
+    'useradd': ACCOUNT_RESOURCES,
+    'usermod': ACCOUNT_RESOURCES,
+    'chage': ACCOUNT_RESOURCES,
+    'gpasswd': ACCOUNT_RESOURCES,
+}
+
+
+def resources_conflict(first: Set[str], second: Set[str]) -> bool:
+    """Return True if fixes holding these resources must not run concurrently."""
+    if not first or not second:
+        return False
+    if 'exclusive' in first or 'exclusive' in second or first & second:
+        return True
+    
+    for a in first:
+        kind_a, _, name_a = a.partition(':')
+        for b in second:
+            kind_b, _, name_b = b.partition(':')
+            if kind_a != kind_b or not name_a:
+                continue
+            if kind_a == 'systemd' and '*' in (name_a, name_b):
+                return True
+            # A directory conflicts with everything below it
+            if kind_a == 'file':
+                if name_a == '/' or name_b == '/' or \
+                   name_b.startswith(name_a + '/') or name_a.startswith(name_b + '/'):
+                    return True
+    return False
 
 
 class SystemHardener:
     """Apply STIG hardening fixes to the system."""
     
-    def __init__(self, backup_dir: Path = Path("/tmp/stig_backups")):
+    def __init__(self, backup_dir: Path = DEFAULT_BACKUP_ROOT):
         self.backup_dir = backup_dir
         self.backup_dir.mkdir(parents=True, exist_ok=True)
+        self.backups = BackupStore(backup_dir)
         self.stats = {
             'total': 0,
             'applied': 0,
             'skipped': 0,
             'failed': 0,
+            'resumed': 0,
             'manual': []
         }
+        # Fixes may be applied from several worker threads (see FixScheduler)
+        self._stats_lock = threading.Lock()
         self.grub_password_hash: Optional[str] = None
+        self.grub_password_configured = False
+        # Results of the batched PackageTransaction per (vuln_id, command)
+        self.package_results: Dict[Tuple[str, str], bool] = {}
+        # sysctl and GRUB changes, written and reloaded once after all fixes
+        self.staged = StagedChanges(self)
+    
+    def count(self, outcome: str, manual_note: Optional[str] = None) -> None:
+        """Increment a summary counter, optionally recording a manual action."""
+        with self._stats_lock:
+            self.stats[outcome] += 1
+            if manual_note:
+                self.stats['manual'].append(manual_note)
+    
+    def note_manual(self, note: str) -> None:
+        """Record a manual action for the summary."""
+        with self._stats_lock:
+            self.stats['manual'].append(note)
     
     def check_prerequisites(self) -> bool:
         """Check system prerequisites before hardening."""
@@ -409,35 +600,33 @@ class SystemHardener:
         return True
     
     def backup_file(self, file_path: Path) -> bool:
-        """Backup a file before modification."""
+        """Backup a file before modification (skipped if unchanged since its last backup)."""
         try:
-            if not file_path.exists():
-                return True
-            
-            backup_path = self.backup_dir / file_path.name
-            shutil.copy2(file_path, backup_path)
-            logger.debug(f"Backed up {file_path} to {backup_path}")
+            self.backups.backup(file_path)
             return True
         except Exception as e:
             logger.error(f"Failed to backup {file_path}: {e}")
             return False
     
     def run_command(self, command: str, check: bool = True) -> Tuple[bool, str]:
-        """Run a shell command and return success status and output."""
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=check
-            )
-            return True, result.stdout
-        except subprocess.CalledProcessError as e:
-            return False, e.stderr
+        """Run a shell command and return success status and output.
+        
+        Read-only probes are answered from the shared per-run cache.
+        """
+        result = PROBES.run(command)
+        if check and result.returncode != 0:
+            return False, result.stderr
+        return True, result.stdout
     
     def apply_package_fix(self, command: str, rule: StigRule) -> bool:
         """Apply package installation/removal fixes."""
+        # Already applied by the batched package transaction
+        settled = self.package_results.get((rule.vuln_id, command))
+        if settled is not None:
+            logger.info(f"Package fix applied by batched transaction: {command} "
+                        f"({'succeeded' if settled else 'failed'})")
+            return settled
+        
         logger.info(f"Applying package fix: {command}")
         
         # Remove sudo if present
@@ -560,84 +749,46 @@ class SystemHardener:
             return False
     
     def apply_sysctl_fix(self, command: str, rule: StigRule) -> bool:
-        """Apply sysctl parameter fixes."""
+        """
+        Apply sysctl parameter fixes.
+        
+        Parameters are staged into the shared drop-in file and reloads are
+        deferred; StagedChanges.commit() writes the file and runs
+        "sysctl --system" once at the end of the run.
+        """
         logger.info(f"Applying sysctl fix: {command}")
         
         # Remove sudo if present
         command = re.sub(r'^sudo\s+', '', command)
         
-        # Handle sysctl --system (reload)
-        if '--system' in command or '-p' in command:
-            success, output = self.run_command(command)
-            if success:
-                logger.info("Successfully reloaded sysctl")
-                return True
-            else:
-                logger.warning(f"Failed to reload sysctl: {output}")
-                return False
-        
         # Skip directory references
         if command.endswith('/') or '/sysctl.d/' in command:
             logger.info("Skipping directory reference in sysctl fix")
             return True
         
-        # Extract parameter and value from the fix text if available
+        # Extract parameters and values from the fix text if available
         # Look for patterns like "kernel.dmesg_restrict = 1" in the rule description
-        param_match = re.search(r'(\w+(?:\.\w+)+)\s*=\s*(\w+)', rule.fix_text)
-        if not param_match:
-            # Also try to extract from the command itself
-            param_match = re.search(r'(\w+(?:\.\w+)+)\s*=\s*(\w+)', command)
-        
-        if param_match:
-            param = param_match.group(1)
-            value = param_match.group(2)
-            
-            # Check current value
-            success, output = self.run_command(f"sysctl {param}", check=False)
-            if success:
-                current_match = re.search(r'=\s*(\w+)', output)
-                if current_match and current_match.group(1) == value:
-                    logger.info(f"Sysctl parameter {param} is already set to {value}")
-                else:
-                    # Set the parameter
-                    self.run_command(f"sysctl -w {param}={value}", check=False)
-                    logger.info(f"Set sysctl parameter {param}={value}")
-            
-            # Write to sysctl.d for persistence
-            sysctl_file = Path(f"/etc/sysctl.d/99-stig-{param.replace('.', '-')}.conf")
-            if sysctl_file.exists():
-                # Check if already configured
-                with open(sysctl_file, 'r') as f:
-                    content = f.read()
-                    if f"{param} = {value}" in content or f"{param}={value}" in content:
-                        logger.info(f"Sysctl parameter already in {sysctl_file}")
-                        return True
-            
-            self.backup_file(sysctl_file)
-            with open(sysctl_file, 'w') as f:
-                f.write(f"{param} = {value}\n")
-            logger.info(f"Wrote sysctl parameter to {sysctl_file}")
-            
-            # Reload sysctl
-            self.run_command("sysctl --system", check=False)
+        params = SYSCTL_PARAM_PATTERN.findall(rule.fix_text) or SYSCTL_PARAM_PATTERN.findall(command)
+        if params:
+            for param, value in params:
+                self.staged.stage_sysctl(rule.vuln_id, param, value)
+            return True
+        
+        # Handle sysctl --system (reload)
+        if '--system' in command or '-p' in command:
+            self.staged.request_sysctl_reload(rule.vuln_id)
             return True
         
         # If no parameter found, try to execute the command directly
         if command.startswith('sysctl'):
             success, output = self.run_command(command)
             if success:
-                # Reload sysctl
-                self.run_command("sysctl --system", check=False)
+                self.staged.request_sysctl_reload(rule.vuln_id)
                 return True
             else:
                 logger.error(f"Failed to apply sysctl fix: {output}")
                 return False
         
-        # If it's a directory reference or other non-command, skip it
-        if '/sysctl.d' in command or command.endswith('/'):
-            logger.info("Skipping directory reference in sysctl fix")
-            return True
-        
         logger.warning(f"Could not parse sysctl command: {command}")
         return False
     
@@ -707,6 +858,54 @@ class SystemHardener:
             logger.error(f"Failed to edit file: {output}")
             return False
     
+    @staticmethod
+    def needs_grub_password(rule: StigRule) -> bool:
+        """Return True if the rule's fix sets a GRUB password."""
+        return rule.vuln_id == "V-260470" or "grub-mkpasswd-pbkdf2" in rule.fix_text
+    
+    def generate_grub_password_hash(self) -> bool:
+        """Prompt for the GRUB password and generate its PBKDF2 hash."""
+        logger.info("GRUB password required for this STIG")
+        try:
+            password = getpass.getpass("Enter GRUB password: ")
+            password_confirm = getpass.getpass("Confirm GRUB password: ")
+        except EOFError:
+            logger.error("No terminal to read the GRUB password from")
+            return False
+        
+        if password != password_confirm:
+            logger.error("Passwords do not match")
+            return False
+        
+        # Generate hash
+        try:
+            process = subprocess.Popen(
+                ['grub-mkpasswd-pbkdf2'],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
+        except OSError as e:
+            logger.error(f"Failed to run grub-mkpasswd-pbkdf2: {e}")
+            return False
+        stdout, stderr = process.communicate(input=f"{password}\n{password}\n")
+        
+        if process.returncode != 0:
+            logger.error(f"Failed to generate GRUB password hash: {stderr}")
+            return False
+        
+        # Extract hash from output
+        hash_match = re.search(r'grub\.pbkdf2\.sha512\.\d+\.[A-Za-z0-9+/=]+', stdout)
+        if hash_match:
+            self.grub_password_hash = hash_match.group(0)
+            logger.info("Generated GRUB password hash")
+        else:
+            logger.error("Could not extract hash from grub-mkpasswd-pbkdf2 output")
+            return False
+        
+        return True
+    
     def apply_grub_config(self, commands: List[str], rule: StigRule) -> bool:
         """Apply GRUB configuration fixes."""
         logger.info("Applying GRUB configuration fixes")
@@ -719,38 +918,13 @@ class SystemHardener:
         self.backup_file(grub_custom)
         
         # Handle GRUB password requirement
-        if rule.vuln_id == "V-260470" or "grub-mkpasswd-pbkdf2" in rule.fix_text:
-            if not self.grub_password_hash:
-                logger.info("GRUB password required for this rule")
-                password = getpass.getpass("Enter GRUB password: ")
-                password_confirm = getpass.getpass("Confirm GRUB password: ")
-                
-                if password != password_confirm:
-                    logger.error("Passwords do not match")
-                    return False
-                
-                # Generate hash
-                process = subprocess.Popen(
-                    ['grub-mkpasswd-pbkdf2'],
-                    stdin=subprocess.PIPE,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True
-                )
-                stdout, stderr = process.communicate(input=f"{password}\n{password}\n")
-                
-                if process.returncode != 0:
-                    logger.error(f"Failed to generate GRUB password hash: {stderr}")
-                    return False
-                
-                # Extract hash from output
-                hash_match = re.search(r'grub\.pbkdf2\.sha512\.\d+\.[A-Za-z0-9+/=]+', stdout)
-                if hash_match:
-                    self.grub_password_hash = hash_match.group(0)
-                    logger.info("Generated GRUB password hash")
-                else:
-                    logger.error("Could not extract hash from grub-mkpasswd-pbkdf2 output")
+        if self.needs_grub_password(rule):
+            if not self.grub_password_configured:
+                # Prompted for once in main, never from a fix worker thread
+                if not self.grub_password_hash:
+                    logger.error(f"{rule.vuln_id}: no GRUB password hash, not configuring the GRUB password")
                     return False
+                self.grub_password_configured = True
                 
                 # Add password to grub custom file
                 if self.grub_password_hash:
@@ -808,108 +982,53 @@ class SystemHardener:
                         os.chmod(grub_custom, 0o755)
                         logger.info(f"Created GRUB password configuration in {grub_custom}")
         
-        # Apply GRUB configuration changes from fix text
-        # Handle audit=1 in GRUB_CMDLINE_LINUX
-        grub_updated = False
-        if "audit=1" in rule.fix_text or "GRUB_CMDLINE_LINUX" in rule.fix_text:
-            if grub_default.exists():
-                with open(grub_default, 'r') as f:
-                    content = f.read()
-                
-                # Check if audit=1 is already present
-                if 'audit=1' in content:
-                    logger.info("audit=1 already present in GRUB configuration")
-                else:
-                    # Add audit=1 to GRUB_CMDLINE_LINUX and GRUB_CMDLINE_LINUX_DEFAULT
-                    lines = content.split('\n')
-                    new_lines = []
-                    for line in lines:
-                        if line.startswith('GRUB_CMDLINE_LINUX=') or line.startswith('GRUB_CMDLINE_LINUX_DEFAULT='):
-                            # Add audit=1 if not present
-                            if 'audit=1' not in line:
-                                if line.endswith('"'):
-                                    line = line[:-1] + ' audit=1"'
-                                else:
-                                    line = line + ' audit=1'
-                                grub_updated = True
-                        new_lines.append(line)
-                    
-                    if grub_updated:
-                        with open(grub_default, 'w') as f:
-                            f.write('\n'.join(new_lines))
-                        logger.info("Added audit=1 to GRUB configuration")
-        
-        # Apply other GRUB commands
+        # Stage kernel command line args from the fix text (e.g. audit=1);
+        # they are written to GRUB_CMDLINE_LINUX(_DEFAULT) in one edit
+        kernel_args = []
+        for value in re.findall(r'GRUB_CMDLINE_LINUX(?:_DEFAULT)?="([^"]*)"', rule.fix_text):
+            kernel_args.extend(arg for arg in value.split() if arg not in kernel_args)
+        if not kernel_args and "audit=1" in rule.fix_text:
+            kernel_args = ["audit=1"]
+        if kernel_args:
+            self.staged.stage_kernel_args(rule.vuln_id, kernel_args)
+        
+        # Apply other GRUB commands (update-grub itself runs once at commit)
         for cmd in commands:
             if 'sed' in cmd.lower() or 'echo' in cmd.lower():
                 success, _ = self.run_command(cmd)
                 if not success:
                     logger.warning(f"Failed to apply GRUB command: {cmd}")
                 else:
-                    grub_updated = True
+                    self.staged.request_grub_update(rule.vuln_id)
         
-        # Only update GRUB if we made changes
-        if not grub_updated and not self.grub_password_hash:
-            logger.info("No GRUB changes to apply")
-            return True
-        
-        # Validate GRUB custom file before updating
-        if grub_custom.exists():
-            with open(grub_custom, 'r') as f:
-                content = f.read()
-                # Check for duplicate password entries
-                password_count = content.count('password_pbkdf2')
-                if password_count > 1:
-                    logger.warning(f"Found {password_count} password entries in {grub_custom}, cleaning up...")
-                    # Remove duplicates, keep only the first valid one
-                    lines = content.split('\n')
-                    new_lines = []
-                    found_superusers = False
-                    found_password = False
-                    for i, line in enumerate(lines):
-                        if 'set superusers' in line.lower():
-                            if not found_superusers:
-                                new_lines.append(line)
-                                found_superusers = True
-                            # Skip duplicate superusers lines
-                            continue
-                        elif 'password_pbkdf2' in line.lower():
-                            if not found_password and found_superusers:
-                                # Keep the first password after superusers
-                                new_lines.append(line)
-                                found_password = True
-                            # Skip duplicate password lines
-                            continue
-                        new_lines.append(line)
-                    
-                    with open(grub_custom, 'w') as f:
-                        f.write('\n'.join(new_lines))
-                    logger.info("Cleaned up duplicate GRUB password entries")
+        if self.needs_grub_password(rule) and self.grub_password_hash:
+            self.staged.request_grub_update(rule.vuln_id)
         
-        # Update GRUB
-        success, output = self.run_command("update-grub")
-        if success:
-            logger.info("Successfully updated GRUB configuration")
-            return True
-        else:
-            logger.error(f"Failed to update GRUB: {output}")
-            # Try to get more details about the error
-            if '/boot/grub/grub.cfg.new' in output:
-                logger.error("GRUB config generation failed. Check /boot/grub/grub.cfg.new for details.")
-                logger.error("You may need to manually fix the GRUB configuration before rebooting.")
-            return False
+        if not self.staged.has_grub_changes(rule.vuln_id):
+            logger.info("No GRUB changes to apply")
+        return True
     
-    def apply_fix(self, rule: StigRule) -> bool:
-        """Apply a single STIG rule fix."""
-        self.stats['total'] += 1
+    def apply_fix(self, rule: StigRule, commands: Optional[List[Dict]] = None) -> bool:
+        """
+        Apply a single STIG rule fix.
+        
+        Args:
+            rule: Rule to fix
+            commands: Commands already extracted from the rule's fix text
+                (extracted here if not given)
+        
+        Returns:
+            True if every fix command succeeded
+        """
+        self.count('total')
         logger.info(f"Processing rule: {rule.vuln_id} - {rule.title}")
         
-        extractor = CommandExtractor()
-        commands = extractor.extract_commands(rule.fix_text)
+        if commands is None:
+            commands = CommandExtractor().extract_commands(rule.fix_text)
         
         if not commands:
             logger.warning(f"No commands extracted for rule {rule.vuln_id}")
-            self.stats['skipped'] += 1
+            self.count('skipped')
             return False
         
         # Group commands by type
@@ -931,12 +1050,11 @@ class SystemHardener:
                 logger.warning(f"GRUB configuration had issues for rule {rule.vuln_id}, but continuing...")
                 # Still mark as applied if we made changes, even if update-grub failed
                 if self.grub_password_hash or 'audit=1' in rule.fix_text:
-                    self.stats['applied'] += 1
-                    self.stats['manual'].append(f"{rule.vuln_id}: GRUB update failed - manual review needed")
+                    self.count('applied', f"{rule.vuln_id}: GRUB update failed - manual review needed")
                 else:
-                    self.stats['failed'] += 1
+                    self.count('failed')
             else:
-                self.stats['applied'] += 1
+                self.count('applied')
         
         # Apply other fixes
         all_success = True
@@ -987,10 +1105,10 @@ class SystemHardener:
                 all_success = False
         
         if all_success:
-            self.stats['applied'] += 1
+            self.count('applied')
             return True
         else:
-            self.stats['failed'] += 1
+            self.count('failed')
             return False
     
     def print_summary(self):
@@ -1002,6 +1120,8 @@ class SystemHardener:
         print(f"Successfully applied: {self.stats['applied']}")
         print(f"Skipped: {self.stats['skipped']}")
         print(f"Failed: {self.stats['failed']}")
+        if self.stats['resumed']:
+            print(f"Already applied (journal): {self.stats['resumed']}")
         if self.stats['manual']:
             print(f"\nManual actions required: {len(self.stats['manual'])}")
             for item in self.stats['manual']:
@@ -1009,6 +1129,753 @@ class SystemHardener:
         print("="*60)
 
 
+class StagedChanges:
+    """
+    sysctl and GRUB changes staged by rule fixes and applied once.
+    
+    Rules stage sysctl keys and kernel command line args instead of rewriting
+    files and reloading per rule. commit() writes every sysctl key to one
+    drop-in file, edits /etc/default/grub once, and runs "sysctl --system"
+    and "update-grub" exactly once, logging the outcome for each rule.
+    """
+    
+    SYSCTL_DROPIN = Path('/etc/sysctl.d/99-stig-hardening.conf')
+    # Per-parameter files written by earlier versions (99-stig-<param>.conf);
+    # they sort after the drop-in and would override it at sysctl --system
+    LEGACY_SYSCTL_GLOB = '99-stig-*.conf'
+    GRUB_DEFAULT = Path('/etc/default/grub')
+    GRUB_CUSTOM = Path('/etc/grub.d/40_custom')
+    
+    def __init__(self, hardener: 'SystemHardener'):
+        self.hardener = hardener
+        # Fixes are staged from several worker threads
+        self._lock = threading.Lock()
+        # param -> (value, vuln_id), in staging order
+        self.sysctl: Dict[str, Tuple[str, str]] = {}
+        self.sysctl_reload: List[str] = []
+        # kernel arg -> vuln_ids
+        self.kernel_args: Dict[str, List[str]] = {}
+        self.grub_update: List[str] = []
+        # Every rule that staged a change, even if a later rule overrode it
+        self.rules: Set[str] = set()
+    
+    def stage_sysctl(self, vuln_id: str, param: str, value: str) -> None:
+        """Stage a sysctl parameter for the drop-in file."""
+        with self._lock:
+            previous = self.sysctl.get(param)
+            if previous and previous[0] != value:
+                logger.warning(f"{vuln_id}: sysctl {param} = {value} overrides "
+                               f"{previous[0]} from {previous[1]}")
+            self.sysctl[param] = (value, vuln_id)
+            self.rules.add(vuln_id)
+        logger.info(f"{vuln_id}: staged sysctl {param} = {value}")
+    
+    def request_sysctl_reload(self, vuln_id: str) -> None:
+        """Note that a rule needs sysctl settings reloaded."""
+        with self._lock:
+            self.sysctl_reload.append(vuln_id)
+            self.rules.add(vuln_id)
+        logger.info(f"{vuln_id}: sysctl reload deferred to the end of the run")
+    
+    def stage_kernel_args(self, vuln_id: str, args: List[str]) -> None:
+        """Stage kernel command line args for GRUB_CMDLINE_LINUX(_DEFAULT)."""
+        with self._lock:
+            for arg in args:
+                self.kernel_args.setdefault(arg, []).append(vuln_id)
+            self.rules.add(vuln_id)
+        logger.info(f"{vuln_id}: staged kernel args {' '.join(args)}")
+    
+    def request_grub_update(self, vuln_id: str) -> None:
+        """Note that a rule changed GRUB files and needs update-grub."""
+        with self._lock:
+            if vuln_id not in self.grub_update:
+                self.grub_update.append(vuln_id)
+            self.rules.add(vuln_id)
+        logger.info(f"{vuln_id}: update-grub deferred to the end of the run")
+    
+    def has_changes(self, vuln_id: str) -> bool:
+        """Return True if the rule staged any sysctl or GRUB change."""
+        with self._lock:
+            return vuln_id in self.rules
+    
+    def has_grub_changes(self, vuln_id: str) -> bool:
+        """Return True if the rule staged any GRUB change."""
+        with self._lock:
+            return vuln_id in self.grub_update or \
+                any(vuln_id in vuln_ids for vuln_ids in self.kernel_args.values())
+    
+    def commit(self) -> Dict[str, bool]:
+        """
+        Write the staged changes and reload once.
+        
+        Returns:
+            Success per rule that staged a change
+        """
+        results: Dict[str, bool] = {}
+        if self.sysctl or self.sysctl_reload:
+            results.update(self._commit_sysctl())
+        if self.kernel_args or self.grub_update:
+            results.update(self._commit_grub())
+        return results
+    
+    @staticmethod
+    def _read_sysctl_file(path: Path) -> Dict[str, str]:
+        """Return the key = value settings of a sysctl.d file."""
+        entries: Dict[str, str] = {}
+        for line in path.read_text().splitlines():
+            key, sep, value = line.partition('=')
+            if sep and not line.lstrip().startswith(('#', ';')):
+                entries[key.strip()] = value.strip()
+        return entries
+    
+    def _legacy_sysctl_files(self) -> List[Path]:
+        """Per-parameter sysctl files from earlier runs, in sysctl --system order."""
+        return sorted(
+            path for path in self.SYSCTL_DROPIN.parent.glob(self.LEGACY_SYSCTL_GLOB)
+            if path != self.SYSCTL_DROPIN and path.is_file()
+        )
+    
+    def _commit_sysctl(self) -> Dict[str, bool]:
+        """Write all staged sysctl keys to the drop-in file and run sysctl --system once."""
+        written = True
+        legacy_files = self._legacy_sysctl_files()
+        if self.sysctl or legacy_files:
+            # Keep keys from earlier runs, including per-parameter files from older
+            # versions (migrated into the drop-in); staged values take precedence
+            entries: Dict[str, str] = {}
+            try:
+                if self.SYSCTL_DROPIN.exists():
+                    entries.update(self._read_sysctl_file(self.SYSCTL_DROPIN))
+                for path in legacy_files:
+                    entries.update(self._read_sysctl_file(path))
+                entries.update({param: value for param, (value, _) in self.sysctl.items()})
+                content = "# STIG hardening sysctl settings (harden_ubuntu_stig.py)\n" + \
+                    ''.join(f"{param} = {value}\n" for param, value in entries.items())
+                
+                if not self.SYSCTL_DROPIN.exists() or self.SYSCTL_DROPIN.read_text() != content:
+                    self.hardener.backup_file(self.SYSCTL_DROPIN)
+                    self.SYSCTL_DROPIN.parent.mkdir(parents=True, exist_ok=True)
+                    self.SYSCTL_DROPIN.write_text(content)
+                    logger.info(f"Wrote {len(entries)} sysctl parameters to {self.SYSCTL_DROPIN}")
+                else:
+                    logger.info(f"Sysctl parameters already in {self.SYSCTL_DROPIN}")
+                # Only drop the old files once their settings are in the drop-in
+                for path in legacy_files:
+                    self.hardener.backup_file(path)
+                    path.unlink()
+                    logger.info(f"Migrated {path} into {self.SYSCTL_DROPIN}")
+            except OSError as e:
+                logger.error(f"Failed to write {self.SYSCTL_DROPIN}: {e}")
+                written = False
+        
+        # Reload sysctl
+        success, output = self.hardener.run_command("sysctl --system", check=False)
+        if not success:
+            logger.warning(f"Failed to reload sysctl: {output}")
+        
+        results = {}
+        for param, (value, vuln_id) in self.sysctl.items():
+            results[vuln_id] = results.get(vuln_id, True) and written
+            if written:
+                logger.info(f"{vuln_id}: sysctl {param} = {value} written to {self.SYSCTL_DROPIN}")
+            else:
+                logger.error(f"{vuln_id}: sysctl {param} = {value} could not be written")
+                self.hardener.note_manual(f"{vuln_id}: sysctl {param} = {value} not persisted - manual review needed")
+        for vuln_id in self.sysctl_reload:
+            results.setdefault(vuln_id, True)
+            logger.info(f"{vuln_id}: sysctl settings reloaded")
+        return results
+    
+    def _commit_grub(self) -> Dict[str, bool]:
+        """Apply all staged kernel args in one /etc/default/grub edit and run update-grub once."""
+        grub_default = self.GRUB_DEFAULT
+        if self.kernel_args and grub_default.exists():
+            with open(grub_default, 'r') as f:
+                content = f.read()
+            
+            # Add the args to GRUB_CMDLINE_LINUX and GRUB_CMDLINE_LINUX_DEFAULT
+            lines = content.split('\n')
+            new_lines = []
+            for line in lines:
+                if line.startswith('GRUB_CMDLINE_LINUX=') or line.startswith('GRUB_CMDLINE_LINUX_DEFAULT='):
+                    key, _, value = line.partition('=')
+                    quoted = value.startswith('"') and value.endswith('"') and len(value) >= 2
+                    args = (value[1:-1] if quoted else value).split()
+                    missing = [arg for arg in self.kernel_args if arg not in args]
+                    if missing:
+                        value = ' '.join(args + missing)
+                        line = f'{key}="{value}"' if quoted else f'{key}={value}'
+                new_lines.append(line)
+            
+            # (backed up by apply_grub_config before any rule changed it)
+            if new_lines != lines:
+                with open(grub_default, 'w') as f:
+                    f.write('\n'.join(new_lines))
+                logger.info(f"Added {' '.join(self.kernel_args)} to GRUB configuration")
+            else:
+                logger.info(f"{' '.join(self.kernel_args)} already present in GRUB configuration")
+        
+        self._dedupe_grub_password()
+        
+        # Update GRUB
+        success, output = self.hardener.run_command("update-grub")
+        if success:
+            logger.info("Successfully updated GRUB configuration")
+        else:
+            logger.error(f"Failed to update GRUB: {output}")
+            # Try to get more details about the error
+            if '/boot/grub/grub.cfg.new' in output:
+                logger.error("GRUB config generation failed. Check /boot/grub/grub.cfg.new for details.")
+                logger.error("You may need to manually fix the GRUB configuration before rebooting.")
+        
+        results = {}
+        vuln_ids = list(self.grub_update)
+        for arg, arg_vuln_ids in self.kernel_args.items():
+            vuln_ids.extend(v for v in arg_vuln_ids if v not in vuln_ids)
+        for vuln_id in vuln_ids:
+            results[vuln_id] = success
+            if success:
+                logger.info(f"{vuln_id}: GRUB changes applied")
+            else:
+                logger.error(f"{vuln_id}: GRUB update failed")
+                self.hardener.note_manual(f"{vuln_id}: GRUB update failed - manual review needed")
+        return results
+    
+    def _dedupe_grub_password(self) -> None:
+        """Remove duplicate superusers/password entries from the GRUB custom file."""
+        grub_custom = self.GRUB_CUSTOM
+        if not grub_custom.exists():
+            return
+        with open(grub_custom, 'r') as f:
+            content = f.read()
+        # Check for duplicate password entries
+        password_count = content.count('password_pbkdf2')
+        if password_count <= 1:
+            return
+        
+        logger.warning(f"Found {password_count} password entries in {grub_custom}, cleaning up...")
+        # Remove duplicates, keep only the first valid one
+        lines = content.split('\n')
+        new_lines = []
+        found_superusers = False
+        found_password = False
+        for line in lines:
+            if 'set superusers' in line.lower():
+                if not found_superusers:
+                    new_lines.append(line)
+                    found_superusers = True
+                # Skip duplicate superusers lines
+                continue
+            elif 'password_pbkdf2' in line.lower():
+                if not found_password and found_superusers:
+                    # Keep the first password after superusers
+                    new_lines.append(line)
+                    found_password = True
+                # Skip duplicate password lines
+                continue
+            new_lines.append(line)
+        
+        with open(grub_custom, 'w') as f:
+            f.write('\n'.join(new_lines))
+        logger.info("Cleaned up duplicate GRUB password entries")
+
+
+@dataclass
+class PackageIntent:
+    """A package install/purge requested by one command of a rule's fix."""
+    vuln_id: str
+    command: str
+    action: str  # 'install', 'purge' or 'force-purge' (dpkg -P --force-all)
+    packages: List[str]
+
+
+class PackageTransaction:
+    """
+    Batch every rule's package commands into one apt/dpkg transaction.
+    
+    Install and remove intents are collected from all rules up front. When
+    rules disagree about a package, the later rule in STIG order wins (the
+    state a sequential run would end in). The transaction then runs one
+    dpkg force-purge, one apt-get purge and one apt-get install, and each
+    rule's success is read back from the resulting package state.
+    """
+    
+    PACKAGE_NAME = re.compile(r'^[a-z0-9][a-z0-9+.\-]*(?::[a-z0-9]+)?$')
+    
+    def __init__(self, hardener: SystemHardener):
+        self.hardener = hardener
+        self.intents: List[PackageIntent] = []
+        # Final action per package, in order of first request
+        self.final: Dict[str, str] = {}
+        self.conflicts: List[str] = []
+        self._covered: Set[Tuple[str, str]] = set()
+    
+    def parse_intent(self, vuln_id: str, command: str) -> Optional[PackageIntent]:
+        """Parse an apt/dpkg command into an intent, or None if it can't be batched."""
+        words = re.sub(r'^sudo\s+', '', command).split()
+        if not words:
+            return None
+        
+        if words[0] in ('apt', 'apt-get'):
+            verbs = [w for w in words[1:] if not w.startswith('-')]
+            if not verbs or verbs[0] not in ('install', 'remove', 'purge'):
+                return None
+            action = 'install' if verbs[0] == 'install' else 'purge'
+            packages = verbs[1:]
+        elif words[0] == 'dpkg':
+            flags = [w for w in words[1:] if w.startswith('-')]
+            if '-P' not in flags and '--purge' not in flags:
+                return None
+            action = 'force-purge' if '--force-all' in flags else 'purge'
+            packages = [w for w in words[1:] if not w.startswith('-')]
+        else:
+            return None
+        
+        if not packages or not all(self.PACKAGE_NAME.match(pkg) for pkg in packages):
+            return None
+        return PackageIntent(vuln_id, command, action, packages)
+    
+    def collect(self, extracted: List[Tuple[StigRule, List[Dict]]]) -> None:
+        """Collect package intents from every rule's extracted commands, in STIG order."""
+        for rule, commands in extracted:
+            for cmd in commands:
+                if cmd['type'] not in ('package_install', 'package_remove'):
+                    continue
+                intent = self.parse_intent(rule.vuln_id, cmd['command'])
+                if intent is None:
+                    continue
+                
+                for pkg in intent.packages:
+                    previous = self.final.get(pkg)
+                    if previous and (previous == 'install') != (intent.action == 'install'):
+                        self.conflicts.append(
+                            f"{pkg}: {previous} superseded by {intent.action} from {rule.vuln_id}"
+                        )
+                    self.final[pkg] = intent.action
+                self.intents.append(intent)
+                self._covered.add((rule.vuln_id, cmd['command']))
+    
+    def covers(self, vuln_id: str, command: str) -> bool:
+        """Return True if the command is applied by the transaction instead of its rule."""
+        return (vuln_id, command) in self._covered
+    
+    def packages_for(self, action: str) -> List[str]:
+        """Return the packages whose final action is the given one."""
+        return [pkg for pkg, final in self.final.items() if final == action]
+    
+    def installed_packages(self) -> Optional[Set[str]]:
+        """Return the installed packages (dpkg status "ii"), or None if dpkg can't be queried."""
+        success, output = self.hardener.run_command(
+            "dpkg-query -W -f='${Package} ${db:Status-Abbrev}\\n'", check=False
+        )
+        if not success:
+            return None
+        installed = set()
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].startswith('ii'):
+                installed.add(parts[0])
+        return installed
+    
+    def print_plan(self) -> None:
+        """Print what the transaction will install and purge."""
+        print(f"Package transaction: {len(self.intents)} commands from "
+              f"{len({intent.vuln_id for intent in self.intents})} rules")
+        for action, label in (('force-purge', 'dpkg -P --force-all'),
+                              ('purge', 'apt-get purge'),
+                              ('install', 'apt-get install')):
+            packages = self.packages_for(action)
+            if packages:
+                print(f"  {label}: {' '.join(packages)}")
+        for conflict in self.conflicts:
+            print(f"  conflict: {conflict}")
+    
+    def execute(self) -> Dict[Tuple[str, str], bool]:
+        """
+        Run the batched transaction and map the outcome back to each command.
+        
+        Returns:
+            Success per (vuln_id, command) covered by the transaction
+        """
+        if not self.intents:
+            return {}
+        
+        for conflict in self.conflicts:
+            logger.warning(f"Package conflict resolved in STIG order: {conflict}")
+        
+        installed = self.installed_packages() or set()
+        to_force_purge = [pkg for pkg in self.packages_for('force-purge') if pkg in installed]
+        to_purge = [pkg for pkg in self.packages_for('purge') if pkg in installed]
+        to_install = [pkg for pkg in self.packages_for('install') if pkg.split(':')[0] not in installed]
+        logger.info(f"Package transaction: install {len(to_install)}, purge "
+                    f"{len(to_purge) + len(to_force_purge)}, "
+                    f"{len(self.final) - len(to_install) - len(to_purge) - len(to_force_purge)} "
+                    f"already in the desired state")
+        
+        env = "DEBIAN_FRONTEND=noninteractive"
+        steps = []
+        # Removals first so the install can pull back anything they took with them
+        if to_force_purge:
+            steps.append(f"dpkg -P --force-all {' '.join(to_force_purge)}")
+        if to_purge:
+            steps.append(f"{env} apt-get purge -y {' '.join(to_purge)}")
+        for step in steps:
+            logger.info(f"Running package transaction step: {step}")
+            success, output = self.hardener.run_command(step)
+            if not success:
+                logger.error(f"Package transaction step failed: {output}")
+        
+        if to_install:
+            self.hardener.run_command("apt-get update", check=False)
+            step = f"{env} apt-get install -y {' '.join(to_install)}"
+            logger.info(f"Running package transaction step: {step}")
+            success, output = self.hardener.run_command(step)
+            if not success:
+                # apt installs nothing when one package fails; retry the rest
+                # one by one so a single unavailable package doesn't fail every rule
+                logger.error(f"Batched install failed, retrying packages individually: {output}")
+                installed = self.installed_packages() or set()
+                for pkg in to_install:
+                    if pkg.split(':')[0] not in installed:
+                        self.hardener.run_command(f"{env} apt-get install -y {pkg}", check=False)
+        
+        # Per-rule success is the final state of the rule's own packages
+        installed = self.installed_packages()
+        results = {}
+        for intent in self.intents:
+            if installed is None:
+                success = False
+            elif intent.action == 'install':
+                success = all(pkg.split(':')[0] in installed for pkg in intent.packages)
+            else:
+                success = all(pkg.split(':')[0] not in installed for pkg in intent.packages)
+            results[(intent.vuln_id, intent.command)] = success
+            if success:
+                logger.info(f"{intent.vuln_id}: {intent.action} {' '.join(intent.packages)} OK")
+            else:
+                logger.error(f"{intent.vuln_id}: {intent.action} {' '.join(intent.packages)} failed")
+        return results
+
+
+@dataclass
+class RulePlan:
+    """A rule scheduled for fixing, with the resources its commands touch."""
+    index: int
+    rule: StigRule
+    commands: List[Dict]
+    resources: Set[str]
+    depends_on: List[int] = field(default_factory=list)
+    wave: int = 1
+    input_hash: str = ''
+
+
+def rule_input_hash(rule: StigRule, commands: List[Dict]) -> str:
+    """Hash what a rule's fix is computed from, so journal entries go stale when it changes."""
+    payload = json.dumps([rule.rule_id, rule.vuln_id, rule.fix_text, commands], sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class HardeningJournal:
+    """
+    Append-only JSON-lines journal of rule progress.
+    
+    Each rule gets a "start" record before its fix runs and a "done" record
+    with its status after. Rules whose changes are staged (sysctl, GRUB) are
+    "staged" until a "commit" record shows the staged changes were written.
+    Records are flushed to the OS as they are written and fsynced in batches,
+    so a crash loses at most the last batch; a lost record only means the rule
+    is applied again. A "run" record without resume starts a new journal epoch.
+    """
+    
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # vuln_id -> (input hash, status) from the current epoch
+        self.state: Dict[str, Tuple[str, str]] = {}
+    
+    def load(self) -> None:
+        """Read rule state from the journal's latest epoch."""
+        self.state = {}
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn write from a crash
+                    continue
+                event = record.get('event')
+                if event == 'run' and not record.get('resume'):
+                    self.state = {}
+                elif event == 'start':
+                    self.state[record['vuln_id']] = (record['input'], 'in-flight')
+                elif event == 'done':
+                    self.state[record['vuln_id']] = (record['input'], record['status'])
+                elif event == 'commit':
+                    for vuln_id in record['vuln_ids']:
+                        if vuln_id in self.state and self.state[vuln_id][1] == 'staged':
+                            self.state[vuln_id] = (self.state[vuln_id][0], 'applied')
+    
+    def open(self, resume: bool) -> None:
+        """Open the journal for appending and record the start of a run."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a')
+        self.record({'event': 'run', 'resume': resume}, sync=True)
+    
+    def is_applied(self, vuln_id: str, input_hash: str) -> bool:
+        """Return True if the journal shows the rule applied from the same input."""
+        return self.state.get(vuln_id) == (input_hash, 'applied')
+    
+    def in_flight(self) -> List[str]:
+        """Rules that started but never finished in the journaled run."""
+        return [vuln_id for vuln_id, (_, status) in self.state.items() if status == 'in-flight']
+    
+    def record(self, record: Dict, sync: bool = False) -> None:
+        """Append a record, fsyncing once a batch is full or old enough."""
+        record = {'time': time.time(), **record}
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            if sync or self._unsynced >= JOURNAL_FSYNC_BATCH or \
+                    time.monotonic() - self._last_sync >= JOURNAL_FSYNC_INTERVAL:
+                self._sync()
+    
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+    
+    def start(self, plan: 'RulePlan') -> None:
+        self.record({'event': 'start', 'vuln_id': plan.rule.vuln_id, 'input': plan.input_hash})
+    
+    def done(self, plan: 'RulePlan', status: str) -> None:
+        self.record({'event': 'done', 'vuln_id': plan.rule.vuln_id, 'input': plan.input_hash,
+                     'status': status})
+    
+    def commit(self, vuln_ids: List[str]) -> None:
+        """Record that the staged changes of these rules were written."""
+        self.record({'event': 'commit', 'vuln_ids': sorted(vuln_ids)}, sync=True)
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._sync()
+                self._file.close()
+                self._file = None
+
+
+class FixScheduler:
+    """
+    Apply rule fixes concurrently on a bounded thread pool.
+    
+    Each rule's extracted commands are classified by the resources they touch
+    (apt lock, config files, sysctl, systemd units, GRUB). A rule depends on
+    every earlier rule whose resources conflict with its own, so conflicting
+    fixes still apply in STIG order while independent fixes run in parallel.
+    """
+    
+    def __init__(self, hardener: SystemHardener, workers: int = DEFAULT_FIX_WORKERS,
+                 packages: Optional[PackageTransaction] = None,
+                 journal: Optional[HardeningJournal] = None):
+        self.hardener = hardener
+        self.workers = max(1, workers)
+        self.packages = packages
+        self.journal = journal
+        # Indexes of rules the journal shows as already applied (--resume)
+        self.completed: Set[int] = set()
+        # Indexes of rules left out of this run (see skip)
+        self.skipped: Set[int] = set()
+        self.extractor = CommandExtractor()
+        # Per-rule results: vuln_id -> (seconds, success or None on error)
+        self.timings: Dict[str, Tuple[float, Optional[bool]]] = {}
+        self.wall_seconds = 0.0
+        # Set when run() was cut short by Ctrl+C
+        self.interrupted = False
+    
+    def plan(self, rules: List[StigRule]) -> List[RulePlan]:
+        """Extract and classify each rule's commands and resolve dependencies."""
+        extracted = [(rule, self.extractor.extract_commands(rule.fix_text)) for rule in rules]
+        if self.packages:
+            self.packages.collect(extracted)
+        
+        plans = []
+        for index, (rule, commands) in enumerate(extracted):
+            resources: Set[str] = set()
+            for cmd in commands:
+                # Batched package commands no longer take the apt lock per rule
+                if self.packages and self.packages.covers(rule.vuln_id, cmd['command']):
+                    continue
+                resources |= self.extractor.resources_for(cmd)
+            plan = RulePlan(index, rule, commands, resources,
+                            input_hash=rule_input_hash(rule, commands))
+            
+            for earlier in plans:
+                if resources_conflict(earlier.resources, resources):
+                    plan.depends_on.append(earlier.index)
+                    plan.wave = max(plan.wave, earlier.wave + 1)
+            plans.append(plan)
+        return plans
+    
+    def resume(self, plans: List[RulePlan]) -> List[RulePlan]:
+        """
+        Mark rules the journal shows as applied from unchanged input as completed.
+        
+        Returns:
+            The plans that still have to run
+        """
+        for vuln_id in self.journal.in_flight():
+            logger.info(f"{vuln_id} was in flight when the previous run stopped, re-applying it")
+        self.completed = {
+            plan.index for plan in plans
+            if self.journal.is_applied(plan.rule.vuln_id, plan.input_hash)
+        }
+        remaining = [plan for plan in plans if plan.index not in self.completed]
+        logger.info(f"Resuming: {len(self.completed)} rules already applied, {len(remaining)} remaining")
+        return remaining
+    
+    def skip(self, plans: List[RulePlan], reason: str) -> None:
+        """
+        Leave rules out of this run, counted as skipped with a manual note.
+        
+        Skipped rules don't hold up rules that depend on them, and aren't
+        journaled, so --resume tries them again.
+        """
+        for plan in plans:
+            logger.warning(f"Skipping {plan.rule.vuln_id}: {reason}")
+            self.skipped.add(plan.index)
+            self.hardener.count('skipped', f"{plan.rule.vuln_id}: {reason}")
+    
+    def print_plan(self, plans: List[RulePlan]) -> None:
+        """Print the dry-run plan: which rules run together and what they wait for."""
+        waves = max((plan.wave for plan in plans), default=0)
+        print("\n" + "="*60)
+        print("STIG Hardening Plan (dry run)")
+        print("="*60)
+        print(f"Rules: {len(plans)}  Waves: {waves}  Workers: {self.workers}")
+        if self.packages:
+            self.packages.print_plan()
+        for wave in range(1, waves + 1):
+            members = [plan for plan in plans if plan.wave == wave]
+            print(f"\nWave {wave} ({len(members)} rules, run concurrently):")
+            for plan in members:
+                resources = ', '.join(sorted(plan.resources)) or 'none (no commands)'
+                print(f"  {plan.rule.vuln_id:<10} {len(plan.commands)} commands  [{resources}]")
+                if plan.depends_on:
+                    after = [plans[i].rule.vuln_id for i in plan.depends_on[-3:]]
+                    more = len(plan.depends_on) - len(after)
+                    print(f"  {'':<10} after {', '.join(after)}" + (f" (+{more} earlier)" if more else ""))
+        print("="*60)
+    
+    def run(self, plans: List[RulePlan]) -> None:
+        """Apply every planned rule, starting each once its dependencies finished."""
+        # Rules applied by an earlier run count as finished dependencies
+        pending = {plan.index: plan for plan in plans
+                   if plan.index not in self.completed and plan.index not in self.skipped}
+        done: Set[int] = self.completed | self.skipped
+        for _ in self.completed:
+            self.hardener.count('resumed')
+        running = {}
+        started = time.perf_counter()
+        
+        executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='fix')
+        try:
+            while pending or running:
+                # Ready rules never conflict with each other: the later of two
+                # conflicting rules depends on the earlier one
+                for index in list(pending):
+                    plan = pending[index]
+                    if all(dep in done for dep in plan.depends_on):
+                        running[executor.submit(self._apply, plan, len(plans))] = index
+                        del pending[index]
+                
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+        except KeyboardInterrupt:
+            logger.warning("Hardening process interrupted by user, waiting for running fixes")
+            self.interrupted = True
+            executor.shutdown(wait=True, cancel_futures=True)
+        finally:
+            executor.shutdown(wait=True)
+            self.wall_seconds = time.perf_counter() - started
+    
+    def _apply(self, plan: RulePlan, total: int) -> None:
+        """Apply one rule fix and record its timing."""
+        rule = plan.rule
+        started = time.perf_counter()
+        success: Optional[bool] = None
+        if self.journal:
+            self.journal.start(plan)
+        try:
+            logger.info(f"Processing rule {plan.index + 1}/{total}: {rule.vuln_id}")
+            success = self.hardener.apply_fix(rule, plan.commands)
+        except Exception as e:
+            logger.error(f"Error applying fix for {rule.vuln_id}: {e}", exc_info=True)
+            self.hardener.count('failed')
+        finally:
+            self.timings[rule.vuln_id] = (time.perf_counter() - started, success)
+        if self.journal:
+            if success is None:
+                status = 'error'
+            elif not success:
+                status = 'failed'
+            elif self.hardener.staged.has_changes(rule.vuln_id):
+                # Not applied until the staged changes are committed
+                status = 'staged'
+            else:
+                status = 'applied'
+            self.journal.done(plan, status)
+    
+    def print_timing_report(self, plans: List[RulePlan], limit: int = 15) -> None:
+        """Print wall time versus summed rule time and the slowest rules."""
+        total = sum(seconds for seconds, _ in self.timings.values())
+        print("\n" + "="*60)
+        print("STIG Hardening Timing")
+        print("="*60)
+        print(f"Wall time: {self.wall_seconds:.1f}s  Sum of rule times: {total:.1f}s  "
+              f"Workers: {self.workers}")
+        if self.wall_seconds > 0:
+            print(f"Parallel speedup: {total / self.wall_seconds:.1f}x")
+        
+        resources = {plan.rule.vuln_id: plan.resources for plan in plans}
+        slowest = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        print(f"\nSlowest {min(limit, len(slowest))} rules:")
+        for vuln_id, (seconds, success) in slowest[:limit]:
+            status = {True: 'applied', False: 'failed', None: 'error'}[success]
+            print(f"  {vuln_id:<10} {seconds:8.2f}s  {status:<8} "
+                  f"[{', '.join(sorted(resources.get(vuln_id, ()))) or 'none'}]")
+        print("="*60)
+    
+    def write_timing_report(self, plans: List[RulePlan], path: Path) -> None:
+        """Write the per-rule timing report as JSON."""
+        report = {
+            'workers': self.workers,
+            'wall_seconds': round(self.wall_seconds, 3),
+            'rules': [
+                {
+                    'vuln_id': plan.rule.vuln_id,
+                    'rule_id': plan.rule.rule_id,
+                    'wave': plan.wave,
+                    'resources': sorted(plan.resources),
+                    'seconds': round(self.timings[plan.rule.vuln_id][0], 3),
+                    'success': self.timings[plan.rule.vuln_id][1],
+                }
+                for plan in plans if plan.rule.vuln_id in self.timings
+            ],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2) + "\n")
+        logger.info(f"Timing report written to {path}")
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -1026,6 +1893,50 @@ def main():
         default=Path('/var/log/ubuntu_stig_hardening.log'),
         help='Path to log file (default: /var/log/ubuntu_stig_hardening.log)'
     )
+    parser.add_argument(
+        '--parse-cache-dir',
+        type=Path,
+        default=DEFAULT_PARSE_CACHE_DIR,
+        help=f'Directory for cached STIG rule indexes (default: {DEFAULT_PARSE_CACHE_DIR})'
+    )
+    parser.add_argument(
+        '--no-parse-cache',
+        action='store_true',
+        help='Always parse the STIG XML instead of using a cached rule index'
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=DEFAULT_FIX_WORKERS,
+        help=f'Maximum rules fixed concurrently (default: {DEFAULT_FIX_WORKERS}; 1 applies rules in sequence)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print the parallel fix plan without changing the system'
+    )
+    parser.add_argument(
+        '--timing-report',
+        type=Path,
+        default=None,
+        help='Write per-rule timings as JSON to this file'
+    )
+    parser.add_argument(
+        '--no-package-batch',
+        action='store_true',
+        help='Run each rule\'s apt/dpkg commands separately instead of one batched transaction'
+    )
+    parser.add_argument(
+        '--journal',
+        type=Path,
+        default=DEFAULT_JOURNAL_PATH,
+        help=f'Append-only progress journal (default: {DEFAULT_JOURNAL_PATH})'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Skip rules the journal shows as already applied and continue an interrupted run'
+    )
     
     args = parser.parse_args()
     
@@ -1037,7 +1948,7 @@ def main():
         file_handler = logging.FileHandler(args.log_file)
         file_handler.setLevel(logging.INFO)
         file_handler.setFormatter(
-            logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+            logging.Formatter('%(asctime)s - %(levelname)s - [%(threadName)s] %(message)s')
         )
         logger.addHandler(file_handler)
     except PermissionError:
@@ -1045,9 +1956,9 @@ def main():
     except Exception as e:
         logger.warning(f"Failed to setup file logging: {e}, logging to console only")
     
-    # Check prerequisites
+    # Check prerequisites (nothing is changed in a dry run)
     hardener = SystemHardener()
-    if not hardener.check_prerequisites():
+    if not args.dry_run and not hardener.check_prerequisites():
         logger.error("Prerequisites check failed")
         sys.exit(1)
     
@@ -1056,7 +1967,10 @@ def main():
         logger.error(f"STIG file not found: {args.stig_file}")
         sys.exit(1)
     
-    stig_parser = StigParser(args.stig_file)
+    stig_parser = StigParser(
+        args.stig_file,
+        cache_dir=None if args.no_parse_cache else args.parse_cache_dir
+    )
     try:
         rules = stig_parser.parse()
         if not rules:
@@ -1066,23 +1980,69 @@ def main():
         logger.error(f"Failed to parse STIG file: {e}")
         sys.exit(1)
     
+    journal = HardeningJournal(args.journal)
+    if args.resume:
+        journal.load()
+    
+    packages = None if args.no_package_batch else PackageTransaction(hardener)
+    scheduler = FixScheduler(hardener, workers=args.workers, packages=packages, journal=journal)
+    plans = scheduler.plan(rules)
+    remaining = scheduler.resume(plans) if args.resume else plans
+    
+    if args.dry_run:
+        scheduler.print_plan(plans)
+        return
+    
+    try:
+        journal.open(resume=args.resume)
+    except OSError as e:
+        logger.warning(f"Cannot write journal {args.journal}: {e}; an interrupted run can't be resumed")
+        scheduler.journal = None
+    
     # Apply fixes
-    logger.info(f"Starting hardening process for {len(rules)} rules")
+    logger.info(f"Starting hardening process for {len(rules)} rules "
+                f"({max(plan.wave for plan in plans)} waves, {scheduler.workers} workers)")
     logger.info("Note: Some fixes may require a system reboot to take effect")
     
-    for i, rule in enumerate(rules, 1):
-        try:
-            logger.info(f"Processing rule {i}/{len(rules)}: {rule.vuln_id}")
-            hardener.apply_fix(rule)
-        except KeyboardInterrupt:
-            logger.warning("Hardening process interrupted by user")
-            break
-        except Exception as e:
-            logger.error(f"Error applying fix for {rule.vuln_id}: {e}", exc_info=True)
-            hardener.stats['failed'] += 1
+    # Prompt for the GRUB password before fixes run concurrently; without
+    # it the rules that set it are skipped rather than prompting again
+    grub_password_plans = [plan for plan in remaining if hardener.needs_grub_password(plan.rule)]
+    if grub_password_plans and not hardener.generate_grub_password_hash():
+        scheduler.skip(grub_password_plans, "GRUB password not set - re-run to configure it")
+    
+    # One apt/dpkg transaction for every rule's package commands (packages
+    # already in the desired state are left alone, so a resumed run is cheap)
+    if packages:
+        hardener.package_results = packages.execute()
+    
+    try:
+        scheduler.run(plans)
+        
+        if scheduler.interrupted:
+            # Leave staged rules uncommitted in the journal; --resume re-applies them
+            logger.warning("Interrupted - staged sysctl/GRUB changes were not written and "
+                           "update-grub was not run; re-run with --resume to finish")
+        else:
+            # Write staged sysctl/GRUB changes and reload once
+            started = time.perf_counter()
+            committed = hardener.staged.commit()
+            logger.info(f"Committed staged sysctl/GRUB changes in {time.perf_counter() - started:.1f}s")
+            if scheduler.journal:
+                # Rules whose staged value was overridden by a later rule count as committed too
+                scheduler.journal.commit([v for v in hardener.staged.rules if committed.get(v, True)])
+    finally:
+        journal.close()
     
     # Print summary
     hardener.print_summary()
+    scheduler.print_timing_report(plans)
+    logger.info(PROBES.summary())
+    if args.timing_report:
+        scheduler.write_timing_report(plans, args.timing_report)
+    
+    if scheduler.interrupted:
+        logger.info(f"Journal kept for --resume: {args.journal}")
+        sys.exit(130)
     
     logger.info("Hardening process completed")
     logger.info(f"Backups saved to: {hardener.backup_dir}")
@@ -2,6 +2,8 @@
 # Quick recovery script for GCE - run this via serial console as root
 
 BACKUP_DIR="/tmp/stig_backups"
+# Newest backup of each file, by full path (older backups: by basename)
+LATEST_DIR="$BACKUP_DIR/latest/etc"
 
 echo "=== Sudo Recovery Script for GCE ==="
 echo ""
@@ -27,9 +29,13 @@ ls -lh "$BACKUP_DIR" | head -20
 echo ""
 
 # Restore main sudoers file
-if [ -f "$BACKUP_DIR/sudoers" ]; then
+SUDOERS_BACKUP="$BACKUP_DIR/sudoers"
+if [ -f "$LATEST_DIR/sudoers" ]; then
+    SUDOERS_BACKUP="$LATEST_DIR/sudoers"
+fi
+if [ -f "$SUDOERS_BACKUP" ]; then
     echo "Restoring /etc/sudoers..."
-    cp "$BACKUP_DIR/sudoers" /etc/sudoers
+    cp "$SUDOERS_BACKUP" /etc/sudoers
     chmod 440 /etc/sudoers
     echo "✓ Restored /etc/sudoers"
 else
@@ -40,7 +46,7 @@ fi
 echo ""
 echo "Restoring /etc/sudoers.d files..."
 RESTORED=0
-for backup in "$BACKUP_DIR"/sudoers.d*; do
+for backup in "$LATEST_DIR"/sudoers.d/* "$BACKUP_DIR"/sudoers.d*; do
     if [ -f "$backup" ]; then
         filename=$(basename "$backup")
         target="/etc/sudoers.d/$filename"
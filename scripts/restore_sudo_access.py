@@ -5,32 +5,55 @@ Recovery script to restore sudo access after STIG hardening.
 This script restores the sudoers file from backup to re-enable passwordless sudo
 (if that's what was configured before).
 
+Every /etc/sudoers* file in the hardening backup store (scripts/backup_store.py)
+is restored in one call, optionally as of a point in time. Backup directories
+from older versions, with files stored by basename, are still supported.
+
 Usage:
-    sudo python3 restore_sudo_access.py
+    sudo python3 restore_sudo_access.py [--backup-dir <path>] [--at <ISO time>] [--dry-run]
 """
 
 import argparse
 import os
 import shutil
 import sys
+from datetime import datetime
 from pathlib import Path
 
-def main():
-    """Restore sudoers file from backup."""
-    if os.geteuid() != 0:
-        print("ERROR: This script must be run as root or with sudo")
-        print("If you can't use sudo, you'll need to:")
-        print("1. Access the system as root directly (console, recovery mode, etc.)")
-        print("2. Or restore the files manually from /tmp/stig_backups/")
-        sys.exit(1)
-    
-    backup_dir = Path("/tmp/stig_backups")
-    
-    if not backup_dir.exists():
-        print(f"ERROR: Backup directory not found: {backup_dir}")
-        print("Backups may have been cleaned up or stored elsewhere.")
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+try:
+    from backup_store import DEFAULT_BACKUP_ROOT, INDEX_NAME, BackupStore
+except ImportError:
+    # Copied to the host without scripts/backup_store.py: legacy directories
+    # can still be restored, a backup store only by hand from latest/
+    BackupStore = None
+    DEFAULT_BACKUP_ROOT = Path('/tmp/stig_backups')
+    INDEX_NAME = 'index.jsonl'
+
+SUDOERS_PREFIX = '/etc/sudoers'
+
+
+def restore_from_store(backup_dir: Path, at: datetime = None, dry_run: bool = False):
+    """Restore every /etc/sudoers* file from the backup store in one call."""
+    store = BackupStore(backup_dir)
+    if not store.entries(SUDOERS_PREFIX, at):
+        print(f"ERROR: No sudoers backups found in {backup_dir}" + (f" as of {at}" if at else ""))
+        print("Backed up paths:")
+        for path in sorted(store.history):
+            print(f"  - {path}")
         sys.exit(1)
     
+    print("Restoring sudoers files from backup..." + (" (dry run)" if dry_run else ""))
+    restored = store.restore(SUDOERS_PREFIX, at=at, dry_run=dry_run)
+    for entry in restored:
+        print(f"✓ {'Would restore' if dry_run else 'Restored'} {entry['path']} "
+              f"(backup of {entry['time']}, mode {entry['mode']:o})")
+    if not restored:
+        print("✓ Sudoers files already match their backups")
+
+
+def restore_legacy(backup_dir: Path, dry_run: bool = False):
+    """Restore sudoers files from a backup directory of basename copies."""
     # Find sudoers backup
     sudoers_backup = backup_dir / "sudoers"
     sudoers_d_backups = list(backup_dir.glob("sudoers.d*"))
@@ -42,15 +65,18 @@ def main():
             print(f"  - {f.name}")
         sys.exit(1)
     
-    print("Restoring sudoers files from backup...")
+    print("Restoring sudoers files from backup..." + (" (dry run)" if dry_run else ""))
     
     # Restore main sudoers file
     if sudoers_backup.exists():
         sudoers_path = Path("/etc/sudoers")
-        print(f"Restoring {sudoers_path} from {sudoers_backup}")
-        shutil.copy2(sudoers_backup, sudoers_path)
-        os.chmod(sudoers_path, 0o440)  # Restore correct permissions
-        print(f"✓ Restored {sudoers_path}")
+        if dry_run:
+            print(f"✓ Would restore {sudoers_path} from {sudoers_backup}")
+        else:
+            print(f"Restoring {sudoers_path} from {sudoers_backup}")
+            shutil.copy2(sudoers_backup, sudoers_path)
+            os.chmod(sudoers_path, 0o440)  # Restore correct permissions
+            print(f"✓ Restored {sudoers_path}")
     else:
         print("No main sudoers backup found (this is normal if using sudoers.d)")
     
@@ -62,10 +88,67 @@ def main():
             # Extract original filename (backup might be named differently)
             # Try to find the original file or restore with backup name
             target_file = sudoers_d_dir / backup_file.name
+            if dry_run:
+                print(f"✓ Would restore {target_file} from {backup_file}")
+                continue
             print(f"Restoring {target_file} from {backup_file}")
             shutil.copy2(backup_file, target_file)
             os.chmod(target_file, 0o440)
             print(f"✓ Restored {target_file}")
+
+
+def main():
+    """Restore sudoers file from backup."""
+    parser = argparse.ArgumentParser(description='Restore sudoers files from STIG hardening backups')
+    parser.add_argument(
+        '--backup-dir',
+        type=Path,
+        default=DEFAULT_BACKUP_ROOT,
+        help=f'Backup directory (default: {DEFAULT_BACKUP_ROOT})'
+    )
+    parser.add_argument(
+        '--at',
+        type=datetime.fromisoformat,
+        default=None,
+        help='Restore the files as they were backed up at or before this time '
+             '(e.g. 2024-05-01T12:00 in local time, or 2024-05-01T12:00+00:00)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Show what would be restored without changing anything'
+    )
+    args = parser.parse_args()
+    
+    if os.geteuid() != 0 and not args.dry_run:
+        print("ERROR: This script must be run as root or with sudo")
+        print("If you can't use sudo, you'll need to:")
+        print("1. Access the system as root directly (console, recovery mode, etc.)")
+        print(f"2. Or restore the files manually from {args.backup_dir}/latest/etc/")
+        sys.exit(1)
+    
+    backup_dir = args.backup_dir
+    
+    if not backup_dir.exists():
+        print(f"ERROR: Backup directory not found: {backup_dir}")
+        print("Backups may have been cleaned up or stored elsewhere.")
+        sys.exit(1)
+    
+    if (backup_dir / INDEX_NAME).exists():
+        if BackupStore is None:
+            print(f"ERROR: backup_store.py is missing next to {Path(__file__).name}")
+            print(f"Deploy it alongside this script, or restore the files manually from {backup_dir}/latest/etc/")
+            sys.exit(1)
+        restore_from_store(backup_dir, at=args.at, dry_run=args.dry_run)
+    else:
+        # Backups by basename, from before the backup store: no history to pick a time from
+        if args.at:
+            print(f"ERROR: --at needs a backup store; {backup_dir} only holds the latest copy of each file")
+            sys.exit(1)
+        restore_legacy(backup_dir, dry_run=args.dry_run)
+    
+    if args.dry_run:
+        return
     
     print("\n✓ Sudoers files restored!")
     print("\nIMPORTANT: Verify sudo access works before closing this session:")
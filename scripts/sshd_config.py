@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+sshd_config parser and writer shared by the CMMC hardening and validation scripts.
+
+Computes effective sshd settings in-process, the way sshd reads them:
+keywords are case-insensitive, the first value obtained wins (except for
+keywords that accumulate, like Port or AllowUsers), `Include` files are read
+in place (globs sorted, relative paths under /etc/ssh) and `Match` blocks only
+apply to connections they match. This lets harden_ubuntu_cmmc.py and
+cmmc_hardening_validation_evidence.py check settings without substring tests
+or an `sshd -T` fork per check; `sshd -T` runs once, as a final confirmation.
+
+Usage:
+    config = SshdConfig.load()
+    config.get('PermitRootLogin')            # effective global value
+    config.set_global({'MaxAuthTries': '3'})  # edits the line that takes effect
+    config.save()
+"""
+
+import fnmatch
+import glob
+import ipaddress
+import logging
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SSHD_CONFIG = Path('/etc/ssh/sshd_config')
+
+# Keywords whose values accumulate instead of first-one-wins
+MULTI_VALUE_KEYWORDS = {
+    'acceptenv', 'allowgroups', 'allowusers', 'denygroups', 'denyusers',
+    'hostcertificate', 'hostkey', 'listenaddress', 'port', 'subsystem',
+}
+
+# Maximum Include nesting, as in sshd
+MAX_INCLUDE_DEPTH = 16
+
+_DIRECTIVE = re.compile(r'^\s*(\S+?)(?:\s*=\s*|\s+)(.*?)\s*$')
+
+
+@dataclass
+class SshdDirective:
+    """A keyword line of an sshd config file."""
+    keyword: str            # As written
+    value: str
+    path: Path
+    line_index: int         # Index into the file's lines
+    match: Optional[str]    # Criteria of the enclosing Match block, None if global
+
+    @property
+    def key(self) -> str:
+        return self.keyword.lower()
+
+
+def _split_line(line: str) -> Optional[Tuple[str, str]]:
+    """Split a config line into (keyword, value), or None for blanks and comments."""
+    stripped = line.strip()
+    if not stripped or stripped.startswith('#'):
+        return None
+    found = _DIRECTIVE.match(stripped)
+    if not found:
+        return stripped, ''
+    return found.group(1), found.group(2)
+
+
+def _patterns_match(patterns: str, value: Optional[str], matcher: Callable[[str, str], bool]) -> bool:
+    """Evaluate an sshd pattern list ("a*,!b") against a value."""
+    if value is None:
+        return False
+    matched = False
+    for pattern in patterns.split(','):
+        negate = pattern.startswith('!')
+        pattern = pattern[1:] if negate else pattern
+        if matcher(value, pattern):
+            if negate:
+                return False
+            matched = True
+    return matched
+
+
+def _address_match(address: str, pattern: str) -> bool:
+    """Match an address against a CIDR or wildcard pattern."""
+    if '/' in pattern:
+        try:
+            return ipaddress.ip_address(address) in ipaddress.ip_network(pattern, strict=False)
+        except ValueError:
+            return False
+    return fnmatch.fnmatchcase(address, pattern)
+
+
+def match_applies(criteria: str, context: Dict[str, str]) -> bool:
+    """
+    Check whether Match criteria apply to a connection.
+
+    Args:
+        criteria: Text after the Match keyword, e.g. "User alice Address 10.0.0.0/8"
+        context: Connection attributes (user, group, host, address, localaddress,
+            localport); criteria on missing attributes don't match
+    """
+    words = criteria.split()
+    if len(words) == 1 and words[0].lower() == 'all':
+        return True
+    for name, patterns in zip(words[0::2], words[1::2]):
+        name = name.lower()
+        if name in ('address', 'localaddress'):
+            matcher = _address_match
+        else:
+            matcher = fnmatch.fnmatchcase
+        if not _patterns_match(patterns, context.get(name), matcher):
+            return False
+    return len(words) % 2 == 0
+
+
+class SshdConfig:
+    """Parsed sshd_config with its Include files, editable in place."""
+
+    def __init__(self, path: Path = DEFAULT_SSHD_CONFIG):
+        self.path = Path(path)
+        self.base_dir = self.path.parent
+        self.files: Dict[Path, List[str]] = {}
+        self.directives: List[SshdDirective] = []
+        self._changed: set = set()
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_SSHD_CONFIG) -> 'SshdConfig':
+        """
+        Parse an sshd config file and everything it includes.
+
+        Raises:
+            FileNotFoundError: If the main config file doesn't exist
+        """
+        config = cls(path)
+        config._parse(config.path, None, 0, required=True)
+        return config
+
+    def _parse(self, path: Path, match: Optional[str], depth: int, required: bool = False):
+        """Read one file, expanding Include directives in place."""
+        if depth > MAX_INCLUDE_DEPTH:
+            logger.warning(f"sshd Include nesting too deep at {path}")
+            return
+        if path not in self.files:
+            try:
+                with open(path, 'r') as f:
+                    self.files[path] = f.readlines()
+            except OSError as e:
+                if required:
+                    raise
+                logger.warning(f"Could not read sshd include {path}: {e}")
+                return
+
+        for index, line in enumerate(self.files[path]):
+            parts = _split_line(line)
+            if parts is None:
+                continue
+            keyword, value = parts
+            key = keyword.lower()
+            if key == 'match':
+                # "Match all" applies to every connection, i.e. back to global
+                match = None if value.strip().lower() == 'all' else value
+                continue
+            if key == 'include':
+                for pattern in value.split():
+                    if not os.path.isabs(pattern):
+                        pattern = str(self.base_dir / pattern)
+                    for included in sorted(glob.glob(pattern)):
+                        # A Match inside an included file ends with that file
+                        self._parse(Path(included), match, depth + 1)
+                continue
+            self.directives.append(SshdDirective(keyword, value, path, index, match))
+
+    def effective(self, context: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """
+        Compute effective settings (lowercase keywords, as printed by sshd -T).
+
+        As in sshd, the first value of a keyword wins within the global
+        section and within the matching Match blocks, and a value from a
+        matching Match block overrides the global one.
+
+        Args:
+            context: Connection attributes to evaluate Match blocks against;
+                without one only global settings are returned
+
+        Returns:
+            Dict of keyword -> value; accumulating keywords join their values
+            with newlines
+        """
+        settings: Dict[str, str] = {}
+        matched: Dict[str, str] = {}
+        for directive in self.directives:
+            if directive.match is None:
+                target = settings
+            elif context and match_applies(directive.match, context):
+                target = matched
+            else:
+                continue
+            key = directive.key
+            if key in MULTI_VALUE_KEYWORDS:
+                settings[key] = f"{settings[key]}\n{directive.value}" if key in settings else directive.value
+            elif key not in target:
+                target[key] = directive.value
+        settings.update(matched)
+        return settings
+
+    def get(self, keyword: str, context: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Return the effective value of a keyword, or None if it isn't set."""
+        return self.effective(context).get(keyword.lower())
+
+    def set_global(self, settings: Dict[str, str]) -> bool:
+        """
+        Make the given values the effective global settings.
+
+        Every global line of a keyword (in the main file or an Include drop-in,
+        which may take precedence) is rewritten; keywords that aren't set
+        globally are added to the main file before its first Match block.
+
+        Returns:
+            True if any file content changed
+        """
+        changed = False
+        missing = []
+        for keyword, value in settings.items():
+            occurrences = [d for d in self.directives if d.match is None and d.key == keyword.lower()]
+            if not occurrences:
+                missing.append(f"{keyword} {value}\n")
+                continue
+            for directive in occurrences:
+                if directive.value == value:
+                    continue
+                self.files[directive.path][directive.line_index] = f"{keyword} {value}\n"
+                self._changed.add(directive.path)
+                changed = True
+
+        if missing:
+            lines = self.files[self.path]
+            insert_at = len(lines)
+            for index, line in enumerate(lines):
+                parts = _split_line(line)
+                if parts and parts[0].lower() == 'match':
+                    insert_at = index
+                    break
+            if insert_at and not lines[insert_at - 1].endswith('\n'):
+                lines[insert_at - 1] += '\n'
+            lines[insert_at:insert_at] = missing
+            self._changed.add(self.path)
+            changed = True
+
+        if changed:
+            self._reparse()
+        return changed
+
+    def _reparse(self):
+        """Rebuild the directive list from the (edited) file contents."""
+        self.directives = []
+        self._parse(self.path, None, 0, required=True)
+
+    @property
+    def changed_files(self) -> List[Path]:
+        """Files edited since loading, not yet saved."""
+        return sorted(self._changed)
+
+    def render(self, path: Optional[Path] = None) -> str:
+        """Return the current content of a config file (the main file by default)."""
+        return ''.join(self.files[Path(path) if path else self.path])
+
+    def save(self) -> List[Path]:
+        """Write edited files atomically, keeping their permissions; returns the paths written."""
+        written = []
+        for path in self.changed_files:
+            tmp_path = path.with_name(f".{path.name}.tmp")
+            with open(tmp_path, 'w') as f:
+                f.writelines(self.files[path])
+            try:
+                st = os.stat(path)
+                os.chmod(tmp_path, st.st_mode & 0o7777)
+                os.chown(tmp_path, st.st_uid, st.st_gid)
+            except OSError:
+                pass
+            os.replace(tmp_path, path)
+            written.append(path)
+        self._changed.clear()
+        return written
+
+
+def parse_sshd_t(output: str) -> Dict[str, str]:
+    """Parse `sshd -T` output into keyword -> value (accumulating keywords joined by newlines)."""
+    settings: Dict[str, str] = {}
+    for line in output.splitlines():
+        key, _, value = line.strip().partition(' ')
+        if not key:
+            continue
+        if key in MULTI_VALUE_KEYWORDS and key in settings:
+            settings[key] += f"\n{value}"
+        else:
+            settings.setdefault(key, value)
+    return settings
+
+
+def confirm_with_sshd(expected: Dict[str, str],
+                      run_command: Callable[[str], Tuple[bool, str]]) -> Tuple[bool, List[str], str]:
+    """
+    Run `sshd -T` once to confirm the config is valid and has the expected values.
+
+    Args:
+        expected: Keyword -> value computed in-process
+        run_command: Function running a shell command, returning (success, output)
+
+    Returns:
+        Tuple of (config valid, keywords whose sshd -T value differs, sshd -T output).
+        Keywords sshd no longer reports (e.g. Protocol) are not compared.
+    """
+    success, output = run_command("sshd -T")
+    if not success:
+        return False, [], output
+    reported = parse_sshd_t(output)
+    mismatches = [
+        keyword for keyword, value in expected.items()
+        if keyword.lower() in reported and reported[keyword.lower()].lower() != value.lower()
+    ]
+    return True, mismatches, output
@@ -0,0 +1,150 @@
+"""Tests for cloud platform detection in the CMMC hardening script."""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harden_ubuntu_cmmc import CloudPlatformDetector
+
+
+PROBE_TIMEOUT = 0.5
+BOOT_ID = "boot-1"
+
+
+class MetadataServer:
+    """Local stand-in for the metadata services.
+
+    Paths listed in ``answering`` return 200 at once; every other request
+    hangs until the server is stopped, like an unroutable metadata address.
+    """
+
+    def __init__(self, answering=()):
+        self.answering = set(answering)
+        self.requests = []
+        self.release = threading.Event()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                if self.path not in server.answering:
+                    server.release.wait()
+                    return
+                self.send_response(200)
+                self.end_headers()
+                self.wfile.write(b"ok")
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.block_on_close = False
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.release.set()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def detector(monkeypatch, tmp_path):
+    """Point the detector at a temporary DMI directory, state file and local metadata server."""
+    servers = []
+
+    def configure(answering=(), dmi=None):
+        server = MetadataServer(answering)
+        servers.append(server)
+        endpoints = [
+            (platform, name, f"{server.url}/{platform}", headers)
+            for platform, name, _, headers in CloudPlatformDetector.METADATA_ENDPOINTS
+        ]
+        dmi_dir = tmp_path / "dmi"
+        dmi_dir.mkdir(exist_ok=True)
+        for file_name, value in (dmi or {}).items():
+            (dmi_dir / file_name).write_text(value + "\n")
+        monkeypatch.setattr(CloudPlatformDetector, "METADATA_ENDPOINTS", endpoints)
+        monkeypatch.setattr(CloudPlatformDetector, "PROBE_TIMEOUT", PROBE_TIMEOUT)
+        monkeypatch.setattr(CloudPlatformDetector, "DMI_DIR", dmi_dir)
+        monkeypatch.setattr(CloudPlatformDetector, "STATE_FILE", tmp_path / "cloud_platform.json")
+        monkeypatch.setattr(CloudPlatformDetector, "_detected", None)
+        monkeypatch.setattr(CloudPlatformDetector, "_boot_id", classmethod(lambda cls: BOOT_ID))
+        return server
+
+    yield configure
+    for server in servers:
+        server.stop()
+
+
+def _write_state(path: Path, platform, detected_at: float, boot_id: str = BOOT_ID) -> None:
+    path.write_text(json.dumps({
+        "platform": platform,
+        "source": "metadata",
+        "detected_at": detected_at,
+        "boot_id": boot_id,
+    }))
+
+
+def test_dmi_match_skips_network(detector):
+    """Test that a DMI vendor match identifies the platform without probing metadata."""
+    server = detector(answering={"/gcp"}, dmi={"sys_vendor": "Amazon EC2"})
+
+    assert CloudPlatformDetector.detect_platform() == "aws"
+    assert server.requests == []
+
+
+def test_non_cloud_host_takes_one_probe_timeout(detector):
+    """Test that the probes run concurrently, so a non-cloud host waits one timeout, not three."""
+    server = detector()
+
+    start = time.monotonic()
+    platform = CloudPlatformDetector.detect_platform()
+    elapsed = time.monotonic() - start
+
+    assert platform is None
+    assert sorted(server.requests) == ["/aws", "/azure", "/gcp"]
+    assert PROBE_TIMEOUT <= elapsed < 2 * PROBE_TIMEOUT
+
+
+def test_first_answering_endpoint_wins(detector):
+    """Test that the first endpoint to answer decides without waiting for the others."""
+    detector(answering={"/azure"})
+
+    start = time.monotonic()
+    assert CloudPlatformDetector.detect_platform() == "azure"
+    assert time.monotonic() - start < PROBE_TIMEOUT
+
+
+def test_fresh_state_file_is_reused(detector):
+    """Test that a fresh state file from this boot is used without probing."""
+    server = detector(answering={"/gcp"})
+    _write_state(CloudPlatformDetector.STATE_FILE, "aws", time.time())
+
+    assert CloudPlatformDetector.detect_platform() == "aws"
+    assert server.requests == []
+
+
+@pytest.mark.parametrize("age, boot_id", [
+    (CloudPlatformDetector.STATE_TTL + 60, BOOT_ID),
+    (0, "boot-0"),
+])
+def test_stale_state_file_forces_probe(detector, age, boot_id):
+    """Test that an expired TTL or a different boot id makes the detector probe again."""
+    server = detector(answering={"/gcp"})
+    state_file = CloudPlatformDetector.STATE_FILE
+    _write_state(state_file, "aws", time.time() - age, boot_id)
+
+    assert CloudPlatformDetector.detect_platform() == "gcp"
+    assert "/gcp" in server.requests
+    state = json.loads(state_file.read_text())
+    assert state["platform"] == "gcp"
+    assert state["boot_id"] == BOOT_ID
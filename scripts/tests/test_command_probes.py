@@ -0,0 +1,38 @@
+"""Tests for the shared command probe cache used by the host hardening scripts."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from command_probes import CommandProbeCache, reads_recursively
+
+
+def test_reads_recursively():
+    """Test that recursive grep and ls invocations are recognized."""
+    assert reads_recursively("grep -rn maxretry /etc/fail2ban")
+    assert reads_recursively("sudo grep -iR PermitRootLogin /etc/ssh 2>/dev/null")
+    assert reads_recursively("grep --recursive bantime /etc/fail2ban | head -1")
+    assert reads_recursively("ls -laR /etc/ssh/sshd_config.d")
+    assert not reads_recursively("grep -n maxretry /etc/fail2ban/jail.local")
+    # ls -r only reverses the sort order
+    assert not reads_recursively("ls -lr /etc/ssh")
+
+
+def test_recursive_probe_refreshed_after_nested_edit(tmp_path):
+    """Test that a cached grep -r is refreshed when a file in a subdirectory changes."""
+    nested = tmp_path / "jail.d" / "local"
+    nested.mkdir(parents=True)
+    (nested / "sshd.conf").write_text("maxretry = 5\n")
+    cache = CommandProbeCache()
+    command = f"grep -rh maxretry {tmp_path}"
+
+    assert cache.run(command).stdout == "maxretry = 5\n"
+    assert cache.run(command).stdout == "maxretry = 5\n"
+    assert cache.stats['hits'] == 1
+
+    # Edited from Python: the parent directories' stat data doesn't change
+    (nested / "sshd.conf").write_text("maxretry = 3 \n")
+
+    assert cache.run(command).stdout == "maxretry = 3 \n"
+    assert cache.stats['stale'] == 1
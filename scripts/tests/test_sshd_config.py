@@ -0,0 +1,48 @@
+"""Tests for the shared sshd_config parser used by the host hardening scripts."""
+
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sshd_config import SshdConfig
+
+
+SSHD_CONFIG = """\
+MaxAuthTries 6
+PermitRootLogin no
+Match User bob
+    MaxAuthTries 10
+    PasswordAuthentication yes
+Match User bob,alice
+    MaxAuthTries 20
+"""
+
+
+def _load(content: str) -> SshdConfig:
+    path = Path(tempfile.mkdtemp()) / "sshd_config"
+    path.write_text(content)
+    return SshdConfig.load(path)
+
+
+def test_matching_match_block_overrides_global():
+    """Test that a matching Match block's value wins over the global one."""
+    config = _load(SSHD_CONFIG)
+    config.set_global({"MaxAuthTries": "3"})
+
+    assert config.get("MaxAuthTries") == "3"
+    assert config.get("MaxAuthTries", {"user": "bob"}) == "10"
+    assert config.get("PasswordAuthentication", {"user": "bob"}) == "yes"
+    # First matching Match block wins; globals still apply where it sets nothing
+    assert config.get("MaxAuthTries", {"user": "alice"}) == "20"
+    assert config.get("PermitRootLogin", {"user": "bob"}) == "no"
+
+
+def test_non_matching_match_block_is_ignored():
+    """Test that Match blocks that don't apply leave the global values."""
+    config = _load(SSHD_CONFIG)
+
+    assert config.get("MaxAuthTries", {"user": "carol"}) == "6"
+    assert config.get("PasswordAuthentication", {"user": "carol"}) is None
+    assert config.get("PasswordAuthentication") is None
@@ -3,9 +3,8 @@
 import re
 from pathlib import Path
 
-from ..model.controls import StigControl
+from ..model.controls import CheckCommandAnalysis, StigControl
 from .utils import extract_cli_commands
-from .extractors import extract_check_commands_from_block
 
 
 def generate_checker_playbook(
@@ -188,66 +187,42 @@ def _format_checker_task(control: StigControl, os_family: str) -> list[str]:
     return "\n".join(lines)
 
 
-def _generate_linux_check(control: StigControl, check_text: str) -> list[str]:
-    """Generate Linux check task using structured check_commands with improved sanitization."""
-    nist_display = _format_nist_for_display(control.nist_family_id)
-    from .extractors import is_probable_cli_command, normalize_command_line
+def _get_check_analysis(control: StigControl, check_text: str, default_os_family: str) -> CheckCommandAnalysis:
+    """
+    Return the control's check command analysis, reusing the parse-time record.
     
-    # Prose prefixes that should be rejected
-    PROSE_PREFIXES = (
-        "Configure ", "If ", "Document ", "To ", "NOTE:", "Must:", "The following condition",
-        "All verification requirements", "Output must be:", "File location:",
-        "Configuration: ", "Command output", "Review the command output",
-    )
+    The parser stores a CheckCommandAnalysis on every control. It is only
+    recomputed when the control's check commands were replaced after parsing
+    (e.g. by a classifier) or when the control was built without a parser.
     
-    # Prefer structured check_commands from control
+    Args:
+        control: STIG control
+        check_text: Check text to extract from if the control has no commands
+        default_os_family: OS family to use when the control has none
+        
+    Returns:
+        CheckCommandAnalysis for the control
+    """
     check_commands = control.check_commands or control.candidate_check_blocks
+    analysis = control.check_analysis
+    if analysis is not None and (not check_commands or check_commands == analysis.commands):
+        return analysis
     
-    # If no structured commands, use the extractor (same as hardening/CTP)
-    if not check_commands and check_text:
-        extracted_cmds, _ = extract_check_commands_from_block(check_text, control.os_family or "rhel")
-        check_commands = extracted_cmds
-    
-    # Filter out degenerate grep patterns and prose using robust command detection
-    valid_commands = []
+    os_family = control.os_family or default_os_family
+    if check_commands:
+        return CheckCommandAnalysis.from_commands(check_commands, os_family)
+    return CheckCommandAnalysis.from_text(check_text, os_family)
+
+
+def _generate_linux_check(control: StigControl, check_text: str) -> list[str]:
+    """Generate Linux check task using structured check_commands with improved sanitization."""
+    nist_display = _format_nist_for_display(control.nist_family_id)
     
-    for cmd in check_commands:
-        if not cmd or len(cmd.strip()) < 3:
-            continue
-        
-        # Normalize and check for prose prefixes
-        normalized = normalize_command_line(cmd)
-        if any(normalized.startswith(p) for p in PROSE_PREFIXES):
-            continue
-        
-        # Only keep real CLI commands
-        if not is_probable_cli_command(cmd):
-            continue
-        
-        # Additional grep validation
-        if normalized.lower().startswith('grep'):
-            # Check if grep command has a meaningful pattern (not just flags)
-            parts = normalized.split()
-            has_meaningful_pattern = False
-            for part in parts:
-                # Skip flags
-                if part.startswith('-'):
-                    continue
-                # Check if it's a real pattern (not just a flag or placeholder)
-                if len(part) >= 3 and re.match(r'[A-Za-z0-9_.=-]{3,}', part):
-                    if part not in ['-r', '-i', '-n', '-E', '-A1', 'args']:
-                        has_meaningful_pattern = True
-                        break
-            
-            if has_meaningful_pattern:
-                valid_commands.append(cmd)
-            # else: skip degenerate grep command
-        else:
-            # Not a grep command, keep it if it's a real command
-            valid_commands.append(cmd)
+    # Validated check commands from the parse-time analysis
+    analysis = _get_check_analysis(control, check_text, "rhel")
     
     # Use valid commands
-    commands = valid_commands
+    commands = analysis.valid_commands
     
     # Use structured commands if available
     if commands:
@@ -467,13 +442,8 @@ def _generate_network_check(control: StigControl, check_text: str) -> list[str]:
             tags_base.append(f"        - nist_{nist_family.lower()}")
         tags_base.append(f"        - nist_{nist_display.lower().replace('.', '_').replace('-', '_')}")
     
-    # Use structured check commands from control
-    check_commands = control.check_commands or control.candidate_check_blocks
-    
-    # If no structured commands, extract from check_text
-    if not check_commands and check_text:
-        extracted_cmds, _ = extract_check_commands_from_block(check_text, control.os_family or "network")
-        check_commands = extracted_cmds
+    # Use structured check commands from control (extracted from check_text if absent)
+    check_commands = _get_check_analysis(control, check_text, "network").commands
     
     # Filter for show commands ONLY (checker must use show commands, not config commands)
     show_commands = [cmd for cmd in check_commands if cmd.lower().startswith('show ')]
@@ -0,0 +1,530 @@
+"""One-pass analysis of STIG check text for CTP generation.
+
+The CTP extractors used to rescan the same check_text with ad-hoc regexes for
+every step of every control (requirements, notes, screen output, navigation,
+...). CheckTextAnalysis tokenizes a control's check text once into a structured
+representation (lines, sentences, expected-value lines, GUI paths, registry
+entries, file paths) and memoizes every derived extraction on top of it,
+so each extractor runs at most once per distinct check text.
+"""
+
+import re
+from functools import cached_property, lru_cache
+
+
+# --- Tokenization patterns -------------------------------------------------
+
+_VALUE_LINE = re.compile(r'Value:\s*([^\n]+?)(?:\n|$)', re.IGNORECASE)
+_NAVIGATE_TO = re.compile(r'Navigate\s+to\s+([^\n]+)', re.IGNORECASE)
+_UNDER_QUOTED = re.compile(r'Under\s+""([^""]+)""', re.IGNORECASE)
+_SELECT_QUOTED = re.compile(r'Select\s+""([^""]+)""', re.IGNORECASE)
+_REGISTRY_ENTRY = re.compile(
+    r'Registry Hive:\s*(HKEY_[A-Z_]+)\s*\n'
+    r'Registry Path:\s*\\([^\n]+)\s*\n'
+    r'Value Name:\s*([^\n]+)\s*\n'
+    r'Type:\s*([^\n]+)\s*\n'
+    r'Value:\s*([^\n]+)',
+    re.IGNORECASE | re.MULTILINE
+)
+_SYSTEM_FILE_PATH = re.compile(r'[/](?:etc|usr|var|opt|home|root)/[a-zA-Z0-9_/.-]+')
+
+# --- Requirement patterns (_extract_stig_requirements) ---------------------
+
+_REQ_IF_PATTERNS = [
+    (re.compile(r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+display\s+["\']([^"\']+)["\']', re.IGNORECASE), 'display'),
+    (re.compile(r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+show\s+["\']([^"\']+)["\']', re.IGNORECASE), 'show'),
+    (re.compile(r'if\s+["\']([^"\']+)["\']\s+is\s+not\s+["\']([^"\']+)["\']', re.IGNORECASE), 'be'),
+    (re.compile(r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+indicate\s+["\']([^"\']+)["\']', re.IGNORECASE), 'indicate'),
+]
+_REQ_MUST = re.compile(r'must\s+(?:display|show|indicate|be|have)\s+["\']?([^"\'\n]{5,80})["\']?', re.IGNORECASE)
+_REQ_SHOULD = re.compile(r'should\s+(?:be|display|show|indicate)\s+["\']?([^"\'\n]{5,80})["\']?', re.IGNORECASE)
+_REQ_VERIFY = re.compile(r'verify\s+([^\.]+?)(?:\.\s+If\s+it\s+does\s+not|\.\s+If\s+not|\.)', re.IGNORECASE)
+
+# --- Detailed expected result patterns -------------------------------------
+
+_IF_NOT_DISPLAY_FINDING = re.compile(
+    r'if\s+["\']?([^"\']+)["\']?\s+does\s+not\s+display\s+["\']?([^"\']+)["\']?[^\.]*this\s+is\s+a\s+finding',
+    re.IGNORECASE
+)
+_IF_NOT_FINDING = re.compile(
+    r'if\s+["\']?([^"\']+)["\']?\s+is\s+not\s+["\']?([^"\']+)["\']?[^\.]*this\s+is\s+a\s+finding',
+    re.IGNORECASE
+)
+_LINE_MUST_BE = re.compile(r'must\s+be\s+["\']?([^"\'\n]{5,80})["\']?', re.IGNORECASE)
+_LINE_SHOULD_DISPLAY = re.compile(r'should\s+display\s+["\']?([^"\'\n]{5,80})["\']?', re.IGNORECASE)
+_LINE_FINDING = re.compile(r'if\s+([^,\.]{10,80}),\s+this\s+is\s+a\s+finding', re.IGNORECASE)
+_SHOULD_REST = re.compile(r'should[^\n]*([^\n]+)', re.IGNORECASE)
+_DISPLAYS_REST = re.compile(r'display[s]?\s+([^\n]+)', re.IGNORECASE)
+
+# --- Finding conditions used by the step extractors ------------------------
+
+_FINDING_20_150 = re.compile(r'if\s+([^,\.]{20,150}),\s+this\s+is\s+a\s+finding', re.IGNORECASE)
+_FINDING_20_100 = re.compile(r'if\s+([^,\.]{20,100}),\s+this\s+is\s+a\s+finding', re.IGNORECASE)
+
+# --- Certificate patterns --------------------------------------------------
+
+_CERT_ISSUER_LIKE = re.compile(r'Issuer\s+-Like\s+["\']([^"\']+)["\']', re.IGNORECASE)
+_CERT_SUBJECT_LIKE = re.compile(r'Subject\s+-Like\s+["\']([^"\']+)["\']', re.IGNORECASE)
+_CERT_STORE = re.compile(r'Cert:[^\\]+\\?([a-zA-Z]+)', re.IGNORECASE)
+_CERT_ISSUER = re.compile(r'Issuer.*?["\']([^"\']+)["\']', re.IGNORECASE)
+_CERT_SUBJECT = re.compile(r'Subject.*?["\']([^"\']+)["\']', re.IGNORECASE)
+_CERT_IF_NOT_EXIST = re.compile(
+    r'if\s+([^,\.]{20,150})\s+does\s+not\s+exist[^\.]*this\s+is\s+a\s+finding', re.IGNORECASE
+)
+_CERT_MUST_EXIST = re.compile(r'certificates?\s+must\s+(?:be\s+)?(?:present|exist)[^\.]*\.', re.IGNORECASE)
+
+# --- Notes patterns --------------------------------------------------------
+
+_NOTES_REGISTRY = re.compile(r'Registry\s+(?:Hive|Path|Location):\s*([^\n]+)', re.IGNORECASE)
+_NOTES_FILE_PATH = re.compile(r'([/\\][a-zA-Z0-9_/\\\\.-]+\.(?:conf|config|cfg|ini|xml|yml|yaml|json|log|txt))')
+_NOTES_CONFIG = re.compile(r'([A-Za-z0-9_]+)\s*=\s*([^\s,;]+)')
+
+# --- GUI patterns ----------------------------------------------------------
+
+_GUI_IF_NOT_DISPLAY = re.compile(
+    r'if\s+["\']?([^"\']+)["\']?\s+does\s+not\s+display\s+["\']?([^"\']+)["\']?', re.IGNORECASE
+)
+_GUI_MUST_SHOW = re.compile(r'must\s+(?:indicate|display|show)\s+["\']?([^"\']+)["\']?', re.IGNORECASE)
+
+# --- Verification points ---------------------------------------------------
+
+_POINT_IF = re.compile(r'if\s+([^,]+?)(?:,|\.|this is a finding)', re.IGNORECASE)
+_POINT_VERIFY = re.compile(r'verify\s+([^\.]+?)(?:\.|$)', re.IGNORECASE)
+
+# --- Screen output patterns ------------------------------------------------
+
+_SCREEN_OUTPUT_PATTERNS = [
+    re.compile(r'output\s+should\s+show[:\s]+([^\n]{20,200})', re.IGNORECASE),
+    re.compile(r'expected\s+output[:\s]+([^\n]{20,200})', re.IGNORECASE),
+    re.compile(r'you\s+should\s+see[:\s]+([^\n]{20,200})', re.IGNORECASE),
+    re.compile(r'display\s+should\s+show[:\s]+([^\n]{20,200})', re.IGNORECASE),
+    re.compile(r'verify\s+that\s+([^\n]{20,200})\s+is\s+displayed', re.IGNORECASE),
+]
+_SCREEN_VALUE_PATTERNS = [
+    re.compile(r'value\s+should\s+be\s+["\']?([^"\'\n]{5,100})["\']?', re.IGNORECASE),
+    re.compile(r'must\s+be\s+set\s+to\s+["\']?([^"\'\n]{5,100})["\']?', re.IGNORECASE),
+    re.compile(r'should\s+display\s+["\']?([^"\'\n]{5,100})["\']?', re.IGNORECASE),
+]
+_SCREEN_GREP = re.compile(r'grep\s+["\']?([^"\'\s]+)["\']?', re.IGNORECASE)
+_WHITESPACE_RUN = re.compile(r'\s+')
+
+# --- Network patterns ------------------------------------------------------
+
+_NET_VERIFY = re.compile(r'verify\s+(?:that|the)\s+([^,\.]{20,150})', re.IGNORECASE)
+_NET_FINDING = re.compile(r'if\s+([^,\.]{20,120}),\s+this\s+is\s+a\s+finding', re.IGNORECASE)
+_NET_CONFIG_PATTERNS = [
+    (re.compile(pattern, re.IGNORECASE), pattern.replace('\\s+', ' ').replace('\\', ''))
+    for pattern in [
+        r'switchport\s+mode\s+access',
+        r'spanning-tree\s+guard\s+root',
+        r'spanning-tree\s+bpduguard\s+enable',
+        r'mls\s+qos',
+        r'vtp\s+password',
+    ]
+]
+
+
+class CheckTextAnalysis:
+    """
+    Structured, memoized view of a single control's check text.
+
+    Tokens (lines, sentences, value lines, GUI paths, registry
+    entries) are computed once in __init__; derived extractions are cached
+    properties or per-command memo tables.
+    """
+
+    def __init__(self, check_text: str):
+        self.text = check_text or ""
+        self.lower = self.text.lower()
+        self.lines = self.text.split('\n')
+        self.lines_lower = [line.lower() for line in self.lines]
+        self.sentences = self.text.split('.')
+        # "Value: ..." lines (registry and policy expected values)
+        self.value_lines = _VALUE_LINE.findall(self.text)
+        # GUI navigation paths, in extractor priority order
+        self.gui_paths = (
+            _NAVIGATE_TO.findall(self.text)
+            + _UNDER_QUOTED.findall(self.text)
+            + _SELECT_QUOTED.findall(self.text)
+        )
+        # (hive, path, value_name, type, value) registry blocks
+        self.registry_entries = _REGISTRY_ENTRY.findall(self.text)
+
+        self._line_expectations: dict[int, str] = {}
+        self._detailed_results: dict[str, str] = {}
+        self._expected_results: dict[str, str] = {}
+        self._network_results: dict[str, str] = {}
+
+    # --- Tokens ----------------------------------------------------------
+
+    @cached_property
+    def system_file_paths(self) -> list[str]:
+        """Absolute paths under /etc, /usr, /var, /opt, /home or /root."""
+        return _SYSTEM_FILE_PATH.findall(self.text)
+
+    @cached_property
+    def finding_condition_long(self) -> str:
+        """First 'if <20-150 chars>, this is a finding' condition, or ''."""
+        match = _FINDING_20_150.search(self.text)
+        return match.group(1).strip() if match else ""
+
+    @cached_property
+    def finding_condition_short(self) -> str:
+        """First 'if <20-100 chars>, this is a finding' condition, or ''."""
+        match = _FINDING_20_100.search(self.text)
+        return match.group(1).strip() if match else ""
+
+    def lines_mentioning(self, command: str) -> list[int]:
+        """Indexes of lines containing either of the command's first two words."""
+        words = command.lower().split()[:2]
+        return [
+            i for i, line in enumerate(self.lines_lower)
+            if any(word in line for word in words)
+        ]
+
+    # --- Derived extractions ---------------------------------------------
+
+    @cached_property
+    def stig_requirements(self) -> str:
+        """Actual STIG requirements for expected results ('' if none)."""
+        requirements = []
+
+        # Extract "if" statements that describe what should be checked
+        for pattern, verb in _REQ_IF_PATTERNS:
+            for match in pattern.findall(self.text):
+                field = match[0].strip()
+                expected_value = match[1].strip()
+                # Clean up expected_value - remove trailing ellipsis and incomplete text
+                if expected_value.endswith('...'):
+                    expected_value = expected_value[:-3].strip()
+                if len(expected_value) > 100:  # Too long, probably incomplete
+                    continue
+                req = f"'{field}' must {verb} '{expected_value}'. If it does not, this is a finding."
+                if req not in requirements and len(req) < 200:
+                    requirements.append(req)
+
+        # Registry/policy value requirements (e.g., "Value: 0x00000001 (1)")
+        for match in self.value_lines[:2]:
+            value_str = match.strip()
+            if len(value_str) > 80 or '\n' in value_str:
+                continue
+            req = f"Value must be set to: {value_str}"
+            if req not in requirements:
+                requirements.append(req)
+
+        # "must" statements (but be careful not to duplicate)
+        for match in _REQ_MUST.findall(self.text)[:2]:
+            req = f"Must be: {match.strip()}"
+            if not any(match.strip() in r for r in requirements):
+                if req not in requirements:
+                    requirements.append(req)
+
+        # "should" statements
+        for match in _REQ_SHOULD.findall(self.text)[:2]:
+            req = f"Should be: {match.strip()}"
+            if req not in requirements:
+                requirements.append(req)
+
+        # "Verify X. If it does not, this is a finding."
+        for match in _REQ_VERIFY.findall(self.text)[:2]:
+            req_text = match.strip()
+            # Only use if it's a substantive requirement (not just "compliance")
+            if len(req_text) > 15 and len(req_text) < 150 and 'compliance' not in req_text.lower():
+                req = f"Must: {req_text}. If it does not, this is a finding."
+                if req not in requirements:
+                    requirements.append(req)
+
+        # Remove duplicates and overly long requirements
+        cleaned_requirements = []
+        seen = set()
+        for req in requirements:
+            req_lower = req.lower()
+            if req_lower not in seen and len(req) < 250:
+                seen.add(req_lower)
+                cleaned_requirements.append(req)
+
+        if cleaned_requirements:
+            return "; ".join(cleaned_requirements[:2])
+
+        return ""
+
+    @cached_property
+    def if_finding_expectation(self) -> str:
+        """Command-independent expected result from 'if X does not display/is not Y' findings."""
+        match = _IF_NOT_DISPLAY_FINDING.search(self.text)
+        if match:
+            field = match.group(1).strip()
+            expected_value = match.group(2).strip()
+            if len(expected_value) < 100:
+                return f"'{field}' must display '{expected_value}'. If it does not, this is a finding."
+
+        match = _IF_NOT_FINDING.search(self.text)
+        if match:
+            field = match.group(1).strip()
+            expected_value = match.group(2).strip()
+            if len(expected_value) < 100:
+                return f"'{field}' must be '{expected_value}'. If it is not, this is a finding."
+
+        return ""
+
+    def _line_expectation(self, index: int) -> str:
+        """Expected result stated on a single line ('' if none), memoized per line."""
+        cached = self._line_expectations.get(index)
+        if cached is not None:
+            return cached
+
+        check_line = self.lines[index]
+        result = ""
+
+        match = _LINE_MUST_BE.search(check_line)
+        if match and len(match.group(1).strip()) < 100:
+            result = f"Output must be: {match.group(1).strip()}. If it is not, this is a finding."
+        if not result:
+            match = _LINE_SHOULD_DISPLAY.search(check_line)
+            if match and len(match.group(1).strip()) < 100:
+                result = f"Output should display: {match.group(1).strip()}. If it does not, this is a finding."
+        if not result:
+            match = _LINE_FINDING.search(check_line)
+            if match and len(match.group(1).strip()) < 100:
+                result = f"The following condition must NOT be true: {match.group(1).strip()}. If it is true, this is a finding."
+
+        self._line_expectations[index] = result
+        return result
+
+    def detailed_expected_result(self, command: str) -> str:
+        """Detailed expected result for ``command`` ('' if none), memoized per command."""
+        cached = self._detailed_results.get(command)
+        if cached is not None:
+            return cached
+
+        result = self.if_finding_expectation
+        if not result:
+            # Look for specific value requirements near the command
+            line_count = len(self.lines)
+            for i in self.lines_mentioning(command):
+                for j in range(max(0, i - 2), min(i + 10, line_count)):
+                    result = self._line_expectation(j)
+                    if result:
+                        break
+                if result:
+                    break
+
+        self._detailed_results[command] = result
+        return result
+
+    def expected_result(self, command: str) -> str:
+        """'Output displays/should display' result near ``command`` ('' if none)."""
+        cached = self._expected_results.get(command)
+        if cached is not None:
+            return cached
+
+        result = ""
+        line_count = len(self.lines)
+        for i in self.lines_mentioning(command):
+            for j in range(i, min(i + 5, line_count)):
+                next_lower = self.lines_lower[j]
+                if "display" in next_lower or "show" in next_lower or "indicate" in next_lower:
+                    if "does not display" in next_lower or "does not show" in next_lower:
+                        match = _SHOULD_REST.search(self.lines[j])
+                        if match:
+                            result = f"Output should display: {match.group(1).strip()}"
+                    else:
+                        match = _DISPLAYS_REST.search(self.lines[j])
+                        if match:
+                            result = f"Output displays: {match.group(1).strip()}"
+                if result:
+                    break
+            if result:
+                break
+
+        self._expected_results[command] = result
+        return result
+
+    @cached_property
+    def certificate_requirements(self) -> str:
+        """Certificate issuer/subject/store requirements ('' if none)."""
+        requirements = []
+
+        # From PowerShell command patterns (e.g., Where {$_.Issuer -Like "*DoD*"})
+        issuer_matches = _CERT_ISSUER_LIKE.findall(self.text)
+        subject_matches = _CERT_SUBJECT_LIKE.findall(self.text)
+
+        for issuer in issuer_matches[:2]:
+            issuer_clean = issuer.strip('*').strip()
+            if len(issuer_clean) < 100:
+                requirements.append(f"Certificate issuer must contain: {issuer_clean}")
+
+        for subject in subject_matches[:2]:
+            subject_clean = subject.strip('*').strip()
+            if len(subject_clean) < 100:
+                requirements.append(f"Certificate subject must contain: {subject_clean}")
+
+        # Certificate store location (disallowed, root, etc.)
+        store_match = _CERT_STORE.search(self.text)
+        if store_match:
+            store_name = store_match.group(1)
+            if store_name.lower() == "disallowed":
+                requirements.append("Certificates must be present in the disallowed certificate store.")
+            elif store_name.lower() == "root":
+                requirements.append("Certificates must be present in the root certificate store.")
+
+        # Issuer/subject requirements in prose, only if not already found in a command
+        if not issuer_matches:
+            for issuer in _CERT_ISSUER.findall(self.text)[:2]:
+                if len(issuer) < 100:
+                    requirements.append(f"Certificate issuer must contain: {issuer}")
+
+        if not subject_matches:
+            for subject in _CERT_SUBJECT.findall(self.text)[:2]:
+                if len(subject) < 100:
+                    requirements.append(f"Certificate subject must contain: {subject}")
+
+        if_match = _CERT_IF_NOT_EXIST.search(self.text)
+        if if_match:
+            condition = if_match.group(1).strip()
+            if len(condition) < 150:
+                requirements.append(f"Certificates matching the following must exist: {condition}")
+
+        if _CERT_MUST_EXIST.search(self.text):
+            if not any("disallowed" in req.lower() for req in requirements):
+                requirements.append("Certificates matching the specified criteria must be present in the disallowed store.")
+
+        if requirements:
+            return ". ".join(requirements) + ". If they are not, this is a finding."
+
+        return ""
+
+    @cached_property
+    def autonomous_notes(self) -> str:
+        """Notes that stand on their own (registry, file and config locations)."""
+        notes = []
+
+        for match in _NOTES_REGISTRY.findall(self.text)[:2]:
+            reg_path = match.strip()
+            if len(reg_path) < 150:
+                notes.append(f"Registry location: {reg_path}")
+
+        file_matches = _NOTES_FILE_PATH.findall(self.text)
+        for match in set(file_matches[:2]):
+            file_path = match.strip()
+            if len(file_path) < 150:
+                notes.append(f"File location: {file_path}")
+
+        for key, value in _NOTES_CONFIG.findall(self.text)[:2]:
+            if len(key) < 50 and len(value) < 50:
+                notes.append(f"Configuration: {key} = {value}")
+
+        if notes:
+            return "; ".join(notes)
+
+        return ""
+
+    @cached_property
+    def gui_expected_result(self) -> str:
+        """Expected result for GUI-based checks ('' if none)."""
+        match = _GUI_IF_NOT_DISPLAY.search(self.text)
+        if match:
+            return f"Verify that '{match.group(1)}' displays '{match.group(2)}'. If it does not, this is a finding."
+
+        match = _GUI_MUST_SHOW.search(self.text)
+        if match:
+            return f"Verify the field displays: {match.group(1).strip()}"
+
+        return ""
+
+    @cached_property
+    def navigation_steps(self) -> str:
+        """First GUI navigation path ('Navigate to', 'Under', 'Select'), or ''."""
+        return self.gui_paths[0].strip() if self.gui_paths else ""
+
+    @cached_property
+    def verification_points(self) -> list[str]:
+        """Key verification points from 'if' and 'verify' statements."""
+        points = []
+
+        for match in _POINT_IF.findall(self.text)[:3]:
+            point = match.strip()
+            if len(point) > 10 and len(point) < 150:
+                points.append(point)
+
+        for match in _POINT_VERIFY.findall(self.text)[:2]:
+            point = match.strip()
+            if len(point) > 10 and len(point) < 150:
+                points.append(point)
+
+        return points[:5]
+
+    @cached_property
+    def expected_screen_output(self) -> str:
+        """Expected screen output that a user would see."""
+        for pattern in _SCREEN_OUTPUT_PATTERNS:
+            match = pattern.search(self.text)
+            if match:
+                output = _WHITESPACE_RUN.sub(' ', match.group(1).strip())
+                if len(output) < 250:
+                    return output
+
+        for pattern in _SCREEN_VALUE_PATTERNS:
+            match = pattern.search(self.text)
+            if match:
+                value = match.group(1).strip()
+                if len(value) < 150:
+                    return f"Output should show: {value}"
+
+        if "grep" in self.lower or "cat" in self.lower:
+            grep_match = _SCREEN_GREP.search(self.text)
+            if grep_match:
+                return f"Command output should show lines matching pattern: {grep_match.group(1)}"
+
+        return "Review the command output and verify it matches the expected result described above."
+
+    @cached_property
+    def _network_command_independent_result(self) -> str:
+        match = _NET_VERIFY.search(self.text)
+        if match:
+            verify_text = match.group(1).strip()
+            if len(verify_text) < 150:
+                return f"Verify that {verify_text}. If it is not, this is a finding."
+
+        match = _NET_FINDING.search(self.text)
+        if match:
+            condition = match.group(1).strip()
+            if len(condition) < 120:
+                return f"The following condition must NOT be true: {condition}. If it is true, this is a finding."
+
+        return ""
+
+    @cached_property
+    def _network_config_result(self) -> str:
+        for pattern, config_name in _NET_CONFIG_PATTERNS:
+            if pattern.search(self.text):
+                return f"Configuration must include: {config_name}. If it does not, this is a finding."
+        return ""
+
+    def network_expected_result(self, command: str) -> str:
+        """Expected result for a network device command ('' if none)."""
+        cached = self._network_results.get(command)
+        if cached is not None:
+            return cached
+
+        result = ""
+        command_lower = command.lower()
+        if "interface" in command_lower or "show" in command_lower:
+            result = self._network_command_independent_result
+        if not result:
+            result = self._network_config_result
+
+        self._network_results[command] = result
+        return result
+
+
+@lru_cache(maxsize=256)
+def analyze_check_text(check_text: str) -> CheckTextAnalysis:
+    """
+    Return the (cached) structured analysis for a check text.
+
+    Controls are processed one after another and every extractor for a
+    control asks for the same text, so a small LRU keeps the analysis alive
+    exactly as long as it is useful.
+    """
+    return CheckTextAnalysis(check_text)
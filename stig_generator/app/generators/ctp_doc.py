@@ -10,6 +10,83 @@ from .extractors import (
     extract_shell_commands_from_block, split_command_and_prose, is_placeholder_command,
     is_probable_cli_command, looks_like_config_value, normalize_command_line
 )
+from .check_text import analyze_check_text
+
+
+# Step extraction patterns, compiled once at import time. Check-text-only
+# extractions (requirements, notes, screen output, ...) live in check_text.py.
+
+# PowerShell commands (Windows)
+_PS_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE | re.MULTILINE)
+    for pattern in [
+        r'Get-ChildItem[^\n]+',
+        r'Get-ItemProperty[^\n]+',
+        r'Get-Service[^\n]+',
+        r'Get-Process[^\n]+',
+        r'Get-WmiObject[^\n]+',
+        r'Get-CimInstance[^\n]+',
+        r'Execute the following command:\s*\n\s*([^\n]+)',  # "Execute the following command:"
+        r'Run ""PowerShell""[^\n]*\n[^\n]*Execute[^\n]*:\s*\n\s*([^\n]+)',  # PowerShell execute pattern
+    ]
+]
+_PS_REGISTRY_PATH = re.compile(r"-Path\s+['\"]([^'\"]+)['\"]")
+
+# GUI instructions and the command that opens them (Windows)
+# Handle both double quotes and single quotes, and variations
+_GUI_COMMANDS = [
+    (re.compile(pattern, re.IGNORECASE), cmd, app_name)
+    for pattern, cmd, app_name in [
+        (r'Run\s+["\']System\s+Information["\']', 'msinfo32.exe', 'System Information'),
+        (r'Run\s+["\']tpm\.msc["\']', 'tpm.msc', 'TPM Management'),
+        (r'Run\s+["\']winver\.exe["\']', 'winver.exe', 'About Windows'),
+        (r'Run\s+["\']Computer\s+Management["\']', 'compmgmt.msc', 'Computer Management'),
+        (r'Run\s+["\']Local\s+Security\s+Policy["\']', 'secpol.msc', 'Local Security Policy'),
+        (r'Run\s+["\']Group\s+Policy\s+Editor["\']', 'gpedit.msc', 'Group Policy Editor'),
+        (r'Open\s+["\']Settings["\']', 'ms-settings:', 'Settings'),
+        (r'Run\s+["\']gpedit\.msc["\']', 'gpedit.msc', 'Group Policy Editor'),
+        (r'Run\s+["\']secpol\.msc["\']', 'secpol.msc', 'Local Security Policy'),
+        # Also check for just the app name without quotes
+        (r'Run\s+System\s+Information', 'msinfo32.exe', 'System Information'),
+        (r'Run\s+tpm\.msc', 'tpm.msc', 'TPM Management'),
+    ]
+]
+
+# Executables in quotes (Windows)
+_EXE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r'Run\s+""([^""]+\.exe)""',
+        r'Run\s+""([^""]+\.msc)""',
+        r'execute:\s*([^\n]+\.exe)',
+        r'command:\s*([^\n]+\.exe)',
+    ]
+]
+_REG_QUERY = re.compile(r'reg\s+query\s+([^\n]+)', re.IGNORECASE)
+_MUST_PHRASE = re.compile(r'must\s+([^\.]{10,100})', re.IGNORECASE)
+_SHOULD_PHRASE = re.compile(r'should\s+([^\.]{10,100})', re.IGNORECASE)
+
+# Explicit commands in prose (Linux/Unix)
+_LINUX_COMMAND_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in [
+        r'`([^`]+)`',  # Backtick commands
+        r'run:\s*([^\n]+)',  # "run: command"
+        r'execute:\s*([^\n]+)',  # "execute: command"
+        r'command:\s*([^\n]+)',  # "command: command"
+        r'Run\s+""([^""]+)""',  # Run "command"
+    ]
+]
+_SUDO_PROMPT = re.compile(r'^\$\s*sudo\s+')
+_PROMPT = re.compile(r'^\$\s*')
+_GREP_FILE = re.compile(r'grep\s+["\']?([^"\'\s]+)["\']?\s+([/a-zA-Z0-9_/.-]+)', re.IGNORECASE)
+_SYSTEMCTL_QUERY = re.compile(r'systemctl\s+(status|is-enabled|is-active)\s+([a-zA-Z0-9-@.]+)', re.IGNORECASE)
+_PERMISSIVE_MODE = re.compile(r'(\d{4})\s+or\s+less\s+permissive', re.IGNORECASE)
+_OWNED_BY = re.compile(r'owned\s+by\s+([^\s,\.]+)', re.IGNORECASE)
+_SERVICE_STATE = re.compile(r'(enabled|disabled|active|inactive)', re.IGNORECASE)
+
+# Interface configuration examples (network devices)
+_INTERFACE = re.compile(r'interface\s+([A-Za-z0-9/]+)', re.IGNORECASE)
 
 
 def _format_nist_control_id(nist_id: str | None) -> str | None:
@@ -277,8 +354,6 @@ def _format_control_rows(control: StigControl) -> list[list[str]]:
 
 def _extract_manual_ctp_steps(control: StigControl) -> list[dict[str, str]]:
     """Extract manual CLI commands from check_text for CTP steps."""
-    import re
-
     steps = []
     check_text = control.check_text
     
@@ -297,25 +372,13 @@ def _extract_manual_ctp_steps(control: StigControl) -> list[dict[str, str]]:
 
 def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[str, str]]:
     """Extract Windows-specific manual steps from check_text."""
-    import re
-    
+    analysis = analyze_check_text(check_text)
     steps = []
     
     # 1. Extract PowerShell commands
-    ps_patterns = [
-        r'Get-ChildItem[^\n]+',
-        r'Get-ItemProperty[^\n]+',
-        r'Get-Service[^\n]+',
-        r'Get-Process[^\n]+',
-        r'Get-WmiObject[^\n]+',
-        r'Get-CimInstance[^\n]+',
-        r'Execute the following command:\s*\n\s*([^\n]+)',  # "Execute the following command:"
-        r'Run ""PowerShell""[^\n]*\n[^\n]*Execute[^\n]*:\s*\n\s*([^\n]+)',  # PowerShell execute pattern
-    ]
-    
     found_commands = set()
-    for pattern in ps_patterns:
-        matches = re.findall(pattern, check_text, re.IGNORECASE | re.MULTILINE)
+    for pattern in _PS_PATTERNS:
+        matches = pattern.findall(check_text)
         for match in matches:
             if isinstance(match, tuple):
                 cmd = match[0] if match[0] else match[1] if len(match) > 1 else ""
@@ -338,10 +401,8 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
                     expected = _extract_stig_requirements(check_text)
                 if not expected:
                     # Try to extract from "if" statements
-                    if_pattern = r'if\s+([^,\.]{20,150}),\s+this\s+is\s+a\s+finding'
-                    if_match = re.search(if_pattern, check_text, re.IGNORECASE)
-                    if if_match:
-                        condition = if_match.group(1).strip()
+                    condition = analysis.finding_condition_long
+                    if condition:
                         expected = f"The following condition must NOT be true: {condition}. If it is true, this is a finding."
                     else:
                         expected = "Command output must be reviewed. If output does not match the expected result, this is a finding."
@@ -350,7 +411,7 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
                 if not notes:
                     # Extract registry path from command if present
                     if "Get-ItemProperty" in cmd:
-                        path_match = re.search(r"-Path\s+['\"]([^'\"]+)['\"]", cmd)
+                        path_match = _PS_REGISTRY_PATH.search(cmd)
                         if path_match:
                             notes = f"Registry path: {path_match.group(1)}"
                 
@@ -363,25 +424,8 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
                 })
     
     # 2. Extract GUI instructions and convert to commands
-    # Handle both double quotes and single quotes, and variations
-    gui_commands = [
-        (r'Run\s+["\']System\s+Information["\']', 'msinfo32.exe', 'System Information'),
-        (r'Run\s+["\']tpm\.msc["\']', 'tpm.msc', 'TPM Management'),
-        (r'Run\s+["\']winver\.exe["\']', 'winver.exe', 'About Windows'),
-        (r'Run\s+["\']Computer\s+Management["\']', 'compmgmt.msc', 'Computer Management'),
-        (r'Run\s+["\']Local\s+Security\s+Policy["\']', 'secpol.msc', 'Local Security Policy'),
-        (r'Run\s+["\']Group\s+Policy\s+Editor["\']', 'gpedit.msc', 'Group Policy Editor'),
-        (r'Open\s+["\']Settings["\']', 'ms-settings:', 'Settings'),
-        (r'Run\s+["\']gpedit\.msc["\']', 'gpedit.msc', 'Group Policy Editor'),
-        (r'Run\s+["\']secpol\.msc["\']', 'secpol.msc', 'Local Security Policy'),
-        # Also check for just the app name without quotes
-        (r'Run\s+System\s+Information', 'msinfo32.exe', 'System Information'),
-        (r'Run\s+tpm\.msc', 'tpm.msc', 'TPM Management'),
-    ]
-    
-    for pattern, cmd, app_name in gui_commands:
-        match = re.search(pattern, check_text, re.IGNORECASE)
-        if match:
+    for pattern, cmd, app_name in _GUI_COMMANDS:
+        if pattern.search(check_text):
             # Extract what to check from the text
             expected = _extract_gui_expected_result(check_text, pattern)
             navigation_steps = _extract_navigation_steps(check_text, app_name)
@@ -409,17 +453,7 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
             break  # Only add one GUI command per control
     
     # 3. Extract registry checks
-    registry_pattern = re.compile(
-        r'Registry Hive:\s*(HKEY_[A-Z_]+)\s*\n'
-        r'Registry Path:\s*\\([^\n]+)\s*\n'
-        r'Value Name:\s*([^\n]+)\s*\n'
-        r'Type:\s*([^\n]+)\s*\n'
-        r'Value:\s*([^\n]+)',
-        re.IGNORECASE | re.MULTILINE
-    )
-    
-    registry_matches = registry_pattern.findall(check_text)
-    for hive, path, value_name, reg_type, expected_value in registry_matches:
+    for hive, path, value_name, reg_type, expected_value in analysis.registry_entries:
         # Convert to PowerShell registry path
         ps_path = f"HKLM:\\{path.replace('/', '\\')}"
         ps_cmd = f"Get-ItemProperty -Path '{ps_path}' -Name '{value_name}' | Select-Object -ExpandProperty '{value_name}'"
@@ -441,16 +475,9 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
         })
     
     # 4. Extract executable commands in quotes (more comprehensive)
-    exe_patterns = [
-        r'Run\s+""([^""]+\.exe)""',
-        r'Run\s+""([^""]+\.msc)""',
-        r'execute:\s*([^\n]+\.exe)',
-        r'command:\s*([^\n]+\.exe)',
-    ]
-    
     found_exes = set()
-    for pattern in exe_patterns:
-        exe_matches = re.findall(pattern, check_text, re.IGNORECASE)
+    for pattern in _EXE_PATTERNS:
+        exe_matches = pattern.findall(check_text)
         for exe in exe_matches:
             exe_clean = exe.strip()
             # Skip GUI apps already handled
@@ -473,8 +500,8 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
                 })
     
     # 5. Extract reg query commands
-    if "reg query" in check_text.lower():
-        reg_query_match = re.search(r'reg\s+query\s+([^\n]+)', check_text, re.IGNORECASE)
+    if "reg query" in analysis.lower:
+        reg_query_match = _REG_QUERY.search(check_text)
         if reg_query_match:
             reg_path = reg_query_match.group(1).strip()
             expected = _extract_stig_requirements(check_text)
@@ -507,12 +534,12 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
             if not stig_requirements:
                 # Look for key phrases that indicate requirements
                 req_phrases = []
-                if "must" in check_text.lower():
-                    must_matches = re.findall(r'must\s+([^\.]{10,100})', check_text, re.IGNORECASE)
+                if "must" in analysis.lower:
+                    must_matches = _MUST_PHRASE.findall(check_text)
                     for match in must_matches[:2]:
                         req_phrases.append(f"Must: {match.strip()}")
-                if "should" in check_text.lower():
-                    should_matches = re.findall(r'should\s+([^\.]{10,100})', check_text, re.IGNORECASE)
+                if "should" in analysis.lower:
+                    should_matches = _SHOULD_PHRASE.findall(check_text)
                     for match in should_matches[:2]:
                         req_phrases.append(f"Should: {match.strip()}")
                 if req_phrases:
@@ -547,8 +574,7 @@ def _extract_windows_steps(control: StigControl, check_text: str) -> list[dict[s
 
 def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str, str]]:
     """Extract Linux/Unix-specific manual steps from check_text."""
-    import re
-    
+    analysis = analyze_check_text(check_text)
     steps = []
     
     # Prose prefixes that should be rejected
@@ -586,35 +612,28 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
     # If no structured commands, fall back to pattern extraction
     if not extracted_commands:
         # Extract commands in backticks, quotes, or explicit "run:" patterns
-        command_patterns = [
-            r'`([^`]+)`',  # Backtick commands
-            r'run:\s*([^\n]+)',  # "run: command"
-            r'execute:\s*([^\n]+)',  # "execute: command"
-            r'command:\s*([^\n]+)',  # "command: command"
-            r'Run\s+""([^""]+)""',  # Run "command"
-        ]
-        
-        for pattern in command_patterns:
-            matches = re.findall(pattern, check_text, re.IGNORECASE)
+        for pattern in _LINUX_COMMAND_PATTERNS:
+            matches = pattern.findall(check_text)
             for match in matches:
                 cmd = match.strip() if isinstance(match, str) else match[0].strip()
                 # Clean up command
-                cmd = re.sub(r'^\$\s*sudo\s+', '', cmd)
-                cmd = re.sub(r'^\$\s*', '', cmd)
+                cmd = _SUDO_PROMPT.sub('', cmd)
+                cmd = _PROMPT.sub('', cmd)
                 if cmd and len(cmd) > 3 and not cmd.endswith(('...', ':')) and len(cmd) < 300:
                     if any(cmd.startswith(prefix) for prefix in ['ls ', 'cat ', 'grep ', 'stat ', 'systemctl ', 'rpm ', 'find ', 'awk ', 'sed ', 'chmod ', 'chown ', '/', 'sudo ', 'grep']):
                         extracted_commands.append(cmd)
     
     # If no explicit commands, infer from text patterns
     if not extracted_commands:
-        file_paths = re.findall(r'[/](?:etc|usr|var|opt|home|root)/[a-zA-Z0-9_/.-]+', check_text)
+        file_paths = analysis.system_file_paths
+        check_lower = analysis.lower
         
-        if "ls -l" in check_text.lower() or "permission" in check_text.lower():
+        if "ls -l" in check_lower or "permission" in check_lower:
             if file_paths:
                 extracted_commands.append(f"ls -l {file_paths[0]}")
         
-        if "grep" in check_text.lower() and file_paths:
-            grep_match = re.search(r'grep\s+["\']?([^"\'\s]+)["\']?\s+([/a-zA-Z0-9_/.-]+)', check_text, re.IGNORECASE)
+        if "grep" in check_lower and file_paths:
+            grep_match = _GREP_FILE.search(check_text)
             if grep_match:
                 pattern = grep_match.group(1)
                 file_path = grep_match.group(2) if len(grep_match.groups()) > 1 else file_paths[0]
@@ -622,10 +641,10 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
             elif file_paths:
                 extracted_commands.append(f"grep -E '.*' {file_paths[0]}")
         
-        if ("cat" in check_text.lower() or "view" in check_text.lower()) and file_paths:
+        if ("cat" in check_lower or "view" in check_lower) and file_paths:
             extracted_commands.append(f"cat {file_paths[0]}")
         
-        systemctl_match = re.search(r'systemctl\s+(status|is-enabled|is-active)\s+([a-zA-Z0-9-@.]+)', check_text, re.IGNORECASE)
+        systemctl_match = _SYSTEMCTL_QUERY.search(check_text)
         if systemctl_match:
             action = systemctl_match.group(1)
             service = systemctl_match.group(2)
@@ -674,8 +693,8 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
         if clean_cmd.startswith("ls -l") or clean_cmd.startswith("stat"):
             if not expected:
                 # Try to extract specific permission/ownership requirements
-                perm_match = re.search(r'(\d{4})\s+or\s+less\s+permissive', check_text, re.IGNORECASE)
-                owner_match = re.search(r'owned\s+by\s+([^\s,\.]+)', check_text, re.IGNORECASE)
+                perm_match = _PERMISSIVE_MODE.search(check_text)
+                owner_match = _OWNED_BY.search(check_text)
                 if perm_match:
                     expected = f"File permissions must be {perm_match.group(1)} or less permissive. If not, this is a finding."
                 elif owner_match:
@@ -685,7 +704,7 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
         elif cmd.startswith("grep"):
             if not expected:
                 # Try to determine if pattern should be present or absent
-                if "does not exist" in check_text.lower() or "is not present" in check_text.lower():
+                if "does not exist" in analysis.lower or "is not present" in analysis.lower:
                     expected = "No matching lines should be displayed. If matching lines are found, this is a finding."
                 else:
                     expected = "Matching lines displayed. Verify the pattern matches the expected result. If it does not, this is a finding."
@@ -695,7 +714,7 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
         elif cmd.startswith("systemctl"):
             if not expected:
                 # Try to extract service state requirement
-                state_match = re.search(r'(enabled|disabled|active|inactive)', check_text, re.IGNORECASE)
+                state_match = _SERVICE_STATE.search(check_text)
                 if state_match:
                     state = state_match.group(1)
                     expected = f"Service must be {state}. If it is not, this is a finding."
@@ -751,7 +770,7 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
             action = "\n".join(action_parts)
         else:
             # Extract short description from check_text
-            check_sentences = check_text.split('.')[:2]
+            check_sentences = analysis.sentences[:2]
             short_desc = '. '.join(s.strip() for s in check_sentences if s.strip())
             if len(short_desc) > 150:
                 short_desc = short_desc[:147] + "..."
@@ -781,369 +800,47 @@ def _extract_linux_steps(control: StigControl, check_text: str) -> list[dict[str
 
 def _extract_expected_result(check_text: str, command: str) -> str:
     """Extract expected result from check_text based on command context."""
-    import re
-    
-    # Look for "if" or "verify" statements near the command
-    lines = check_text.split('\n')
-    cmd_lower = command.lower()
-    
-    for i, line in enumerate(lines):
-        if any(word in line.lower() for word in cmd_lower.split()[:2]):  # Check if command words appear in line
-            # Look at next few lines for expected results
-            for j in range(i, min(i + 5, len(lines))):
-                next_line = lines[j]
-                if "display" in next_line.lower() or "show" in next_line.lower() or "indicate" in next_line.lower():
-                    # Extract the expected value
-                    if "does not display" in next_line.lower() or "does not show" in next_line.lower():
-                        # Extract what it SHOULD display
-                        match = re.search(r'should[^\n]*([^\n]+)', next_line, re.IGNORECASE)
-                        if match:
-                            return f"Output should display: {match.group(1).strip()}"
-                    else:
-                        # Extract what it displays
-                        match = re.search(r'display[s]?\s+([^\n]+)', next_line, re.IGNORECASE)
-                        if match:
-                            return f"Output displays: {match.group(1).strip()}"
-    
-    return ""
+    return analyze_check_text(check_text).expected_result(command)
 
 
 def _extract_detailed_expected_result(check_text: str, command: str) -> str:
     """Extract detailed, specific expected result from check_text based on command context."""
-    import re
-    
-    # First try to find specific "if" statements that describe what should be displayed
-    # Pattern: "If X does not display Y, this is a finding"
-    if_not_display_pattern = r'if\s+["\']?([^"\']+)["\']?\s+does\s+not\s+display\s+["\']?([^"\']+)["\']?[^\.]*this\s+is\s+a\s+finding'
-    match = re.search(if_not_display_pattern, check_text, re.IGNORECASE)
-    if match:
-        field = match.group(1).strip()
-        expected_value = match.group(2).strip()
-        if len(expected_value) < 100:  # Avoid overly long values
-            return f"'{field}' must display '{expected_value}'. If it does not, this is a finding."
-    
-    # Pattern: "If X is not Y, this is a finding"
-    if_not_pattern = r'if\s+["\']?([^"\']+)["\']?\s+is\s+not\s+["\']?([^"\']+)["\']?[^\.]*this\s+is\s+a\s+finding'
-    match = re.search(if_not_pattern, check_text, re.IGNORECASE)
-    if match:
-        field = match.group(1).strip()
-        expected_value = match.group(2).strip()
-        if len(expected_value) < 100:
-            return f"'{field}' must be '{expected_value}'. If it is not, this is a finding."
-    
-    # Look for specific value requirements near the command
-    lines = check_text.split('\n')
-    cmd_lower = command.lower()
-    
-    for i, line in enumerate(lines):
-        if any(word in line.lower() for word in cmd_lower.split()[:2]):
-            # Look at surrounding lines for specific values
-            for j in range(max(0, i-2), min(i + 10, len(lines))):
-                check_line = lines[j]
-                
-                # Look for "must be" or "should be" with specific values
-                must_be_pattern = r'must\s+be\s+["\']?([^"\'\n]{5,80})["\']?'
-                match = re.search(must_be_pattern, check_line, re.IGNORECASE)
-                if match:
-                    value = match.group(1).strip()
-                    if len(value) < 100:
-                        return f"Output must be: {value}. If it is not, this is a finding."
-                
-                # Look for "should display" with specific values
-                should_display_pattern = r'should\s+display\s+["\']?([^"\'\n]{5,80})["\']?'
-                match = re.search(should_display_pattern, check_line, re.IGNORECASE)
-                if match:
-                    value = match.group(1).strip()
-                    if len(value) < 100:
-                        return f"Output should display: {value}. If it does not, this is a finding."
-                
-                # Look for "is a finding" statements that indicate what should NOT be
-                finding_pattern = r'if\s+([^,\.]{10,80}),\s+this\s+is\s+a\s+finding'
-                match = re.search(finding_pattern, check_line, re.IGNORECASE)
-                if match:
-                    condition = match.group(1).strip()
-                    if len(condition) < 100:
-                        return f"The following condition must NOT be true: {condition}. If it is true, this is a finding."
-    
-    return ""
+    return analyze_check_text(check_text).detailed_expected_result(command)
 
 
 def _extract_certificate_requirements(check_text: str) -> str:
     """Extract specific certificate requirements from check_text."""
-    import re
-    
-    requirements = []
-    
-    # Extract from PowerShell command patterns (e.g., Where {$_.Issuer -Like "*DoD*"})
-    issuer_like_pattern = r'Issuer\s+-Like\s+["\']([^"\']+)["\']'
-    subject_like_pattern = r'Subject\s+-Like\s+["\']([^"\']+)["\']'
-    
-    issuer_matches = re.findall(issuer_like_pattern, check_text, re.IGNORECASE)
-    subject_matches = re.findall(subject_like_pattern, check_text, re.IGNORECASE)
-    
-    if issuer_matches:
-        for issuer in issuer_matches[:2]:
-            issuer_clean = issuer.strip('*').strip()
-            if len(issuer_clean) < 100:
-                requirements.append(f"Certificate issuer must contain: {issuer_clean}")
-    
-    if subject_matches:
-        for subject in subject_matches[:2]:
-            subject_clean = subject.strip('*').strip()
-            if len(subject_clean) < 100:
-                requirements.append(f"Certificate subject must contain: {subject_clean}")
-    
-    # Look for certificate store location (disallowed, root, etc.)
-    store_pattern = r'Cert:[^\\]+\\?([a-zA-Z]+)'
-    store_match = re.search(store_pattern, check_text, re.IGNORECASE)
-    if store_match:
-        store_name = store_match.group(1)
-        if store_name.lower() == "disallowed":
-            requirements.append("Certificates must be present in the disallowed certificate store.")
-        elif store_name.lower() == "root":
-            requirements.append("Certificates must be present in the root certificate store.")
-    
-    # Look for certificate issuer/subject requirements in text
-    issuer_pattern = r'Issuer.*?["\']([^"\']+)["\']'
-    subject_pattern = r'Subject.*?["\']([^"\']+)["\']'
-    
-    issuers = re.findall(issuer_pattern, check_text, re.IGNORECASE)
-    subjects = re.findall(subject_pattern, check_text, re.IGNORECASE)
-    
-    if issuers and not issuer_matches:  # Only if not already found in command
-        for issuer in issuers[:2]:
-            if len(issuer) < 100:
-                requirements.append(f"Certificate issuer must contain: {issuer}")
-    
-    if subjects and not subject_matches:  # Only if not already found in command
-        for subject in subjects[:2]:
-            if len(subject) < 100:
-                requirements.append(f"Certificate subject must contain: {subject}")
-    
-    # Look for "if" statements about certificates
-    if_cert_pattern = r'if\s+([^,\.]{20,150})\s+does\s+not\s+exist[^\.]*this\s+is\s+a\s+finding'
-    if_match = re.search(if_cert_pattern, check_text, re.IGNORECASE)
-    if if_match:
-        condition = if_match.group(1).strip()
-        if len(condition) < 150:
-            requirements.append(f"Certificates matching the following must exist: {condition}")
-    
-    # Look for "must be present" or "must exist"
-    must_exist_pattern = r'certificates?\s+must\s+(?:be\s+)?(?:present|exist)[^\.]*\.'
-    if re.search(must_exist_pattern, check_text, re.IGNORECASE):
-        if not any("disallowed" in req.lower() for req in requirements):
-            requirements.append("Certificates matching the specified criteria must be present in the disallowed store.")
-    
-    if requirements:
-        return ". ".join(requirements) + ". If they are not, this is a finding."
-    
-    return ""
+    return analyze_check_text(check_text).certificate_requirements
 
 
 def _extract_autonomous_notes(check_text: str) -> str:
     """Extract notes from check_text that are autonomous (no external references)."""
-    import re
-    
-    notes = []
-    
-    # Extract registry paths if present
-    registry_pattern = r'Registry\s+(?:Hive|Path|Location):\s*([^\n]+)'
-    registry_matches = re.findall(registry_pattern, check_text, re.IGNORECASE)
-    if registry_matches:
-        for match in registry_matches[:2]:  # Limit to 2
-            reg_path = match.strip()
-            if len(reg_path) < 150:
-                notes.append(f"Registry location: {reg_path}")
-    
-    # Extract file paths if present
-    file_path_pattern = r'([/\\][a-zA-Z0-9_/\\\\.-]+\.(?:conf|config|cfg|ini|xml|yml|yaml|json|log|txt))'
-    file_matches = re.findall(file_path_pattern, check_text)
-    if file_matches:
-        for match in set(file_matches[:2]):  # Limit to 2 unique paths
-            file_path = match.strip()
-            if len(file_path) < 150:
-                notes.append(f"File location: {file_path}")
-    
-    # Extract specific configuration values mentioned
-    config_pattern = r'([A-Za-z0-9_]+)\s*=\s*([^\s,;]+)'
-    config_matches = re.findall(config_pattern, check_text)
-    if config_matches:
-        for key, value in config_matches[:2]:  # Limit to 2
-            if len(key) < 50 and len(value) < 50:
-                notes.append(f"Configuration: {key} = {value}")
-    
-    # Combine notes
-    if notes:
-        return "; ".join(notes)
-    
-    return ""
+    return analyze_check_text(check_text).autonomous_notes
 
 
 def _extract_gui_expected_result(check_text: str, pattern: str) -> str:
     """Extract expected result for GUI-based checks."""
-    import re
-    
-    # Look for "if" statements that describe what should be displayed
-    if_pattern = r'if\s+["\']?([^"\']+)["\']?\s+does\s+not\s+display\s+["\']?([^"\']+)["\']?'
-    match = re.search(if_pattern, check_text, re.IGNORECASE)
-    if match:
-        field = match.group(1)
-        expected_value = match.group(2)
-        return f"Verify that '{field}' displays '{expected_value}'. If it does not, this is a finding."
-    
-    # Look for "must indicate" or "must display"
-    must_pattern = r'must\s+(?:indicate|display|show)\s+["\']?([^"\']+)["\']?'
-    match = re.search(must_pattern, check_text, re.IGNORECASE)
-    if match:
-        return f"Verify the field displays: {match.group(1).strip()}"
-    
-    return ""
+    return analyze_check_text(check_text).gui_expected_result
 
 
 def _extract_navigation_steps(check_text: str, app_name: str) -> str:
     """Extract navigation steps from check_text for GUI applications."""
-    import re
-    
-    # Look for navigation instructions like "Navigate to X >> Y"
-    nav_pattern = r'Navigate\s+to\s+([^\n]+)'
-    match = re.search(nav_pattern, check_text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    
-    # Look for "Under" or "In" statements
-    under_pattern = r'Under\s+""([^""]+)""'
-    match = re.search(under_pattern, check_text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    
-    # Look for "Select" statements
-    select_pattern = r'Select\s+""([^""]+)""'
-    match = re.search(select_pattern, check_text, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    
-    return ""
+    return analyze_check_text(check_text).navigation_steps
 
 
 def _extract_stig_requirements(check_text: str) -> str:
     """Extract actual STIG requirements from check_text for expected results."""
-    import re
-    
-    requirements = []
-    
-    # Extract "if" statements that describe what should be checked
-    # Pattern: "if X does not display Y" or "if X is not Y"
-    if_patterns = [
-        (r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+display\s+["\']([^"\']+)["\']', 'display'),
-        (r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+show\s+["\']([^"\']+)["\']', 'show'),
-        (r'if\s+["\']([^"\']+)["\']\s+is\s+not\s+["\']([^"\']+)["\']', 'be'),
-        (r'if\s+["\']([^"\']+)["\']\s+does\s+not\s+indicate\s+["\']([^"\']+)["\']', 'indicate'),
-    ]
-    
-    for pattern, verb in if_patterns:
-        matches = re.findall(pattern, check_text, re.IGNORECASE)
-        for match in matches:
-            field = match[0].strip()
-            expected_value = match[1].strip()
-            # Clean up expected_value - remove trailing ellipsis and incomplete text
-            if expected_value.endswith('...'):
-                expected_value = expected_value[:-3].strip()
-            if len(expected_value) > 100:  # Too long, probably incomplete
-                continue
-            req = f"'{field}' must {verb} '{expected_value}'. If it does not, this is a finding."
-            if req not in requirements and len(req) < 200:
-                requirements.append(req)
-    
-    # Extract specific value requirements (e.g., "Value: 0x00000001 (1)")
-    # Look for registry value requirements
-    value_pattern = r'Value:\s*([^\n]+?)(?:\n|$)'
-    matches = re.findall(value_pattern, check_text, re.IGNORECASE)
-    for match in matches[:2]:  # Limit to 2
-        value_str = match.strip()
-        # Clean up - remove if too long or contains newlines
-        if len(value_str) > 80 or '\n' in value_str:
-            continue
-        req = f"Value must be set to: {value_str}"
-        if req not in requirements:
-            requirements.append(req)
-    
-    # Extract "must" statements (but be careful not to duplicate)
-    must_pattern = r'must\s+(?:display|show|indicate|be|have)\s+["\']?([^"\'\n]{5,80})["\']?'
-    matches = re.findall(must_pattern, check_text, re.IGNORECASE)
-    for match in matches[:2]:  # Limit to 2
-        req = f"Must be: {match.strip()}"
-        # Don't add if we already have a similar requirement
-        if not any(match.strip() in r for r in requirements):
-            if req not in requirements:
-                requirements.append(req)
-    
-    # Extract "should" statements
-    should_pattern = r'should\s+(?:be|display|show|indicate)\s+["\']?([^"\'\n]{5,80})["\']?'
-    matches = re.findall(should_pattern, check_text, re.IGNORECASE)
-    for match in matches[:2]:  # Limit to 2
-        req = f"Should be: {match.strip()}"
-        if req not in requirements:
-            requirements.append(req)
-    
-    # Extract "verify" statements that contain requirements
-    # Pattern: "Verify X. If it does not, this is a finding."
-    verify_pattern = r'verify\s+([^\.]+?)(?:\.\s+If\s+it\s+does\s+not|\.\s+If\s+not|\.)'
-    matches = re.findall(verify_pattern, check_text, re.IGNORECASE)
-    for match in matches[:2]:  # Limit to 2
-        req_text = match.strip()
-        # Only use if it's a substantive requirement (not just "compliance")
-        if len(req_text) > 15 and len(req_text) < 150 and 'compliance' not in req_text.lower():
-            req = f"Must: {req_text}. If it does not, this is a finding."
-            if req not in requirements:
-                requirements.append(req)
-    
-    # Clean up requirements - remove duplicates and overly long ones
-    cleaned_requirements = []
-    seen = set()
-    for req in requirements:
-        # Normalize for comparison
-        req_lower = req.lower()
-        if req_lower not in seen and len(req) < 250:
-            seen.add(req_lower)
-            cleaned_requirements.append(req)
-    
-    # Combine requirements into a single string
-    if cleaned_requirements:
-        # Join with semicolons for clarity, limit to 2 most important
-        return "; ".join(cleaned_requirements[:2])
-    
-    return ""
+    return analyze_check_text(check_text).stig_requirements
 
 
 def _extract_verification_points(check_text: str) -> list[str]:
     """Extract key verification points from check_text."""
-    import re
-    
-    points = []
-    
-    # Look for "if" statements that indicate what to check
-    if_pattern = r'if\s+([^,]+?)(?:,|\.|this is a finding)'
-    matches = re.findall(if_pattern, check_text, re.IGNORECASE)
-    for match in matches[:3]:  # Limit to 3
-        point = match.strip()
-        if len(point) > 10 and len(point) < 150:
-            points.append(point)
-    
-    # Look for "verify" statements
-    verify_pattern = r'verify\s+([^\.]+?)(?:\.|$)'
-    matches = re.findall(verify_pattern, check_text, re.IGNORECASE)
-    for match in matches[:2]:  # Limit to 2
-        point = match.strip()
-        if len(point) > 10 and len(point) < 150:
-            points.append(point)
-    
-    return points[:5]  # Total limit
+    return list(analyze_check_text(check_text).verification_points)
 
 
 def _extract_network_steps(control: StigControl, check_text: str) -> list[dict[str, str]]:
     """Extract network device-specific manual steps from check_text."""
-    import re
-    
+    analysis = analyze_check_text(check_text)
     steps = []
     
     # Use structured check commands from control
@@ -1167,9 +864,8 @@ def _extract_network_steps(control: StigControl, check_text: str) -> list[dict[s
                 expected = _extract_stig_requirements(check_text)
             if not expected:
                 # Look for "if" statements
-                if_match = re.search(r'if\s+([^,\.]{20,100}),\s+this\s+is\s+a\s+finding', check_text, re.IGNORECASE)
-                if if_match:
-                    condition = if_match.group(1).strip()
+                condition = analysis.finding_condition_short
+                if condition:
                     expected = f"The following condition must NOT be true: {condition}. If it is true, this is a finding."
                 else:
                     expected = "Command output displayed. Verify the output matches the expected configuration. If it does not, this is a finding."
@@ -1185,8 +881,7 @@ def _extract_network_steps(control: StigControl, check_text: str) -> list[dict[s
             })
     
     # Extract interface configuration examples from check_text
-    interface_pattern = r'interface\s+([A-Za-z0-9/]+)'
-    interface_matches = re.findall(interface_pattern, check_text, re.IGNORECASE)
+    interface_matches = _INTERFACE.findall(check_text)
     if interface_matches and not found_commands:
         # If we found interfaces but no show commands, create verification steps
         for iface in set(interface_matches[:2]):
@@ -1235,89 +930,9 @@ def _extract_network_steps(control: StigControl, check_text: str) -> list[dict[s
 
 def _extract_expected_screen_output(check_text: str) -> str:
     """Extract expected screen output that a user would see."""
-    import re
-    
-    # Look for example outputs in the check text
-    # Pattern: "Output should show:" or "Expected output:"
-    output_patterns = [
-        r'output\s+should\s+show[:\s]+([^\n]{20,200})',
-        r'expected\s+output[:\s]+([^\n]{20,200})',
-        r'you\s+should\s+see[:\s]+([^\n]{20,200})',
-        r'display\s+should\s+show[:\s]+([^\n]{20,200})',
-        r'verify\s+that\s+([^\n]{20,200})\s+is\s+displayed',
-    ]
-    
-    for pattern in output_patterns:
-        match = re.search(pattern, check_text, re.IGNORECASE)
-        if match:
-            output = match.group(1).strip()
-            # Clean up
-            output = re.sub(r'\s+', ' ', output)
-            if len(output) < 250:
-                return output
-    
-    # Look for specific value patterns
-    value_patterns = [
-        r'value\s+should\s+be\s+["\']?([^"\'\n]{5,100})["\']?',
-        r'must\s+be\s+set\s+to\s+["\']?([^"\'\n]{5,100})["\']?',
-        r'should\s+display\s+["\']?([^"\'\n]{5,100})["\']?',
-    ]
-    
-    for pattern in value_patterns:
-        match = re.search(pattern, check_text, re.IGNORECASE)
-        if match:
-            value = match.group(1).strip()
-            if len(value) < 150:
-                return f"Output should show: {value}"
-    
-    # Look for file content patterns
-    if "grep" in check_text.lower() or "cat" in check_text.lower():
-        # Try to extract what should be in the file
-        grep_match = re.search(r'grep\s+["\']?([^"\'\s]+)["\']?', check_text, re.IGNORECASE)
-        if grep_match:
-            pattern = grep_match.group(1)
-            return f"Command output should show lines matching pattern: {pattern}"
-    
-    # Default
-    return "Review the command output and verify it matches the expected result described above."
+    return analyze_check_text(check_text).expected_screen_output
 
 
 def _extract_network_expected_result(check_text: str, command: str) -> str:
     """Extract specific expected result for network device commands."""
-    import re
-    
-    # Look for configuration examples that should match
-    # Pattern: "interface X\n switchport mode access\n authentication port-control auto"
-    if "interface" in command.lower() or "show" in command.lower():
-        # Look for "verify that" or "verify the" statements
-        verify_pattern = r'verify\s+(?:that|the)\s+([^,\.]{20,150})'
-        match = re.search(verify_pattern, check_text, re.IGNORECASE)
-        if match:
-            verify_text = match.group(1).strip()
-            if len(verify_text) < 150:
-                return f"Verify that {verify_text}. If it is not, this is a finding."
-        
-        # Look for "if" statements with specific conditions
-        if_pattern = r'if\s+([^,\.]{20,120}),\s+this\s+is\s+a\s+finding'
-        match = re.search(if_pattern, check_text, re.IGNORECASE)
-        if match:
-            condition = match.group(1).strip()
-            if len(condition) < 120:
-                return f"The following condition must NOT be true: {condition}. If it is true, this is a finding."
-    
-    # Look for specific configuration values that should be present
-    config_patterns = [
-        r'switchport\s+mode\s+access',
-        r'spanning-tree\s+guard\s+root',
-        r'spanning-tree\s+bpduguard\s+enable',
-        r'mls\s+qos',
-        r'vtp\s+password',
-    ]
-    
-    for pattern in config_patterns:
-        if re.search(pattern, check_text, re.IGNORECASE):
-            config_name = pattern.replace('\\s+', ' ').replace('\\', '')
-            return f"Configuration must include: {config_name}. If it does not, this is a finding."
-    
-    return ""
-
+    return analyze_check_text(check_text).network_expected_result(command)
@@ -688,6 +688,68 @@ def extract_check_commands_from_block(text: str, os_family: str) -> Tuple[List[s
         return filtered_commands, notes
 
 
+# Prose prefixes that should never be treated as check commands
+CHECK_PROSE_PREFIXES = (
+    "Configure ", "If ", "Document ", "To ", "NOTE:", "Must:", "The following condition",
+    "All verification requirements", "Output must be:", "File location:",
+    "Configuration: ", "Command output", "Review the command output",
+)
+
+
+def validate_check_commands(commands: List[str]) -> List[str]:
+    """
+    Filter extracted check commands down to real, runnable CLI commands.
+    
+    Rejects empty/degenerate entries, prose (see CHECK_PROSE_PREFIXES), lines
+    that fail is_probable_cli_command, and grep commands without a meaningful
+    pattern.
+    
+    Args:
+        commands: Check commands (e.g. from extract_check_commands_from_block)
+        
+    Returns:
+        Commands that are safe to run as checks, in their original order
+    """
+    valid_commands = []
+    
+    for cmd in commands:
+        if not cmd or len(cmd.strip()) < 3:
+            continue
+        
+        # Normalize and check for prose prefixes
+        normalized = normalize_command_line(cmd)
+        if any(normalized.startswith(p) for p in CHECK_PROSE_PREFIXES):
+            continue
+        
+        # Only keep real CLI commands
+        if not is_probable_cli_command(cmd):
+            continue
+        
+        # Additional grep validation
+        if normalized.lower().startswith('grep'):
+            # Check if grep command has a meaningful pattern (not just flags)
+            parts = normalized.split()
+            has_meaningful_pattern = False
+            for part in parts:
+                # Skip flags
+                if part.startswith('-'):
+                    continue
+                # Check if it's a real pattern (not just a flag or placeholder)
+                if len(part) >= 3 and re.match(r'[A-Za-z0-9_.=-]{3,}', part):
+                    if part not in ['-r', '-i', '-n', '-E', '-A1', 'args']:
+                        has_meaningful_pattern = True
+                        break
+            
+            if has_meaningful_pattern:
+                valid_commands.append(cmd)
+            # else: skip degenerate grep command
+        else:
+            # Not a grep command, keep it if it's a real command
+            valid_commands.append(cmd)
+    
+    return valid_commands
+
+
 def parse_systemctl_command(cmd: str) -> Optional[dict]:
     """
     Parse a systemctl command and extract:
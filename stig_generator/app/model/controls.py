@@ -1,9 +1,103 @@
 """STIG Control data model definitions."""
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import Literal, Optional
 
 
+@dataclass
+class CheckCommandAnalysis:
+    """
+    Check commands extracted from a control's check_text, computed once at parse time.
+
+    Generators consume this record instead of re-running the extractor and
+    re-validating every command for each output format.
+    """
+
+    os_family: str  # OS family the extraction was run for
+    commands: list[str] = field(default_factory=list)  # Output of extract_check_commands_from_block
+    notes: list[str] = field(default_factory=list)  # Residual notes from the extractor
+    valid_commands: list[str] = field(default_factory=list)  # Commands that pass validate_check_commands
+
+    @classmethod
+    def from_text(cls, check_text: str, os_family: str) -> "CheckCommandAnalysis":
+        """
+        Extract and validate check commands from check_text.
+
+        Args:
+            check_text: The "Check" section of a STIG rule
+            os_family: OS family (rhel, windows, ubuntu, network, etc.)
+
+        Returns:
+            CheckCommandAnalysis for the text
+        """
+        from ..generators.extractors import extract_check_commands_from_block
+
+        commands, notes = extract_check_commands_from_block(check_text or "", os_family)
+        return cls.from_commands(commands, os_family, notes)
+
+    @classmethod
+    def from_commands(
+        cls, commands: list[str], os_family: str, notes: Optional[list[str]] = None
+    ) -> "CheckCommandAnalysis":
+        """
+        Build an analysis from already-extracted check commands.
+
+        Args:
+            commands: Extracted check commands
+            os_family: OS family the commands were extracted for
+            notes: Optional extractor notes
+
+        Returns:
+            CheckCommandAnalysis with validated commands
+        """
+        from ..generators.extractors import validate_check_commands
+
+        return cls(
+            os_family=os_family,
+            commands=list(commands),
+            notes=list(notes or []),
+            valid_commands=validate_check_commands(commands),
+        )
+
+    @staticmethod
+    def commands_for(data: Optional[dict], check_text: str, os_family: str) -> list[str]:
+        """
+        Return extracted (unvalidated) check commands for a consumer's OS family.
+
+        Reuses a serialized analysis only when it was computed for the same OS
+        family, since extraction depends on it; otherwise extracts from
+        check_text. Consumers apply their own command filters.
+
+        Args:
+            data: Serialized analysis (to_dict() output) or None
+            check_text: Check text to extract from if the analysis can't be reused
+            os_family: OS family the consumer extracts for
+
+        Returns:
+            Check commands, as extract_check_commands_from_block returns them
+        """
+        if data and data.get("os_family") == os_family:
+            return list(data.get("commands", []))
+        from ..generators.extractors import extract_check_commands_from_block
+
+        commands, _ = extract_check_commands_from_block(check_text or "", os_family)
+        return commands
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CheckCommandAnalysis":
+        """Rebuild an analysis serialized with to_dict()."""
+        return cls(
+            os_family=data.get("os_family", "rhel"),
+            commands=list(data.get("commands", [])),
+            notes=list(data.get("notes", [])),
+            valid_commands=list(data.get("valid_commands", [])),
+        )
+
+    def to_dict(self) -> dict:
+        """Convert to dictionary for JSON serialization."""
+        return asdict(self)
+
+
 @dataclass
 class StigControl:
     """Represents a single STIG control/rule."""
@@ -42,6 +136,8 @@ class StigControl:
     # Structured data for specific control types
     service_actions: list[dict] = field(default_factory=list)  # Systemd service actions: [{"unit": "rngd", "action": "enable_and_start"}]
     sysctl_params: list[dict] = field(default_factory=list)  # Sysctl parameters: [{"name": "kernel.randomize_va_space", "value": "2"}]
+    # Parse-time check command extraction shared by all generators
+    check_analysis: Optional[CheckCommandAnalysis] = None
     
     def has_real_commands(self) -> bool:
         """
@@ -6,14 +6,14 @@ from pathlib import Path
 from typing import Literal
 from xml.etree import ElementTree
 
-from ..model.controls import StigControl, normalize_severity
+from ..model.controls import CheckCommandAnalysis, StigControl, normalize_severity
 from ..generators.extractors import (
     extract_cli_commands_from_block,
     extract_shell_commands_from_block,
-    extract_check_commands_from_block,
     extract_systemd_actions,
     extract_sysctl_params,
 )
+from .xccdf_reader import XccdfReader
 
 # Global cache for CCI-to-NIST mapping
 _CCI_TO_NIST_MAP: dict[str, str] | None = None
@@ -128,13 +128,17 @@ def _convert_nist_id_from_csv(nist_id: str) -> str | None:
     return result
 
 
-def parse_xccdf(file_path: Path, os_family: str | None = None) -> list[StigControl]:
+def parse_xccdf(
+    file_path: Path, os_family: str | None = None, check_os_family: str | None = None
+) -> list[StigControl]:
     """
     Parse an XCCDF XML file and extract STIG controls.
 
     Args:
         file_path: Path to the XCCDF XML file
         os_family: Optional OS family identifier (e.g., "rhel"). If not provided, will be extracted from STIG.
+        check_os_family: Optional OS family or product (e.g., "rhel9") to extract check commands
+            for, if the consumers of check_analysis need a different one than os_family.
 
     Returns:
         List of StigControl objects
@@ -146,12 +150,6 @@ def parse_xccdf(file_path: Path, os_family: str | None = None) -> list[StigContr
     if not file_path.exists():
         raise FileNotFoundError(f"STIG file not found: {file_path}")
 
-    try:
-        tree = ElementTree.parse(file_path)
-        root = tree.getroot()
-    except ElementTree.ParseError as e:
-        raise ValueError(f"Failed to parse XML file: {e}") from e
-
     # XCCDF namespace handling
     namespaces = {
         "xccdf": "http://checklists.nist.gov/xccdf/1.2",
@@ -159,72 +157,54 @@ def parse_xccdf(file_path: Path, os_family: str | None = None) -> list[StigContr
         "cpe": "http://cpe.mitre.org/language/2.0",
     }
 
-    # Try to detect namespaces from root if not present
-    if root.tag.startswith("{"):
-        default_ns = root.tag.split("}")[0].strip("{")
-        if "xccdf" not in namespaces.values():
-            namespaces["xccdf"] = default_ns
-
-    # Extract OS family from Benchmark if not provided
-    if os_family is None:
-        os_family = _extract_os_family_from_benchmark(root, namespaces)
-    
-    if not os_family:
-        os_family = "rhel"  # Default fallback
-
     controls = []
 
-    # Build a map of Group IDs to their titles (for SRG-OS extraction)
+    # Map of Group IDs to their titles (for SRG-OS extraction), filled as
+    # the streaming reader passes each Group
     group_map = {}
-    groups = root.findall(".//xccdf:Group", namespaces)
-    if not groups:
-        groups = root.findall(".//Group")
-    
-    for group in groups:
-        group_id = group.get("id", "")
-        group_title_elem = group.find("xccdf:title", namespaces)
-        if group_title_elem is None:
-            group_title_elem = group.find("title")
-        if group_title_elem is not None and group_title_elem.text:
-            group_map[group_id] = group_title_elem.text
-            # Also process rules within this group
-            group_rules = group.findall("xccdf:Rule", namespaces)
-            if not group_rules:
-                group_rules = group.findall("Rule")
-            
-            for rule in group_rules:
-                try:
-                    control = _parse_rule(rule, os_family, namespaces, group_map, group_id)
-                    if control:
-                        controls.append(control)
-                except Exception as e:
-                    rule_id = rule.get("id", "unknown")
-                    print(f"Warning: Failed to parse rule {rule_id}: {e}")
-                    continue
 
-    # Also find any rules not in groups (shouldn't happen in STIGs, but be safe)
-    all_rules = root.findall(".//xccdf:Rule", namespaces)
-    if not all_rules:
-        all_rules = root.findall(".//Rule")
-    
-    processed_rule_ids = {c.id for c in controls}
-    for rule in all_rules:
-        rule_id = rule.get("id", "")
-        if rule_id and rule_id not in processed_rule_ids:
+    # Stream the Rules (XCCDF 1.1 or 1.2) instead of loading the whole tree;
+    # each Rule subtree is only kept while it is being parsed
+    reader = XccdfReader(file_path, keep_elements=True)
+    try:
+        for xccdf_rule in reader:
+            # The Benchmark header has been read by the time the first Rule is
+            if reader.benchmark.namespace:
+                namespaces["xccdf"] = reader.benchmark.namespace
+
+            # Extract OS family from Benchmark if not provided
+            if os_family is None:
+                os_family = _os_family_from_benchmark_text(
+                    reader.benchmark.title, reader.benchmark.id
+                )
+            if not os_family:
+                os_family = "rhel"  # Default fallback
+
+            group_id = None
+            if xccdf_rule.group_title:
+                group_id = xccdf_rule.group_id
+                group_map[group_id] = xccdf_rule.group_title
+
             try:
-                control = _parse_rule(rule, os_family, namespaces, group_map, None)
+                control = _parse_rule(
+                    xccdf_rule.element, os_family, namespaces, group_map, group_id, check_os_family
+                )
                 if control:
                     controls.append(control)
             except Exception as e:
+                rule_id = xccdf_rule.rule_id or "unknown"
                 print(f"Warning: Failed to parse rule {rule_id}: {e}")
                 continue
+    except ElementTree.ParseError as e:
+        raise ValueError(f"Failed to parse XML file: {e}") from e
 
     return controls
 
 
 def _parse_rule(
     rule: ElementTree.Element, os_family: str, namespaces: dict[str, str], 
-    group_map: dict[str, str] | None = None, parent_group_id: str | None = None
+    group_map: dict[str, str] | None = None, parent_group_id: str | None = None,
+    check_os_family: str | None = None
 ) -> StigControl | None:
     """Parse a single Rule element into a StigControl."""
     rule_id = rule.get("id", "")
@@ -372,12 +352,13 @@ def _parse_rule(
         # Extract structured sysctl parameters
         sysctl_params = extract_sysctl_params(fix_text)
     
-    # Extract check commands from check_text
-    check_cmds, check_notes = extract_check_commands_from_block(check_text, os_family)
-    candidate_check_blocks = check_cmds
-    check_commands = check_cmds
-    if check_notes:
-        manual_notes.extend(check_notes)
+    # Extract and validate check commands from check_text once; generators
+    # consume the analysis instead of re-extracting
+    check_analysis = CheckCommandAnalysis.from_text(check_text, check_os_family or os_family)
+    candidate_check_blocks = check_analysis.commands
+    check_commands = check_analysis.commands
+    if check_analysis.notes:
+        manual_notes.extend(check_analysis.notes)
 
     return StigControl(
         id=rule_id,
@@ -399,6 +380,7 @@ def _parse_rule(
         manual_notes=manual_notes,
         service_actions=service_actions,
         sysctl_params=sysctl_params,
+        check_analysis=check_analysis,
     )
 
 
@@ -488,13 +470,20 @@ def _extract_os_family_from_benchmark(root: ElementTree.Element, namespaces: dic
     title_elem = root.find("xccdf:title", namespaces)
     if title_elem is None:
         title_elem = root.find("title")
-    title = (title_elem.text if title_elem is not None and title_elem.text else "").lower()
-    
-    # Get Benchmark id
-    benchmark_id = root.get("id", "").lower()
-    
+    title = title_elem.text if title_elem is not None and title_elem.text else ""
+
+    return _os_family_from_benchmark_text(title, root.get("id", ""))
+
+
+def _os_family_from_benchmark_text(title: str, benchmark_id: str) -> str:
+    """
+    Map a Benchmark title and id to an OS family.
+
+    Returns:
+        OS family identifier (e.g., "rhel", "windows", "ubuntu")
+    """
     # Check title and id for OS family indicators
-    text_to_check = f"{title} {benchmark_id}"
+    text_to_check = f"{title} {benchmark_id}".lower()
     
     # Windows indicators
     if any(indicator in text_to_check for indicator in ["windows", "microsoft", "ms_"]):
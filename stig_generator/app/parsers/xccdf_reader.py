@@ -0,0 +1,288 @@
+"""
+Streaming XCCDF reader shared by the STIG parsers.
+
+Reads XCCDF 1.1 and 1.2 benchmarks with ElementTree.iterparse, yielding one
+record per Rule and discarding each Group once it has been read, so memory
+stays flat regardless of benchmark size. The reader also builds a cached
+intermediate (rule id -> fix/check text) keyed by the SHA-256 of the source
+file, letting repeated runs on the same STIG skip XML parsing altogether.
+
+This module only depends on the standard library so host-side scripts
+(scripts/harden_ubuntu_stig.py) can import it without the app package.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Iterator
+from xml.etree import ElementTree
+
+XCCDF_NAMESPACES = (
+    "http://checklists.nist.gov/xccdf/1.1",
+    "http://checklists.nist.gov/xccdf/1.2",
+)
+
+# Bump when the cached record layout changes so stale caches are ignored
+RULE_INDEX_FORMAT = 1
+
+DEFAULT_RULE_INDEX_CACHE_DIR = Path.home() / ".cache" / "stig_generator" / "xccdf"
+
+
+@dataclass
+class XccdfBenchmark:
+    """Header of an XCCDF Benchmark."""
+    id: str = ""
+    title: str = ""
+    namespace: str = ""
+
+
+@dataclass
+class XccdfRule:
+    """A Rule read from an XCCDF benchmark."""
+    rule_id: str
+    group_id: str = ""
+    group_title: str = ""
+    title: str = ""
+    severity: str = ""
+    version: str = ""
+    fix_text: str = ""
+    check_content: str = ""
+    # Full Rule subtree, only set when the reader keeps elements; it is
+    # cleared once the consumer moves on to the next rule
+    element: ElementTree.Element | None = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class RuleIndex:
+    """Rules of a benchmark keyed by rule id, in document order."""
+    source: Path
+    sha256: str
+    benchmark: XccdfBenchmark
+    rules: dict[str, XccdfRule]
+    from_cache: bool = False
+
+
+def split_tag(tag: str) -> tuple[str, str]:
+    """
+    Split an ElementTree tag into its namespace and local name.
+
+    Args:
+        tag: Tag such as "{http://checklists.nist.gov/xccdf/1.1}Rule"
+
+    Returns:
+        Tuple of (namespace, local name); the namespace is "" for plain tags
+    """
+    if tag.startswith("{"):
+        namespace, _, local = tag[1:].partition("}")
+        return namespace, local
+    return "", tag
+
+
+def _tags(namespace: str, name: str) -> frozenset[str]:
+    """Return the tags a local name may appear as: namespaced, or plain."""
+    return frozenset((f"{{{namespace}}}{name}" if namespace else name, name))
+
+
+def _child(elem: ElementTree.Element, tags: frozenset[str]) -> ElementTree.Element | None:
+    """Find the first direct child with one of the given tags."""
+    for child in elem:
+        if child.tag in tags:
+            return child
+    return None
+
+
+def _descendant(elem: ElementTree.Element, *path: frozenset[str]) -> ElementTree.Element | None:
+    """Find the first descendant matching a path of tag sets, e.g. check/check-content."""
+    for candidate in elem.iter():
+        if candidate.tag not in path[0]:
+            continue
+        if len(path) == 1:
+            return candidate
+        found = _descendant(candidate, *path[1:])
+        if found is not None:
+            return found
+    return None
+
+
+def _text(elem: ElementTree.Element | None) -> str:
+    """Return the direct text of an element, or an empty string."""
+    if elem is None or not elem.text:
+        return ""
+    return elem.text
+
+
+class XccdfReader:
+    """
+    Streaming reader over the Rules of an XCCDF benchmark.
+
+    Iterating the reader yields an XccdfRule per Rule in document order.
+    The Benchmark header is available as ``reader.benchmark`` once the first
+    rule has been yielded (or iteration finished).
+
+    Args:
+        file_path: Path to the XCCDF XML file
+        keep_elements: Attach the Rule subtree to each record for callers that
+            need fields beyond the common ones
+
+    Raises:
+        ElementTree.ParseError: During iteration, if the XML is malformed
+    """
+
+    def __init__(self, file_path: Path, keep_elements: bool = False):
+        self.file_path = Path(file_path)
+        self.keep_elements = keep_elements
+        self.benchmark = XccdfBenchmark()
+
+    def __iter__(self) -> Iterator[XccdfRule]:
+        # Open elements from the root down; parents[-1] is the current element
+        parents: list[ElementTree.Element] = []
+        # (group id, group title) of the enclosing Groups
+        groups: list[list[str]] = []
+
+        for event, elem in ElementTree.iterparse(self.file_path, events=("start", "end")):
+            tag = elem.tag
+
+            if event == "start":
+                if not parents:
+                    # XCCDF 1.1 and 1.2 differ only by namespace here, so the
+                    # tags are resolved once against the root's namespace
+                    namespace = split_tag(tag)[0]
+                    self.benchmark = XccdfBenchmark(id=elem.get("id", ""), namespace=namespace)
+                    group_tags = _tags(namespace, "Group")
+                    rule_tags = _tags(namespace, "Rule")
+                    title_tags = _tags(namespace, "title")
+                    version_tags = _tags(namespace, "version")
+                    fixtext_tags = _tags(namespace, "fixtext")
+                    check_tags = _tags(namespace, "check")
+                    content_tags = _tags(namespace, "check-content")
+                elif tag in group_tags:
+                    groups.append([elem.get("id", ""), ""])
+                parents.append(elem)
+                continue
+
+            parents.pop()
+
+            if tag in title_tags:
+                if len(parents) == 1 and not self.benchmark.title:
+                    self.benchmark.title = _text(elem)
+                elif groups and parents[-1].tag in group_tags:
+                    groups[-1][1] = _text(elem)
+
+            elif tag in rule_tags:
+                group_id, group_title = groups[-1] if groups else ("", "")
+                yield XccdfRule(
+                    rule_id=elem.get("id", ""),
+                    group_id=group_id,
+                    group_title=group_title,
+                    title=_text(_child(elem, title_tags)),
+                    severity=elem.get("severity", ""),
+                    version=_text(_child(elem, version_tags)),
+                    fix_text=_text(_descendant(elem, fixtext_tags)),
+                    check_content=_text(_descendant(elem, check_tags, content_tags)),
+                    element=elem if self.keep_elements else None,
+                )
+                elem.clear()
+
+            elif tag in group_tags:
+                groups.pop()
+                # Drop the finished Group so the tree never holds more than
+                # the open path from the root
+                if parents:
+                    parents[-1].remove(elem)
+
+
+def file_sha256(file_path: Path) -> str:
+    """Return the SHA-256 hex digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cached_rule_index(cache_file: Path, file_path: Path, sha256: str) -> RuleIndex | None:
+    """Load a cached rule index, or None if it is missing, stale or unreadable."""
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if data.get("format") != RULE_INDEX_FORMAT or data.get("sha256") != sha256:
+        return None
+
+    rule_fields = {f.name for f in fields(XccdfRule)} - {"element"}
+    try:
+        rules = {
+            record["rule_id"]: XccdfRule(**{k: v for k, v in record.items() if k in rule_fields})
+            for record in data["rules"]
+        }
+        benchmark = XccdfBenchmark(**data["benchmark"])
+    except (KeyError, TypeError):
+        return None
+    return RuleIndex(file_path, sha256, benchmark, rules, from_cache=True)
+
+
+def _write_rule_index(cache_file: Path, index: RuleIndex) -> None:
+    """Atomically write a rule index to the cache; failures are ignored."""
+    data = {
+        "format": RULE_INDEX_FORMAT,
+        "source": str(index.source),
+        "sha256": index.sha256,
+        "benchmark": asdict(index.benchmark),
+        "rules": [
+            {k: v for k, v in asdict(rule).items() if k != "element"}
+            for rule in index.rules.values()
+        ],
+    }
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_name, cache_file)
+    except OSError:
+        # The cache is an optimization; an unwritable cache dir just means
+        # the next run parses again
+        pass
+
+
+def load_rule_index(
+    file_path: Path,
+    cache_dir: Path | None = DEFAULT_RULE_INDEX_CACHE_DIR,
+) -> RuleIndex:
+    """
+    Read the rules of an XCCDF benchmark, reusing a cached index when possible.
+
+    The cache entry is keyed by the SHA-256 of the file content, so an updated
+    STIG (even at the same path) is parsed again while repeated runs against
+    the same file only hash it.
+
+    Args:
+        file_path: Path to the XCCDF XML file
+        cache_dir: Directory for cached indexes, or None to always parse
+
+    Returns:
+        RuleIndex with every Rule of the benchmark keyed by rule id
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ElementTree.ParseError: If the XML is malformed
+    """
+    file_path = Path(file_path)
+    sha256 = file_sha256(file_path)
+    cache_file = Path(cache_dir) / f"{sha256}.json" if cache_dir is not None else None
+
+    if cache_file is not None:
+        cached = _cached_rule_index(cache_file, file_path, sha256)
+        if cached is not None:
+            return cached
+
+    reader = XccdfReader(file_path)
+    rules = {rule.rule_id: rule for rule in reader}
+    index = RuleIndex(file_path, sha256, reader.benchmark, rules)
+
+    if cache_file is not None:
+        _write_rule_index(cache_file, index)
+    return index
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Standalone STIG check runner.
+
+generate_checker.py --runner writes a copy of this file with CHECKS filled in
+from each control's validated check commands. The checker playbook copies the
+runner to the host and executes it once: every check runs locally on a thread
+pool with a per-command timeout, and a single JSON document of results is
+written to stdout. A scan therefore costs one connection per host instead of
+one per control.
+
+The runner only depends on the Python standard library and stays compatible
+with the platform Python of the targeted hosts (3.6+), so it must not import
+anything from app/ or scripts/.
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+RUNNER_VERSION = 1
+
+# Product the checks were generated for (filled in by generate_checker.py)
+PRODUCT = ""
+
+# One entry per control, in playbook order (filled in by generate_checker.py):
+#   {"sv_id": ..., "title": ..., "automation_level": ..., "commands": [...], "note": ...}
+# Controls without commands are reported with status "manual" and their note.
+CHECKS = []
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_WORKERS = 8
+
+# Check commands are read-only, but their output can be large (e.g. find over
+# the whole filesystem); keep the result document bounded
+MAX_OUTPUT_CHARS = 65536
+
+
+def _truncate(output):
+    """Decode command output and cap its length."""
+    text = output.decode("utf-8", errors="replace") if output else ""
+    if len(text) > MAX_OUTPUT_CHARS:
+        return text[:MAX_OUTPUT_CHARS] + "\n... [truncated]"
+    return text
+
+
+def run_command(command, timeout):
+    """
+    Run one check command through the shell.
+
+    The command runs in its own session so that a timeout kills the whole
+    pipeline, not just the shell.
+
+    Args:
+        command: Shell command line
+        timeout: Seconds before the command is killed
+
+    Returns:
+        Result dict with command, rc, stdout, stderr, duration and timed_out
+    """
+    start = time.monotonic()
+    result = {"command": command, "rc": None, "stdout": "", "stderr": "", "timed_out": False}
+    try:
+        proc = subprocess.Popen(
+            command,
+            shell=True,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+    except OSError as e:
+        result["stderr"] = str(e)
+        result["duration"] = round(time.monotonic() - start, 3)
+        return result
+
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except OSError:
+            pass
+        stdout, stderr = proc.communicate()
+        result["timed_out"] = True
+
+    result["rc"] = proc.returncode
+    result["stdout"] = _truncate(stdout)
+    result["stderr"] = _truncate(stderr)
+    result["duration"] = round(time.monotonic() - start, 3)
+    return result
+
+
+def run_check(check, timeout):
+    """
+    Run every command of one control in order.
+
+    Status is "manual" when the control has no commands, "timeout" if any
+    command timed out, "error" if a command could not be started,
+    "nonzero_exit" if a command exited non-zero (e.g. grep without a match)
+    and "completed" otherwise. Whether the output is a finding is left to the
+    reviewer, as with the playbook's display tasks.
+
+    Args:
+        check: Entry from CHECKS
+        timeout: Per-command timeout in seconds
+
+    Returns:
+        Result dict for the control
+    """
+    result = {
+        "sv_id": check["sv_id"],
+        "title": check.get("title", ""),
+        "automation_level": check.get("automation_level", "unknown"),
+    }
+    commands = check.get("commands") or []
+    if not commands:
+        result["status"] = "manual"
+        result["note"] = check.get("note", "")
+        result["commands"] = []
+        result["duration"] = 0.0
+        return result
+
+    start = time.monotonic()
+    command_results = [run_command(command, timeout) for command in commands]
+
+    if any(r["timed_out"] for r in command_results):
+        status = "timeout"
+    elif any(r["rc"] is None for r in command_results):
+        status = "error"
+    elif any(r["rc"] != 0 for r in command_results):
+        status = "nonzero_exit"
+    else:
+        status = "completed"
+
+    result["status"] = status
+    result["commands"] = command_results
+    result["duration"] = round(time.monotonic() - start, 3)
+    return result
+
+
+def run_checks(checks, workers=DEFAULT_WORKERS, timeout=DEFAULT_TIMEOUT, only=None):
+    """
+    Run checks concurrently and build the result document.
+
+    Args:
+        checks: Entries shaped like CHECKS
+        workers: Maximum number of checks running at once
+        timeout: Per-command timeout in seconds
+        only: Optional collection of STIG IDs to restrict the run to
+
+    Returns:
+        Result document (results keyed by STIG ID, in input order)
+    """
+    if only:
+        checks = [check for check in checks if check["sv_id"] in only]
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # map() yields in submission order, so the document is deterministic
+        results = list(executor.map(lambda check: run_check(check, timeout), checks))
+
+    summary = {"total": len(results)}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+
+    return {
+        "runner_version": RUNNER_VERSION,
+        "product": PRODUCT,
+        "host": socket.gethostname(),
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "duration": round(time.monotonic() - start, 3),
+        "summary": summary,
+        "results": {result["sv_id"]: result for result in results},
+    }
+
+
+def main(argv=None):
+    """Main entry point for the check runner."""
+    parser = argparse.ArgumentParser(description="Run STIG check commands and report JSON results")
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Maximum concurrent checks (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--timeout", "-t",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Per-command timeout in seconds (default: {DEFAULT_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--only",
+        nargs="*",
+        default=None,
+        help="Only run these STIG IDs"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=None,
+        help="Write the JSON document to this file instead of stdout"
+    )
+
+    args = parser.parse_args(argv)
+
+    document = run_checks(CHECKS, workers=args.workers, timeout=args.timeout, only=args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2)
+    else:
+        json.dump(document, sys.stdout)
+        sys.stdout.write("\n")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
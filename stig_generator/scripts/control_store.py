@@ -0,0 +1,506 @@
+"""Compact binary control store for StigControl records.
+
+The JSON intermediate written by parse_stig.py is convenient to read by hand,
+but every consumer has to decode the whole file just to look at a handful of
+fields. This module provides an alternative on-disk format that is opened via
+``mmap`` and decoded lazily, one field at a time.
+
+File layout (all integers little-endian):
+
+    Header (fixed width, 24 bytes)
+        magic          8s   b"STIGCTL1"
+        version        u16
+        field_count    u16
+        record_count   u32
+        fields_offset  u32  offset of the field name table
+        index_offset   u32  offset of the record offset table
+
+    Field name table
+        field_count x (u16 length + UTF-8 name)
+
+    Record offset table
+        record_count x u64 absolute offset of each record
+
+    Records
+        field_count x (u8 tag + u32 length + payload)
+
+Field tags distinguish a missing key, ``None``, a UTF-8 string and any other
+JSON value (lists, numbers), so a JSON -> store -> JSON round trip is lossless.
+
+For plain JSON inputs, iter_control_dicts() streams records with a field
+projection so generators never materialize fields they do not read.
+
+Usage:
+    python scripts/control_store.py --input data/json/rhel9_v2r6_controls.json --output data/json/rhel9_v2r6_controls.stigdb
+    python scripts/control_store.py --input data/json/rhel9_v2r6_controls.stigdb --output rhel9_v2r6_controls.json
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+logger = logging.getLogger(__name__)
+
+STORE_MAGIC = b"STIGCTL1"
+STORE_VERSION = 1
+STORE_SUFFIX = ".stigdb"
+
+_HEADER = struct.Struct("<8sHHIII")
+_FIELD_NAME_LEN = struct.Struct("<H")
+_RECORD_OFFSET = struct.Struct("<Q")
+_FIELD_PREFIX = struct.Struct("<BI")
+
+_TAG_ABSENT = 0
+_TAG_NONE = 1
+_TAG_STR = 2
+_TAG_JSON = 3
+
+
+def _encode_value(value: Any) -> tuple[int, bytes]:
+    """Encode a single field value into a (tag, payload) pair."""
+    if value is None:
+        return _TAG_NONE, b""
+    if isinstance(value, str):
+        return _TAG_STR, value.encode("utf-8")
+    return _TAG_JSON, json.dumps(value, ensure_ascii=False).encode("utf-8")
+
+
+def write_control_store(controls: Iterable[dict], output_path: Path) -> int:
+    """
+    Write control dicts to a binary control store.
+
+    Field order is the order in which keys are first seen, so stores written
+    from StigControl.to_dict() keep the dataclass field order.
+
+    Args:
+        controls: Control dicts (e.g. StigControl.to_dict() output)
+        output_path: Path where the store should be written
+
+    Returns:
+        Number of records written
+    """
+    records = list(controls)
+    fields: list[str] = []
+    seen: set[str] = set()
+    for record in records:
+        for key in record:
+            if key not in seen:
+                seen.add(key)
+                fields.append(key)
+
+    field_table = bytearray()
+    for name in fields:
+        encoded = name.encode("utf-8")
+        field_table += _FIELD_NAME_LEN.pack(len(encoded))
+        field_table += encoded
+
+    fields_offset = _HEADER.size
+    index_offset = fields_offset + len(field_table)
+    data_offset = index_offset + _RECORD_OFFSET.size * len(records)
+
+    offsets = bytearray()
+    body = bytearray()
+    for record in records:
+        offsets += _RECORD_OFFSET.pack(data_offset + len(body))
+        for name in fields:
+            if name in record:
+                tag, payload = _encode_value(record[name])
+            else:
+                tag, payload = _TAG_ABSENT, b""
+            body += _FIELD_PREFIX.pack(tag, len(payload))
+            body += payload
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "wb") as f:
+        f.write(_HEADER.pack(
+            STORE_MAGIC, STORE_VERSION, len(fields), len(records), fields_offset, index_offset
+        ))
+        f.write(field_table)
+        f.write(offsets)
+        f.write(body)
+
+    logger.info(f"Saved {len(records)} controls to {output_path}")
+    return len(records)
+
+
+class ControlStore:
+    """
+    Read-only, memory-mapped view of a binary control store.
+
+    Opening a store only parses the header and field table; record fields are
+    decoded on demand, so callers pay only for the fields they touch.
+
+    Example:
+        with ControlStore(path) as store:
+            for control in store.iter_records(fields={"sv_id", "title"}):
+                ...
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty control store: {self.path}")
+
+        if len(self._mm) < _HEADER.size:
+            self.close()
+            raise ValueError(f"Truncated control store header: {self.path}")
+
+        magic, version, field_count, record_count, fields_offset, index_offset = _HEADER.unpack_from(self._mm, 0)
+        if magic != STORE_MAGIC:
+            self.close()
+            raise ValueError(f"Not a control store (bad magic): {self.path}")
+        if version != STORE_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported control store version {version}: {self.path}")
+
+        names = []
+        pos = fields_offset
+        for _ in range(field_count):
+            (length,) = _FIELD_NAME_LEN.unpack_from(self._mm, pos)
+            pos += _FIELD_NAME_LEN.size
+            names.append(self._mm[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        self.fields: tuple[str, ...] = tuple(names)
+        self._field_index = {name: i for i, name in enumerate(names)}
+        self._record_count = record_count
+        self._index_offset = index_offset
+        self._sv_id_index: Optional[dict[str, int]] = None
+
+    def __enter__(self) -> "ControlStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._record_count
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_records()
+
+    def __getitem__(self, index: int) -> dict:
+        return self.record(index)
+
+    def close(self) -> None:
+        """Release the memory map and underlying file handle."""
+        mm = getattr(self, "_mm", None)
+        if mm is not None and not mm.closed:
+            mm.close()
+        if not self._file.closed:
+            self._file.close()
+
+    def __del__(self) -> None:
+        # Stores dropped from a cache without close() release their map here
+        if getattr(self, "_file", None) is not None:
+            self.close()
+
+    def _record_offset(self, index: int) -> int:
+        if index < 0:
+            index += self._record_count
+        if not 0 <= index < self._record_count:
+            raise IndexError(f"Record index out of range: {index}")
+        (offset,) = _RECORD_OFFSET.unpack_from(self._mm, self._index_offset + index * _RECORD_OFFSET.size)
+        return offset
+
+    def _decode(self, tag: int, start: int, length: int) -> Any:
+        if tag == _TAG_STR:
+            return self._mm[start:start + length].decode("utf-8")
+        if tag == _TAG_JSON:
+            return json.loads(self._mm[start:start + length].decode("utf-8"))
+        return None
+
+    def get_field(self, index: int, name: str, default: Any = None) -> Any:
+        """
+        Decode a single field of a single record.
+
+        Args:
+            index: Record index
+            name: Field name (e.g. "sv_id")
+            default: Value returned when the record does not carry the field
+
+        Returns:
+            Decoded field value
+        """
+        target = self._field_index.get(name)
+        if target is None:
+            return default
+
+        pos = self._record_offset(index)
+        for _ in range(target):
+            _, length = _FIELD_PREFIX.unpack_from(self._mm, pos)
+            pos += _FIELD_PREFIX.size + length
+
+        tag, length = _FIELD_PREFIX.unpack_from(self._mm, pos)
+        if tag == _TAG_ABSENT:
+            return default
+        return self._decode(tag, pos + _FIELD_PREFIX.size, length)
+
+    def record(self, index: int, fields: Optional[Iterable[str]] = None) -> dict:
+        """
+        Decode one record into a dict.
+
+        Args:
+            index: Record index
+            fields: Optional projection; only these fields are decoded
+
+        Returns:
+            Control dict containing the requested fields that are present
+        """
+        wanted = None if fields is None else set(fields)
+        result = {}
+        pos = self._record_offset(index)
+        for name in self.fields:
+            tag, length = _FIELD_PREFIX.unpack_from(self._mm, pos)
+            pos += _FIELD_PREFIX.size
+            if tag != _TAG_ABSENT and (wanted is None or name in wanted):
+                result[name] = self._decode(tag, pos, length)
+            pos += length
+        return result
+
+    def iter_records(self, fields: Optional[Iterable[str]] = None) -> Iterator[dict]:
+        """Yield every record in file order, optionally projected to ``fields``."""
+        projection = None if fields is None else frozenset(fields)
+        for index in range(self._record_count):
+            yield self.record(index, projection)
+
+    def find(self, sv_id: str) -> Optional[dict]:
+        """
+        Look up a record by STIG ID.
+
+        The sv_id index is built on first use by decoding only the sv_id field.
+
+        Args:
+            sv_id: STIG rule ID (e.g. "SV-257777r991589_rule")
+
+        Returns:
+            Control dict, or None if the ID is not in the store
+        """
+        if self._sv_id_index is None:
+            self._sv_id_index = {
+                self.get_field(i, "sv_id"): i for i in range(self._record_count)
+            }
+        index = self._sv_id_index.get(sv_id)
+        return None if index is None else self.record(index)
+
+
+def is_control_store(path: Path) -> bool:
+    """Return True if ``path`` starts with the control store magic bytes."""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(STORE_MAGIC)) == STORE_MAGIC
+    except OSError:
+        return False
+
+
+_JSON_WS = re.compile(rb"[ \t\n\r]*")
+_JSON_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_JSON_SCALAR = re.compile(rb"[^,\]}\s]+")
+_JSON_STRUCTURAL = re.compile(rb'["{}\[\]]')
+
+
+def _skip_ws(buf, pos: int) -> int:
+    return _JSON_WS.match(buf, pos).end()
+
+
+def _skip_json_value(buf, pos: int) -> int:
+    """Return the offset just past the JSON value starting at ``pos`` without decoding it."""
+    first = buf[pos:pos + 1]
+    if first == b'"':
+        match = _JSON_STRING.match(buf, pos)
+        if match is None:
+            raise ValueError(f"Unterminated JSON string at offset {pos}")
+        return match.end()
+
+    if first in (b"{", b"["):
+        depth = 0
+        while True:
+            match = _JSON_STRUCTURAL.search(buf, pos)
+            if match is None:
+                raise ValueError(f"Unterminated JSON container at offset {pos}")
+            token = match.group()
+            if token == b'"':
+                pos = _skip_json_value(buf, match.start())
+                continue
+            pos = match.end()
+            depth += 1 if token in (b"{", b"[") else -1
+            if depth == 0:
+                return pos
+
+    match = _JSON_SCALAR.match(buf, pos)
+    if match is None:
+        raise ValueError(f"Invalid JSON value at offset {pos}")
+    return match.end()
+
+
+def _expect(buf, pos: int, token: bytes) -> int:
+    if buf[pos:pos + 1] != token:
+        raise ValueError(f"Expected {token.decode()!r} at offset {pos} in controls JSON")
+    return pos + 1
+
+
+def _iter_json_array(buf, fields: Optional[frozenset]) -> Iterator[dict]:
+    """
+    Stream objects out of a top-level JSON array held in ``buf``.
+
+    Keys outside ``fields`` are skipped with byte-level scanning and never
+    decoded; only the projected values are passed through ``json.loads``.
+    """
+    pos = _expect(buf, _skip_ws(buf, 0), b"[")
+    pos = _skip_ws(buf, pos)
+    if buf[pos:pos + 1] == b"]":
+        return
+
+    while True:
+        pos = _expect(buf, pos, b"{")
+        record = {}
+        pos = _skip_ws(buf, pos)
+        if buf[pos:pos + 1] == b"}":
+            pos += 1
+        else:
+            while True:
+                key_end = _skip_json_value(buf, pos)
+                raw_key = buf[pos + 1:key_end - 1]
+                key = json.loads(buf[pos:key_end]) if b"\\" in raw_key else raw_key.decode("utf-8")
+                pos = _skip_ws(buf, _expect(buf, _skip_ws(buf, key_end), b":"))
+                value_end = _skip_json_value(buf, pos)
+                if fields is None or key in fields:
+                    record[key] = json.loads(buf[pos:value_end])
+                pos = _skip_ws(buf, value_end)
+                if buf[pos:pos + 1] == b"}":
+                    pos += 1
+                    break
+                pos = _skip_ws(buf, _expect(buf, pos, b","))
+        yield record
+
+        pos = _skip_ws(buf, pos)
+        if buf[pos:pos + 1] == b"]":
+            return
+        pos = _skip_ws(buf, _expect(buf, pos, b","))
+
+
+def iter_control_dicts(path: Path, fields: Optional[Iterable[str]] = None) -> Iterator[dict]:
+    """
+    Stream control dicts from a JSON file or a binary control store.
+
+    With a ``fields`` projection, only those keys are materialized. JSON files
+    are scanned through ``mmap``, so the raw text is never decoded into a
+    Python string and unused fields (e.g. ``description``) are never built.
+
+    Args:
+        path: Path to a JSON controls file or a control store
+        fields: Optional set of field names to keep (e.g. {"sv_id", "check_text"})
+
+    Yields:
+        Control dicts, in file order
+    """
+    projection = None if fields is None else frozenset(fields)
+
+    if is_control_store(path):
+        with ControlStore(path) as store:
+            yield from store.iter_records(projection)
+        return
+
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ValueError(f"Empty controls file: {path}")
+        try:
+            yield from _iter_json_array(buf, projection)
+        finally:
+            buf.close()
+
+
+def load_control_dicts(path: Path, fields: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Load control dicts from either a JSON file or a binary control store.
+
+    This is the adapter used by the existing ``load_controls_from_json``
+    functions so that every generator accepts both formats.
+
+    Args:
+        path: Path to a JSON controls file or a control store
+        fields: Optional field projection; see iter_control_dicts()
+
+    Returns:
+        List of control dicts
+    """
+    if fields is not None:
+        return list(iter_control_dicts(path, fields))
+
+    if is_control_store(path):
+        with ControlStore(path) as store:
+            return list(store.iter_records())
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_control_dicts(controls: Iterable[dict], output_path: Path) -> None:
+    """
+    Save control dicts as JSON, or as a control store when the path ends in .stigdb.
+
+    Args:
+        controls: Control dicts
+        output_path: Destination path; the suffix selects the format
+    """
+    if output_path.suffix == STORE_SUFFIX:
+        write_control_store(controls, output_path)
+        return
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(list(controls), f, indent=2, ensure_ascii=False)
+
+
+def main():
+    """Main entry point: convert between JSON and the binary control store."""
+    parser = argparse.ArgumentParser(
+        description="Convert StigControl JSON to/from the binary control store"
+    )
+    parser.add_argument(
+        "--input", "-i",
+        type=Path,
+        required=True,
+        help="Path to input JSON file or control store"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        required=True,
+        help=f"Path to output file ({STORE_SUFFIX} for a control store, anything else for JSON)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        controls = load_control_dicts(args.input)
+        save_control_dicts(controls, args.output)
+        logger.info(f"✓ Converted {len(controls)} controls: {args.input} → {args.output}")
+    except FileNotFoundError as e:
+        logger.error(f"File not found: {e}")
+        return 1
+    except ValueError as e:
+        logger.error(f"Invalid input: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
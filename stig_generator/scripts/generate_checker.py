@@ -12,30 +12,51 @@ Usage:
 """
 
 import argparse
-import json
 import logging
 import re
+import shlex
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from app.generators.extractors import (
-    extract_check_commands_from_block,
-    is_probable_cli_command,
-    normalize_command_line,
-)
+from app.generators.extractors import is_probable_cli_command, normalize_command_line
+from app.model.controls import CheckCommandAnalysis
+from scripts.control_store import load_control_dicts
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def load_controls_from_json(json_path: Path) -> list[dict]:
-    """Load StigControl objects from JSON file."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        controls = json.load(f)
+# Control fields read by the checker generator; everything else (notably the
+# long description and fix text) is skipped when loading with a field projection.
+CHECKER_FIELDS = frozenset({
+    "sv_id",
+    "title",
+    "check_text",
+    "product",
+    "category",
+    "automation_level",
+    "automation_source",
+    "check_analysis",
+})
+
+
+def load_controls_from_json(json_path: Path, fields: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Load StigControl objects from JSON file (or a binary .stigdb control store).
+    
+    Args:
+        json_path: Path to JSON file or control store
+        fields: Optional field projection (e.g. CHECKER_FIELDS); records are streamed
+            and fields outside the projection are never materialized
+        
+    Returns:
+        List of StigControl dicts
+    """
+    controls = load_control_dicts(json_path, fields)
     logger.info(f"Loaded {len(controls)} controls from {json_path}")
     return controls
 
@@ -145,6 +166,30 @@ def _extract_mount_path(text: str) -> Optional[str]:
     return None
 
 
+def _valid_check_commands(control: dict) -> list[str]:
+    """Validated check commands for a control dict."""
+    # Check commands from the parse-time analysis (extracted here if it was
+    # computed for another OS family or the control predates it)
+    check_commands = CheckCommandAnalysis.commands_for(
+        control.get("check_analysis"), control.get("check_text", "") or "", control.get("product", "rhel9")
+    )
+    # Filter for real commands
+    return [cmd for cmd in check_commands if is_probable_cli_command(cmd)]
+
+
+def _manual_check_message(sv_id: str, automation_level: str, automation_source: str) -> str:
+    """Message shown for a control that has no automated check."""
+    manual_msg = f"{sv_id} requires manual verification"
+    if automation_level == "manual_only":
+        if automation_source in ["scap", "nessus"]:
+            manual_msg += f". Not covered by {automation_source} automated scans. See CTP document for procedure."
+        else:
+            manual_msg += ". See CTP document for procedure."
+    elif automation_level == "unknown":
+        manual_msg += ". Automation status unknown. See CTP document for procedure."
+    return manual_msg
+
+
 def generate_checker_task(control: dict) -> list[str]:
     """
     Generate checker task for a control.
@@ -179,11 +224,7 @@ def generate_checker_task(control: dict) -> list[str]:
     
     var_name = _sanitize_var_name(f"{sv_id}_check")
     
-    # Extract check commands using existing extractor
-    check_commands, _ = extract_check_commands_from_block(check_text, product)
-    
-    # Filter for real commands
-    valid_commands = [cmd for cmd in check_commands if is_probable_cli_command(cmd)]
+    valid_commands = _valid_check_commands(control)
     
     # For automated controls: prefer modules that mirror SCAP/OVAL/Nessus checks
     # For manual_only: focus on guiding human tester with clear manual verification steps
@@ -404,14 +445,7 @@ def generate_checker_task(control: dict) -> list[str]:
             ]
     
     # Manual or no valid commands
-    manual_msg = f"{sv_id} requires manual verification"
-    if automation_level_normalized == "manual_only":
-        if automation_source in ["scap", "nessus"]:
-            manual_msg += f". Not covered by {automation_source} automated scans. See CTP document for procedure."
-        else:
-            manual_msg += ". See CTP document for procedure."
-    elif automation_level_normalized == "unknown":
-        manual_msg += ". Automation status unknown. See CTP document for procedure."
+    manual_msg = _manual_check_message(sv_id, automation_level_normalized, automation_source)
     
     return [
         f"    - name: '{sv_id} | {title}'",
@@ -469,6 +503,132 @@ def get_product_tag_from_controls(controls: list[dict], fallback: str = "rhel9")
     return fallback
 
 
+def normalize_tag_level(automation_level: str) -> str:
+    """Normalize an automation level (including legacy values) for tagging."""
+    if automation_level in ["automatable", "scannable_with_nessus"]:
+        return "automated"
+    elif automation_level == "semi_automatable":
+        return "manual_only"  # OCIL is not fully automated
+    elif automation_level in ["manual", "not_scannable_with_nessus"]:
+        return "manual_only"
+    elif automation_level == "unknown":
+        return "unknown"
+    return automation_level  # "automated", "manual_only", "unknown"
+
+
+def add_automation_tag(task_lines: list[str], automation_level: str) -> list[str]:
+    """
+    Add the validate_<level> tag to every tags section of a control's tasks.
+    
+    Args:
+        task_lines: YAML lines for the control's tasks
+        automation_level: Control automation level (raw or normalized)
+        
+    Returns:
+        Task lines with the automation level tag added
+    """
+    tag_name = f"validate_{normalize_tag_level(automation_level)}"
+    if tag_name in "\n".join(task_lines):
+        return task_lines
+    
+    # Find all "tags:" sections and add automation level
+    new_task_lines = []
+    for i, line in enumerate(task_lines):
+        new_task_lines.append(line)
+        if line.strip() == "tags:":
+            # Look ahead to find where tags end
+            j = i + 1
+            while j < len(task_lines) and (task_lines[j].startswith("        -") or task_lines[j].strip() == ""):
+                j += 1
+            # Insert automation level tag before the closing
+            if j < len(task_lines):
+                new_task_lines.append(f"        - {tag_name}")
+    return new_task_lines
+
+
+def _write_playbook_header(f, controls: list[dict], product_tag: str) -> None:
+    """Write the header comments, play definition and OS pre_tasks of a checker playbook."""
+    os_family = os_family_for_product(product_tag)
+    product_name = format_product_name(product_tag)
+    
+    # Write header with SCAP-based automation level counts
+    f.write(f"# Generated checker playbook for {product_tag}\n")
+    f.write(f"# Total Controls: {len(controls)}\n")
+    
+    # Count by automation level
+    automated = sum(1 for c in controls if c.get("automation_level") in ["automated", "automatable", "scannable_with_nessus"])
+    manual_only = sum(1 for c in controls if c.get("automation_level") in ["manual_only", "manual", "not_scannable_with_nessus"])
+    unknown = sum(1 for c in controls if c.get("automation_level") == "unknown")
+    
+    f.write(f"#   - Automated: {automated} ({automated*100//len(controls) if controls else 0}%)\n")
+    f.write(f"#   - Manual-only: {manual_only} ({manual_only*100//len(controls) if controls else 0}%)\n")
+    if unknown > 0:
+        f.write(f"#   - Unknown: {unknown} ({unknown*100//len(controls) if controls else 0}%)\n")
+    
+    f.write("\n")
+    f.write("# Validation usage:\n")
+    f.write("#   - Validate automated controls only:\n")
+    f.write("#       ansible-playbook checker.yml --tags validate_automated\n")
+    f.write("#   - Validate manual-only controls only:\n")
+    f.write("#       ansible-playbook checker.yml --tags validate_manual_only\n")
+    f.write("#   - Validate all controls:\n")
+    f.write("#       ansible-playbook checker.yml\n")
+    f.write("\n")
+    
+    # Write playbook structure
+    f.write(f"- name: Validate {product_name} STIG controls\n")
+    f.write("  hosts: all\n")
+    f.write("  become: yes\n")
+    f.write("  gather_facts: yes\n")
+    f.write("  vars:\n")
+    f.write("    # Place any tunable defaults here if needed later\n")
+    
+    # Add OS assert pre_tasks
+    if os_family == "RedHat":
+        f.write("  pre_tasks:\n")
+        # Extract version from product (e.g., "rhel8" -> "8")
+        version_match = re.search(r'(\d+)', product_tag)
+        version = version_match.group(1) if version_match else "9"
+        f.write(f"    - name: Verify {product_name} OS family\n")
+        f.write("      ansible.builtin.assert:\n")
+        f.write("        that:\n")
+        f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+        f.write(f"          - ansible_facts['distribution_major_version'] == '{version}'\n")
+        f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''distribution_major_version''] }} }}'\n")
+        f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    elif os_family == "Windows":
+        f.write("  pre_tasks:\n")
+        f.write(f"    - name: Verify {product_name} OS family\n")
+        f.write("      ansible.builtin.assert:\n")
+        f.write("        that:\n")
+        f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+        if "2022" in product_tag:
+            f.write("          - ansible_facts['os_version'] is version('10.0.20348', '>=')\n")
+        elif "2019" in product_tag:
+            f.write("          - ansible_facts['os_version'] is version('10.0.17763', '>=')\n")
+        f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''os_version''] }} }}'\n")
+        f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    elif os_family:
+        f.write("  pre_tasks:\n")
+        f.write(f"    - name: Verify {product_name} OS family\n")
+        f.write("      ansible.builtin.assert:\n")
+        f.write("        that:\n")
+        f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+        f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }}'\n")
+        f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    
+    f.write("\n")
+    f.write("  tasks:\n")
+
+
+def _write_task_lines(f, task_lines: list[str]) -> None:
+    """Write one control's (or one bulk collection's) task lines."""
+    f.write("\n")
+    for line in task_lines:
+        f.write(f"{line}\n")
+    f.write("\n")
+
+
 def generate_checker_playbook(controls: list[dict], output_path: Path, product: str = "rhel9") -> None:
     """
     Generate Ansible checker playbook from StigControl objects.
@@ -482,123 +642,554 @@ def generate_checker_playbook(controls: list[dict], output_path: Path, product:
     
     # Extract product from controls or use fallback
     product_tag = get_product_tag_from_controls(controls, product)
-    os_family = os_family_for_product(product_tag)
-    product_name = format_product_name(product_tag)
     
     with open(output_path, "w") as f:
-        # Write header with SCAP-based automation level counts
-        f.write(f"# Generated checker playbook for {product_tag}\n")
-        f.write(f"# Total Controls: {len(controls)}\n")
+        _write_playbook_header(f, controls, product_tag)
         
-        # Count by automation level
-        automated = sum(1 for c in controls if c.get("automation_level") in ["automated", "automatable", "scannable_with_nessus"])
-        manual_only = sum(1 for c in controls if c.get("automation_level") in ["manual_only", "manual", "not_scannable_with_nessus"])
-        unknown = sum(1 for c in controls if c.get("automation_level") == "unknown")
+        # Generate tasks for each control
+        for control in controls:
+            # Generate task lines, tagged with the control's automation level
+            task_lines = generate_checker_task(control)
+            task_lines = add_automation_tag(task_lines, control.get("automation_level", "manual"))
+            _write_task_lines(f, task_lines)
+    
+    logger.info(f"Generated checker playbook with {len(controls)} tasks")
+
+
+# Bulk fact groups, in the order their collection tasks are emitted. "mounts"
+# needs no collection task: it reads the facts gathered at play start.
+BULK_CHECK_GROUPS = ("files", "packages", "services", "sysctl", "mounts", "commands")
+
+
+def _extract_sysctl_value(text: str, param: str) -> Optional[str]:
+    """Extract the expected single-token value of a sysctl parameter from text."""
+    match = re.search(rf'^\s*(?:\$\s*)?{re.escape(param)}\s*=\s*(\S+)\s*$', text, re.MULTILINE)
+    if match:
+        return match.group(1)
+    return None
+
+
+def _service_unit(name: str) -> str:
+    """Return the systemd unit name as reported by service_facts."""
+    return name if "." in name else f"{name}.service"
+
+
+def plan_bulk_check(control: dict) -> Optional[tuple[str, dict]]:
+    """
+    Decide whether a control can be answered from a bulk fact collection.
+    
+    Uses the same extractors as generate_checker_task, so a control is only
+    consolidated when the per-control generator would have emitted a module
+    check for it.
+    
+    Args:
+        control: StigControl dict
         
-        f.write(f"#   - Automated: {automated} ({automated*100//len(controls) if controls else 0}%)\n")
-        f.write(f"#   - Manual-only: {manual_only} ({manual_only*100//len(controls) if controls else 0}%)\n")
-        if unknown > 0:
-            f.write(f"#   - Unknown: {unknown} ({unknown*100//len(controls) if controls else 0}%)\n")
+    Returns:
+        (group, item) where group is one of BULK_CHECK_GROUPS, or None when the
+        control needs its own task
+    """
+    check_text = control.get("check_text", "") or ""
+    category = control.get("category", "other")
+    
+    if category in ("file_permissions", "file_owner"):
+        file_path = _extract_file_path(check_text)
+        if file_path:
+            return "files", {"path": file_path, "mode": _extract_file_mode(check_text)}
+    
+    elif category in ("package_absent", "package_present"):
+        package_name = _extract_package_name(check_text)
+        if package_name:
+            return "packages", {"name": package_name, "present": category == "package_present"}
+    
+    elif category in ("service_enabled", "service_disabled"):
+        service_name = _extract_service_name(check_text)
+        if service_name:
+            return "services", {"unit": _service_unit(service_name), "enabled": category == "service_enabled"}
+    
+    # Mirror generate_checker_task: sysctl and mount checks are tried after
+    # the file/package/service branches
+    if category == "sysctl":
+        sysctl_param = _extract_sysctl_param(check_text)
+        if sysctl_param:
+            return "sysctl", {"name": sysctl_param, "value": _extract_sysctl_value(check_text, sysctl_param)}
+    
+    if category == "mount_option":
+        mount_path = _extract_mount_path(check_text)
+        if mount_path:
+            return "mounts", {"path": mount_path}
+    
+    # Fallback command checks are batched into one shell script, as long as the
+    # command is a single, well-quoted line that cannot break the script
+    valid_commands = _valid_check_commands(control)
+    if valid_commands:
+        cmd = normalize_command_line(valid_commands[0])
+        if "\n" not in cmd and _is_well_quoted(cmd):
+            return "commands", {"cmd": cmd}
+    
+    return None
+
+
+def _is_well_quoted(cmd: str) -> bool:
+    """Check that a command has balanced quotes and parentheses outside quotes."""
+    try:
+        tokens = shlex.split(cmd, posix=True)
+    except ValueError:
+        return False
+    unquoted = re.sub(r"'[^']*'|\"(?:[^\"\\]|\\.)*\"", "", cmd)
+    return bool(tokens) and unquoted.count("(") == unquoted.count(")")
+
+
+def generate_bulk_collection_tasks(group: str, items: list[tuple[dict, dict]]) -> list[str]:
+    """
+    Generate the task(s) that collect facts for every control in a bulk group.
+    
+    Collection tasks are tagged `always` so filtering by STIG ID or
+    automation level still gathers the facts the per-control asserts read.
+    
+    Args:
+        group: One of BULK_CHECK_GROUPS
+        items: (control, item) pairs planned for the group (see plan_bulk_check)
         
-        f.write("\n")
-        f.write("# Validation usage:\n")
-        f.write("#   - Validate automated controls only:\n")
-        f.write("#       ansible-playbook checker.yml --tags validate_automated\n")
-        f.write("#   - Validate manual-only controls only:\n")
-        f.write("#       ansible-playbook checker.yml --tags validate_manual_only\n")
-        f.write("#   - Validate all controls:\n")
-        f.write("#       ansible-playbook checker.yml\n")
-        f.write("\n")
+    Returns:
+        List of YAML lines (empty when the group needs no collection)
+    """
+    tags = [
+        "      tags:",
+        "        - stig_check",
+        "        - always",
+    ]
+    
+    if group == "files":
+        paths = " ".join(sorted({item["path"] for _, item in items}))
+        return [
+            f"    - name: 'Collect file metadata for {len(items)} controls'",
+            "      ansible.builtin.shell:",
+            "        cmd: |",
+            "          printf '{'",
+            f"          stat -L -c '\"%n\": {{\"mode\": \"%a\", \"owner\": \"%U\", \"group\": \"%G\"}},' {paths} 2>/dev/null",
+            "          printf '\"\": null}'",
+            "      register: stig_bulk_files",
+            "      changed_when: false",
+            "      failed_when: false",
+            "      check_mode: false",
+        ] + tags + [
+            "",
+            "    - name: 'Index collected file metadata'",
+            "      ansible.builtin.set_fact:",
+            "        stig_file_facts: \"{{ stig_bulk_files.stdout | from_json }}\"",
+        ] + tags
+    
+    if group == "packages":
+        return [
+            f"    - name: 'Collect installed packages for {len(items)} controls'",
+            "      ansible.builtin.package_facts:",
+            "        manager: auto",
+        ] + tags
+    
+    if group == "services":
+        return [
+            f"    - name: 'Collect service states for {len(items)} controls'",
+            "      ansible.builtin.service_facts:",
+        ] + tags
+    
+    if group == "sysctl":
+        names = sorted({item["name"] for _, item in items})
+        return [
+            f"    - name: 'Collect kernel parameters for {len(items)} controls'",
+            "      ansible.builtin.command:",
+            "        argv:",
+            "          - sysctl",
+            "          - -e",
+        ] + [f"          - {name}" for name in names] + [
+            "      register: stig_bulk_sysctl",
+            "      changed_when: false",
+            "      failed_when: false",
+            "      check_mode: false",
+        ] + tags + [
+            "",
+            "    - name: 'Index collected kernel parameters'",
+            "      ansible.builtin.set_fact:",
+            "        stig_sysctl_facts: \"{{ dict(stig_bulk_sysctl.stdout_lines | select('search', ' = ') | map('split', ' = ')) }}\"",
+        ] + tags
+    
+    if group == "mounts":
+        return []
+    
+    if group == "commands":
+        # One line per control: "<sv_id>\t<base64 of combined output>"
+        script = []
+        for control, item in items:
+            sv_id = control.get("sv_id", "UNKNOWN")
+            script.append(f"          printf '%s\\t' '{sv_id}'; ( {item['cmd']} ) </dev/null 2>&1 | base64 -w0; echo")
+        return [
+            f"    - name: 'Run check commands for {len(items)} controls'",
+            "      ansible.builtin.shell:",
+            "        cmd: |",
+        ] + script + [
+            "      register: stig_bulk_commands",
+            "      changed_when: false",
+            "      failed_when: false",
+            "      check_mode: false",
+        ] + tags + [
+            "",
+            "    - name: 'Index check command output'",
+            "      ansible.builtin.set_fact:",
+            "        stig_command_facts: \"{{ dict(stig_bulk_commands.stdout_lines | select('search', '\\t') | map('split', '\\t')) }}\"",
+        ] + tags
+    
+    raise ValueError(f"Unknown bulk check group: {group}")
+
+
+def generate_bulk_evaluation_task(control: dict, group: str, item: dict) -> list[str]:
+    """
+    Generate the local pass/fail evaluation for a consolidated control.
+    
+    The assert/debug runs on the controller against the collected facts, so it
+    costs no round-trip to the host. Failed asserts are ignored so one finding
+    does not stop evaluation of the remaining controls.
+    
+    Args:
+        control: StigControl dict
+        group: Bulk group the control was planned into
+        item: Planned item (see plan_bulk_check)
         
-        # Write playbook structure
-        f.write(f"- name: Validate {product_name} STIG controls\n")
-        f.write("  hosts: all\n")
-        f.write("  become: yes\n")
-        f.write("  gather_facts: yes\n")
-        f.write("  vars:\n")
-        f.write("    # Place any tunable defaults here if needed later\n")
+    Returns:
+        List of YAML lines
+    """
+    sv_id = control.get("sv_id", "UNKNOWN")
+    tags = [
+        "      tags:",
+        "        - stig_check",
+        f"        - {sv_id}",
+        f"        - validate_{normalize_tag_level(control.get('automation_level', 'manual'))}",
+    ]
+    
+    def assert_task(name: str, that: list[str], fail_msg: str, success_msg: str) -> list[str]:
+        return [
+            f"    - name: '{sv_id} | {name}'",
+            "      ansible.builtin.assert:",
+            "        that:",
+        ] + [f"          - '{condition}'" for condition in that] + [
+            f"        fail_msg: \"{sv_id} failed: {fail_msg}\"",
+            f"        success_msg: \"{sv_id} passed: {success_msg}\"",
+            "      ignore_errors: true",
+        ] + tags
+    
+    if group == "files":
+        path = item["path"]
+        if item["mode"]:
+            return assert_task(
+                "Assert file permissions",
+                [
+                    f'stig_file_facts["{path}"] is defined',
+                    f'(stig_file_facts["{path}"].mode | int(base=8)) == ("{item["mode"]}" | int(base=8))',
+                ],
+                "File permissions do not match",
+                "File permissions are correct",
+            )
+        return [
+            f"    - name: '{sv_id} | Display file metadata'",
+            "      ansible.builtin.debug:",
+            f"        msg: \"{path}: {{{{ stig_file_facts['{path}'] | default('missing') }}}}\"",
+        ] + tags
+    
+    if group == "packages":
+        name = item["name"]
+        if item["present"]:
+            return assert_task(
+                "Assert package is installed",
+                [f'"{name}" in ansible_facts.packages'],
+                f"Package {name} is not installed",
+                f"Package {name} is installed",
+            )
+        return assert_task(
+            "Assert package is not installed",
+            [f'"{name}" not in ansible_facts.packages'],
+            f"Package {name} is installed (should be absent)",
+            f"Package {name} is not installed",
+        )
+    
+    if group == "services":
+        unit = item["unit"]
+        service = f'ansible_facts.services["{unit}"]'
+        if item["enabled"]:
+            return assert_task(
+                f"Assert service {unit} is enabled",
+                [
+                    f"{service} is defined",
+                    f'{service}.status == "enabled"',
+                    f'{service}.state == "running"',
+                ],
+                f"Service {unit} is not enabled",
+                f"Service {unit} is enabled",
+            )
+        return assert_task(
+            f"Assert service {unit} is disabled",
+            [
+                f'{service} is not defined or {service}.status in ["disabled", "masked"]',
+                f'{service} is not defined or {service}.state != "running"',
+            ],
+            f"Service {unit} is not disabled",
+            f"Service {unit} is disabled",
+        )
+    
+    if group == "sysctl":
+        name = item["name"]
+        if item["value"] is not None:
+            return assert_task(
+                "Assert sysctl parameter",
+                [f'stig_sysctl_facts["{name}"] | default("") == "{item["value"]}"'],
+                f"{name} is not set to {item['value']}",
+                f"{name} is set to {item['value']}",
+            )
+        return [
+            f"    - name: '{sv_id} | Display sysctl value'",
+            "      ansible.builtin.debug:",
+            f"        msg: \"{name} = {{{{ stig_sysctl_facts['{name}'] | default('unset') }}}}\"",
+        ] + tags
+    
+    if group == "mounts":
+        path = item["path"]
+        return [
+            f"    - name: '{sv_id} | Check mount options for {path}'",
+            "      ansible.builtin.debug:",
+            f"        msg: \"Mount point {path} options: {{{{ ansible_facts.mounts | selectattr('mount', 'equalto', '{path}') | map(attribute='options') | list }}}}\"",
+        ] + tags
+    
+    if group == "commands":
+        return [
+            f"    - name: '{sv_id} | Display check result'",
+            "      ansible.builtin.debug:",
+            f"        msg: \"{{{{ stig_command_facts['{sv_id}'] | default('') | b64decode }}}}\"",
+        ] + tags
+    
+    raise ValueError(f"Unknown bulk check group: {group}")
+
+
+def generate_consolidated_checker_playbook(
+    controls: list[dict], output_path: Path, product: str = "rhel9"
+) -> dict[str, int]:
+    """
+    Generate a checker playbook that batches fact collection across controls.
+    
+    File metadata, installed packages, service states, kernel parameters and
+    the output of read-only check commands are each collected by one task per
+    host (mount options come from the facts gathered at play start); every
+    consolidated control is then evaluated locally with assert/debug against
+    those facts. Controls that
+    cannot be consolidated get the same per-control tasks as
+    generate_checker_playbook. Every control keeps its STIG ID and automation
+    level tags.
+    
+    Args:
+        controls: List of StigControl dicts
+        output_path: Path where playbook YAML should be written
+        product: Product identifier (e.g., "rhel9") - used as fallback if not in controls
         
-        # Add OS assert pre_tasks
-        if os_family == "RedHat":
-            f.write("  pre_tasks:\n")
-            # Extract version from product (e.g., "rhel8" -> "8")
-            version_match = re.search(r'(\d+)', product_tag)
-            version = version_match.group(1) if version_match else "9"
-            f.write(f"    - name: Verify {product_name} OS family\n")
-            f.write("      ansible.builtin.assert:\n")
-            f.write("        that:\n")
-            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-            f.write(f"          - ansible_facts['distribution_major_version'] == '{version}'\n")
-            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''distribution_major_version''] }} }}'\n")
-            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
-        elif os_family == "Windows":
-            f.write("  pre_tasks:\n")
-            f.write(f"    - name: Verify {product_name} OS family\n")
-            f.write("      ansible.builtin.assert:\n")
-            f.write("        that:\n")
-            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-            if "2022" in product_tag:
-                f.write("          - ansible_facts['os_version'] is version('10.0.20348', '>=')\n")
-            elif "2019" in product_tag:
-                f.write("          - ansible_facts['os_version'] is version('10.0.17763', '>=')\n")
-            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''os_version''] }} }}'\n")
-            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
-        elif os_family:
-            f.write("  pre_tasks:\n")
-            f.write(f"    - name: Verify {product_name} OS family\n")
-            f.write("      ansible.builtin.assert:\n")
-            f.write("        that:\n")
-            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }}'\n")
-            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    Returns:
+        Number of consolidated controls per bulk group, plus "individual"
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    product_tag = get_product_tag_from_controls(controls, product)
+    # Bulk collection relies on a POSIX shell, rpm/dpkg and systemd
+    can_consolidate = os_family_for_product(product_tag) not in ("Windows", "network")
+    
+    planned: dict[str, list[tuple[dict, dict]]] = {group: [] for group in BULK_CHECK_GROUPS}
+    individual: list[dict] = []
+    for control in controls:
+        plan = plan_bulk_check(control) if can_consolidate else None
+        if plan:
+            group, item = plan
+            planned[group].append((control, item))
+        else:
+            individual.append(control)
+    
+    with open(output_path, "w") as f:
+        _write_playbook_header(f, controls, product_tag)
         
-        f.write("\n")
-        f.write("  tasks:\n")
+        for group in BULK_CHECK_GROUPS:
+            if not planned[group]:
+                continue
+            collection_tasks = generate_bulk_collection_tasks(group, planned[group])
+            if collection_tasks:
+                _write_task_lines(f, collection_tasks)
+            for control, item in planned[group]:
+                _write_task_lines(f, generate_bulk_evaluation_task(control, group, item))
+        
+        for control in individual:
+            task_lines = generate_checker_task(control)
+            task_lines = add_automation_tag(task_lines, control.get("automation_level", "manual"))
+            _write_task_lines(f, task_lines)
+    
+    counts = {group: len(planned[group]) for group in BULK_CHECK_GROUPS}
+    counts["individual"] = len(individual)
+    consolidated = sum(counts[group] for group in BULK_CHECK_GROUPS)
+    collections = sum(1 for group in BULK_CHECK_GROUPS if planned[group] and group != "mounts")
+    logger.info(
+        f"Generated consolidated checker playbook: {consolidated} controls from "
+        f"{collections} bulk collections, {len(individual)} individual checks"
+    )
+    return counts
+
+
+# Template for the standalone check runner written by generate_check_runner()
+CHECK_RUNNER_TEMPLATE = Path(__file__).with_name("check_runner.py")
+
+
+def build_runner_checks(controls: list[dict]) -> list[dict]:
+    """
+    Build the runner's CHECKS entries from the controls' validated check commands.
+    
+    Args:
+        controls: List of StigControl dicts
+        
+    Returns:
+        One entry per control, in control order
+    """
+    checks = []
+    for control in controls:
+        sv_id = control.get("sv_id", "UNKNOWN")
+        automation_level = normalize_tag_level(control.get("automation_level", "unknown"))
+        commands = [normalize_command_line(cmd) for cmd in _valid_check_commands(control)]
+        check = {
+            "sv_id": sv_id,
+            "title": control.get("title", "")[:80],
+            "automation_level": automation_level,
+            "commands": [cmd for cmd in commands if cmd],
+        }
+        if not check["commands"]:
+            check["note"] = _manual_check_message(
+                sv_id, automation_level, control.get("automation_source", "none")
+            )
+        checks.append(check)
+    return checks
+
+
+def generate_check_runner(controls: list[dict], runner_path: Path, product: str = "rhel9") -> int:
+    """
+    Write the standalone check runner with the controls' checks embedded.
+    
+    Args:
+        controls: List of StigControl dicts
+        runner_path: Path where the runner script should be written
+        product: Product identifier (e.g., "rhel9") - used as fallback if not in controls
+        
+    Returns:
+        Number of controls with at least one command to run
+    """
+    runner_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    product_tag = get_product_tag_from_controls(controls, product)
+    checks = build_runner_checks(controls)
+    
+    # Python literals are valid for the embedded data (repr of str/list/dict)
+    checks_literal = "[\n" + "".join(f"    {check!r},\n" for check in checks) + "]"
+    source = CHECK_RUNNER_TEMPLATE.read_text()
+    source = source.replace('\nPRODUCT = ""\n', f"\nPRODUCT = {product_tag!r}\n", 1)
+    source = source.replace("\nCHECKS = []\n", f"\nCHECKS = {checks_literal}\n", 1)
+    
+    runner_path.write_text(source)
+    runner_path.chmod(0o755)
+    
+    automated = sum(1 for check in checks if check["commands"])
+    logger.info(f"Generated check runner with {automated} command checks and {len(checks) - automated} manual entries")
+    return automated
+
+
+def generate_runner_checker_playbook(
+    controls: list[dict], output_path: Path, product: str = "rhel9", runner_path: Optional[Path] = None
+) -> Optional[Path]:
+    """
+    Generate a checker playbook that runs all checks through the standalone runner.
+    
+    The runner (see scripts/check_runner.py) is written next to the playbook,
+    copied to each host by the script module and executed once, so a scan
+    costs a single connection per host. Its JSON document is saved on the
+    controller and every control gets a local debug task showing its result,
+    tagged with the STIG ID and automation level.
+    
+    Windows and network products have no POSIX shell to run the checks, so
+    the standard per-control playbook is generated instead.
+    
+    Args:
+        controls: List of StigControl dicts
+        output_path: Path where playbook YAML should be written
+        product: Product identifier (e.g., "rhel9") - used as fallback if not in controls
+        runner_path: Where to write the runner (default: <playbook stem>_runner.py)
+        
+    Returns:
+        Path of the generated runner, or None when the standard playbook was generated
+    """
+    product_tag = get_product_tag_from_controls(controls, product)
+    if os_family_for_product(product_tag) in ("Windows", "network"):
+        logger.warning(f"Check runner is not supported for {product_tag}; generating standard playbook")
+        generate_checker_playbook(controls, output_path, product)
+        return None
+    
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if runner_path is None:
+        runner_path = output_path.with_name(f"{output_path.stem}_runner.py")
+    generate_check_runner(controls, runner_path, product_tag)
+    
+    # Relative to the playbook when written alongside it
+    if runner_path.parent.resolve() == output_path.parent.resolve():
+        runner_ref = f"{{{{ playbook_dir }}}}/{runner_path.name}"
+    else:
+        runner_ref = str(runner_path.resolve())
+    
+    tags = [
+        "      tags:",
+        "        - stig_check",
+        "        - always",
+    ]
+    run_tasks = [
+        f"    - name: 'Run STIG check runner for {len(controls)} controls'",
+        "      ansible.builtin.script:",
+        f"        cmd: \"{runner_ref} --workers {{{{ stig_runner_workers | default(8) }}}} --timeout {{{{ stig_runner_timeout | default(60) }}}}\"",
+        "        executable: \"{{ ansible_facts['python']['executable'] }}\"",
+        "      register: stig_runner",
+        "      changed_when: false",
+        "      check_mode: false",
+    ] + tags + [
+        "",
+        "    - name: 'Index check runner results'",
+        "      ansible.builtin.set_fact:",
+        "        stig_runner_results: \"{{ (stig_runner.stdout | from_json).results }}\"",
+    ] + tags + [
+        "",
+        "    - name: 'Save check runner results'",
+        "      ansible.builtin.copy:",
+        "        content: \"{{ stig_runner.stdout }}\"",
+        "        dest: \"{{ stig_runner_results_dir | default(playbook_dir) }}/{{ inventory_hostname }}_stig_check_results.json\"",
+        "        mode: '0600'",
+        "      delegate_to: localhost",
+        "      become: false",
+        "      changed_when: false",
+    ] + tags
+    
+    with open(output_path, "w") as f:
+        _write_playbook_header(f, controls, product_tag)
+        _write_task_lines(f, run_tasks)
         
-        # Generate tasks for each control
         for control in controls:
             sv_id = control.get("sv_id", "UNKNOWN")
-            automation_level = control.get("automation_level", "manual")
-            # Normalize automation_level for tagging
-            if automation_level in ["automatable", "scannable_with_nessus"]:
-                tag_level = "automated"
-            elif automation_level == "semi_automatable":
-                tag_level = "manual_only"  # OCIL is not fully automated
-            elif automation_level in ["manual", "not_scannable_with_nessus"]:
-                tag_level = "manual_only"
-            elif automation_level == "unknown":
-                tag_level = "unknown"
-            else:
-                tag_level = automation_level  # "automated", "manual_only", "unknown"
-            
-            # Generate task lines
-            task_lines = generate_checker_task(control)
-            
-            # Add automation level tag to all tag sections
-            task_lines_str = "\n".join(task_lines)
-            tag_name = f"validate_{tag_level}"
-            if tag_name not in task_lines_str:
-                # Find all "tags:" sections and add automation level
-                new_task_lines = []
-                for i, line in enumerate(task_lines):
-                    new_task_lines.append(line)
-                    if line.strip() == "tags:":
-                        # Look ahead to find where tags end
-                        j = i + 1
-                        while j < len(task_lines) and (task_lines[j].startswith("        -") or task_lines[j].strip() == ""):
-                            j += 1
-                        # Insert automation level tag before the closing
-                        if j < len(task_lines):
-                            new_task_lines.append(f"        - {tag_name}")
-                task_lines = new_task_lines
-            
-            # Write task
-            f.write("\n")
-            for line in task_lines:
-                f.write(f"{line}\n")
-            f.write("\n")
+            # Single-quoted YAML scalar: escape embedded quotes
+            title = control.get("title", "")[:80].replace("'", "''")
+            tag_level = normalize_tag_level(control.get("automation_level", "manual"))
+            _write_task_lines(f, [
+                f"    - name: '{sv_id} | {title}'",
+                "      ansible.builtin.debug:",
+                f"        var: stig_runner_results['{sv_id}']",
+                "      tags:",
+                "        - stig_check",
+                f"        - {sv_id}",
+                f"        - validate_{tag_level}",
+            ])
     
-    logger.info(f"Generated checker playbook with {len(controls)} tasks")
+    logger.info(f"Generated runner checker playbook with {len(controls)} result tasks")
+    return runner_path
 
 
 def verify_coverage(controls: list[dict], playbook_path: Path) -> bool:
@@ -663,19 +1254,37 @@ def main():
         action="store_true",
         help="Verify that all STIG IDs are covered in the playbook"
     )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--consolidated",
+        action="store_true",
+        help="Batch file, package, service, sysctl, mount and command checks into bulk "
+             "fact collection and evaluate each control locally"
+    )
+    mode.add_argument(
+        "--runner",
+        action="store_true",
+        help="Also write a standalone check runner (<output stem>_runner.py) and a playbook "
+             "that executes it once per host"
+    )
     
     args = parser.parse_args()
     
     try:
         # Load controls from JSON
-        controls = load_controls_from_json(args.input)
+        controls = load_controls_from_json(args.input, fields=CHECKER_FIELDS)
         
         if not controls:
             logger.warning("No controls found in input file")
             return 1
         
         # Generate checker playbook
-        generate_checker_playbook(controls, args.output, args.product)
+        if args.consolidated:
+            generate_consolidated_checker_playbook(controls, args.output, args.product)
+        elif args.runner:
+            generate_runner_checker_playbook(controls, args.output, args.product)
+        else:
+            generate_checker_playbook(controls, args.output, args.product)
         
         # Verify coverage if requested
         if args.verify_coverage:
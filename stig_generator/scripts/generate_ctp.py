@@ -11,31 +11,61 @@ Usage:
 
 import argparse
 import csv
-import json
+import itertools
 import logging
 import re
 import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from app.generators.extractors import (
-    extract_check_commands_from_block,
     is_probable_cli_command,
     normalize_command_line,
     split_command_and_prose,
 )
+from app.model.controls import CheckCommandAnalysis
+from scripts.control_store import iter_control_dicts, load_control_dicts
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
-def load_controls_from_json(json_path: Path) -> list[dict]:
-    """Load StigControl objects from JSON file."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        controls = json.load(f)
+# Control fields read by the CTP generator; everything else (notably the long
+# description text) is skipped when loading with a field projection.
+CTP_FIELDS = frozenset({
+    "sv_id",
+    "nist_id",
+    "severity",
+    "title",
+    "check_text",
+    "os_family",
+    "product",
+    "automation_level",
+    "automation_source",
+    "check_analysis",
+})
+
+
+def load_controls_from_json(json_path: Path, fields: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Load StigControl objects from JSON file (or a binary .stigdb control store).
+    
+    Args:
+        json_path: Path to JSON file or control store
+        fields: Optional field projection (e.g. CTP_FIELDS); records are streamed
+            and fields outside the projection are never materialized
+        
+    Returns:
+        List of StigControl dicts
+    """
+    controls = load_control_dicts(json_path, fields)
     logger.info(f"Loaded {len(controls)} controls from {json_path}")
     return controls
 
@@ -332,12 +362,53 @@ def _extract_screen_output(check_text: str) -> str:
     return "Review the command output and verify it matches the expected result."
 
 
-def generate_ctp_rows_for_control(control: dict) -> list[list[str]]:
+def extract_ctp_steps(control: dict) -> list[str]:
     """
-    Generate CTP rows for a single control.
+    Step-extraction stage: find the verification commands for a control.
+    
+    Args:
+        control: StigControl dict
+        
+    Returns:
+        Cleaned, de-prompted check commands (possibly empty)
+    """
+    check_text = control.get("check_text") or ""
+    # Use os_family if available, otherwise fall back to product
+    os_family = control.get("os_family") or control.get("product", "rhel")
+    
+    # Check commands from the parse-time analysis (extracted here if it was
+    # computed for another OS family or the control predates it)
+    check_commands = CheckCommandAnalysis.commands_for(control.get("check_analysis"), check_text, os_family)
+    
+    # Filter for real commands and clean them
+    valid_commands = []
+    for cmd in check_commands:
+        if not is_probable_cli_command(cmd):
+            continue
+        cmd_clean = _clean_command(cmd)
+        if cmd_clean and len(cmd_clean) > 5:  # Skip very short/incomplete commands
+            # Remove prompts (e.g., "Switch#", "SW1(config)#")
+            cmd_clean = re.sub(r'^[A-Z0-9]+(?:\([^)]+\))?#\s*', '', cmd_clean, flags=re.IGNORECASE)
+            cmd_clean = re.sub(r'^[A-Z0-9]+#\s*', '', cmd_clean, flags=re.IGNORECASE)
+            # Ensure no backticks remain
+            cmd_clean = cmd_clean.replace('`', '').strip()
+            # For network devices, only show commands should be in CTP
+            if os_family == "network" and not cmd_clean.lower().startswith('show '):
+                # Skip config commands for network CTP
+                continue
+            if cmd_clean:
+                valid_commands.append(cmd_clean)
+    
+    return valid_commands
+
+
+def build_ctp_rows(control: dict, valid_commands: list[str]) -> list[list[str]]:
+    """
+    Expected-result stage: turn extracted steps into CTP rows.
     
     Args:
         control: StigControl dict
+        valid_commands: Output of extract_ctp_steps() for this control
         
     Returns:
         List of rows, where each row is a list of strings for CSV columns
@@ -369,27 +440,6 @@ def generate_ctp_rows_for_control(control: dict) -> list[list[str]]:
     else:
         automation_level_normalized = automation_level
     
-    # Extract check commands using existing extractor
-    check_commands, _ = extract_check_commands_from_block(check_text, os_family)
-    
-    # Filter for real commands and clean them
-    valid_commands = []
-    for cmd in check_commands:
-        if is_probable_cli_command(cmd):
-            cmd_clean = _clean_command(cmd)
-            if cmd_clean and len(cmd_clean) > 5:  # Skip very short/incomplete commands
-                # Remove prompts (e.g., "Switch#", "SW1(config)#")
-                cmd_clean = re.sub(r'^[A-Z0-9]+(?:\([^)]+\))?#\s*', '', cmd_clean, flags=re.IGNORECASE)
-                cmd_clean = re.sub(r'^[A-Z0-9]+#\s*', '', cmd_clean, flags=re.IGNORECASE)
-                # Ensure no backticks remain
-                cmd_clean = cmd_clean.replace('`', '').strip()
-                # For network devices, only show commands should be in CTP
-                if os_family == "network" and not cmd_clean.lower().startswith('show '):
-                    # Skip config commands for network CTP
-                    continue
-                if cmd_clean:
-                    valid_commands.append(cmd_clean)
-    
     # Generate 1-3 steps per control
     # Adjust language based on automation_level
     if valid_commands:
@@ -590,64 +640,197 @@ def generate_ctp_rows_for_control(control: dict) -> list[list[str]]:
     return rows
 
 
-def generate_ctp_csv(controls: list[dict], output_path: Path, manual_only: bool = True) -> None:
+def generate_ctp_rows_for_control(control: dict) -> list[list[str]]:
+    """
+    Generate CTP rows for a single control.
+    
+    Args:
+        control: StigControl dict
+        
+    Returns:
+        List of rows, where each row is a list of strings for CSV columns
+    """
+    return build_ctp_rows(control, extract_ctp_steps(control))
+
+
+# CSV header with automation columns
+CTP_HEADER = [
+    "STIG ID",
+    "NIST 800-53 Control ID",
+    "Severity",
+    "Step Number",
+    "Action/Command",
+    "Expected Output/Result",
+    "Expected Screen Output (what user sees)",
+    "Notes",
+    "Automation Level",
+    "Automation Source",
+    "Pass/Fail"
+]
+
+MANUAL_ONLY_LEVELS = ("manual_only", "manual", "not_scannable_with_nessus")
+
+
+@dataclass
+class CtpPipelineStats:
+    """Per-stage counters and wall-clock timings for a CTP generation run.
+    
+    Stage seconds are summed per control, so with a worker pool the step and
+    expected-result totals measure CPU work and can exceed the run's wall time.
+    """
+    controls_seen: int = 0
+    controls_processed: int = 0
+    rows_written: int = 0
+    filter_seconds: float = 0.0
+    step_seconds: float = 0.0
+    expected_seconds: float = 0.0
+    write_seconds: float = 0.0
+    total_seconds: float = 0.0
+    
+    def to_dict(self) -> dict:
+        """Convert to dictionary for logging/JSON output."""
+        return asdict(self)
+
+
+def filter_ctp_controls(
+    controls: Iterable[dict],
+    manual_only: bool,
+    stats: CtpPipelineStats,
+) -> Iterator[dict]:
+    """
+    Filter stage: yield the controls that belong in the CTP.
+    
+    Args:
+        controls: StigControl dicts (list or stream)
+        manual_only: If True, only yield manual-only controls
+        stats: Counters updated as controls flow through
+    """
+    for control in controls:
+        start = time.perf_counter()
+        stats.controls_seen += 1
+        keep = not manual_only or control.get("automation_level", "unknown") in MANUAL_ONLY_LEVELS
+        stats.filter_seconds += time.perf_counter() - start
+        if keep:
+            stats.controls_processed += 1
+            yield control
+
+
+def _timed_ctp_rows(control: dict) -> tuple[list[list[str]], float, float]:
+    """Run the step and expected-result stages for one control, timing each.
+    
+    Module-level so it can be shipped to a process pool.
+    """
+    start = time.perf_counter()
+    valid_commands = extract_ctp_steps(control)
+    steps_done = time.perf_counter()
+    rows = build_ctp_rows(control, valid_commands)
+    return rows, steps_done - start, time.perf_counter() - steps_done
+
+
+def iter_ctp_rows(
+    controls: Iterable[dict],
+    stats: CtpPipelineStats,
+    workers: int = 0,
+    use_processes: bool = False,
+    max_pending: Optional[int] = None,
+) -> Iterator[list[str]]:
+    """
+    Extraction stages: yield CTP rows in input order.
+    
+    With workers > 0 the step/expected-result extraction runs on a thread or
+    process pool. At most ``max_pending`` controls are in flight at once, so
+    memory stays bounded regardless of input size, and rows are yielded
+    strictly in control order.
+    
+    Args:
+        controls: Filtered StigControl dicts
+        stats: Counters updated with per-stage timings
+        workers: Pool size; 0 runs the stages inline
+        use_processes: Use a process pool instead of threads (the regex
+            extractors hold the GIL, so processes scale better)
+        max_pending: In-flight window size (default: 4 x workers)
+    """
+    def _emit(result):
+        rows, step_seconds, expected_seconds = result
+        stats.step_seconds += step_seconds
+        stats.expected_seconds += expected_seconds
+        return rows
+    
+    if workers <= 0:
+        for control in controls:
+            yield from _emit(_timed_ctp_rows(control))
+        return
+    
+    window = max_pending or workers * 4
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_cls(max_workers=workers) as executor:
+        pending = deque()
+        for control in controls:
+            pending.append(executor.submit(_timed_ctp_rows, control))
+            if len(pending) >= window:
+                yield from _emit(pending.popleft().result())
+        while pending:
+            yield from _emit(pending.popleft().result())
+
+
+def generate_ctp_csv(
+    controls: Iterable[dict],
+    output_path: Path,
+    manual_only: bool = True,
+    workers: int = 0,
+    use_processes: bool = False,
+) -> CtpPipelineStats:
     """
     Generate CTP CSV file from StigControl objects.
     
     CTP (Certification Test Procedure) can include all controls or only manual controls.
     When manual_only=True, only controls that are not automated by SCAP/Nessus are included.
     
+    Generation is a streaming pipeline (filter → step extraction → expected-result
+    extraction → CSV write); rows are written as soon as they are ready, in order.
+    
     Args:
-        controls: List of StigControl dicts
+        controls: List (or stream) of StigControl dicts
         output_path: Path where CSV should be written
         manual_only: If True, only include manual-only controls. If False, include all controls.
+        workers: Size of the extraction worker pool; 0 runs inline
+        use_processes: Use a process pool instead of a thread pool for extraction
+        
+    Returns:
+        Per-stage counters and timings for the run
     """
     output_path.parent.mkdir(parents=True, exist_ok=True)
+    stats = CtpPipelineStats()
+    run_start = time.perf_counter()
     
-    # Filter controls if manual_only is requested
-    if manual_only:
-        filtered_controls = []
-        for control in controls:
-            automation_level = control.get("automation_level", "unknown")
-            # Only include controls that are manual-only
-            if automation_level in ["manual_only", "manual", "not_scannable_with_nessus"]:
-                filtered_controls.append(control)
-        
-        logger.info(f"Filtering to {len(filtered_controls)} manual-only controls (out of {len(controls)} total)")
-        logger.info(f"  - Automated controls (excluded from CTP): {len(controls) - len(filtered_controls)}")
-        logger.info(f"  - Manual-only controls (included in CTP): {len(filtered_controls)}")
-        controls_to_process = filtered_controls
-    else:
-        logger.info(f"Generating CTP for all {len(controls)} controls")
-        controls_to_process = controls
+    filtered = filter_ctp_controls(controls, manual_only, stats)
+    rows = iter_ctp_rows(filtered, stats, workers=workers, use_processes=use_processes)
     
     with open(output_path, "w", newline="", encoding="utf-8") as f:
         writer = csv.writer(f)
+        writer.writerow(CTP_HEADER)
         
-        # Write CSV header with automation columns
-        writer.writerow([
-            "STIG ID",
-            "NIST 800-53 Control ID",
-            "Severity",
-            "Step Number",
-            "Action/Command",
-            "Expected Output/Result",
-            "Expected Screen Output (what user sees)",
-            "Notes",
-            "Automation Level",
-            "Automation Source",
-            "Pass/Fail"
-        ])
-        
-        # Write control rows
-        total_rows = 0
-        for control in controls_to_process:
-            rows = generate_ctp_rows_for_control(control)
-            for row in rows:
-                writer.writerow(row)
-                total_rows += 1
-        
-        logger.info(f"Generated {total_rows} CTP rows for {len(controls_to_process)} controls")
+        for row in rows:
+            start = time.perf_counter()
+            writer.writerow(row)
+            stats.write_seconds += time.perf_counter() - start
+            stats.rows_written += 1
+    
+    stats.total_seconds = time.perf_counter() - run_start
+    
+    if manual_only:
+        logger.info(f"Filtered to {stats.controls_processed} manual-only controls (out of {stats.controls_seen} total)")
+        logger.info(f"  - Automated controls (excluded from CTP): {stats.controls_seen - stats.controls_processed}")
+        logger.info(f"  - Manual-only controls (included in CTP): {stats.controls_processed}")
+    else:
+        logger.info(f"Generated CTP for all {stats.controls_seen} controls")
+    logger.info(f"Generated {stats.rows_written} CTP rows for {stats.controls_processed} controls")
+    logger.info(
+        f"Stage timings: filter {stats.filter_seconds:.3f}s, steps {stats.step_seconds:.3f}s, "
+        f"expected {stats.expected_seconds:.3f}s, write {stats.write_seconds:.3f}s "
+        f"(wall {stats.total_seconds:.3f}s)"
+    )
+    return stats
 
 
 def verify_coverage(controls: list[dict], csv_path: Path, manual_only: bool = False) -> bool:
@@ -670,7 +853,7 @@ def verify_coverage(controls: list[dict], csv_path: Path, manual_only: bool = Fa
         expected_control_ids = {
             control.get("sv_id") 
             for control in controls 
-            if control.get("automation_level", "unknown") in ["manual_only", "manual", "not_scannable_with_nessus"]
+            if control.get("automation_level", "unknown") in MANUAL_ONLY_LEVELS
         }
     else:
         # Extract ALL STIG IDs from controls
@@ -725,19 +908,45 @@ def main():
         action="store_true",
         help="Generate CTP rows for all controls (default: manual-only controls only)"
     )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=0,
+        help="Run step/expected-result extraction on a pool of N workers (default: inline)"
+    )
+    parser.add_argument(
+        "--processes",
+        action="store_true",
+        help="Use a process pool instead of a thread pool for --workers"
+    )
     
     args = parser.parse_args()
     
     try:
-        # Load controls from JSON
-        controls = load_controls_from_json(args.input)
+        # Coverage verification needs the controls twice; otherwise stream them
+        # straight from the input file into the pipeline.
+        if args.verify_coverage:
+            controls = load_controls_from_json(args.input, fields=CTP_FIELDS)
+            has_controls = bool(controls)
+        else:
+            # Peek at the stream so an empty input leaves no header-only CSV behind
+            stream = iter_control_dicts(args.input, fields=CTP_FIELDS)
+            first = next(stream, None)
+            has_controls = first is not None
+            controls = itertools.chain([first], stream) if has_controls else stream
         
-        if not controls:
+        if not has_controls:
             logger.warning("No controls found in input file")
             return 1
         
         # Generate CTP CSV (default to manual-only, use --all to include all controls)
-        generate_ctp_csv(controls, args.output, manual_only=not args.all)
+        stats = generate_ctp_csv(
+            controls,
+            args.output,
+            manual_only=not args.all,
+            workers=args.workers,
+            use_processes=args.processes,
+        )
         
         # Verify coverage if requested
         if args.verify_coverage:
@@ -17,7 +17,7 @@ import logging
 import re
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 # Add parent directory to path to import app modules
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -27,6 +27,7 @@ from app.generators.extractors import (
     extract_systemd_actions,
     extract_package_names_from_commands,
 )
+from scripts.control_store import load_control_dicts
 
 logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
@@ -114,10 +115,36 @@ def yaml_safe_scalar(text: str) -> str:
     return f"'{escaped}'"
 
 
-def load_controls_from_json(json_path: Path) -> list[dict]:
-    """Load StigControl objects from JSON file."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        controls = json.load(f)
+# Control fields read by the hardening generator; everything else (notably the
+# long description text) is skipped when loading with a field projection.
+HARDENING_FIELDS = frozenset({
+    "sv_id",
+    "rule_id",
+    "vul_id",
+    "title",
+    "severity",
+    "category",
+    "check_text",
+    "fix_text",
+    "product",
+    "automation_level",
+    "automation_source",
+})
+
+
+def load_controls_from_json(json_path: Path, fields: Optional[Iterable[str]] = None) -> list[dict]:
+    """
+    Load StigControl objects from JSON file (or a binary .stigdb control store).
+    
+    Args:
+        json_path: Path to JSON file or control store
+        fields: Optional field projection (e.g. HARDENING_FIELDS); records are streamed
+            and fields outside the projection are never materialized
+        
+    Returns:
+        List of StigControl dicts
+    """
+    controls = load_control_dicts(json_path, fields)
     logger.info(f"Loaded {len(controls)} controls from {json_path}")
     return controls
 
@@ -401,13 +428,19 @@ def _extract_file_group(text: str) -> Optional[str]:
     return None
 
 
-def generate_file_permission_tasks(control: dict) -> list[str]:
-    """Generate Ansible tasks for file_permissions category."""
+def _extract_file_permission_item(control: dict) -> Optional[dict]:
+    """
+    Extract the file attributes a file_permissions/file_owner control enforces.
+    
+    Args:
+        control: StigControl dict
+        
+    Returns:
+        Dict with path, mode, owner, group (None when not enforced) and state
+        ("file" or "directory"), or None if no file path was found
+    """
     fix_text = control.get("fix_text", "") or ""
     check_text = control.get("check_text", "") or ""
-    sv_id = control.get("sv_id", "UNKNOWN")
-    vul_id = control.get("vul_id", "")
-    rule_id = control.get("rule_id", "")
     title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
     combined_text = f"{fix_text} {check_text}"
     
@@ -499,31 +532,7 @@ def generate_file_permission_tasks(control: dict) -> list[str]:
                             break
     
     if not file_path:
-        return _generate_fallback_task(control)
-    
-    # Build task name with all IDs
-    task_name_parts = []
-    if vul_id:
-        task_name_parts.append(vul_id)
-    task_name_parts.append(title)
-    if sv_id and sv_id != "UNKNOWN":
-        task_name_parts.append(f"({sv_id})")
-    if rule_id:
-        task_name_parts.append(f"({rule_id})")
-    task_name = " - ".join(task_name_parts)
-    
-    lines = [
-        f"    - name: {quote_yaml_string(task_name)}",
-        "      ansible.builtin.file:",
-        f"        path: {file_path}",
-    ]
-    
-    if mode:
-        lines.append(f"        mode: '{mode}'")
-    if owner:
-        lines.append(f"        owner: {owner}")
-    if group:
-        lines.append(f"        group: {group}")
+        return None
     
     # Determine if it's a directory or file based on path and title
     # Files typically have extensions or are specific files mentioned in title
@@ -556,34 +565,95 @@ def generate_file_permission_tasks(control: dict) -> list[str]:
             # Default: assume file unless path looks like a directory
             is_directory = False
     
-    if is_directory:
-        lines.append("        state: directory")
-    else:
-        lines.append("        state: file")
-    
-    return lines
+    return {
+        "path": file_path,
+        "mode": mode,
+        "owner": owner,
+        "group": group,
+        "state": "directory" if is_directory else "file",
+    }
 
 
-def generate_package_present_tasks(control: dict) -> list[str]:
-    """Generate Ansible tasks for package_present category."""
-    fix_text = control.get("fix_text", "") or ""
-    check_text = control.get("check_text", "") or ""
+def generate_file_permission_tasks(control: dict) -> list[str]:
+    """Generate Ansible tasks for file_permissions category."""
     sv_id = control.get("sv_id", "UNKNOWN")
     vul_id = control.get("vul_id", "")
     rule_id = control.get("rule_id", "")
     title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
+    
+    item = _extract_file_permission_item(control)
+    if not item:
+        return _generate_fallback_task(control)
+    
+    # Build task name with all IDs
+    task_name_parts = []
+    if vul_id:
+        task_name_parts.append(vul_id)
+    task_name_parts.append(title)
+    if sv_id and sv_id != "UNKNOWN":
+        task_name_parts.append(f"({sv_id})")
+    if rule_id:
+        task_name_parts.append(f"({rule_id})")
+    task_name = " - ".join(task_name_parts)
+    
+    lines = [
+        f"    - name: {quote_yaml_string(task_name)}",
+        "      ansible.builtin.file:",
+        f"        path: {item['path']}",
+    ]
+    
+    if item["mode"]:
+        lines.append(f"        mode: '{item['mode']}'")
+    if item["owner"]:
+        lines.append(f"        owner: {item['owner']}")
+    if item["group"]:
+        lines.append(f"        group: {item['group']}")
+    lines.append(f"        state: {item['state']}")
+    
+    return lines
+
+
+# Words extract_package_names_from_commands picks up from prose
+PACKAGE_NAME_BLACKLIST = frozenset({"that", "all", "is", "contents", "red", "run", "--now", "--mask"})
+
+
+def _extract_package_name(control: dict) -> Optional[str]:
+    """Extract the package a package_present/package_absent control installs or removes."""
+    fix_text = control.get("fix_text", "") or ""
+    check_text = control.get("check_text", "") or ""
     combined_text = f"{fix_text} {check_text}"
     
     # Use existing extractor
     package_names = extract_package_names_from_commands(combined_text)
+    valid_package_names = [pkg for pkg in package_names if pkg.lower() not in PACKAGE_NAME_BLACKLIST]
+    
+    return valid_package_names[0] if valid_package_names else None
+
+
+def _is_package_update_control(control: dict) -> bool:
+    """Check whether a package_absent control is really an update/patch requirement."""
+    fix_text = control.get("fix_text", "") or ""
+    check_text = control.get("check_text", "") or ""
+    combined_text = f"{fix_text} {check_text}"
     
-    # Blacklist
-    blacklist = {"that", "all", "is", "contents", "red", "run", "--now", "--mask"}
-    valid_package_names = [pkg for pkg in package_names if pkg.lower() not in blacklist]
+    update_keywords = ["update", "upgrade", "security patches", "patches and updates"]
+    has_update_keyword = any(keyword in combined_text.lower() for keyword in update_keywords)
+    has_update_regex = bool(re.search(r'install.*update|apply.*patch', combined_text, re.IGNORECASE))
+    has_package_cmd = any(cmd in combined_text.lower() for cmd in ["dnf", "yum", "rpm"])
     
-    if valid_package_names:
-        package_name = valid_package_names[0]
-        
+    return (has_update_keyword or has_update_regex) and has_package_cmd
+
+
+def generate_package_present_tasks(control: dict) -> list[str]:
+    """Generate Ansible tasks for package_present category."""
+    sv_id = control.get("sv_id", "UNKNOWN")
+    vul_id = control.get("vul_id", "")
+    rule_id = control.get("rule_id", "")
+    title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
+    
+    package_name = _extract_package_name(control)
+    
+    if package_name:
         # Build task name
         task_name_parts = []
         if vul_id:
@@ -609,21 +679,13 @@ def generate_package_present_tasks(control: dict) -> list[str]:
 
 def generate_package_absent_tasks(control: dict) -> list[str]:
     """Generate Ansible tasks for package_absent category."""
-    fix_text = control.get("fix_text", "") or ""
-    check_text = control.get("check_text", "") or ""
     sv_id = control.get("sv_id", "UNKNOWN")
     vul_id = control.get("vul_id", "")
     rule_id = control.get("rule_id", "")
     title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
-    combined_text = f"{fix_text} {check_text}"
     
     # Check for package update/upgrade commands first (these should generate update tasks, not removal)
-    update_keywords = ["update", "upgrade", "security patches", "patches and updates"]
-    has_update_keyword = any(keyword in combined_text.lower() for keyword in update_keywords)
-    has_update_regex = bool(re.search(r'install.*update|apply.*patch', combined_text, re.IGNORECASE))
-    has_package_cmd = any(cmd in combined_text.lower() for cmd in ["dnf", "yum", "rpm"])
-    
-    if (has_update_keyword or has_update_regex) and has_package_cmd:
+    if _is_package_update_control(control):
         # This is actually a package update task, not a removal
         task_name_parts = []
         if vul_id:
@@ -644,16 +706,9 @@ def generate_package_absent_tasks(control: dict) -> list[str]:
             "        update_cache: yes",
         ]
     
-    # Use existing extractor
-    package_names = extract_package_names_from_commands(combined_text)
-    
-    # Blacklist
-    blacklist = {"that", "all", "is", "contents", "red", "run", "--now", "--mask"}
-    valid_package_names = [pkg for pkg in package_names if pkg.lower() not in blacklist]
+    package_name = _extract_package_name(control)
     
-    if valid_package_names:
-        package_name = valid_package_names[0]
-        
+    if package_name:
         # Build task name
         task_name_parts = []
         if vul_id:
@@ -698,14 +753,32 @@ def _extract_service_name(text: str) -> Optional[str]:
     return None
 
 
-def generate_service_enabled_tasks(control: dict) -> list[str]:
-    """Generate Ansible tasks for service_enabled category."""
+# systemd module parameters for each extract_systemd_actions action
+SERVICE_ACTION_PARAMS = {
+    "enable_and_start": {"enabled": "yes", "state": "started"},
+    "mask": {"masked": "yes", "state": "stopped"},
+    "unmask": {"masked": "no"},
+    "disable": {"enabled": "no", "state": "stopped"},
+    "stop": {"state": "stopped"},
+    "start": {"state": "started"},
+    "restart": {"state": "restarted"},
+    "enable": {"enabled": "yes"},
+}
+
+
+def _extract_service_action(control: dict) -> Optional[dict]:
+    """
+    Extract the systemd unit a service control manages and how.
+    
+    Args:
+        control: StigControl dict
+        
+    Returns:
+        Dict with unit, description (task name text) and params (ordered
+        systemd module parameters), or None if no valid unit was found
+    """
     fix_text = control.get("fix_text", "") or ""
     check_text = control.get("check_text", "") or ""
-    sv_id = control.get("sv_id", "UNKNOWN")
-    vul_id = control.get("vul_id", "")
-    rule_id = control.get("rule_id", "")
-    title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
     combined_text = f"{fix_text} {check_text}"
     
     # Use existing extractor for structured actions
@@ -742,49 +815,15 @@ def generate_service_enabled_tasks(control: dict) -> list[str]:
                 unit = None
         
         if unit:
-            # Build task name
-            task_name_parts = []
-            if vul_id:
-                task_name_parts.append(vul_id)
-            task_name_parts.append(f"Ensure {unit} is {action}")
-            if sv_id and sv_id != "UNKNOWN":
-                task_name_parts.append(f"({sv_id})")
-            if rule_id:
-                task_name_parts.append(f"({rule_id})")
-            task_name = " - ".join(task_name_parts)
-            
-            lines = [
-                f"    - name: {quote_yaml_string(task_name)}",
-                "      ansible.builtin.systemd:",
-                f"        name: {unit}",
-            ]
-            
-            if action == "enable_and_start":
-                lines.append("        enabled: yes")
-                lines.append("        state: started")
-            elif action == "mask":
-                lines.append("        masked: yes")
-                lines.append("        state: stopped")
-            elif action == "unmask":
-                lines.append("        masked: no")
-            elif action == "disable":
-                lines.append("        enabled: no")
-                lines.append("        state: stopped")
-            elif action == "stop":
-                lines.append("        state: stopped")
-            elif action == "start":
-                lines.append("        state: started")
-            elif action == "restart":
-                lines.append("        state: restarted")
-            else:  # enable
-                lines.append("        enabled: yes")
-            
+            description = f"Ensure {unit} is {action}"
             # Fix task name if it says "mask" instead of "masked"
-            task_name_str = "\n".join(lines)
-            if "is mask" in task_name_str:
-                lines[0] = lines[0].replace("is mask", "is masked")
-            
-            return lines
+            if "is mask" in description:
+                description = description.replace("is mask", "is masked")
+            return {
+                "unit": unit,
+                "description": description,
+                "params": dict(SERVICE_ACTION_PARAMS.get(action, SERVICE_ACTION_PARAMS["enable"])),
+            }
     
     # Fallback: extract from text
     service_name = _extract_service_name(combined_text)
@@ -799,16 +838,41 @@ def generate_service_enabled_tasks(control: dict) -> list[str]:
         disabled = "disabled" in text_lower or "disable" in text_lower
         masked = "masked" in text_lower or "mask" in text_lower
         
+        if masked:
+            return {
+                "unit": service_name,
+                "description": f"Ensure {service_name} is masked and stopped",
+                "params": {"masked": "yes", "state": "stopped"},
+            }
+        elif disabled:
+            return {
+                "unit": service_name,
+                "description": f"Ensure {service_name} is disabled and stopped",
+                "params": {"enabled": "no", "state": "stopped"},
+            }
+        return {
+            "unit": service_name,
+            "description": f"Ensure {service_name} is enabled and running",
+            "params": {"enabled": "yes", "state": "started"},
+        }
+    
+    return None
+
+
+def generate_service_enabled_tasks(control: dict) -> list[str]:
+    """Generate Ansible tasks for service_enabled category."""
+    sv_id = control.get("sv_id", "UNKNOWN")
+    vul_id = control.get("vul_id", "")
+    rule_id = control.get("rule_id", "")
+    
+    service = _extract_service_action(control)
+    
+    if service:
         # Build task name
         task_name_parts = []
         if vul_id:
             task_name_parts.append(vul_id)
-        if masked:
-            task_name_parts.append(f"Ensure {service_name} is masked and stopped")
-        elif disabled:
-            task_name_parts.append(f"Ensure {service_name} is disabled and stopped")
-        else:
-            task_name_parts.append(f"Ensure {service_name} is enabled and running")
+        task_name_parts.append(service["description"])
         if sv_id and sv_id != "UNKNOWN":
             task_name_parts.append(f"({sv_id})")
         if rule_id:
@@ -818,18 +882,9 @@ def generate_service_enabled_tasks(control: dict) -> list[str]:
         lines = [
             f"    - name: {quote_yaml_string(task_name)}",
             "      ansible.builtin.systemd:",
-            f"        name: {service_name}",
+            f"        name: {service['unit']}",
         ]
-        
-        if masked:
-            lines.append("        masked: yes")
-            lines.append("        state: stopped")
-        elif disabled:
-            lines.append("        enabled: no")
-            lines.append("        state: stopped")
-        else:
-            lines.append("        enabled: yes")
-            lines.append("        state: started")
+        lines.extend(f"        {key}: {value}" for key, value in service["params"].items())
         
         return lines
     
@@ -843,14 +898,10 @@ def generate_service_disabled_tasks(control: dict) -> list[str]:
     return generate_service_enabled_tasks(control)
 
 
-def generate_sysctl_tasks(control: dict) -> list[str]:
-    """Generate Ansible tasks for sysctl category."""
+def _extract_sysctl_param(control: dict) -> Optional[dict]:
+    """Extract the kernel parameter ({"name", "value"}) a sysctl control sets."""
     fix_text = control.get("fix_text", "") or ""
     check_text = control.get("check_text", "") or ""
-    sv_id = control.get("sv_id", "UNKNOWN")
-    vul_id = control.get("vul_id", "")
-    rule_id = control.get("rule_id", "")
-    title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
     combined_text = f"{fix_text} {check_text}"
     
     # Use existing extractor
@@ -858,31 +909,43 @@ def generate_sysctl_tasks(control: dict) -> list[str]:
     
     if sysctl_params:
         param = sysctl_params[0]
-        param_name = param.get("name")
-        param_value = param.get("value")
+        if param.get("name") and param.get("value"):
+            return {"name": param["name"], "value": param["value"]}
+    
+    return None
+
+
+def generate_sysctl_tasks(control: dict) -> list[str]:
+    """Generate Ansible tasks for sysctl category."""
+    sv_id = control.get("sv_id", "UNKNOWN")
+    vul_id = control.get("vul_id", "")
+    rule_id = control.get("rule_id", "")
+    title = _clean_title_for_task_name(control.get("title", ""), max_length=80)
+    
+    param = _extract_sysctl_param(control)
+    
+    if param:
+        # Build task name
+        task_name_parts = []
+        if vul_id:
+            task_name_parts.append(vul_id)
+        task_name_parts.append(title)
+        if sv_id and sv_id != "UNKNOWN":
+            task_name_parts.append(f"({sv_id})")
+        if rule_id:
+            task_name_parts.append(f"({rule_id})")
+        task_name = " - ".join(task_name_parts)
         
-        if param_name and param_value:
-            # Build task name
-            task_name_parts = []
-            if vul_id:
-                task_name_parts.append(vul_id)
-            task_name_parts.append(title)
-            if sv_id and sv_id != "UNKNOWN":
-                task_name_parts.append(f"({sv_id})")
-            if rule_id:
-                task_name_parts.append(f"({rule_id})")
-            task_name = " - ".join(task_name_parts)
-            
-            return [
-                f"    - name: {quote_yaml_string(task_name)}",
-                "      ansible.builtin.sysctl:",
-                f"        name: {param_name}",
-                f"        value: '{param_value}'",
-                "        state: present",
-                "        sysctl_set: yes",
-                "        reload: yes",
-                "      notify: Reload sysctl",
-            ]
+        return [
+            f"    - name: {quote_yaml_string(task_name)}",
+            "      ansible.builtin.sysctl:",
+            f"        name: {param['name']}",
+            f"        value: '{param['value']}'",
+            "        state: present",
+            "        sysctl_set: yes",
+            "        reload: yes",
+            "      notify: Reload sysctl",
+        ]
     
     # Fallback
     return _generate_fallback_task(control)
@@ -3040,6 +3103,321 @@ def format_product_name(product: str) -> str:
     return product.upper()
 
 
+def _write_hardening_header(f, controls: list[dict], product_tag: str, play_vars: Optional[list[str]] = None) -> None:
+    """
+    Write the header comments, play definition, pre_tasks and handlers of a hardening playbook.
+    
+    Args:
+        f: Open output file
+        controls: List of StigControl dicts (used for the header counts)
+        product_tag: Product identifier (e.g., "rhel9")
+        play_vars: Optional YAML lines (4-space indented) added under the play's vars
+    """
+    os_family = os_family_for_product(product_tag)
+    product_name = format_product_name(product_tag)
+    
+    # Write header with SCAP-based automation level counts
+    f.write(f"# Generated hardening playbook for {product_tag}\n")
+    f.write(f"# Total Controls: {len(controls)}\n")
+    
+    # Count by automation level
+    automated = sum(1 for c in controls if c.get("automation_level") in ["automated", "automatable", "scannable_with_nessus"])
+    manual_only = sum(1 for c in controls if c.get("automation_level") in ["manual_only", "manual", "not_scannable_with_nessus"])
+    unknown = sum(1 for c in controls if c.get("automation_level") == "unknown")
+    
+    f.write(f"#   - Automated: {automated} ({automated*100//len(controls) if controls else 0}%)\n")
+    f.write(f"#   - Manual-only: {manual_only} ({manual_only*100//len(controls) if controls else 0}%)\n")
+    if unknown > 0:
+        f.write(f"#   - Unknown: {unknown} ({unknown*100//len(controls) if controls else 0}%)\n")
+    
+    f.write("\n")
+    
+    # Write playbook structure - product-aware with quoted names
+    play_name_quoted = quote_yaml_string(f"{product_name} STIG Hardening")
+    f.write(f"- name: {play_name_quoted}\n")
+    f.write("  hosts: all\n")
+    f.write("  become: yes\n")
+    f.write("  gather_facts: yes\n")
+    f.write("  vars:\n")
+    f.write("    # Place any tunable defaults here if needed later\n")
+    for line in play_vars or []:
+        f.write(f"{line}\n")
+    
+    # Write OS-specific pre_tasks
+    if os_family == "RedHat":
+        f.write("  pre_tasks:\n")
+        # Extract version from product (e.g., "rhel8" -> "8", "rhel9" -> "9")
+        version_match = re.search(r'(\d+)', product_tag)
+        version = version_match.group(1) if version_match else "9"
+        pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
+        f.write(f"    - name: {pre_task_name}\n")
+        f.write("      ansible.builtin.assert:\n")
+        f.write("        that:\n")
+        f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+        f.write(f"          - ansible_facts['distribution_major_version'] == '{version}'\n")
+        f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''distribution_major_version''] }} }}'\n")
+        f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    elif os_family == "Windows":
+        f.write("  pre_tasks:\n")
+        pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
+        f.write(f"    - name: {pre_task_name}\n")
+        f.write("      ansible.builtin.assert:\n")
+        f.write("        that:\n")
+        f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+        # Windows version check - extract from product
+        if "2022" in product_tag:
+            f.write("          - ansible_facts['os_version'] is version('10.0.20348', '>=')\n")
+        elif "2019" in product_tag:
+            f.write("          - ansible_facts['os_version'] is version('10.0.17763', '>=')\n")
+        f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''os_version''] }} }}'\n")
+        f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    else:
+        # Generic OS check for other products
+        if os_family:
+            f.write("  pre_tasks:\n")
+            pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
+            f.write(f"    - name: {pre_task_name}\n")
+            f.write("      ansible.builtin.assert:\n")
+            f.write("        that:\n")
+            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
+            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }}'\n")
+            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    
+    f.write("\n")
+    
+    # Write OS-specific handlers (only Linux handlers for Linux, none for Windows)
+    if os_family == "RedHat":
+        f.write("  handlers:\n")
+        # Regenerate grub configuration
+        handler_name = quote_yaml_string("Regenerate grub configuration")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.command:\n")
+        f.write("        cmd: grub2-mkconfig -o /boot/grub2/grub.cfg\n")
+        f.write("      when: ansible_os_family == 'RedHat'\n")
+        f.write("\n")
+        # Restart sshd
+        handler_name = quote_yaml_string("Restart sshd")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.service:\n")
+        f.write("        name: sshd\n")
+        f.write("        state: restarted\n")
+        f.write("\n")
+        # Reload systemd daemon
+        handler_name = quote_yaml_string("Reload systemd daemon")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.systemd:\n")
+        f.write("        daemon_reload: yes\n")
+        f.write("\n")
+        # Reload sysctl
+        handler_name = quote_yaml_string("Reload sysctl")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.command:\n")
+        f.write("        cmd: sysctl -p\n")
+        f.write("      ignore_errors: yes\n")
+        f.write("\n")
+        # Reload firewalld
+        handler_name = quote_yaml_string("Reload firewalld")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.command:\n")
+        f.write("        cmd: firewall-cmd --reload\n")
+        f.write("      when: ansible_facts['os_family'] == 'RedHat'\n")
+        f.write("      ignore_errors: yes\n")
+        f.write("\n")
+        # Update dconf database
+        handler_name = quote_yaml_string("Update dconf database")
+        f.write(f"    - name: {handler_name}\n")
+        f.write("      ansible.builtin.command:\n")
+        f.write("        cmd: dconf update\n")
+        f.write("      when: ansible_pkg_mgr == 'dnf' or ansible_pkg_mgr == 'yum'\n")
+        f.write("\n")
+    # For Windows and other OSes, handlers section is empty or minimal
+    # (Windows-specific handlers can be added here in the future if needed)
+    
+    f.write("  tasks:\n")
+
+
+def _generate_control_task_lines(control: dict, product_tag: str) -> list[str]:
+    """
+    Generate one control's task lines with automation comments and tags.
+    
+    Args:
+        control: StigControl dict (its category is updated in place)
+        product_tag: Product identifier used for the product tag
+        
+    Returns:
+        List of YAML lines for the control's task(s)
+    """
+    sv_id = control.get("sv_id", "UNKNOWN")
+    category = categorize_control(control)
+    control["category"] = category  # Update control with category
+    
+    # Generate task lines
+    task_lines = generate_category_task(control, category)
+    
+    # Check if the generated task is actually a real enforcing task (not just debug)
+    task_lines_str = "\n".join(task_lines)
+    has_debug_only = (
+        'ansible.builtin.debug' in task_lines_str or
+        'debug:' in task_lines_str
+    )
+    # Check for real enforcing modules
+    real_modules = [
+        'ansible.builtin.file', 'ansible.builtin.lineinfile', 'ansible.builtin.sysctl',
+        'ansible.builtin.systemd', 'ansible.builtin.service', 'ansible.builtin.dnf',
+        'ansible.builtin.yum', 'ansible.builtin.command', 'ansible.builtin.shell',
+        'ansible.builtin.copy', 'ansible.builtin.template', 'ansible.builtin.blockinfile',
+        'ansible.windows.win_regedit', 'ansible.windows.win_security_policy',
+        'ansible.windows.win_user_right', 'ansible.windows.win_audit_policy',
+        'ansible.posix.firewalld', 'ansible.builtin.mount'
+    ]
+    has_real_module = any(module in task_lines_str for module in real_modules)
+    
+    # Add tags and comments based on automation_level
+    severity = control.get("severity", "medium")
+    automation_level = control.get("automation_level", "manual")
+    
+    # Normalize automation_level
+    # New values: "automated", "manual_only", "unknown"
+    # Legacy: "scannable_with_nessus", "not_scannable_with_nessus", "automatable", "semi_automatable", "manual"
+    if automation_level in ["automatable", "scannable_with_nessus"]:
+        automation_level = "automated"  # Treat as automated for tagging
+    elif automation_level == "semi_automatable":
+        automation_level = "manual_only"  # OCIL is not fully automated
+    elif automation_level in ["manual", "not_scannable_with_nessus"]:
+        automation_level = "manual_only"
+    elif automation_level == "unknown":
+        automation_level = "unknown"
+    
+    # If tagged as automated but only has debug task, downgrade to manual_only
+    if automation_level == "automated" and has_debug_only and not has_real_module:
+        automation_level = "manual_only"
+        logger.debug(f"Downgraded {sv_id} from automated to manual_only (only debug task generated)")
+    
+    # If tagged as manual_only but has a real Windows module, convert to debug-only
+    if automation_level in ["manual", "manual_only"] and has_real_module:
+        logger.debug(f"Converting manual-only control {sv_id} from module task to debug-only")
+        # Replace the task with a debug-only fallback
+        task_lines = _generate_fallback_task(control)
+        has_real_module = False
+        has_debug_only = True
+    
+    # Add automation level comment
+    automation_source = control.get("automation_source", "none")
+    if automation_level == "automated":
+        # Insert comment before task
+        comment_idx = 0
+        for i, line in enumerate(task_lines):
+            if line.strip().startswith("- name:"):
+                comment_idx = i
+                break
+        if automation_source == "scap":
+            task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated via SCAP")
+        elif automation_source == "nessus":
+            task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated via Nessus")
+        else:
+            task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated")
+    elif automation_level == "manual_only":
+        # Insert comment before task
+        comment_idx = 0
+        for i, line in enumerate(task_lines):
+            if line.strip().startswith("- name:"):
+                comment_idx = i
+                break
+        if automation_source in ["scap", "nessus"]:
+            task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: manual-only (not covered by {automation_source})")
+        else:
+            task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: manual-only")
+    
+    # Ensure tags are added to all tasks (handle multi-task scenarios)
+    # Also replace any existing product tags with the correct one
+    task_lines_str = "\n".join(task_lines)
+    
+    # Replace any existing product tags (rhel8, rhel9, windows2022, etc.) with the correct one
+    # This ensures tasks generated by category functions get the right tag
+    for i, line in enumerate(task_lines):
+        # Replace any product tag with the correct one
+        if "        - rhel8" in line or "        - rhel9" in line or "        - windows" in line or "        - windows11" in line or "        - windows2022" in line:
+            # Find the product tag line and replace it
+            task_lines[i] = f"        - {product_tag}"
+    
+    if "tags:" not in task_lines_str:
+        # Find the last task in the list (in case of multiple tasks)
+        last_task_idx = len(task_lines) - 1
+        for i in range(len(task_lines) - 1, -1, -1):
+            if task_lines[i].strip().startswith("- name:"):
+                last_task_idx = i
+                break
+        
+        # Find where to insert tags (after the module/action, before next task)
+        insert_idx = last_task_idx + 1
+        for i in range(last_task_idx + 1, len(task_lines)):
+            if task_lines[i].strip().startswith("- name:"):
+                insert_idx = i
+                break
+            if task_lines[i].strip() and not task_lines[i].strip().startswith(" ") and not task_lines[i].strip().startswith("#"):
+                insert_idx = i
+                break
+        
+        # Insert tags with product tag
+        task_lines.insert(insert_idx, "      tags:")
+        task_lines.insert(insert_idx + 1, "        - stig")
+        task_lines.insert(insert_idx + 2, f"        - {sv_id}")
+        task_lines.insert(insert_idx + 3, f"        - {category}")
+        task_lines.insert(insert_idx + 4, f"        - severity_{severity}")
+        task_lines.insert(insert_idx + 5, f"        - automation_{automation_level}")
+        task_lines.insert(insert_idx + 6, f"        - {product_tag}")
+    
+    return task_lines
+
+
+def _write_hardening_task_lines(f, task_lines: list[str]) -> None:
+    """Write one control's task lines, quoting any unquoted task names."""
+    f.write("\n")
+    for line in task_lines:
+        # Remove any trailing newline first
+        line = line.rstrip()
+        
+        # Post-process: if this is a task name line and it's not quoted, quote it
+        stripped = line.strip()
+        if stripped.startswith("- name:"):
+            # Check if already quoted (has quotes at start of value)
+            if "name:" in line:
+                line_after_name = line.split("name:", 1)[1].strip()
+                # Check if it starts and ends with quotes
+                is_quoted = (line_after_name.startswith('"') and line_after_name.endswith('"')) or \
+                            (line_after_name.startswith("'") and line_after_name.endswith("'"))
+            else:
+                is_quoted = False
+                line_after_name = ""
+            
+            if not is_quoted:
+                # Extract the name value and quote it
+                name_match = re.match(r'(\s*-\s+name:\s+)(.+)$', line)
+                if name_match:
+                    indent = name_match.group(1)
+                    name_value = name_match.group(2).strip()
+                    # Clean the name value (remove |, replace with -)
+                    name_value = name_value.replace("|", "-")
+                    # Remove trailing ellipses
+                    name_value = name_value.rstrip("...").rstrip(".")
+                    # Quote it
+                    quoted_name = quote_yaml_string(name_value)
+                    line = f"{indent}{quoted_name}"
+                else:
+                    # Fallback: just quote the whole thing after name:
+                    if "name:" in line:
+                        parts = line.split("name:", 1)
+                        indent_and_name = parts[0] + "name:"
+                        name_value = parts[1].strip()
+                        name_value = name_value.replace("|", "-").rstrip("...").rstrip(".")
+                        quoted_name = quote_yaml_string(name_value)
+                        line = f"{indent_and_name} {quoted_name}"
+        
+        # Write the line with newline
+        f.write(f"{line}\n")
+    f.write("\n")
+
+
 def generate_hardening_playbook(controls: list[dict], output_path: Path, product: str = "rhel9") -> None:
     """
     Generate Ansible hardening playbook from StigControl objects.
@@ -3060,292 +3438,312 @@ def generate_hardening_playbook(controls: list[dict], output_path: Path, product
     logger.info(f"Product metadata: tag={product_tag}, os_family={os_family}, name={product_name}")
     
     with open(output_path, "w") as f:
-        # Write header with SCAP-based automation level counts
-        f.write(f"# Generated hardening playbook for {product_tag}\n")
-        f.write(f"# Total Controls: {len(controls)}\n")
+        _write_hardening_header(f, controls, product_tag)
         
-        # Count by automation level
-        automated = sum(1 for c in controls if c.get("automation_level") in ["automated", "automatable", "scannable_with_nessus"])
-        manual_only = sum(1 for c in controls if c.get("automation_level") in ["manual_only", "manual", "not_scannable_with_nessus"])
-        unknown = sum(1 for c in controls if c.get("automation_level") == "unknown")
+        # Generate tasks for each control
+        for control in controls:
+            task_lines = _generate_control_task_lines(control, product_tag)
+            # Write task - ensure all task names are quoted
+            _write_hardening_task_lines(f, task_lines)
+    
+    logger.info(f"Generated hardening playbook with {len(controls)} tasks")
+
+
+# Consolidated hardening groups, in the order their tasks are emitted:
+# (group, play var holding the items, task category tag)
+BULK_HARDENING_GROUPS = (
+    ("packages_present", "stig_packages_present", "package_present"),
+    ("packages_absent", "stig_packages_absent", "package_absent"),
+    ("files", "stig_file_modes", "file_permissions"),
+    ("sysctl", "stig_sysctl_params", "sysctl"),
+    ("services", "stig_service_actions", "service"),
+)
+
+# Drop-in written by the consolidated sysctl task. It must sort after
+# 99-sysctl.conf (the /etc/sysctl.conf symlink) so its values win at boot.
+STIG_SYSCTL_DROPIN = "/etc/sysctl.d/zz-stig-hardening.conf"
+
+
+def _normalize_automation_level(automation_level: str) -> str:
+    """Normalize an automation level (including legacy values) for tagging."""
+    if automation_level in ["automatable", "scannable_with_nessus"]:
+        return "automated"
+    elif automation_level == "semi_automatable":
+        return "manual_only"  # OCIL is not fully automated
+    elif automation_level in ["manual", "not_scannable_with_nessus"]:
+        return "manual_only"
+    return automation_level  # "automated", "manual_only", "unknown"
+
+
+def plan_bulk_hardening(control: dict) -> Optional[tuple[str, dict]]:
+    """
+    Decide whether a control can be applied by a consolidated task.
+    
+    Uses the same extraction as the per-control generators, so a consolidated
+    control enforces exactly what its individual task would.
+    
+    Args:
+        control: StigControl dict
         
-        f.write(f"#   - Automated: {automated} ({automated*100//len(controls) if controls else 0}%)\n")
-        f.write(f"#   - Manual-only: {manual_only} ({manual_only*100//len(controls) if controls else 0}%)\n")
-        if unknown > 0:
-            f.write(f"#   - Unknown: {unknown} ({unknown*100//len(controls) if controls else 0}%)\n")
+    Returns:
+        (group, item) where item is the control's entry in the group's vars
+        list, or None if the control needs its individual task
+    """
+    # Manual-only controls are debug-only in every mode
+    if _normalize_automation_level(control.get("automation_level", "manual")) == "manual_only":
+        return None
+    
+    sv_id = control.get("sv_id", "UNKNOWN")
+    category = categorize_control(control)
+    
+    if category == "sysctl":
+        param = _extract_sysctl_param(control)
+        if param:
+            return "sysctl", {"sv_id": sv_id, **param}
+    
+    elif category in ("service_enabled", "service_disabled"):
+        service = _extract_service_action(control)
+        if service:
+            item = {"sv_id": sv_id, "name": service["unit"]}
+            for key, value in service["params"].items():
+                item[key] = {"yes": True, "no": False}.get(value, value)
+            return "services", item
+    
+    elif category == "package_present":
+        package_name = _extract_package_name(control)
+        if package_name:
+            return "packages_present", {"sv_id": sv_id, "name": package_name}
+    
+    elif category == "package_absent":
+        # Update/patch requirements keep their individual "dnf update" task
+        if not _is_package_update_control(control):
+            package_name = _extract_package_name(control)
+            if package_name:
+                return "packages_absent", {"sv_id": sv_id, "name": package_name}
+    
+    elif category in ("file_permissions", "file_owner"):
+        file_item = _extract_file_permission_item(control)
+        if file_item:
+            item = {"sv_id": sv_id}
+            item.update((key, value) for key, value in file_item.items() if value)
+            return "files", item
+    
+    return None
+
+
+def _bulk_selection_var(var_name: str) -> str:
+    """
+    Play var line selecting the items of a vars list that this run applies.
+    
+    Consolidated tasks carry every STIG ID they cover, so `--tags SV-xxx`
+    runs the whole task. When any of the list's STIG IDs is among the run
+    tags, only those items are selected, as the per-control tasks would
+    have been; otherwise (category, severity or no tags) every item is.
+    """
+    return (
+        f"    {var_name}_selected: \"{{{{ {var_name} | selectattr('sv_id', 'in', ansible_run_tags) | list "
+        f"or {var_name} }}}}\""
+    )
+
+
+def _bulk_hardening_tags(group_tag: str, controls: list[dict], product_tag: str) -> list[str]:
+    """Tags for a consolidated task: group, product, severities, automation levels and every STIG ID."""
+    severities = sorted({c.get("severity", "medium") for c in controls})
+    levels = sorted({_normalize_automation_level(c.get("automation_level", "manual")) for c in controls})
+    return (
+        ["      tags:", "        - stig", f"        - {group_tag}", f"        - {product_tag}"]
+        + [f"        - severity_{severity}" for severity in severities]
+        + [f"        - automation_{level}" for level in levels]
+        + [f"        - {c.get('sv_id', 'UNKNOWN')}" for c in controls]
+    )
+
+
+def generate_bulk_hardening_tasks(group: str, var_name: str, tags: list[str], count: int) -> list[str]:
+    """
+    Generate the consolidated task(s) that apply every item of a group's vars list.
+    
+    Args:
+        group: Group name from BULK_HARDENING_GROUPS
+        var_name: Play var holding the group's items
+        tags: Tag lines for the task(s) (see _bulk_hardening_tags)
+        count: Number of controls in the group (for the task name)
         
-        f.write("\n")
+    Returns:
+        List of YAML lines
+    """
+    if group == "packages_present":
+        return [
+            f"    - name: {quote_yaml_string(f'Install required packages for {count} controls')}",
+            "      ansible.builtin.dnf:",
+            f"        name: \"{{{{ {var_name}_selected | map(attribute='name') | unique | list }}}}\"",
+            "        state: present",
+        ] + tags
+    
+    if group == "packages_absent":
+        return [
+            f"    - name: {quote_yaml_string(f'Remove prohibited packages for {count} controls')}",
+            "      ansible.builtin.dnf:",
+            f"        name: \"{{{{ {var_name}_selected | map(attribute='name') | unique | list }}}}\"",
+            "        state: absent",
+        ] + tags
+    
+    if group == "files":
+        return [
+            f"    - name: {quote_yaml_string(f'Set file permissions and ownership for {count} controls')}",
+            "      ansible.builtin.file:",
+            "        path: \"{{ item.path }}\"",
+            "        mode: \"{{ item.mode | default(omit) }}\"",
+            "        owner: \"{{ item.owner | default(omit) }}\"",
+            "        group: \"{{ item.group | default(omit) }}\"",
+            "        state: \"{{ item.state }}\"",
+            f"      loop: \"{{{{ {var_name}_selected }}}}\"",
+            "      loop_control:",
+            "        label: \"{{ item.sv_id }} {{ item.path }}\"",
+        ] + tags
+    
+    if group == "sysctl":
+        # A full run rewrites the drop-in with every parameter; a run limited
+        # to some STIG IDs only sets their lines. Either way the same keys are
+        # commented out of /etc/sysctl.conf and the other sysctl.d files, since
+        # `sysctl --system` applies /etc/sysctl.conf last.
+        full_run = f"{var_name}_selected | length == {var_name} | length"
+        return [
+            f"    - name: {quote_yaml_string(f'Write kernel parameters for {count} controls')}",
+            "      ansible.builtin.copy:",
+            f"        dest: {STIG_SYSCTL_DROPIN}",
+            f"        content: \"{{% for param in {var_name} %}}{{{{ param.name }}}} = {{{{ param.value }}}}\\n{{% endfor %}}\"",
+            "        owner: root",
+            "        group: root",
+            "        mode: '0644'",
+            f"      when: {full_run}",
+            "      register: stig_sysctl_dropin",
+        ] + tags + [
+            "",
+            f"    - name: {quote_yaml_string('Set selected kernel parameters')}",
+            "      ansible.builtin.lineinfile:",
+            f"        path: {STIG_SYSCTL_DROPIN}",
+            "        regexp: \"^{{ item.name | regex_escape }}\\\\s*=\"",
+            "        line: \"{{ item.name }} = {{ item.value }}\"",
+            "        create: yes",
+            "        owner: root",
+            "        group: root",
+            "        mode: '0644'",
+            f"      loop: \"{{{{ {var_name}_selected }}}}\"",
+            "      loop_control:",
+            "        label: \"{{ item.sv_id }} {{ item.name }}\"",
+            f"      when: not ({full_run})",
+            "      register: stig_sysctl_lines",
+        ] + tags + [
+            "",
+            f"    - name: {quote_yaml_string('Find other sysctl configuration files')}",
+            "      ansible.builtin.find:",
+            "        paths: /etc/sysctl.d",
+            "        patterns: '*.conf'",
+            f"        excludes: {Path(STIG_SYSCTL_DROPIN).name}",
+            "      register: stig_sysctl_files",
+        ] + tags + [
+            "",
+            f"    - name: {quote_yaml_string('Comment out conflicting kernel parameters')}",
+            "      ansible.builtin.replace:",
+            "        path: \"{{ item }}\"",
+            f"        regexp: \"^(\\\\s*(?:{{{{ {var_name}_selected | map(attribute='name') | map('regex_escape') | join('|') }}}})\\\\s*=.*)$\"",
+            "        replace: \"# \\\\1\"",
+            "      loop: \"{{ ['/etc/sysctl.conf'] + stig_sysctl_files.files | map(attribute='path') | list }}\"",
+            "      register: stig_sysctl_conflicts",
+        ] + tags + [
+            "",
+            f"    - name: {quote_yaml_string('Load kernel parameters')}",
+            "      ansible.builtin.command:",
+            "        cmd: sysctl --system",
+            "      when: stig_sysctl_dropin is changed or stig_sysctl_lines is changed or stig_sysctl_conflicts is changed",
+        ] + tags
+    
+    if group == "services":
+        return [
+            f"    - name: {quote_yaml_string(f'Apply service states for {count} controls')}",
+            "      ansible.builtin.systemd:",
+            "        name: \"{{ item.name }}\"",
+            "        enabled: \"{{ item.enabled | default(omit) }}\"",
+            "        masked: \"{{ item.masked | default(omit) }}\"",
+            "        state: \"{{ item.state | default(omit) }}\"",
+            f"      loop: \"{{{{ {var_name}_selected }}}}\"",
+            "      loop_control:",
+            "        label: \"{{ item.sv_id }} {{ item.name }}\"",
+        ] + tags
+    
+    raise ValueError(f"Unknown bulk hardening group: {group}")
+
+
+def generate_consolidated_hardening_playbook(
+    controls: list[dict], output_path: Path, product: str = "rhel9"
+) -> dict[str, int]:
+    """
+    Generate a hardening playbook that applies structured controls in bulk.
+    
+    Package names, file modes, kernel parameters and service actions are
+    collected into play vars lists (one entry per control, carrying its STIG
+    ID) and applied by one task per category: a single dnf call per package
+    state, a looped file/systemd task and one sysctl drop-in loaded with a
+    single `sysctl --system`. Each consolidated task is tagged with every
+    STIG ID it covers and, when run with STIG ID tags, applies only those
+    controls' items. Remaining controls get the same per-control tasks as
+    generate_hardening_playbook.
+    
+    Args:
+        controls: List of StigControl dicts
+        output_path: Path where playbook YAML should be written
+        product: Product identifier (e.g., "rhel9") - used as fallback if not in controls
         
-        # Write playbook structure - product-aware with quoted names
-        play_name_quoted = quote_yaml_string(f"{product_name} STIG Hardening")
-        f.write(f"- name: {play_name_quoted}\n")
-        f.write("  hosts: all\n")
-        f.write("  become: yes\n")
-        f.write("  gather_facts: yes\n")
-        f.write("  vars:\n")
-        f.write("    # Place any tunable defaults here if needed later\n")
-        
-        # Write OS-specific pre_tasks
-        if os_family == "RedHat":
-            f.write("  pre_tasks:\n")
-            # Extract version from product (e.g., "rhel8" -> "8", "rhel9" -> "9")
-            version_match = re.search(r'(\d+)', product_tag)
-            version = version_match.group(1) if version_match else "9"
-            pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
-            f.write(f"    - name: {pre_task_name}\n")
-            f.write("      ansible.builtin.assert:\n")
-            f.write("        that:\n")
-            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-            f.write(f"          - ansible_facts['distribution_major_version'] == '{version}'\n")
-            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''distribution_major_version''] }} }}'\n")
-            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
-        elif os_family == "Windows":
-            f.write("  pre_tasks:\n")
-            pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
-            f.write(f"    - name: {pre_task_name}\n")
-            f.write("      ansible.builtin.assert:\n")
-            f.write("        that:\n")
-            f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-            # Windows version check - extract from product
-            if "2022" in product_tag:
-                f.write("          - ansible_facts['os_version'] is version('10.0.20348', '>=')\n")
-            elif "2019" in product_tag:
-                f.write("          - ansible_facts['os_version'] is version('10.0.17763', '>=')\n")
-            f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }} {{ {{ ansible_facts[''os_version''] }} }}'\n")
-            f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
+    Returns:
+        Number of consolidated controls per group, plus "individual"
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    
+    product_tag = get_product_tag_from_controls(controls, product)
+    # Bulk tasks use dnf, systemd and sysctl.d
+    can_consolidate = os_family_for_product(product_tag) not in ("Windows", "network")
+    
+    planned: dict[str, list[tuple[dict, dict]]] = {group: [] for group, _, _ in BULK_HARDENING_GROUPS}
+    individual: list[dict] = []
+    for control in controls:
+        plan = plan_bulk_hardening(control) if can_consolidate else None
+        if plan:
+            group, item = plan
+            planned[group].append((control, item))
         else:
-            # Generic OS check for other products
-            if os_family:
-                f.write("  pre_tasks:\n")
-                pre_task_name = quote_yaml_string(f"Verify {product_name} OS family")
-                f.write(f"    - name: {pre_task_name}\n")
-                f.write("      ansible.builtin.assert:\n")
-                f.write("        that:\n")
-                f.write(f"          - ansible_facts['os_family'] == '{os_family}'\n")
-                f.write(f"        fail_msg: 'This playbook is designed for {product_name} only. Detected OS: {{ {{ ansible_facts[''os_family''] }} }}'\n")
-                f.write(f"        success_msg: 'OS verification passed: {product_name} detected'\n")
-        
-        f.write("\n")
-        
-        # Write OS-specific handlers (only Linux handlers for Linux, none for Windows)
-        if os_family == "RedHat":
-            f.write("  handlers:\n")
-            # Regenerate grub configuration
-            handler_name = quote_yaml_string("Regenerate grub configuration")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.command:\n")
-            f.write("        cmd: grub2-mkconfig -o /boot/grub2/grub.cfg\n")
-            f.write("      when: ansible_os_family == 'RedHat'\n")
-            f.write("\n")
-            # Restart sshd
-            handler_name = quote_yaml_string("Restart sshd")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.service:\n")
-            f.write("        name: sshd\n")
-            f.write("        state: restarted\n")
-            f.write("\n")
-            # Reload systemd daemon
-            handler_name = quote_yaml_string("Reload systemd daemon")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.systemd:\n")
-            f.write("        daemon_reload: yes\n")
-            f.write("\n")
-            # Reload sysctl
-            handler_name = quote_yaml_string("Reload sysctl")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.command:\n")
-            f.write("        cmd: sysctl -p\n")
-            f.write("      ignore_errors: yes\n")
-            f.write("\n")
-            # Reload firewalld
-            handler_name = quote_yaml_string("Reload firewalld")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.command:\n")
-            f.write("        cmd: firewall-cmd --reload\n")
-            f.write("      when: ansible_facts['os_family'] == 'RedHat'\n")
-            f.write("      ignore_errors: yes\n")
-            f.write("\n")
-            # Update dconf database
-            handler_name = quote_yaml_string("Update dconf database")
-            f.write(f"    - name: {handler_name}\n")
-            f.write("      ansible.builtin.command:\n")
-            f.write("        cmd: dconf update\n")
-            f.write("      when: ansible_pkg_mgr == 'dnf' or ansible_pkg_mgr == 'yum'\n")
-            f.write("\n")
-        # For Windows and other OSes, handlers section is empty or minimal
-        # (Windows-specific handlers can be added here in the future if needed)
-        
-        f.write("  tasks:\n")
+            individual.append(control)
+    
+    # Vars lists, one JSON flow mapping (valid YAML) per control
+    play_vars = []
+    for group, var_name, _ in BULK_HARDENING_GROUPS:
+        if planned[group]:
+            play_vars.append(f"    {var_name}:")
+            play_vars.extend(f"      - {json.dumps(item)}" for _, item in planned[group])
+            play_vars.append(_bulk_selection_var(var_name))
+    
+    with open(output_path, "w") as f:
+        _write_hardening_header(f, controls, product_tag, play_vars)
         
-        # Generate tasks for each control
-        for control in controls:
-            sv_id = control.get("sv_id", "UNKNOWN")
-            category = categorize_control(control)
-            control["category"] = category  # Update control with category
-            
-            # Generate task lines
-            task_lines = generate_category_task(control, category)
-            
-            # Check if the generated task is actually a real enforcing task (not just debug)
-            task_lines_str = "\n".join(task_lines)
-            has_debug_only = (
-                'ansible.builtin.debug' in task_lines_str or
-                'debug:' in task_lines_str
+        for group, var_name, group_tag in BULK_HARDENING_GROUPS:
+            if not planned[group]:
+                continue
+            group_controls = [control for control, _ in planned[group]]
+            tags = _bulk_hardening_tags(group_tag, group_controls, product_tag)
+            _write_hardening_task_lines(
+                f, generate_bulk_hardening_tasks(group, var_name, tags, len(group_controls))
             )
-            # Check for real enforcing modules
-            real_modules = [
-                'ansible.builtin.file', 'ansible.builtin.lineinfile', 'ansible.builtin.sysctl',
-                'ansible.builtin.systemd', 'ansible.builtin.service', 'ansible.builtin.dnf',
-                'ansible.builtin.yum', 'ansible.builtin.command', 'ansible.builtin.shell',
-                'ansible.builtin.copy', 'ansible.builtin.template', 'ansible.builtin.blockinfile',
-                'ansible.windows.win_regedit', 'ansible.windows.win_security_policy',
-                'ansible.windows.win_user_right', 'ansible.windows.win_audit_policy',
-                'ansible.posix.firewalld', 'ansible.builtin.mount'
-            ]
-            has_real_module = any(module in task_lines_str for module in real_modules)
-            
-            # Add tags and comments based on automation_level
-            severity = control.get("severity", "medium")
-            automation_level = control.get("automation_level", "manual")
-            
-            # Normalize automation_level
-            # New values: "automated", "manual_only", "unknown"
-            # Legacy: "scannable_with_nessus", "not_scannable_with_nessus", "automatable", "semi_automatable", "manual"
-            if automation_level in ["automatable", "scannable_with_nessus"]:
-                automation_level = "automated"  # Treat as automated for tagging
-            elif automation_level == "semi_automatable":
-                automation_level = "manual_only"  # OCIL is not fully automated
-            elif automation_level in ["manual", "not_scannable_with_nessus"]:
-                automation_level = "manual_only"
-            elif automation_level == "unknown":
-                automation_level = "unknown"
-            
-            # If tagged as automated but only has debug task, downgrade to manual_only
-            if automation_level == "automated" and has_debug_only and not has_real_module:
-                automation_level = "manual_only"
-                logger.debug(f"Downgraded {sv_id} from automated to manual_only (only debug task generated)")
-            
-            # If tagged as manual_only but has a real Windows module, convert to debug-only
-            if automation_level in ["manual", "manual_only"] and has_real_module:
-                logger.debug(f"Converting manual-only control {sv_id} from module task to debug-only")
-                # Replace the task with a debug-only fallback
-                task_lines = _generate_fallback_task(control)
-                has_real_module = False
-                has_debug_only = True
-            
-            # Add automation level comment
-            automation_source = control.get("automation_source", "none")
-            if automation_level == "automated":
-                # Insert comment before task
-                comment_idx = 0
-                for i, line in enumerate(task_lines):
-                    if line.strip().startswith("- name:"):
-                        comment_idx = i
-                        break
-                if automation_source == "scap":
-                    task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated via SCAP")
-                elif automation_source == "nessus":
-                    task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated via Nessus")
-                else:
-                    task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: automated")
-            elif automation_level == "manual_only":
-                # Insert comment before task
-                comment_idx = 0
-                for i, line in enumerate(task_lines):
-                    if line.strip().startswith("- name:"):
-                        comment_idx = i
-                        break
-                if automation_source in ["scap", "nessus"]:
-                    task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: manual-only (not covered by {automation_source})")
-                else:
-                    task_lines.insert(comment_idx, f"    # STIG ID: {sv_id} | Automation: manual-only")
-            
-            # Ensure tags are added to all tasks (handle multi-task scenarios)
-            # Also replace any existing product tags with the correct one
-            task_lines_str = "\n".join(task_lines)
-            
-            # Replace any existing product tags (rhel8, rhel9, windows2022, etc.) with the correct one
-            # This ensures tasks generated by category functions get the right tag
-            for i, line in enumerate(task_lines):
-                # Replace any product tag with the correct one
-                if "        - rhel8" in line or "        - rhel9" in line or "        - windows" in line or "        - windows11" in line or "        - windows2022" in line:
-                    # Find the product tag line and replace it
-                    task_lines[i] = f"        - {product_tag}"
-            
-            if "tags:" not in task_lines_str:
-                # Find the last task in the list (in case of multiple tasks)
-                last_task_idx = len(task_lines) - 1
-                for i in range(len(task_lines) - 1, -1, -1):
-                    if task_lines[i].strip().startswith("- name:"):
-                        last_task_idx = i
-                        break
-                
-                # Find where to insert tags (after the module/action, before next task)
-                insert_idx = last_task_idx + 1
-                for i in range(last_task_idx + 1, len(task_lines)):
-                    if task_lines[i].strip().startswith("- name:"):
-                        insert_idx = i
-                        break
-                    if task_lines[i].strip() and not task_lines[i].strip().startswith(" ") and not task_lines[i].strip().startswith("#"):
-                        insert_idx = i
-                        break
-                
-                # Insert tags with product tag
-                task_lines.insert(insert_idx, "      tags:")
-                task_lines.insert(insert_idx + 1, "        - stig")
-                task_lines.insert(insert_idx + 2, f"        - {sv_id}")
-                task_lines.insert(insert_idx + 3, f"        - {category}")
-                task_lines.insert(insert_idx + 4, f"        - severity_{severity}")
-                task_lines.insert(insert_idx + 5, f"        - automation_{automation_level}")
-                task_lines.insert(insert_idx + 6, f"        - {product_tag}")
-            
-            # Write task - ensure all task names are quoted
-            f.write("\n")
-            for line in task_lines:
-                # Remove any trailing newline first
-                line = line.rstrip()
-                
-                # Post-process: if this is a task name line and it's not quoted, quote it
-                stripped = line.strip()
-                if stripped.startswith("- name:"):
-                    # Check if already quoted (has quotes at start of value)
-                    if "name:" in line:
-                        line_after_name = line.split("name:", 1)[1].strip()
-                        # Check if it starts and ends with quotes
-                        is_quoted = (line_after_name.startswith('"') and line_after_name.endswith('"')) or \
-                                    (line_after_name.startswith("'") and line_after_name.endswith("'"))
-                    else:
-                        is_quoted = False
-                        line_after_name = ""
-                    
-                    if not is_quoted:
-                        # Extract the name value and quote it
-                        name_match = re.match(r'(\s*-\s+name:\s+)(.+)$', line)
-                        if name_match:
-                            indent = name_match.group(1)
-                            name_value = name_match.group(2).strip()
-                            # Clean the name value (remove |, replace with -)
-                            name_value = name_value.replace("|", "-")
-                            # Remove trailing ellipses
-                            name_value = name_value.rstrip("...").rstrip(".")
-                            # Quote it
-                            quoted_name = quote_yaml_string(name_value)
-                            line = f"{indent}{quoted_name}"
-                        else:
-                            # Fallback: just quote the whole thing after name:
-                            if "name:" in line:
-                                parts = line.split("name:", 1)
-                                indent_and_name = parts[0] + "name:"
-                                name_value = parts[1].strip()
-                                name_value = name_value.replace("|", "-").rstrip("...").rstrip(".")
-                                quoted_name = quote_yaml_string(name_value)
-                                line = f"{indent_and_name} {quoted_name}"
-                
-                # Write the line with newline
-                f.write(f"{line}\n")
-            f.write("\n")
+        
+        for control in individual:
+            _write_hardening_task_lines(f, _generate_control_task_lines(control, product_tag))
     
-    logger.info(f"Generated hardening playbook with {len(controls)} tasks")
+    counts = {group: len(planned[group]) for group, _, _ in BULK_HARDENING_GROUPS}
+    bulk_groups = sum(1 for count in counts.values() if count)
+    counts["individual"] = len(individual)
+    logger.info(
+        f"Generated consolidated hardening playbook: {len(controls) - len(individual)} controls "
+        f"in {bulk_groups} bulk groups, {len(individual)} individual controls"
+    )
+    return counts
 
 
 def verify_coverage(controls: list[dict], playbook_path: Path) -> bool:
@@ -3410,19 +3808,28 @@ def main():
         action="store_true",
         help="Verify that all STIG IDs are covered in the playbook"
     )
+    parser.add_argument(
+        "--consolidated",
+        action="store_true",
+        help="Apply packages, file modes, sysctl parameters and services through vars "
+             "lists and one task per category"
+    )
     
     args = parser.parse_args()
     
     try:
         # Load controls from JSON
-        controls = load_controls_from_json(args.input)
+        controls = load_controls_from_json(args.input, fields=HARDENING_FIELDS)
         
         if not controls:
             logger.warning("No controls found in input file")
             return 1
         
         # Generate hardening playbook
-        generate_hardening_playbook(controls, args.output, args.product)
+        if args.consolidated:
+            generate_consolidated_hardening_playbook(controls, args.output, args.product)
+        else:
+            generate_hardening_playbook(controls, args.output, args.product)
         
         # Verify coverage if requested
         if args.verify_coverage:
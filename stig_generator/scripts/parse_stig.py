@@ -14,7 +14,7 @@ import json
 import logging
 import re
 import sys
-from dataclasses import asdict, dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from typing import Literal, Optional
 
@@ -45,6 +45,7 @@ class StigControl:
     category: str = "other"  # e.g. "file_permissions", "package_present", "service_enabled", etc.
     automation_level: Literal["automated", "manual_only", "unknown"] = "unknown"  # Automation classification
     automation_source: Literal["none", "scap", "nessus"] = "none"  # Source of automation metadata
+    check_analysis: dict = field(default_factory=dict)  # Parse-time check commands (CheckCommandAnalysis.to_dict())
     
     def to_dict(self) -> dict:
         """Convert to dictionary for JSON serialization."""
@@ -187,9 +188,6 @@ def parse_xccdf_file(
         else:
             logger.warning("No secondary artifact provided and no SCAP benchmark found - will use fallback classification")
     
-    # Use existing parser
-    legacy_controls = parse_xccdf_legacy(file_path, os_family=None)
-    
     # Extract product from path or original filename
     if original_filename:
         # Try original filename first (for uploaded files with temp paths)
@@ -201,6 +199,10 @@ def parse_xccdf_file(
         product = _extract_product_from_path(file_path)
     logger.info(f"Detected product: {product}")
     
+    # Use existing parser; check commands are extracted once, for the product
+    # the script generators target
+    legacy_controls = parse_xccdf_legacy(file_path, os_family=None, check_os_family=product)
+    
     # Map legacy StigControl to simplified version
     controls = []
     for legacy in legacy_controls:
@@ -279,7 +281,8 @@ def parse_xccdf_file(
             product=product,  # e.g., "rhel9", "windows11", "cisco_ios_switch_ndm"
             category=category,  # e.g., "file_permission", "service", "package", etc.
             automation_level=automation_level,  # "automated", "manual_only", "unknown"
-            automation_source=control_automation_source  # "none", "scap", "nessus"
+            automation_source=control_automation_source,  # "none", "scap", "nessus"
+            check_analysis=legacy.check_analysis.to_dict(),
         )
         controls.append(control)
     
@@ -308,15 +311,24 @@ def save_controls_to_json(controls: list[StigControl], output_path: Path) -> Non
     """
     Save StigControl objects to JSON file.
     
+    If output_path ends in .stigdb, the controls are written to the binary
+    control store instead (see scripts/control_store.py).
+    
     Args:
         controls: List of StigControl objects
         output_path: Path where JSON should be written
     """
+    from scripts.control_store import STORE_SUFFIX, write_control_store
+    
     output_path.parent.mkdir(parents=True, exist_ok=True)
     
     # Convert to list of dicts
     controls_dict = [control.to_dict() for control in controls]
     
+    if output_path.suffix == STORE_SUFFIX:
+        write_control_store(controls_dict, output_path)
+        return
+    
     with open(output_path, "w", encoding="utf-8") as f:
         json.dump(controls_dict, f, indent=2, ensure_ascii=False)
     
@@ -327,14 +339,18 @@ def load_controls_from_json(json_path: Path) -> list[StigControl]:
     """
     Load StigControl objects from JSON file.
     
+    Binary control stores (.stigdb) are detected by their magic bytes and
+    loaded through the same path.
+    
     Args:
-        json_path: Path to JSON file
+        json_path: Path to JSON file or control store
         
     Returns:
         List of StigControl objects
     """
-    with open(json_path, "r", encoding="utf-8") as f:
-        controls_dict = json.load(f)
+    from scripts.control_store import load_control_dicts
+    
+    controls_dict = load_control_dicts(json_path)
     
     controls = [StigControl(**control_dict) for control_dict in controls_dict]
     logger.info(f"Loaded {len(controls)} controls from {json_path}")
@@ -356,7 +372,7 @@ def main():
         "--output", "-o",
         type=Path,
         required=True,
-        help="Path to output JSON file (e.g., data/json/rhel9_2024_Q4_controls.json)"
+        help="Path to output JSON file (e.g., data/json/rhel9_2024_Q4_controls.json); use a .stigdb suffix for the binary control store"
     )
     parser.add_argument(
         "--secondary-artifact",
@@ -0,0 +1,89 @@
+"""Tests for the standalone check runner emitted by generate_checker."""
+
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from scripts.check_runner import run_checks
+from scripts.generate_checker import build_runner_checks, generate_runner_checker_playbook
+
+
+def _control(sv_id: str, commands: list[str], automation_level: str = "automated") -> dict:
+    return {
+        "sv_id": sv_id,
+        "title": f"Vendor's check for {sv_id}",
+        "check_text": "",
+        "product": "rhel9",
+        "automation_level": automation_level,
+        "check_analysis": {
+            "os_family": "rhel9",
+            "commands": commands,
+            "notes": [],
+            "valid_commands": commands,
+        },
+    }
+
+
+CONTROLS = [
+    _control("SV-000001r1_rule", ["awk 'BEGIN { print \"hello\" }'"]),
+    _control("SV-000002r1_rule", ["grep -q nomatch /dev/null"]),
+    _control("SV-000003r1_rule", [], automation_level="manual_only"),
+]
+
+
+def test_build_runner_checks():
+    """Test that runner entries come from the validated check commands."""
+    checks = build_runner_checks(CONTROLS)
+
+    assert [check["sv_id"] for check in checks] == [c["sv_id"] for c in CONTROLS]
+    assert checks[0]["commands"] == CONTROLS[0]["check_analysis"]["commands"]
+    assert checks[2]["commands"] == []
+    assert checks[2]["note"] == "SV-000003r1_rule requires manual verification. See CTP document for procedure."
+
+
+def test_run_checks_statuses_and_timeout():
+    """Test that checks run concurrently, keep input order and honour timeouts."""
+    checks = build_runner_checks(CONTROLS) + [
+        {"sv_id": "SV-000004r1_rule", "commands": ["sleep 5"]},
+    ]
+    document = run_checks(checks, workers=4, timeout=0.5)
+
+    results = document["results"]
+    assert list(results) == [check["sv_id"] for check in checks]
+    assert results["SV-000001r1_rule"]["status"] == "completed"
+    assert results["SV-000001r1_rule"]["commands"][0]["stdout"] == "hello\n"
+    assert results["SV-000002r1_rule"]["status"] == "nonzero_exit"
+    assert results["SV-000003r1_rule"]["status"] == "manual"
+    assert results["SV-000004r1_rule"]["status"] == "timeout"
+    assert document["duration"] < 5
+    assert document["summary"] == {"total": 4, "completed": 1, "nonzero_exit": 1, "manual": 1, "timeout": 1}
+
+
+def test_generate_runner_checker_playbook():
+    """Test that the playbook runs the runner once and shows one result per control."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "checker.yml"
+        runner_path = generate_runner_checker_playbook(CONTROLS, output_path)
+
+        assert runner_path == Path(tmpdir) / "checker_runner.py"
+
+        tasks = yaml.safe_load(output_path.read_text())[0]["tasks"]
+        remote = [t for t in tasks if "ansible.builtin.script" in t]
+        assert len(remote) == 1
+        assert "checker_runner.py" in remote[0]["ansible.builtin.script"]["cmd"]
+
+        for control in CONTROLS:
+            assert any(control["sv_id"] in t["tags"] for t in tasks)
+
+        # The emitted runner is self-contained and produces one JSON document
+        proc = subprocess.run(
+            [sys.executable, str(runner_path), "--only", "SV-000001r1_rule"],
+            capture_output=True, text=True, check=True,
+        )
+        document = json.loads(proc.stdout)
+        assert document["product"] == "rhel9"
+        assert list(document["results"]) == ["SV-000001r1_rule"]
@@ -0,0 +1,47 @@
+"""Tests for the check text analysis used by CTP generation."""
+
+from app.generators.check_text import CheckTextAnalysis, analyze_check_text
+
+
+SAMPLE_CHECK_TEXT = (
+    "Check the audit configuration with the following command:\n"
+    "\n"
+    "$ sudo grep -i space_left_action /etc/audit/auditd.conf\n"
+    "space_left_action = email\n"
+    "\n"
+    "The value must be \"email\" or \"exec\".\n"
+    "If the value is missing, this is a finding."
+)
+
+
+def test_check_text_tokens():
+    """Test that the check text is tokenized once into lines, paths and conditions."""
+    analysis = CheckTextAnalysis(SAMPLE_CHECK_TEXT)
+
+    assert analysis.lines[2].startswith("$ sudo grep")
+    assert analysis.system_file_paths == ["/etc/audit/auditd.conf"]
+    assert analysis.lines_mentioning("grep -i") == [2]
+    assert analysis.finding_condition_long == "the value is missing"
+    assert "space_left_action = email" in analysis.autonomous_notes
+
+
+def test_check_text_expected_results():
+    """Test command-specific and command-independent expected results."""
+    analysis = CheckTextAnalysis(SAMPLE_CHECK_TEXT)
+
+    expected = analysis.detailed_expected_result("grep -i space_left_action")
+    assert expected == "Output must be: email. If it is not, this is a finding."
+    # Memoized per command
+    assert analysis.detailed_expected_result("grep -i space_left_action") is expected
+    assert analysis.stig_requirements == "Must be: email"
+    assert analysis.expected_screen_output == "Command output should show lines matching pattern: -i"
+
+    # No registry/GUI content in a Linux check
+    assert analysis.registry_entries == []
+    assert analysis.navigation_steps == ""
+
+
+def test_analyze_check_text_is_cached():
+    """Test that repeated lookups for the same text share one analysis."""
+    assert analyze_check_text(SAMPLE_CHECK_TEXT) is analyze_check_text(SAMPLE_CHECK_TEXT)
+    assert analyze_check_text("").text == ""
@@ -0,0 +1,95 @@
+"""Tests for the consolidated checker playbook mode."""
+
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from scripts.generate_checker import generate_consolidated_checker_playbook, plan_bulk_check
+
+
+CONTROLS = [
+    {
+        "sv_id": "SV-257933r1044922_rule",
+        "title": "RHEL 9 /etc/shadow file must have mode 0000.",
+        "category": "file_permissions",
+        "check_text": "$ sudo stat -c \"%a %n\" /etc/shadow\n\n0 /etc/shadow\n\nIf mode is not 0000, this is a finding.",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257799r1044838_rule",
+        "title": "RHEL 9 must restrict exposed kernel pointer addresses.",
+        "category": "sysctl",
+        "check_text": "$ sysctl kernel.kptr_restrict\nkernel.kptr_restrict = 1\n\nIf the value is not 1, this is a finding.",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257782r991589_rule",
+        "title": "RHEL 9 must enable the hardware random number generator entropy gatherer service.",
+        "category": "service_enabled",
+        "check_text": "$ systemctl is-active rngd\n\nactive",
+        "product": "rhel9",
+        "automation_level": "manual_only",
+    },
+    {
+        "sv_id": "SV-257777r991589_rule",
+        "title": "RHEL 9 must be a vendor-supported release.",
+        "category": "config",
+        "check_text": "$ cat /etc/redhat-release\n\nRed Hat Enterprise Linux release 9.2 (Plow)",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257778r1134892_rule",
+        "title": "RHEL 9 must be reviewed manually.",
+        "category": "other",
+        "check_text": "Interview the system administrator.",
+        "product": "rhel9",
+        "automation_level": "manual_only",
+    },
+]
+
+
+def test_plan_bulk_check_groups():
+    """Test that controls are planned into the expected bulk groups."""
+    groups = [plan_bulk_check(control) for control in CONTROLS]
+
+    assert groups[0] == ("files", {"path": "/etc/shadow", "mode": "0000"})
+    assert groups[1] == ("sysctl", {"name": "kernel.kptr_restrict", "value": "1"})
+    assert groups[2] == ("services", {"unit": "rngd.service", "enabled": True})
+    assert groups[3] == ("commands", {"cmd": "cat /etc/redhat-release"})
+    assert groups[4] is None
+
+
+def test_consolidated_checker_playbook():
+    """Test that the consolidated playbook batches collection and keeps per-control tags."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "checker.yml"
+        counts = generate_consolidated_checker_playbook(CONTROLS, output_path)
+
+        assert counts == {
+            "files": 1, "packages": 0, "services": 1, "sysctl": 1,
+            "mounts": 0, "commands": 1, "individual": 1,
+        }
+
+        playbook = yaml.safe_load(output_path.read_text())
+        tasks = playbook[0]["tasks"]
+
+        # One remote collection per group; everything else is evaluated locally
+        remote = [t for t in tasks if any(k in t for k in (
+            "ansible.builtin.shell", "ansible.builtin.command", "ansible.builtin.service_facts"
+        ))]
+        assert len(remote) == 4
+        assert all("always" in t["tags"] for t in remote)
+
+        # Every STIG ID is still individually taggable
+        for control in CONTROLS:
+            assert any(control["sv_id"] in t.get("tags", []) for t in tasks)
+
+        sysctl_assert = next(t for t in tasks if t["name"].startswith("SV-257799r1044838_rule"))
+        assert sysctl_assert["ansible.builtin.assert"]["that"] == [
+            'stig_sysctl_facts["kernel.kptr_restrict"] | default("") == "1"'
+        ]
+        assert "validate_automated" in sysctl_assert["tags"]
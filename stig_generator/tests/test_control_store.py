@@ -0,0 +1,168 @@
+"""Tests for the binary control store."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from scripts.control_store import (
+    ControlStore,
+    is_control_store,
+    iter_control_dicts,
+    load_control_dicts,
+    save_control_dicts,
+    write_control_store,
+)
+
+
+SAMPLE_CONTROLS = [
+    {
+        "sv_id": "SV-257777r991589_rule",
+        "nist_id": "CM.06.1(iv)",
+        "severity": "high",
+        "title": "RHEL 9 must be a vendor-supported release.",
+        "description": "An operating system release is considered \"supported\"…",
+        "check_text": "$ cat /etc/redhat-release\n\nRed Hat Enterprise Linux release 9.2 (Plow)",
+        "fix_text": "Upgrade to a supported version of RHEL 9.",
+        "product": "rhel9",
+        "category": "config",
+        "automation_level": "automated",
+        "automation_source": "scap",
+    },
+    {
+        "sv_id": "SV-257778r1134892_rule",
+        "nist_id": None,
+        "severity": "medium",
+        "title": "RHEL 9 vendor packaged system security patches and updates must be installed.",
+        "description": "",
+        "check_text": "$ dnf history list | more",
+        "fix_text": "$ sudo dnf update",
+        "product": "rhel9",
+        "category": "package",
+        "automation_level": "manual_only",
+        "automation_source": "scap",
+        "references": ["CCI-000366"],
+    },
+]
+
+
+def test_control_store_round_trip():
+    """Test that JSON -> store -> dicts is lossless, including None and list values."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = Path(tmpdir) / "controls.stigdb"
+        assert write_control_store(SAMPLE_CONTROLS, store_path) == 2
+        assert is_control_store(store_path)
+
+        assert load_control_dicts(store_path) == SAMPLE_CONTROLS
+
+
+def test_control_store_field_access():
+    """Test single-field decoding, projection and lookup by STIG ID."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = Path(tmpdir) / "controls.stigdb"
+        write_control_store(SAMPLE_CONTROLS, store_path)
+
+        with ControlStore(store_path) as store:
+            assert len(store) == 2
+            assert store.get_field(1, "category") == "package"
+            assert store.get_field(0, "nist_id") == "CM.06.1(iv)"
+            assert store.get_field(1, "nist_id") is None
+            # Missing key in a record returns the default
+            assert store.get_field(0, "references", []) == []
+            assert store.get_field(0, "no_such_field", "x") == "x"
+
+            projected = list(store.iter_records(fields={"sv_id", "automation_level"}))
+            assert projected[1] == {"sv_id": "SV-257778r1134892_rule", "automation_level": "manual_only"}
+
+            assert store.find("SV-257778r1134892_rule")["references"] == ["CCI-000366"]
+            assert store.find("SV-000000r000000_rule") is None
+
+            with pytest.raises(IndexError):
+                store.get_field(2, "sv_id")
+
+
+def test_control_store_rejects_json():
+    """Test that a JSON file is not mistaken for a store."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "controls.json"
+        save_control_dicts(SAMPLE_CONTROLS, json_path)
+
+        assert not is_control_store(json_path)
+        assert load_control_dicts(json_path) == json.loads(json_path.read_text(encoding="utf-8"))
+        with pytest.raises(ValueError):
+            ControlStore(json_path)
+
+
+def test_control_store_empty():
+    """Test that an empty control list produces a valid, empty store."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = Path(tmpdir) / "empty.stigdb"
+        write_control_store([], store_path)
+
+        with ControlStore(store_path) as store:
+            assert len(store) == 0
+            assert store.fields == ()
+            assert list(store) == []
+
+
+def test_load_control_dicts_field_projection():
+    """Test that a field projection streams only the requested keys from JSON and stores."""
+    fields = {"sv_id", "check_text", "automation_level"}
+    expected = [{k: v for k, v in c.items() if k in fields} for c in SAMPLE_CONTROLS]
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "controls.json"
+        store_path = Path(tmpdir) / "controls.stigdb"
+        save_control_dicts(SAMPLE_CONTROLS, json_path)
+        write_control_store(SAMPLE_CONTROLS, store_path)
+
+        assert load_control_dicts(json_path, fields=fields) == expected
+        assert load_control_dicts(store_path, fields=fields) == expected
+
+        # Projection over every key is equivalent to a full json.load
+        all_fields = {k for c in SAMPLE_CONTROLS for k in c}
+        assert list(iter_control_dicts(json_path, fields=all_fields)) == SAMPLE_CONTROLS
+
+
+def test_iter_control_dicts_compact_and_escaped_json():
+    """Test the streaming reader on compact JSON with escapes and nested values."""
+    controls = [
+        {"sv_id": "SV-1\"quoted\"", "title": "a\\\\b", "nested": {"x": [1, {"y": "]}"}]}, "n": 3},
+        {},
+        {"sv_id": "SV-2", "flag": True, "none": None},
+    ]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        json_path = Path(tmpdir) / "compact.json"
+        json_path.write_text(json.dumps(controls, separators=(",", ":")), encoding="utf-8")
+
+        assert list(iter_control_dicts(json_path, fields={"sv_id"})) == [
+            {"sv_id": "SV-1\"quoted\""},
+            {},
+            {"sv_id": "SV-2"},
+        ]
+        all_fields = {"sv_id", "title", "nested", "n", "flag", "none"}
+        assert list(iter_control_dicts(json_path, fields=all_fields)) == controls
+
+
+def test_control_store_dropped_from_cache_stays_readable():
+    """Test that a replaced store stays usable by its holders and closes when collected."""
+    import gc
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        store_path = Path(tmpdir) / "controls.stigdb"
+        write_control_store(SAMPLE_CONTROLS, store_path)
+
+        cache = {store_path: ControlStore(store_path)}
+        in_use = cache[store_path]
+        # Another request replaces the cached store (e.g. the file changed)
+        cache[store_path] = ControlStore(store_path)
+
+        assert in_use.get_field(1, "sv_id") == "SV-257778r1134892_rule"
+
+        mm = in_use._mm
+        del in_use
+        gc.collect()
+        assert mm.closed
+        assert cache[store_path].get_field(0, "severity") == "high"
+        cache[store_path].close()
@@ -0,0 +1,80 @@
+"""Tests for the streaming CTP CSV pipeline."""
+
+import csv
+import tempfile
+from pathlib import Path
+
+from scripts.generate_ctp import generate_ctp_csv, generate_ctp_rows_for_control
+
+
+def _make_controls(count: int) -> list[dict]:
+    controls = []
+    for i in range(count):
+        controls.append({
+            "sv_id": f"SV-{250000 + i}r1_rule",
+            "nist_id": "AU.02",
+            "severity": "medium",
+            "title": f"RHEL 9 must set kernel parameter {i}.",
+            "check_text": (
+                f"Verify the setting with the following command:\n\n"
+                f"$ sudo sysctl kernel.param_{i}\n\n"
+                f"kernel.param_{i} = 1\n\n"
+                f"If the value is not set to \"1\", this is a finding."
+            ),
+            "product": "rhel9",
+            "automation_level": "manual_only" if i % 2 else "automated",
+            "automation_source": "scap",
+        })
+    return controls
+
+
+def test_ctp_pipeline_pool_matches_inline():
+    """Test that pooled extraction writes the same rows, in the same order, as inline."""
+    controls = _make_controls(25)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        inline_path = Path(tmpdir) / "inline.csv"
+        pooled_path = Path(tmpdir) / "pooled.csv"
+
+        inline_stats = generate_ctp_csv(controls, inline_path, manual_only=False)
+        pooled_stats = generate_ctp_csv(iter(controls), pooled_path, manual_only=False, workers=3)
+
+        assert inline_path.read_text(encoding="utf-8") == pooled_path.read_text(encoding="utf-8")
+        assert inline_stats.rows_written == pooled_stats.rows_written
+
+        expected_rows = sum(len(generate_ctp_rows_for_control(c)) for c in controls)
+        assert pooled_stats.rows_written == expected_rows
+
+
+def test_ctp_pipeline_stats_and_filtering():
+    """Test manual-only filtering and per-stage counters."""
+    controls = _make_controls(10)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "ctp.csv"
+        stats = generate_ctp_csv(controls, output_path, manual_only=True, workers=2)
+
+        assert stats.controls_seen == 10
+        assert stats.controls_processed == 5
+        assert stats.step_seconds > 0
+        assert stats.expected_seconds > 0
+        assert set(stats.to_dict()) >= {"filter_seconds", "write_seconds", "total_seconds"}
+
+        with open(output_path, newline="", encoding="utf-8") as f:
+            ids = [row["STIG ID"] for row in csv.DictReader(f)]
+        assert ids == sorted(set(ids), key=ids.index)
+        assert {int(i[3:9]) % 2 for i in ids} == {1}
+
+
+def test_ctp_main_empty_input_writes_no_csv(monkeypatch):
+    """Test that an empty input fails without leaving a header-only CSV."""
+    import sys
+
+    from scripts.generate_ctp import main
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        input_path = Path(tmpdir) / "controls.json"
+        input_path.write_text("[]", encoding="utf-8")
+        output_path = Path(tmpdir) / "ctp.csv"
+
+        monkeypatch.setattr(sys, "argv", ["generate_ctp.py", "-i", str(input_path), "-o", str(output_path)])
+        assert main() == 1
+        assert not output_path.exists()
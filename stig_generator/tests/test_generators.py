@@ -6,7 +6,7 @@ from pathlib import Path
 from app.generators.ansible_hardening import generate_hardening_playbook
 from app.generators.ansible_checker import generate_checker_playbook
 from app.generators.ctp_doc import generate_ctp_document
-from app.model.controls import StigControl
+from app.model.controls import CheckCommandAnalysis, StigControl
 
 
 def test_generate_hardening_playbook_empty_controls():
@@ -1614,3 +1614,59 @@ def test_systemd_task_no_invalid_names():
                     assert unit_name.lower() not in invalid_names, f"Found invalid systemd unit name '{unit_name}'"
                     in_systemd_task = False
 
+
+def test_generate_checker_playbook_uses_check_analysis():
+    """Test that the checker consumes the parse-time check command analysis."""
+    analysis = CheckCommandAnalysis(
+        os_family="rhel",
+        commands=["stat -c '%a' /etc/shadow"],
+        valid_commands=["stat -c '%a' /etc/shadow"],
+    )
+    control = StigControl(
+        id="TEST-00-000001",
+        title="Shadow file permissions",
+        severity="medium",
+        description="Test",
+        rationale=None,
+        check_text="",  # Nothing to re-extract from
+        fix_text="",
+        os_family="rhel",
+        category="file_permission",
+        check_commands=analysis.commands,
+        check_analysis=analysis,
+    )
+    
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "test_checker.yml"
+        metadata = {
+            "stig_name": "Test STIG",
+            "stig_release": "v1.0",
+            "source_file_name": "test.xml",
+            "generated_on": "2024-01-01T00:00:00",
+        }
+        
+        generate_checker_playbook([control], output_path, metadata)
+        content = output_path.read_text()
+        
+        assert "cmd: stat -c '%a' /etc/shadow" in content
+
+
+def test_script_generators_output_unchanged_by_check_analysis():
+    """Test that parse-time check_analysis doesn't change checker or CTP script output."""
+    import pytest
+    from scripts.generate_checker import generate_checker_task
+    from scripts.generate_ctp import generate_ctp_rows_for_control
+    from scripts.parse_stig import parse_xccdf_file
+    
+    # Network STIG: the parser analyzes it as "network", the scripts by product
+    xccdf_path = Path(__file__).parent.parent / "stigs" / "input" / "U_Cisco_IOS_Switch_NDM_STIG_V3R5_Manual-xccdf.xml"
+    if not xccdf_path.exists():
+        pytest.skip(f"{xccdf_path.name} not present")
+    
+    controls = [control.to_dict() for control in parse_xccdf_file(xccdf_path)]
+    assert controls
+    for control in controls:
+        # As written before the field existed
+        legacy = {key: value for key, value in control.items() if key != "check_analysis"}
+        assert generate_checker_task(control) == generate_checker_task(legacy), control["sv_id"]
+        assert generate_ctp_rows_for_control(control) == generate_ctp_rows_for_control(legacy), control["sv_id"]
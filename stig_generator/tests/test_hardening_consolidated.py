@@ -0,0 +1,122 @@
+"""Tests for the consolidated hardening playbook mode."""
+
+import tempfile
+from pathlib import Path
+
+import yaml
+
+from scripts.generate_hardening import (
+    generate_consolidated_hardening_playbook,
+    generate_sysctl_tasks,
+    plan_bulk_hardening,
+)
+
+
+CONTROLS = [
+    {
+        "sv_id": "SV-257782r991589_rule",
+        "title": "RHEL 9 must enable the hardware random number generator entropy gatherer service.",
+        "severity": "low",
+        "category": "service_enabled",
+        "fix_text": "Install the rng-tools package with the following command:\n\n$ sudo dnf install rng-tools\n\n"
+                    "Then enable the rngd service run the following command:\n\n$ sudo systemctl enable --now rngd",
+        "check_text": "$ systemctl is-active rngd\n\nactive\n\nIf the \"rngd\" service is not active, this is a finding.",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257790r991589_rule",
+        "title": "RHEL 9 /boot/grub2/grub.cfg file must be group-owned by root.",
+        "severity": "medium",
+        "category": "file_owner",
+        "fix_text": "Change the group of the file /boot/grub2/grub.cfg to root by running the following command:\n\n"
+                    "$ sudo chgrp root /boot/grub2/grub.cfg",
+        "check_text": "$ sudo stat -c \"%G %n\" /boot/grub2/grub.cfg \n\nroot /boot/grub2/grub.cfg",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257799r1106273_rule",
+        "title": "RHEL 9 must prevent the loading of a new kernel for later execution.",
+        "severity": "medium",
+        "category": "sysctl",
+        "fix_text": "Add or edit the following line in a system configuration file in the \"/etc/sysctl.d/\" directory:\n\n"
+                    "kernel.kexec_load_disabled = 1\n\n$ sudo sysctl --system",
+        "check_text": "$ sudo sysctl kernel.kexec_load_disabled\n\nkernel.kexec_load_disabled = 1",
+        "product": "rhel9",
+        "automation_level": "automated",
+    },
+    {
+        "sv_id": "SV-257800r1106276_rule",
+        "title": "RHEL 9 must restrict access to the kernel message buffer.",
+        "severity": "low",
+        "category": "sysctl",
+        "fix_text": "kernel.dmesg_restrict = 1\n\n$ sudo sysctl --system",
+        "check_text": "$ sudo sysctl kernel.dmesg_restrict\n\nkernel.dmesg_restrict = 1",
+        "product": "rhel9",
+        "automation_level": "manual_only",
+    },
+]
+
+
+def test_plan_bulk_hardening():
+    """Test that structured controls are planned with the per-control extraction."""
+    plans = [plan_bulk_hardening(dict(control)) for control in CONTROLS]
+
+    assert plans[0] == ("services", {
+        "sv_id": "SV-257782r991589_rule", "name": "rngd.service", "enabled": True, "state": "started",
+    })
+    assert plans[1] == ("files", {
+        "sv_id": "SV-257790r991589_rule", "path": "/boot/grub2/grub.cfg", "group": "root", "state": "file",
+    })
+    assert plans[2] == ("sysctl", {
+        "sv_id": "SV-257799r1106273_rule", "name": "kernel.kexec_load_disabled", "value": "1",
+    })
+    # Manual-only controls stay debug-only
+    assert plans[3] is None
+
+    # Same parameter as the individual task
+    assert "        name: kernel.kexec_load_disabled" in generate_sysctl_tasks(dict(CONTROLS[2]))
+
+
+def test_consolidated_hardening_playbook():
+    """Test that bulk tasks read the vars lists and carry every STIG ID tag."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output_path = Path(tmpdir) / "hardening.yml"
+        counts = generate_consolidated_hardening_playbook([dict(c) for c in CONTROLS], output_path)
+
+        assert counts == {
+            "packages_present": 0, "packages_absent": 0, "files": 1, "sysctl": 1,
+            "services": 1, "individual": 1,
+        }
+
+        play = yaml.safe_load(output_path.read_text())[0]
+        assert play["vars"]["stig_sysctl_params"] == [
+            {"sv_id": "SV-257799r1106273_rule", "name": "kernel.kexec_load_disabled", "value": "1"}
+        ]
+
+        # STIG ID tags select only their own items
+        assert play["vars"]["stig_service_actions_selected"] == (
+            "{{ stig_service_actions | selectattr('sv_id', 'in', ansible_run_tags) | list "
+            "or stig_service_actions }}"
+        )
+
+        tasks = play["tasks"]
+        sysctl_tasks = [t for t in tasks if "SV-257799r1106273_rule" in t["tags"]]
+        assert [next(k for k in t if k.startswith("ansible.")) for t in sysctl_tasks] == [
+            "ansible.builtin.copy", "ansible.builtin.lineinfile", "ansible.builtin.find",
+            "ansible.builtin.replace", "ansible.builtin.command",
+        ]
+        # The drop-in sorts after 99-sysctl.conf (/etc/sysctl.conf)
+        assert sysctl_tasks[0]["ansible.builtin.copy"]["dest"] == "/etc/sysctl.d/zz-stig-hardening.conf"
+        assert sysctl_tasks[1]["loop"] == "{{ stig_sysctl_params_selected }}"
+        assert sysctl_tasks[3]["ansible.builtin.replace"]["regexp"].startswith("^(\\s*(?:{{ stig_sysctl_params_selected")
+        assert sysctl_tasks[4]["ansible.builtin.command"]["cmd"] == "sysctl --system"
+
+        service_task = next(t for t in tasks if "ansible.builtin.systemd" in t)
+        assert service_task["loop"] == "{{ stig_service_actions_selected }}"
+        assert "SV-257782r991589_rule" in service_task["tags"]
+
+        # The manual-only control keeps its individual debug task
+        manual = [t for t in tasks if "SV-257800r1106276_rule" in t["tags"]]
+        assert len(manual) == 1 and "ansible.builtin.debug" in manual[0]
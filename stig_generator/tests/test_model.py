@@ -2,7 +2,7 @@
 
 import pytest
 
-from app.model.controls import StigControl, normalize_severity
+from app.model.controls import CheckCommandAnalysis, StigControl, normalize_severity
 
 
 def test_stig_control_creation():
@@ -51,7 +51,25 @@ def test_normalize_severity_edge_cases():
     assert normalize_severity("Critical") == "critical"
 
 
-
-
-
-
+def test_check_command_analysis():
+    """Test extracting, validating and serializing check commands."""
+    check_text = (
+        "Verify the SSH daemon configuration:\n"
+        "\n"
+        "$ sudo grep -i permitrootlogin /etc/ssh/sshd_config\n"
+        "\n"
+        "If \"PermitRootLogin\" is not set to \"no\", this is a finding."
+    )
+    analysis = CheckCommandAnalysis.from_text(check_text, "rhel")
+    
+    assert analysis.os_family == "rhel"
+    assert any("grep -i permitrootlogin" in cmd for cmd in analysis.commands)
+    assert analysis.valid_commands
+    assert set(analysis.valid_commands) <= set(analysis.commands)
+    
+    # Prose and degenerate entries are never valid check commands
+    prose = CheckCommandAnalysis.from_commands(["If the value is wrong, this is a finding.", "ls"], "rhel")
+    assert prose.valid_commands == []
+    
+    # Round trip through the serialized form
+    assert CheckCommandAnalysis.from_dict(analysis.to_dict()) == analysis
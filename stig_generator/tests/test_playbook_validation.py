@@ -0,0 +1,176 @@
+"""Tests for the shared playbook validation engine."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tools.playbook_rules import infer_product
+from tools.playbook_validation import (
+    ValidationRule,
+    build_report,
+    format_text_report,
+    get_rules,
+    iter_tasks,
+    load_playbook,
+    register_rule,
+    syntax_check,
+    validate_playbooks,
+)
+
+
+PLAYBOOK = """---
+- name: "RHEL 9 STIG Hardening"
+  hosts: all
+  pre_tasks:
+    - name: "Verify OS"
+      ansible.builtin.assert:
+        that:
+          - ansible_facts['os_family'] == 'RedHat'
+  tasks:
+    - name: "Set sysctl"
+      ansible.builtin.sysctl:
+        name: kernel.dmesg_restrict
+        value: "1"
+      tags:
+        - stig
+        - rhel9
+    - name: "Grouped"
+      block:
+        - name: "Nested"
+          ansible.builtin.debug:
+            msg: nested
+          tags:
+            - stig
+            - rhel8
+  handlers:
+    - name: "Reload sysctl"
+      ansible.builtin.command: sysctl --system
+"""
+
+
+class TaskNamesRule(ValidationRule):
+    """Records every visited task as section:name."""
+
+    name = "task_names"
+
+    def visit_task(self, task, section, play):
+        self.report(f"{section}:{task['name']}")
+
+
+class WrongTagRule(ValidationRule):
+    """Flags tasks tagged for another product."""
+
+    name = "wrong_tag"
+
+    def visit_task(self, task, section, play):
+        if "rhel8" in task.get("tags", []):
+            self.report(f"{task['name']} tagged rhel8")
+
+
+def test_iter_tasks_walks_sections_and_blocks():
+    """Test that the task tree includes pre_tasks, nested block tasks and handlers."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "playbook.yml"
+        path.write_text(PLAYBOOK)
+        playbook = load_playbook(path, "rhel9")
+
+        assert playbook.yaml_error is None
+        assert [(section, task["name"]) for section, task in iter_tasks(playbook.plays[0])] == [
+            ("pre_tasks", "Verify OS"),
+            ("tasks", "Set sysctl"),
+            ("tasks", "Grouped"),
+            ("tasks", "Nested"),
+            ("handlers", "Reload sysctl"),
+        ]
+
+
+def test_validate_playbooks_runs_rules_in_parallel():
+    """Test that all rules share one traversal and results keep target order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        good = Path(tmpdir) / "good.yml"
+        good.write_text(PLAYBOOK)
+        broken = Path(tmpdir) / "broken.yml"
+        broken.write_text(PLAYBOOK + "  - name: broken: [\n")
+
+        results = validate_playbooks(
+            [(good, "rhel9"), (broken, "rhel9"), (good, "rhel9")],
+            [TaskNamesRule, WrongTagRule],
+            workers=2,
+        )
+
+        assert [r.path for r in results] == [good, broken, good]
+        assert list(results[0].issues) == ["task_names", "wrong_tag"]
+        assert len(results[0].issues["task_names"]) == 5
+        assert results[0].issues["wrong_tag"] == ["Nested tagged rhel8"]
+        assert results[0].syntax_ok is None
+
+        # Unparseable playbooks are visited with no plays
+        assert results[1].issue_count == 0
+
+
+def test_syntax_check_cache_is_keyed_by_content():
+    """Test that cached syntax check results are reused for identical content."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "playbook.yml"
+        path.write_text(PLAYBOOK)
+        cache_dir = Path(tmpdir) / "cache"
+        playbook = load_playbook(path)
+
+        cache_dir.mkdir()
+        (cache_dir / f"{playbook.sha256}.json").write_text(
+            json.dumps({"ok": False, "message": "cached failure"})
+        )
+        assert syntax_check(playbook, cache_dir) == (False, "cached failure")
+
+        # Different content misses the cache
+        path.write_text(PLAYBOOK + "\n")
+        changed = load_playbook(path)
+        assert changed.sha256 != playbook.sha256
+        assert syntax_check(changed, cache_dir) != (False, "cached failure")
+
+
+def test_builtin_rules_report_combined_issues_and_timings():
+    """Test that registered rules run together and feed one report with per-rule timings."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "stig_rhel9_hardening.yml"
+        path.write_text(PLAYBOOK)
+        assert infer_product(path) == "rhel9"
+
+        rules = get_rules()
+        assert [rule.name for rule in rules][:2] == ["yaml_syntax", "quoted_names"]
+
+        results = validate_playbooks([(path, "rhel9")], rules)
+        issues = results[0].issues
+        assert issues["play_header"] == [
+            "OS verification missing version check; expected condition:\n"
+            "    ansible_facts['distribution_major_version'] == '9'\n"
+            "Got:\n"
+            "    ansible_facts['os_family'] == 'RedHat'"
+        ]
+        assert issues["product_tags"][0].startswith("Task 'Nested' missing OS tag 'rhel9'")
+        assert "Found wrong product tag: rhel8 (1 occurrences)" in issues["product_tags"]
+        assert set(results[0].timings) == {rule.name for rule in rules}
+
+        report = build_report(results)
+        assert report["summary"] == {"playbooks": 1, "failed": 1, "errors": 3, "warnings": 0}
+        assert report["playbooks"][0]["rules"]["product_tags"]["severity"] == "error"
+        assert set(report["rule_timings"]) == {rule.name for rule in rules}
+        json.dumps(report)
+
+        text = format_text_report(report)
+        assert "[error] product_tags: 2 issues" in text
+        assert "Rule timings (all playbooks):" in text
+
+
+def test_rule_registry_rejects_duplicates_and_unknown_names():
+    """Test that rule names are unique and lookups fail for unknown rules."""
+    class Duplicate(ValidationRule):
+        name = "yaml_syntax"
+
+    get_rules()  # load the built-in rules
+    with pytest.raises(ValueError):
+        register_rule(Duplicate)
+    with pytest.raises(ValueError):
+        get_rules(["no_such_rule"])
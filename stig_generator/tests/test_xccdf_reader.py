@@ -0,0 +1,109 @@
+"""Tests for the streaming XCCDF reader and its cached rule index."""
+
+import json
+import tempfile
+from pathlib import Path
+
+import pytest
+from xml.etree import ElementTree
+
+from app.parsers.xccdf_reader import XccdfReader, load_rule_index
+
+
+BENCHMARK = """<?xml version="1.0" encoding="UTF-8"?>
+<Benchmark xmlns="http://checklists.nist.gov/xccdf/{version}" id="Canonical_Ubuntu_22-04_LTS_STIG">
+  <title>Canonical Ubuntu 22.04 LTS STIG</title>
+  <Group id="V-260469">
+    <title>SRG-OS-000023-GPOS-00006</title>
+    <Rule id="SV-260469r958390_rule" severity="medium">
+      <version>UBTU-22-211015</version>
+      <title>Ubuntu 22.04 LTS must disable the x86 Ctrl-Alt-Delete key sequence.</title>
+      <fixtext fixref="F-64106r953348_fix">Mask ctrl-alt-del.target: $ sudo systemctl mask ctrl-alt-del.target</fixtext>
+      <check system="C-64198r953347_chk">
+        <check-content>$ systemctl status ctrl-alt-del.target</check-content>
+      </check>
+    </Rule>
+  </Group>
+  <Group id="V-260470">
+    <title>SRG-OS-000080-GPOS-00048</title>
+    <Rule id="SV-260470r958472_rule" severity="high">
+      <version>UBTU-22-212010</version>
+      <title>Ubuntu 22.04 LTS must require a password for single-user mode.</title>
+      <check system="C-64199r953350_chk">
+        <check-content>$ sudo grep -i password /boot/grub/grub.cfg</check-content>
+      </check>
+    </Rule>
+  </Group>
+</Benchmark>
+"""
+
+
+@pytest.mark.parametrize("version", ["1.1", "1.2"])
+def test_reader_streams_rules_for_both_xccdf_versions(version):
+    """Test that XCCDF 1.1 and 1.2 benchmarks yield the same rule records."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "stig.xml"
+        path.write_text(BENCHMARK.format(version=version))
+
+        reader = XccdfReader(path)
+        rules = list(reader)
+
+        assert reader.benchmark.id == "Canonical_Ubuntu_22-04_LTS_STIG"
+        assert reader.benchmark.title == "Canonical Ubuntu 22.04 LTS STIG"
+        assert reader.benchmark.namespace == f"http://checklists.nist.gov/xccdf/{version}"
+        assert [rule.rule_id for rule in rules] == ["SV-260469r958390_rule", "SV-260470r958472_rule"]
+
+        first = rules[0]
+        assert first.group_id == "V-260469"
+        assert first.group_title == "SRG-OS-000023-GPOS-00006"
+        assert first.severity == "medium"
+        assert first.version == "UBTU-22-211015"
+        assert first.fix_text.startswith("Mask ctrl-alt-del.target")
+        assert first.check_content == "$ systemctl status ctrl-alt-del.target"
+        assert first.element is None
+
+        # Rules without a fix are still read
+        assert rules[1].fix_text == ""
+
+
+def test_reader_raises_on_malformed_xml():
+    """Test that malformed XML surfaces as a ParseError during iteration."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "broken.xml"
+        path.write_text("<Benchmark><Group id='V-1'>")
+
+        with pytest.raises(ElementTree.ParseError):
+            list(XccdfReader(path))
+
+
+def test_rule_index_is_cached_by_content():
+    """Test that the rule index is reused for identical content and rebuilt when it changes."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = Path(tmpdir) / "stig.xml"
+        path.write_text(BENCHMARK.format(version="1.1"))
+        cache_dir = Path(tmpdir) / "cache"
+
+        index = load_rule_index(path, cache_dir=cache_dir)
+        assert not index.from_cache
+        cache_file = cache_dir / f"{index.sha256}.json"
+        assert cache_file.exists()
+
+        # A second run only reads the cache: edit it to prove the XML is not parsed
+        data = json.loads(cache_file.read_text())
+        data["rules"][0]["fix_text"] = "from cache"
+        cache_file.write_text(json.dumps(data))
+
+        cached = load_rule_index(path, cache_dir=cache_dir)
+        assert cached.from_cache
+        assert list(cached.rules) == list(index.rules)
+        assert cached.rules["SV-260469r958390_rule"].fix_text == "from cache"
+        assert cached.benchmark == index.benchmark
+
+        # Changed content misses the cache
+        path.write_text(BENCHMARK.format(version="1.2"))
+        changed = load_rule_index(path, cache_dir=cache_dir)
+        assert not changed.from_cache
+        assert changed.rules["SV-260469r958390_rule"].fix_text.startswith("Mask")
+
+        # Caching can be disabled
+        assert not load_rule_index(path, cache_dir=None).from_cache
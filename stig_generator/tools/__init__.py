@@ -0,0 +1,7 @@
+"""Tools for checking generated STIG playbooks.
+
+- playbook_validation.py: Shared validation engine (load once, rule registry, parallel runs, reports)
+- playbook_rules.py: Built-in validation rules shared by all playbook checkers
+- playbook_report.py: Combined text/JSON validation report with per-rule timings
+- sanity_check_playbooks.py: Sanity checker for the generated hardening playbooks
+"""
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Combined validation report for generated STIG playbooks.
+
+Runs every registered rule (or a selection) over the playbooks in one
+traversal per playbook and prints a combined text or JSON report with
+per-rule timings.
+
+Run this from the repo root with:
+    python tools/playbook_report.py
+    python tools/playbook_report.py output/ansible/stig_rhel9_hardening.yml --format json -o report.json
+    python tools/playbook_report.py --rules play_header,product_tags --syntax-check
+
+Exits non-zero if any error-severity rule reports an issue.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.playbook_rules import infer_product
+from tools.playbook_validation import (
+    DEFAULT_SYNTAX_CACHE_DIR,
+    build_report,
+    format_text_report,
+    get_rules,
+    validate_playbooks,
+)
+
+
+def main() -> int:
+    """Main entry point for the combined playbook report."""
+    parser = argparse.ArgumentParser(
+        description="Validate generated STIG playbooks with all registered rules"
+    )
+    parser.add_argument(
+        "playbooks",
+        nargs="*",
+        type=Path,
+        help="Playbooks to validate (default: output/ansible/stig_*_hardening.yml)"
+    )
+    parser.add_argument(
+        "--product",
+        default=None,
+        help="Target product for all playbooks (default: inferred from each file name)"
+    )
+    parser.add_argument(
+        "--rules",
+        default=None,
+        help="Comma-separated rule names to run (default: all registered rules)"
+    )
+    parser.add_argument(
+        "--list-rules",
+        action="store_true",
+        help="List registered rules and exit"
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=["text", "json"],
+        default="text",
+        help="Report format (default: text)"
+    )
+    parser.add_argument(
+        "--output", "-o",
+        type=Path,
+        default=None,
+        help="Write the report to this file instead of stdout"
+    )
+    parser.add_argument(
+        "--syntax-check",
+        action="store_true",
+        help="Also run ansible-playbook --syntax-check (results are cached by playbook hash)"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=None,
+        help="Maximum parallel worker processes (default: one per playbook)"
+    )
+
+    args = parser.parse_args()
+
+    try:
+        rules = get_rules(args.rules.split(",") if args.rules else None)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.list_rules:
+        for rule in rules:
+            print(f"{rule.name:<20} [{rule.severity}] {rule.description}")
+        return 0
+
+    playbooks = args.playbooks or sorted(Path("output/ansible").glob("stig_*_hardening.yml"))
+    missing = [path for path in playbooks if not path.exists()]
+    if missing:
+        for path in missing:
+            print(f"Error: Playbook not found: {path}", file=sys.stderr)
+        return 1
+    if not playbooks:
+        print("No playbooks found to validate", file=sys.stderr)
+        return 1
+
+    results = validate_playbooks(
+        [(path, args.product or infer_product(path)) for path in playbooks],
+        rules,
+        run_syntax_check=args.syntax_check,
+        cache_dir=DEFAULT_SYNTAX_CACHE_DIR,
+        workers=args.workers,
+    )
+    report = build_report(results)
+
+    text = json.dumps(report, indent=2) if args.format == "json" else format_text_report(report)
+    if args.output:
+        args.output.write_text(text + "\n")
+        print(f"✓ Report written to {args.output}")
+    else:
+        print(text)
+
+    return 1 if report["summary"]["errors"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Built-in validation rules for generated STIG playbooks.
+
+Each rule registers with the shared engine (tools/playbook_validation.py) and
+is run by tools/sanity_check_playbooks.py, validate_playbooks.py,
+test_generated_playbooks.py and tools/playbook_report.py. Checks that those
+scripts used to implement separately (YAML syntax, OS wrapper, product tags,
+Windows modules, Linux handlers, config prose) exist once here.
+
+Rules report issues without a product prefix; callers that print one flat
+list across playbooks add it.
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+from tools.playbook_validation import (
+    HAS_YAML,
+    ValidationRule,
+    find_module_name,
+    register_rule,
+)
+
+
+# Expected play header and tags per product
+PRODUCT_META = {
+    "rhel8": {
+        "display_name": "RHEL 8",
+        "expected_play_name": "RHEL 8 STIG Hardening",
+        "expected_os_family": "RedHat",
+        "expected_version_string": "8",
+        "os_tag": "rhel8",
+        "is_windows": False,
+    },
+    "rhel9": {
+        "display_name": "RHEL 9",
+        "expected_play_name": "RHEL 9 STIG Hardening",
+        "expected_os_family": "RedHat",
+        "expected_version_string": "9",
+        "os_tag": "rhel9",
+        "is_windows": False,
+    },
+    "windows11": {
+        "display_name": "Windows 11",
+        "expected_play_name": "Windows 11 STIG Hardening",
+        "expected_os_family": "Windows",
+        # we only enforce family for now; version/name checks could be added later
+        "expected_version_string": None,
+        "os_tag": "windows11",
+        "is_windows": True,
+    },
+    "windows2022": {
+        "display_name": "Windows Server 2022",
+        "expected_play_name": "Windows Server 2022 STIG Hardening",
+        "expected_os_family": "Windows",
+        "expected_version_string": None,
+        "os_tag": "windows2022",
+        "is_windows": True,
+    },
+}
+
+# Linux-specific handler commands and names (lowercase)
+LINUX_HANDLER_MARKERS = [
+    "grub2-mkconfig",
+    "firewall-cmd",
+    "dconf update",
+    "sysctl -p",
+    "regenerate grub configuration",
+    "reload firewalld",
+    "update dconf database",
+]
+
+# STIG prose that must not end up in config lines
+PROSE_INDICATORS = [
+    "verify the system", "check the system", "configure the system",
+    "the following command", "with the following", "following line",
+    "shadow file is configured", "representations of passwords",
+    "hash value", "command:", "file:", "directory:",
+]
+
+# Config lines longer than this are almost certainly prose
+MAX_CONFIG_LINE_LENGTH = 150
+
+DEBUG_MODULES = ("ansible.builtin.debug", "debug", "")
+
+
+def infer_product(path: Path) -> str:
+    """
+    Infer the target product from a playbook file name (e.g. stig_rhel9_hardening.yml).
+
+    Returns:
+        Product key of PRODUCT_META, or "" if the name matches none
+    """
+    parts = re.split(r"[_.\-]", path.name.lower())
+    for product in PRODUCT_META:
+        if product in parts:
+            return product
+    return ""
+
+
+def _task_tags(task: Dict[str, Any]) -> List[str]:
+    tags = task.get("tags", [])
+    if isinstance(tags, str):
+        return [tags]
+    return [str(tag) for tag in tags or []]
+
+
+def _assert_conditions(task: Dict[str, Any]) -> List[str]:
+    body = task.get("ansible.builtin.assert") or task.get("assert")
+    if not isinstance(body, dict):
+        return []
+    that = body.get("that") or []
+    return [str(c) for c in (that if isinstance(that, list) else [that])]
+
+
+@register_rule
+class YamlSyntaxRule(ValidationRule):
+    """YAML validity and top-level play structure."""
+
+    name = "yaml_syntax"
+    description = "Playbook parses as YAML into a non-empty list of plays with tasks"
+
+    def visit_play(self, play: Dict[str, Any]) -> None:
+        if not (play.get("tasks") or play.get("roles")):
+            self.report(f"No tasks found in play '{play.get('name', '')}'")
+
+    def finish(self) -> None:
+        playbook = self.playbook
+        if playbook.yaml_error:
+            self.report(f"YAML parsing error: {playbook.yaml_error}")
+        elif not HAS_YAML:
+            # Basic check: look for unquoted colons in name values
+            if re.search(r'^\s+- name:\s+[^"\'].*:.*[^"\']', playbook.content, re.MULTILINE):
+                self.report("Found unquoted name values with colons (PyYAML not available for full validation)")
+        elif not playbook.documents:
+            self.report("Playbook is empty or did not contain any YAML documents")
+        elif not isinstance(playbook.documents[0], list):
+            self.report("Top-level YAML must be a list of plays")
+        elif not playbook.plays:
+            self.report("No plays found")
+
+
+@register_rule
+class QuotedNamesRule(ValidationRule):
+    """Task and handler names with special characters are quoted."""
+
+    name = "quoted_names"
+    description = "Names containing ':' or '|' (or longer than 50 chars) are quoted"
+
+    def finish(self) -> None:
+        # Quoting is lost by parsing, so this is a text-level check
+        for line_num, line in enumerate(self.playbook.lines, 1):
+            if "- name:" not in line or not re.match(r'^\s*- name:\s+[^"\']', line):
+                continue
+            # Allow simple play names at top level (no leading spaces)
+            if re.match(r'^- name:\s+[A-Z][^:]*STIG Hardening', line):
+                continue
+            name_part = line.strip().split("name:", 1)[1].strip()
+            if ":" in name_part or "|" in name_part or len(name_part) > 50:
+                self.report(f"Line {line_num}: Unquoted name value with special chars: {name_part[:80]}")
+
+
+@register_rule
+class PlayHeaderRule(ValidationRule):
+    """Play name and OS assertions match the product."""
+
+    name = "play_header"
+    description = "Play name and pre_tasks OS assertions match the target product"
+
+    def visit_play(self, play: Dict[str, Any]) -> None:
+        meta = PRODUCT_META.get(self.playbook.product)
+        if meta is None or play is not self.playbook.plays[0]:
+            return
+
+        expected_name = meta["expected_play_name"]
+        actual_name = play.get("name")
+        if actual_name != expected_name:
+            self.report(f"Play name mismatch: expected '{expected_name}', got '{actual_name}'")
+
+        pre_tasks = [t for t in play.get("pre_tasks", []) or [] if isinstance(t, dict)]
+        assert_tasks = [t for t in pre_tasks if "ansible.builtin.assert" in t or "assert" in t]
+        if not assert_tasks:
+            self.report("No ansible.builtin.assert pre_task found for OS verification")
+            return
+
+        conditions = _assert_conditions(assert_tasks[0])
+        if not conditions:
+            self.report("OS verification assert has no 'that' list")
+            return
+
+        need_family = f"ansible_facts['os_family'] == '{meta['expected_os_family']}'"
+        if need_family not in conditions:
+            self.report(
+                f"OS verification missing family check; expected condition:\n"
+                f"    {need_family}\n"
+                f"Got:\n"
+                + "\n".join(f"    {c}" for c in conditions)
+            )
+
+        # For Windows we currently only enforce family. For RHEL we also enforce major version.
+        if not meta["is_windows"] and meta["expected_version_string"]:
+            need_version = f"ansible_facts['distribution_major_version'] == '{meta['expected_version_string']}'"
+            if need_version not in conditions:
+                self.report(
+                    f"OS verification missing version check; expected condition:\n"
+                    f"    {need_version}\n"
+                    f"Got:\n"
+                    + "\n".join(f"    {c}" for c in conditions)
+                )
+
+        # Assertions for another OS anywhere in the pre_tasks
+        all_conditions = [c for t in assert_tasks for c in _assert_conditions(t)]
+        for family in ("RedHat", "Windows"):
+            if family != meta["expected_os_family"] and any(f"os_family'] == '{family}'" in c for c in all_conditions):
+                self.report(f"Found {family} OS assertion in {meta['display_name']} playbook")
+        if meta["is_windows"] and any("distribution_major_version" in c for c in all_conditions):
+            self.report("Windows playbook should not check distribution_major_version")
+
+
+@register_rule
+class ProductTagsRule(ValidationRule):
+    """STIG tasks carry the product tag and no other product's tag."""
+
+    name = "product_tags"
+    description = "Every STIG task is tagged with the target product and no other product"
+
+    def __init__(self, playbook):
+        super().__init__(playbook)
+        self.tag_counts: Dict[str, int] = {}
+
+    def visit_task(self, task: Dict[str, Any], section: str, play: Dict[str, Any]) -> None:
+        meta = PRODUCT_META.get(self.playbook.product)
+        if meta is None:
+            return
+
+        tags = _task_tags(task)
+        for tag in tags:
+            self.tag_counts[tag] = self.tag_counts.get(tag, 0) + 1
+
+        # Ignore non-STIG support tasks
+        if "stig" in tags and meta["os_tag"] not in tags:
+            self.report(f"Task '{task.get('name', '(unnamed)')}' missing OS tag '{meta['os_tag']}' (tags: {tags})")
+
+    def finish(self) -> None:
+        meta = PRODUCT_META.get(self.playbook.product)
+        if meta is None or not self.playbook.plays:
+            return
+
+        for product, other in PRODUCT_META.items():
+            wrong_count = self.tag_counts.get(other["os_tag"], 0)
+            if product != self.playbook.product and wrong_count:
+                self.report(f"Found wrong product tag: {other['os_tag']} ({wrong_count} occurrences)")
+
+        if not self.tag_counts.get(meta["os_tag"]):
+            self.report(f"No {meta['os_tag']} tags found")
+
+
+@register_rule
+class AutomationModulesRule(ValidationRule):
+    """Automation level tags agree with the task's module."""
+
+    name = "automation_modules"
+    description = (
+        "automation_automated tasks use real (on Windows: Windows) modules; "
+        "automation_manual_only tasks are debug-only"
+    )
+
+    def visit_task(self, task: Dict[str, Any], section: str, play: Dict[str, Any]) -> None:
+        tags = _task_tags(task)
+        if "stig" not in tags:
+            return
+
+        name = task.get("name", "(unnamed)")
+        module_name = find_module_name(task)
+        has_automated = "automation_automated" in tags
+        has_manual_only = "automation_manual_only" in tags
+
+        if has_automated and has_manual_only:
+            self.report(f"Task '{name}' has both automation_automated and automation_manual_only tags")
+
+        # Automated tasks must not be debug-only
+        if has_automated:
+            if module_name in DEBUG_MODULES:
+                self.report(f"Task '{name}' is tagged automation_automated but uses debug-only module '{module_name}'")
+
+            meta = PRODUCT_META.get(self.playbook.product)
+            if meta and meta["is_windows"] and not module_name.startswith(("ansible.windows.", "community.windows.")):
+                self.report(
+                    f"Windows task '{name}' is automation_automated "
+                    f"but module '{module_name}' is not a Windows module"
+                )
+
+        # Manual-only tasks must be debug-only (no real config changes)
+        if has_manual_only and module_name not in DEBUG_MODULES:
+            self.report(f"Task '{name}' is automation_manual_only but uses non-debug module '{module_name}'")
+
+
+@register_rule
+class LinuxHandlersRule(ValidationRule):
+    """Non-Linux playbooks contain no Linux handlers."""
+
+    name = "linux_handlers"
+    description = "Windows playbooks do not notify or run Linux handlers (grub, firewalld, dconf, sysctl)"
+
+    def __init__(self, playbook):
+        super().__init__(playbook)
+        self.found = set()
+
+    def visit_task(self, task: Dict[str, Any], section: str, play: Dict[str, Any]) -> None:
+        meta = PRODUCT_META.get(self.playbook.product)
+        if not meta or not meta["is_windows"]:
+            return
+        task_text = str(task).lower()
+        for marker in LINUX_HANDLER_MARKERS:
+            if marker in task_text:
+                self.found.add(marker)
+
+    def finish(self) -> None:
+        for marker in LINUX_HANDLER_MARKERS:
+            if marker in self.found:
+                self.report(f"Found Linux handler in {self.playbook.product} playbook: {marker}")
+
+
+@register_rule
+class ConfigProseRule(ValidationRule):
+    """lineinfile/blockinfile values are config, not STIG prose."""
+
+    name = "config_prose"
+    description = "lineinfile/blockinfile line and regexp values contain no STIG prose"
+
+    def visit_task(self, task: Dict[str, Any], section: str, play: Dict[str, Any]) -> None:
+        for module in ("ansible.builtin.lineinfile", "ansible.builtin.blockinfile"):
+            args = task.get(module)
+            if not isinstance(args, dict):
+                continue
+
+            name = str(task.get("name", ""))[:80]
+            for field in ("line", "regexp"):
+                value = args.get(field)
+                if not isinstance(value, str):
+                    continue
+                value_lower = value.lower()
+                if any(indicator in value_lower for indicator in PROSE_INDICATORS):
+                    self.report(f"Task '{name}': '{field}:' contains prose: {value[:100]}")
+                # Regexps of escaped audit rules are legitimately long
+                elif field == "line" and len(value) > MAX_CONFIG_LINE_LENGTH:
+                    self.report(f"Task '{name}': '{field}:' too long (likely prose): {value[:100]}")
@@ -0,0 +1,541 @@
+#!/usr/bin/env python3
+"""
+Shared validation engine for generated STIG playbooks.
+
+tools/sanity_check_playbooks.py, test_generated_playbooks.py and
+validate_playbooks.py all validate the same generated playbooks. This module
+gives them one engine:
+
+1. Each playbook is read once and parsed once (with the libyaml C loader when
+   PyYAML was built with it) into a Playbook.
+2. Every check is a ValidationRule: a visitor that is called for each play and
+   each task of the parsed task tree (pre_tasks, tasks, post_tasks, handlers,
+   and nested block/rescue/always), and can use the raw lines for text-level
+   checks such as quoting. All rules share one traversal.
+3. Playbooks are validated in parallel worker processes.
+4. `ansible-playbook --syntax-check` is optional, and its result is cached
+   by the SHA-256 of the playbook, so unchanged playbooks are not re-checked.
+
+Rules register themselves with @register_rule (the built-in rules live in
+tools/playbook_rules.py), the engine times every rule, and build_report()
+combines the results of all playbooks into one JSON-serializable report that
+format_text_report() renders as text.
+"""
+
+import hashlib
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Type
+
+try:
+    import yaml  # PyYAML
+    HAS_YAML = True
+    # libyaml-backed loader is several times faster on large playbooks
+    YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+except ImportError:
+    HAS_YAML = False
+    YAML_LOADER = None
+
+
+# Play sections that hold task lists
+TASK_SECTIONS = ("pre_tasks", "tasks", "post_tasks", "handlers")
+
+# Task keys that hold nested task lists
+BLOCK_KEYS = ("block", "rescue", "always")
+
+# Default location of cached ansible-playbook --syntax-check results
+DEFAULT_SYNTAX_CACHE_DIR = Path.home() / ".cache" / "stig_generator" / "syntax_check"
+
+SYNTAX_CHECK_TIMEOUT = 30
+
+# Task keys that are NOT ansible modules
+NON_MODULE_KEYS = frozenset({
+    "name",
+    "tags",
+    "when",
+    "vars",
+    "register",
+    "changed_when",
+    "failed_when",
+    "notify",
+    "loop",
+    "loop_control",
+    "with_items",
+    "become",
+    "delegate_to",
+    "ignore_errors",
+    "environment",
+    "block",
+    "rescue",
+    "always",
+})
+
+# Registered rules by name, in registration order
+RULE_REGISTRY: Dict[str, Type["ValidationRule"]] = {}
+
+
+@dataclass
+class Playbook:
+    """A generated playbook, read and parsed once for all rules."""
+
+    path: Path
+    product: str
+    content: str
+    sha256: str
+    documents: Optional[List[Any]] = None  # Parsed YAML documents (None if not parsed)
+    yaml_error: Optional[str] = None  # Parse error, if any
+
+    @cached_property
+    def lines(self) -> List[str]:
+        """Raw lines, for text-level rules (e.g. quoting, which parsing discards)."""
+        return self.content.split("\n")
+
+    @property
+    def parsed(self) -> bool:
+        """True if the playbook was parsed into YAML documents."""
+        return self.documents is not None
+
+    @property
+    def plays(self) -> List[Dict[str, Any]]:
+        """Plays of the first YAML document (empty if it is not a play list)."""
+        if self.documents and isinstance(self.documents[0], list):
+            return [play for play in self.documents[0] if isinstance(play, dict)]
+        return []
+
+
+def load_playbook(path: Path, product: str = "") -> Playbook:
+    """
+    Read and parse a playbook once.
+
+    Args:
+        path: Path to the playbook
+        product: Product the playbook targets (e.g. "rhel9"), for product rules
+
+    Returns:
+        Playbook; documents is None if PyYAML is unavailable or parsing failed
+    """
+    raw = path.read_bytes()
+    playbook = Playbook(
+        path=path,
+        product=product,
+        content=raw.decode("utf-8"),
+        sha256=hashlib.sha256(raw).hexdigest(),
+    )
+    if HAS_YAML:
+        try:
+            playbook.documents = list(yaml.load_all(playbook.content, Loader=YAML_LOADER))
+        except yaml.YAMLError as e:
+            playbook.yaml_error = str(e)
+    return playbook
+
+
+def iter_tasks(play: Dict[str, Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Walk the task tree of a play.
+
+    Yields:
+        (section, task) for every task in TASK_SECTIONS, including tasks nested
+        in block/rescue/always (block tasks are yielded before their children)
+    """
+    def walk(section: str, tasks: Any) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        for task in tasks or []:
+            if not isinstance(task, dict):
+                continue
+            yield section, task
+            for key in BLOCK_KEYS:
+                if isinstance(task.get(key), list):
+                    yield from walk(section, task[key])
+
+    for section in TASK_SECTIONS:
+        yield from walk(section, play.get(section))
+
+
+class ValidationRule:
+    """
+    Base class for playbook checks.
+
+    A new rule instance is created per playbook. The engine calls visit_play()
+    for each play, visit_task() for each task of that play's task tree, and
+    finish() once at the end; rules record problems with report(). Rules that
+    do not override visit_task() are skipped during the task traversal.
+
+    Subclasses set name (unique registry key), description and severity
+    ("error" fails validation, "warning" is reported only).
+    """
+
+    name = "rule"
+    description = ""
+    severity = "error"
+
+    def __init__(self, playbook: Playbook):
+        self.playbook = playbook
+        self.issues: List[str] = []
+
+    def report(self, message: str) -> None:
+        """Record an issue."""
+        self.issues.append(message)
+
+    def visit_play(self, play: Dict[str, Any]) -> None:
+        """Called for each play, before its tasks."""
+
+    def visit_task(self, task: Dict[str, Any], section: str, play: Dict[str, Any]) -> None:
+        """Called for each task of the play's task tree."""
+
+    def finish(self) -> None:
+        """Called once after the traversal."""
+
+
+@dataclass
+class ValidationResult:
+    """Issues found in one playbook, grouped by rule."""
+
+    path: Path
+    product: str
+    issues: Dict[str, List[str]] = field(default_factory=dict)  # rule name -> issues, in rule order
+    severities: Dict[str, str] = field(default_factory=dict)  # rule name -> "error" / "warning"
+    timings: Dict[str, float] = field(default_factory=dict)  # rule name -> seconds
+    load_seconds: float = 0.0  # Read + parse time
+    sha256: str = ""
+    syntax_ok: Optional[bool] = None  # ansible-playbook --syntax-check (None if not run/available)
+    syntax_message: str = ""
+
+    @property
+    def all_issues(self) -> List[str]:
+        """Every issue, in rule order."""
+        return [issue for rule_issues in self.issues.values() for issue in rule_issues]
+
+    @property
+    def issue_count(self) -> int:
+        return sum(len(rule_issues) for rule_issues in self.issues.values())
+
+    @property
+    def error_count(self) -> int:
+        """Issues of error-severity rules plus a failed syntax check."""
+        errors = sum(
+            len(rule_issues) for name, rule_issues in self.issues.items()
+            if self.severities.get(name, "error") == "error"
+        )
+        return errors + (1 if self.syntax_ok is False else 0)
+
+    @property
+    def warning_count(self) -> int:
+        """Issues of warning-severity rules."""
+        return sum(
+            len(rule_issues) for name, rule_issues in self.issues.items()
+            if self.severities.get(name, "error") == "warning"
+        )
+
+
+def register_rule(rule_class: Type[ValidationRule]) -> Type[ValidationRule]:
+    """
+    Class decorator that registers a rule under its name.
+
+    Raises:
+        ValueError: If another rule is already registered under the same name
+    """
+    existing = RULE_REGISTRY.get(rule_class.name)
+    if existing is not None and existing is not rule_class:
+        raise ValueError(f"Duplicate validation rule name: {rule_class.name}")
+    RULE_REGISTRY[rule_class.name] = rule_class
+    return rule_class
+
+
+def get_rules(names: Optional[Sequence[str]] = None) -> List[Type[ValidationRule]]:
+    """
+    Look up registered rules (loading the built-in rules first).
+
+    Args:
+        names: Rule names, in the order to run them (default: all, in registration order)
+
+    Returns:
+        Rule classes
+
+    Raises:
+        ValueError: If a name is not registered
+    """
+    from tools import playbook_rules  # noqa: F401  (registers the built-in rules)
+
+    if names is None:
+        return list(RULE_REGISTRY.values())
+
+    unknown = [name for name in names if name not in RULE_REGISTRY]
+    if unknown:
+        raise ValueError(f"Unknown validation rule(s): {', '.join(unknown)}")
+    return [RULE_REGISTRY[name] for name in names]
+
+
+def run_rules(
+    playbook: Playbook, rule_classes: Sequence[Type[ValidationRule]]
+) -> Tuple[Dict[str, List[str]], Dict[str, float]]:
+    """
+    Run rules over a playbook in a single traversal, timing each rule.
+
+    Args:
+        playbook: Loaded playbook
+        rule_classes: Rules to run, in report order
+
+    Returns:
+        (rule name -> issues, rule name -> seconds spent in the rule)
+    """
+    clock = time.perf_counter
+    rules = [rule_class(playbook) for rule_class in rule_classes]
+    timings = {rule.name: 0.0 for rule in rules}
+
+    # Only rules that look at tasks take part in the task traversal
+    task_rules = [rule for rule in rules if type(rule).visit_task is not ValidationRule.visit_task]
+
+    for play in playbook.plays:
+        for rule in rules:
+            start = clock()
+            rule.visit_play(play)
+            timings[rule.name] += clock() - start
+        for section, task in iter_tasks(play):
+            for rule in task_rules:
+                start = clock()
+                rule.visit_task(task, section, play)
+                timings[rule.name] += clock() - start
+
+    for rule in rules:
+        start = clock()
+        rule.finish()
+        timings[rule.name] += clock() - start
+
+    return {rule.name: rule.issues for rule in rules}, timings
+
+
+def syntax_check(
+    playbook: Playbook, cache_dir: Optional[Path] = DEFAULT_SYNTAX_CACHE_DIR, timeout: int = SYNTAX_CHECK_TIMEOUT
+) -> Tuple[Optional[bool], str]:
+    """
+    Run `ansible-playbook --syntax-check`, reusing a cached result for the same content.
+
+    Args:
+        playbook: Loaded playbook (its sha256 is the cache key)
+        cache_dir: Directory for cached results (None disables caching)
+        timeout: Seconds before the syntax check is abandoned
+
+    Returns:
+        (ok, message); ok is None when ansible-playbook is not installed
+    """
+    cache_file = cache_dir / f"{playbook.sha256}.json" if cache_dir else None
+    if cache_file and cache_file.exists():
+        try:
+            cached = json.loads(cache_file.read_text())
+            return cached["ok"], cached["message"]
+        except (OSError, ValueError, KeyError):
+            pass  # Unreadable cache entry: run the check again
+
+    try:
+        result = subprocess.run(
+            ["ansible-playbook", "--syntax-check", str(playbook.path)],
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except FileNotFoundError:
+        return None, "ansible-playbook not found (skipping)"
+    except subprocess.TimeoutExpired:
+        return False, f"Timeout after {timeout} seconds"
+    except Exception as e:
+        return False, f"Error running ansible-playbook: {e}"
+
+    ok = result.returncode == 0
+    message = "" if ok else (result.stderr or result.stdout or "Unknown error")
+
+    # Only definitive results are cached; timeouts and errors are retried
+    if cache_file:
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps({"ok": ok, "message": message}))
+        except OSError:
+            pass
+
+    return ok, message
+
+
+def validate_playbook(
+    path: Path,
+    product: str,
+    rule_classes: Sequence[Type[ValidationRule]],
+    run_syntax_check: bool = False,
+    cache_dir: Optional[Path] = DEFAULT_SYNTAX_CACHE_DIR,
+) -> ValidationResult:
+    """
+    Load a playbook once and run every rule (and optionally the syntax check) on it.
+
+    Args:
+        path: Path to the playbook
+        product: Product the playbook targets (e.g. "rhel9")
+        rule_classes: Rules to run, in report order
+        run_syntax_check: Also run the cached ansible-playbook --syntax-check
+        cache_dir: Syntax check cache directory (None disables caching)
+
+    Returns:
+        ValidationResult for the playbook
+    """
+    start = time.perf_counter()
+    playbook = load_playbook(path, product)
+    load_seconds = time.perf_counter() - start
+
+    issues, timings = run_rules(playbook, rule_classes)
+    result = ValidationResult(
+        path=path,
+        product=product,
+        issues=issues,
+        severities={rule_class.name: rule_class.severity for rule_class in rule_classes},
+        timings=timings,
+        load_seconds=load_seconds,
+        sha256=playbook.sha256,
+    )
+    if run_syntax_check:
+        result.syntax_ok, result.syntax_message = syntax_check(playbook, cache_dir)
+    return result
+
+
+def validate_playbooks(
+    targets: Sequence[Tuple[Path, str]],
+    rule_classes: Sequence[Type[ValidationRule]],
+    run_syntax_check: bool = False,
+    cache_dir: Optional[Path] = DEFAULT_SYNTAX_CACHE_DIR,
+    workers: Optional[int] = None,
+) -> List[ValidationResult]:
+    """
+    Validate several playbooks in parallel worker processes.
+
+    Args:
+        targets: (path, product) pairs
+        rule_classes: Rules to run, in report order (must be importable by
+            worker processes, i.e. module-level classes)
+        run_syntax_check: Also run the cached ansible-playbook --syntax-check
+        cache_dir: Syntax check cache directory (None disables caching)
+        workers: Maximum worker processes (default: one per playbook, up to the CPU count)
+
+    Returns:
+        ValidationResults in target order
+    """
+    if workers is None:
+        workers = min(len(targets), os.cpu_count() or 1)
+
+    args = [(path, product, rule_classes, run_syntax_check, cache_dir) for path, product in targets]
+    if workers <= 1 or len(targets) <= 1:
+        return [validate_playbook(*arg) for arg in args]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(validate_playbook, *zip(*args)))
+
+
+def find_module_name(task: Dict[str, Any], non_module_keys: frozenset = NON_MODULE_KEYS) -> str:
+    """
+    Guess the module of a task: the first key that is not a task keyword.
+
+    Args:
+        task: Parsed task
+        non_module_keys: Task keywords to skip
+
+    Returns:
+        Module name, or "" if none was found
+    """
+    for key in task.keys():
+        if key not in non_module_keys:
+            return key
+    return ""
+
+
+def build_report(results: Sequence[ValidationResult]) -> Dict[str, Any]:
+    """
+    Combine validation results into one JSON-serializable report.
+
+    Args:
+        results: Results of validate_playbooks()
+
+    Returns:
+        Report with per-playbook issues and timings, a summary and
+        per-rule timings summed over all playbooks
+    """
+    playbooks = []
+    rule_timings: Dict[str, float] = {}
+    for result in results:
+        rules = {}
+        for name, rule_issues in result.issues.items():
+            seconds = result.timings.get(name, 0.0)
+            rule_timings[name] = rule_timings.get(name, 0.0) + seconds
+            rules[name] = {
+                "severity": result.severities.get(name, "error"),
+                "issues": rule_issues,
+                "seconds": round(seconds, 6),
+            }
+        playbooks.append({
+            "path": str(result.path),
+            "product": result.product,
+            "sha256": result.sha256,
+            "status": "failed" if result.error_count else "passed",
+            "errors": result.error_count,
+            "warnings": result.warning_count,
+            "load_seconds": round(result.load_seconds, 6),
+            "syntax_check": {"ok": result.syntax_ok, "message": result.syntax_message},
+            "rules": rules,
+        })
+
+    return {
+        "generated": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "summary": {
+            "playbooks": len(playbooks),
+            "failed": sum(1 for p in playbooks if p["status"] == "failed"),
+            "errors": sum(p["errors"] for p in playbooks),
+            "warnings": sum(p["warnings"] for p in playbooks),
+        },
+        "rule_timings": {name: round(seconds, 6) for name, seconds in rule_timings.items()},
+        "playbooks": playbooks,
+    }
+
+
+def format_text_report(report: Dict[str, Any], max_issues: int = 10) -> str:
+    """
+    Render a build_report() report as text.
+
+    Args:
+        report: Combined report
+        max_issues: Issues shown per rule before the rest are summarized
+
+    Returns:
+        Report text
+    """
+    lines = []
+    for playbook in report["playbooks"]:
+        status = "❌ FAILED" if playbook["status"] == "failed" else "✅ PASSED"
+        lines.append(
+            f"{status} {playbook['path']} ({playbook['product'] or 'unknown product'}): "
+            f"{playbook['errors']} errors, {playbook['warnings']} warnings"
+        )
+        for name, rule in playbook["rules"].items():
+            if not rule["issues"]:
+                continue
+            lines.append(f"   [{rule['severity']}] {name}: {len(rule['issues'])} issues")
+            for issue in rule["issues"][:max_issues]:
+                lines.append(f"     - {issue}")
+            if len(rule["issues"]) > max_issues:
+                lines.append(f"     ... and {len(rule['issues']) - max_issues} more")
+        syntax = playbook["syntax_check"]
+        if syntax["ok"] is False:
+            lines.append(f"   [error] ansible-playbook --syntax-check failed: {syntax['message'][:500]}")
+        elif syntax["ok"] is None and syntax["message"]:
+            lines.append(f"   ⚠️  {syntax['message']}")
+
+    lines.append("")
+    lines.append("Rule timings (all playbooks):")
+    for name, seconds in sorted(report["rule_timings"].items(), key=lambda item: -item[1]):
+        lines.append(f"  {name:<24} {seconds * 1000:9.1f} ms")
+
+    summary = report["summary"]
+    lines.append("")
+    lines.append(
+        f"{summary['playbooks']} playbooks, {summary['failed']} failed, "
+        f"{summary['errors']} errors, {summary['warnings']} warnings"
+    )
+    return "\n".join(lines)
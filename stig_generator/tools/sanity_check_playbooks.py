@@ -3,20 +3,33 @@
 Sanity checker for generated STIG hardening playbooks.
 
 Run this from the repo root with:
-    python tools/sanity_check_playbooks.py
+    python tools/sanity_check_playbooks.py [--syntax-check]
+
+Checks run as shared rules (tools/playbook_rules.py) of the validation engine
+(tools/playbook_validation.py): each playbook is parsed once and the playbooks are checked in parallel.
 
 If any check fails, it exits non-zero.
 """
 
+import argparse
+import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import List
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.playbook_rules import PRODUCT_META
+from tools.playbook_validation import (
+    HAS_YAML,
+    DEFAULT_SYNTAX_CACHE_DIR,
+    ValidationRule,
+    get_rules,
+    validate_playbooks,
+)
 
-try:
-    import yaml  # PyYAML
-    HAS_YAML = True
-except ImportError:
-    HAS_YAML = False
+if not HAS_YAML:
     print("WARNING: PyYAML is not installed. YAML parsing validation will be skipped.", file=sys.stderr)
     print("         Install with: pip install pyyaml (or pip install --user pyyaml)", file=sys.stderr)
     print("         Continuing with other checks...", file=sys.stderr)
@@ -34,105 +47,7 @@ PLAYBOOKS = {
     "windows2022": Path("output/ansible/stig_windows2022_hardening.yml"),
 }
 
-OS_META = {
-    "rhel8": {
-        "display_name": "RHEL 8",
-        "expected_play_name": "RHEL 8 STIG Hardening",
-        "expected_os_family": "RedHat",
-        "expected_version_string": "8",
-        "os_tag": "rhel8",
-        "is_windows": False,
-    },
-    "rhel9": {
-        "display_name": "RHEL 9",
-        "expected_play_name": "RHEL 9 STIG Hardening",
-        "expected_os_family": "RedHat",
-        "expected_version_string": "9",
-        "os_tag": "rhel9",
-        "is_windows": False,
-    },
-    "windows11": {
-        "display_name": "Windows 11",
-        "expected_play_name": "Windows 11 STIG Hardening",
-        "expected_os_family": "Windows",
-        # we only enforce family for now; version/name checks could be added later
-        "expected_version_string": None,
-        "os_tag": "windows11",
-        "is_windows": True,
-    },
-    "windows2022": {
-        "display_name": "Windows Server 2022",
-        "expected_play_name": "Windows Server 2022 STIG Hardening",
-        "expected_os_family": "Windows",
-        "expected_version_string": None,
-        "os_tag": "windows2022",
-        "is_windows": True,
-    },
-}
-
-
-# Keys that are NOT ansible modules
-NON_MODULE_KEYS = {
-    "name",
-    "tags",
-    "when",
-    "vars",
-    "register",
-    "changed_when",
-    "failed_when",
-    "notify",
-    "loop",
-    "loop_control",
-    "with_items",
-    "become",
-    "delegate_to",
-    "ignore_errors",
-    "environment",
-    "block",
-    "rescue",
-    "always",
-}
-
-
-def load_playbook(path: Path) -> List[Dict[str, Any]]:
-    if not HAS_YAML:
-        # Fallback: use basic text parsing for critical checks
-        # This is less robust but allows validation without PyYAML
-        return None  # Signal to use text-based validation
-    
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            data = list(yaml.safe_load_all(f))
-    except Exception as e:
-        raise RuntimeError(f"YAML load failed for {path}: {e}")
-
-    if not data:
-        raise RuntimeError(f"{path} is empty or did not contain any YAML documents")
-
-    if not isinstance(data[0], list):
-        raise RuntimeError(f"{path} top-level YAML must be a list of plays")
-
-    return data[0]
-
-
-def find_module_name(task: Dict[str, Any]) -> str:
-    """
-    Try to guess the Ansible module name for a task by looking for the first key
-    that is not obviously a control/meta key.
-    """
-    for key in task.keys():
-        if key not in NON_MODULE_KEYS:
-            return key
-    return ""
-
-
-def iter_tasks(play: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """
-    Return a flat list of tasks in the play (ignores roles/imports/blocks for now).
-    """
-    tasks = play.get("tasks", []) or []
-    # You can extend this to look into 'block', 'rescue', etc., if your generator uses them.
-    return tasks
+OS_META = PRODUCT_META
 
 
 def check_play_header_text(playbook_key: str, content: str, errors: List[str]) -> None:
@@ -145,7 +60,6 @@ def check_play_header_text(playbook_key: str, content: str, errors: List[str]) -
     # Check play name
     if f'name: "{expected_name}"' not in content and f"name: '{expected_name}'" not in content:
         # Try to find what name is actually there
-        import re
         name_match = re.search(r'- name:\s*["\']?([^"\'\n]+)', content)
         if name_match:
             actual_name = name_match.group(1)
@@ -173,68 +87,12 @@ def check_play_header_text(playbook_key: str, content: str, errors: List[str]) -
             )
 
 
-def check_play_header(playbook_key: str, play: Dict[str, Any], errors: List[str]) -> None:
-    meta = OS_META[playbook_key]
-    expected_name = meta["expected_play_name"]
-    expected_family = meta["expected_os_family"]
-    expected_version = meta["expected_version_string"]
-
-    actual_name = play.get("name")
-    if actual_name != expected_name:
-        errors.append(
-            f"[{playbook_key}] Play name mismatch: expected '{expected_name}', got '{actual_name}'"
-        )
-
-    pre_tasks = play.get("pre_tasks", []) or []
-    assert_tasks = [
-        t for t in pre_tasks
-        if isinstance(t, dict) and ("ansible.builtin.assert" in t or "assert" in t)
-    ]
-    if not assert_tasks:
-        errors.append(f"[{playbook_key}] No ansible.builtin.assert pre_task found for OS verification")
-        return
-
-    # Check the first assert task
-    assert_task = assert_tasks[0]
-    assert_body = assert_task.get("ansible.builtin.assert") or assert_task.get("assert") or {}
-    that_list = assert_body.get("that") or []
-
-    if not isinstance(that_list, list) or not that_list:
-        errors.append(f"[{playbook_key}] OS verification assert has no 'that' list")
-        return
-
-    that_strs = [str(x) for x in that_list]
-
-    # Check family
-    need_family = f"ansible_facts['os_family'] == '{expected_family}'"
-    if need_family not in that_strs:
-        errors.append(
-            f"[{playbook_key}] OS verification missing family check; expected condition:\n"
-            f"    {need_family}\n"
-            f"Got:\n"
-            + "\n".join(f"    {s}" for s in that_strs)
-        )
-
-    # For Windows we currently only enforce family. For RHEL we also enforce major version.
-    if not meta["is_windows"] and expected_version:
-        need_version = f"ansible_facts['distribution_major_version'] == '{expected_version}'"
-        if need_version not in that_strs:
-            errors.append(
-                f"[{playbook_key}] OS verification missing version check; expected condition:\n"
-                f"    {need_version}\n"
-                f"Got:\n"
-                + "\n".join(f"    {s}" for s in that_strs)
-            )
-
-
 def check_tags_and_modules_text(playbook_key: str, content: str, errors: List[str]) -> None:
     """Text-based tag and module check (fallback when PyYAML not available)."""
     meta = OS_META[playbook_key]
     os_tag = meta["os_tag"]
     is_windows = meta["is_windows"]
     
-    import re
-    
     # Find all task blocks - improved pattern to handle multiline names and comments
     # Look for STIG ID comments followed by tasks
     task_pattern = r'# STIG ID: ([^\n]+)\n.*?(- name:\s*["\']([^"\']+)["\'])\s*\n(.*?)(?=\n\s*# STIG ID:|\Z)'
@@ -301,157 +159,66 @@ def check_tags_and_modules_text(playbook_key: str, content: str, errors: List[st
                     )
 
 
-def check_tags_and_modules(playbook_key: str, play: Dict[str, Any], errors: List[str]) -> None:
-    meta = OS_META[playbook_key]
-    os_tag = meta["os_tag"]
-    is_windows = meta["is_windows"]
-
-    tasks = iter_tasks(play)
-    if not tasks:
-        errors.append(f"[{playbook_key}] No tasks found in play")
-        return
-
-    for idx, task in enumerate(tasks, start=1):
-        if not isinstance(task, dict):
-            errors.append(f"[{playbook_key}] Task #{idx} is not a dict: {task}")
-            continue
-
-        name = task.get("name", f"(unnamed task #{idx})")
-        tags = task.get("tags", [])
-        if isinstance(tags, str):
-            tags = [tags]
-
-        # Ignore non-STIG support tasks
-        if "stig" not in tags:
-            continue
-
-        # 1) OS tag presence & exclusivity
-        if os_tag not in tags:
-            errors.append(
-                f"[{playbook_key}] Task '{name}' missing OS tag '{os_tag}' "
-                f"(tags: {tags})"
-            )
-
-        # 2) Automation vs module sanity
-        module_name = find_module_name(task)
-        has_automated = "automation_automated" in tags
-        has_manual_only = "automation_manual_only" in tags
 
-        if has_automated and has_manual_only:
-            errors.append(
-                f"[{playbook_key}] Task '{name}' has both automation_automated and "
-                f"automation_manual_only tags"
-            )
 
-        # Automated tasks must not be debug-only
-        if has_automated:
-            if module_name in ("ansible.builtin.debug", "debug", ""):
-                errors.append(
-                    f"[{playbook_key}] Task '{name}' is tagged automation_automated "
-                    f"but uses debug-only module '{module_name}'"
-                )
+class TextFallbackRule(ValidationRule):
+    """Text-based play header, tag and module checks (fallback when PyYAML not available)."""
 
-            if is_windows:
-                # For Windows, automated tasks must use ansible.windows.* or community.windows.*
-                if not (
-                    module_name.startswith("ansible.windows.")
-                    or module_name.startswith("community.windows.")
-                ):
-                    errors.append(
-                        f"[{playbook_key}] Windows task '{name}' is automation_automated "
-                        f"but module '{module_name}' is not a Windows module"
-                    )
+    name = "text_fallback"
 
-        # Manual-only tasks must be debug-only (no real config changes)
-        if has_manual_only:
-            if module_name not in ("ansible.builtin.debug", "debug", ""):
-                errors.append(
-                    f"[{playbook_key}] Task '{name}' is automation_manual_only "
-                    f"but uses non-debug module '{module_name}'"
-                )
+    def finish(self) -> None:
+        if not self.playbook.parsed:
+            check_play_header_text(self.playbook.product, self.playbook.content, self.issues)
+            check_tags_and_modules_text(self.playbook.product, self.playbook.content, self.issues)
 
 
-def check_ansible_syntax(path: Path) -> tuple[bool, str]:
-    """
-    Run ansible-playbook --syntax-check on the playbook.
-    Returns (success, error_message).
-    """
-    import subprocess
-    
-    try:
-        result = subprocess.run(
-            ["ansible-playbook", "--syntax-check", str(path)],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode == 0:
-            return True, ""
-        else:
-            error_msg = result.stderr or result.stdout or "Unknown error"
-            return False, error_msg[:500]  # Limit error message length
-    except FileNotFoundError:
-        return True, "ansible-playbook not found, skipping syntax check"
-    except subprocess.TimeoutExpired:
-        return False, "ansible-playbook --syntax-check timed out"
-    except Exception as e:
-        return False, f"Error running ansible-playbook: {e}"
+# Shared rules (tools/playbook_rules.py) run by this checker
+SANITY_RULE_NAMES = ["yaml_syntax", "play_header", "product_tags", "automation_modules"]
 
 
-def run_checks() -> int:
+def run_checks(syntax_check: bool = False, workers: int = None) -> int:
     all_errors: List[str] = []
 
+    targets = []
     for key, path in PLAYBOOKS.items():
-        meta = OS_META[key]
-        display = meta["display_name"]
-
         if not path.exists():
             all_errors.append(f"[{key}] Playbook file not found: {path}")
             continue
-
-        print(f"Checking {display} playbook: {path}")
-        
-        # Load playbook content
-        try:
-            with path.open("r", encoding="utf-8") as f:
-                content = f.read()
-        except Exception as e:
-            all_errors.append(f"[{key}] Error reading file: {e}")
-            continue
-        
-        # First check: YAML validity and structure (if PyYAML available)
-        plays = load_playbook(path)
-        
-        if plays is None:
-            # PyYAML not available, use text-based checks
+        targets.append((path, key))
+
+    rules = get_rules(SANITY_RULE_NAMES) if HAS_YAML else [TextFallbackRule]
+    results = validate_playbooks(
+        targets,
+        rules,
+        run_syntax_check=syntax_check,
+        cache_dir=DEFAULT_SYNTAX_CACHE_DIR,
+        workers=workers,
+    )
+
+    for result in results:
+        display = OS_META[result.product]["display_name"]
+        print(f"Checking {display} playbook: {result.path}")
+        if not HAS_YAML:
             print(f"  Using text-based validation (PyYAML not available)")
-            check_play_header_text(key, content, all_errors)
-            check_tags_and_modules_text(key, content, all_errors)
-        else:
-            # PyYAML available, use structured checks
-            if not plays:
-                all_errors.append(f"[{key}] No plays found in {path}")
-                continue
 
-            play = plays[0]
+        for rule_issues in result.issues.values():
+            # Shared rules report without a product prefix; the text fallback adds its own
+            all_errors.extend(
+                issue if issue.startswith(f"[{result.product}]") else f"[{result.product}] {issue}"
+                for issue in rule_issues
+            )
+
+        if not syntax_check:
+            continue
 
-            # Second check: Play header and OS assertions
-            check_play_header(key, play, all_errors)
-            
-            # Third check: Tags and modules
-            check_tags_and_modules(key, play, all_errors)
-        
-        # Fourth check: Ansible syntax check
         print(f"  Running ansible-playbook --syntax-check...")
-        syntax_ok, syntax_error = check_ansible_syntax(path)
-        if not syntax_ok:
-            if "ansible-playbook not found" in syntax_error:
-                print(f"  ⚠️  {syntax_error}")
-            else:
-                all_errors.append(
-                    f"[{key}] ansible-playbook --syntax-check failed:\n"
-                    f"    {syntax_error}"
-                )
+        if result.syntax_ok is None:
+            print(f"  ⚠️  {result.syntax_message}")
+        elif not result.syntax_ok:
+            all_errors.append(
+                f"[{result.product}] ansible-playbook --syntax-check failed:\n"
+                f"    {result.syntax_message[:500]}"
+            )
         else:
             print(f"  ✅ ansible-playbook --syntax-check passed")
 
@@ -465,6 +232,22 @@ def run_checks() -> int:
     return 0
 
 
-if __name__ == "__main__":
-    sys.exit(run_checks())
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sanity check generated STIG hardening playbooks")
+    parser.add_argument(
+        "--syntax-check",
+        action="store_true",
+        help="Also run ansible-playbook --syntax-check (results are cached by playbook hash)"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=None,
+        help="Maximum parallel worker processes (default: one per playbook)"
+    )
+    args = parser.parse_args()
+    return run_checks(syntax_check=args.syntax_check, workers=args.workers)
 
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -17,6 +17,7 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from scripts.generate_checker import generate_checker_playbook
 from scripts.generate_ctp import generate_ctp_csv
+from scripts.control_store import STORE_SUFFIX, ControlStore
 from scripts.generate_hardening import generate_hardening_playbook
 from scripts.parse_stig import parse_xccdf_file, save_controls_to_json
 
@@ -308,6 +309,42 @@ def _load_json_file(json_file: Path) -> list[dict]:
         raise
 
 
+def _open_control_store(store_file: Path) -> ControlStore:
+    """Open a binary control store with caching based on file modification time."""
+    mtime = store_file.stat().st_mtime
+    
+    if store_file in _json_cache and _json_cache_timestamps.get(store_file) == mtime:
+        return _json_cache[store_file]
+    
+    # Swap in the new store without closing the stale one: other request
+    # threads may still be searching it. It closes when garbage-collected.
+    store = ControlStore(store_file)
+    _json_cache[store_file] = store
+    _json_cache_timestamps[store_file] = mtime
+    return store
+
+
+def _search_control_store(store: ControlStore, query_lower: str, source_name: str, results: list[dict]) -> None:
+    """Search a control store, decoding full records only for matches."""
+    for index in range(len(store)):
+        # Quick field checks first - only these fields are decoded per record
+        if (query_lower in str(store.get_field(index, 'id', '')).lower() or
+            query_lower in str(store.get_field(index, 'sv_id', '')).lower() or
+            query_lower in str(store.get_field(index, 'vul_id', '')).lower() or
+            query_lower in str(store.get_field(index, 'title', '')).lower()):
+            result = store.record(index)
+            result['source_file'] = source_name
+            results.append(result)
+            continue
+        
+        if len(results) < 100:
+            if (query_lower in str(store.get_field(index, 'description', '')).lower() or
+                query_lower in str(store.get_field(index, 'category', '')).lower()):
+                result = store.record(index)
+                result['source_file'] = source_name
+                results.append(result)
+
+
 @app.route('/api/search', methods=['GET', 'POST'])
 def search():
     """Search STIG controls from JSON files."""
@@ -337,8 +374,8 @@ def search():
         if not json_dir.exists():
             return jsonify({'error': 'No JSON data directory found'}), 404
         
-        # Find all JSON files
-        json_files = list(json_dir.glob('*.json'))
+        # Find all JSON files and binary control stores
+        json_files = list(json_dir.glob('*.json')) + list(json_dir.glob(f'*{STORE_SUFFIX}'))
         
         if not json_files:
             return jsonify({'error': 'No JSON files found'}), 404
@@ -346,6 +383,10 @@ def search():
         # Search in each JSON file (using cache)
         for json_file in json_files:
             try:
+                if json_file.suffix == STORE_SUFFIX:
+                    _search_control_store(_open_control_store(json_file), query_lower, json_file.name, results)
+                    continue
+                
                 controls = _load_json_file(json_file)
                 
                 # Search through controls - optimized
@@ -393,6 +434,8 @@ def search():
 def clear_cache():
     """Clear the JSON cache (useful after updating JSON files)."""
     try:
+        # Cached control stores may still be in use by other requests; they
+        # close their memory maps when garbage-collected
         _json_cache.clear()
         _json_cache_timestamps.clear()
         logger.info("JSON cache cleared")
@@ -2,7 +2,8 @@
 CUI Vault API - GET Endpoint Implementation
 Reference implementation for adding GET /cui/{record_id} endpoint
 
-This code should be added to /opt/cui-vault/app.py on the CUI vault VM.
+This code should be added to /opt/cui-vault/app.py on the CUI vault VM, with
+vault_db.py (connection pool and record lookup) copied next to it.
 Adjust imports and framework-specific syntax based on your actual implementation.
 """
 
@@ -16,16 +17,12 @@ import base64
 import uuid
 from datetime import datetime
 
-# Database connection function (adjust based on your existing implementation)
-def get_db_connection():
-    """Get PostgreSQL database connection"""
-    return psycopg2.connect(
-        dbname=os.getenv("DB_NAME", "cuivault"),
-        user=os.getenv("DB_USER", "cuivault_user"),
-        password=os.getenv("DB_PASSWORD"),
-        host=os.getenv("DB_HOST", "localhost"),
-        port=os.getenv("DB_PORT", "5432")
-    )
+# Connection pool and record lookup (vault_db.py, deployed next to app.py)
+from vault_db import close_db_pool, fetch_cui_record, get_db_connection, init_db_pool
+
+# Create the process-wide pool at startup and close it at shutdown
+app.on_event("startup")(init_db_pool)
+app.on_event("shutdown")(close_db_pool)
 
 # Encryption key (should match the one used in store endpoint)
 def get_encryption_key():
@@ -79,24 +76,10 @@ async def get_cui(record_id: str, request: Request):
             status_code=400
         )
     
-    # 3. Query database
-    conn = None
+    # 3. Query database (the connection goes back to the pool before decryption)
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # Query for the record
-        cur.execute(
-            """
-            SELECT id, ciphertext, nonce, tag, created_at
-            FROM public.cui_records
-            WHERE id = %s
-            """,
-            (record_id,)
-        )
-        
-        row = cur.fetchone()
-        cur.close()
+        with get_db_connection() as conn:
+            row = fetch_cui_record(conn, record_id)
         
         if not row:
             return JSONResponse(
@@ -164,12 +147,11 @@ async def get_cui(record_id: str, request: Request):
             {"detail": "Internal Server Error"},
             status_code=500
         )
-    finally:
-        if conn:
-            conn.close()
 
 
 # Alternative implementation for Flask (if using Flask instead of FastAPI)
+# With Flask, create the pool once at startup (call vault_db.init_db_pool() after
+# creating the app) and use get_db_connection()/fetch_cui_record() as above.
 """
 from flask import Flask, request, jsonify
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -194,18 +176,9 @@ def get_cui(record_id):
         return jsonify({"detail": "Invalid record ID format"}), 400
     
     # 3. Query database
-    conn = None
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        cur.execute(
-            "SELECT id, ciphertext, nonce, tag, created_at FROM public.cui_records WHERE id = %s",
-            (record_id,)
-        )
-        
-        row = cur.fetchone()
-        cur.close()
+        with get_db_connection() as conn:
+            row = fetch_cui_record(conn, record_id)
         
         if not row:
             return jsonify({"detail": "Not Found"}), 404
@@ -235,7 +208,4 @@ def get_cui(record_id):
     except Exception as e:
         print(f"Error: {str(e)}")
         return jsonify({"detail": "Internal Server Error"}), 500
-    finally:
-        if conn:
-            conn.close()
 """
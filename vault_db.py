@@ -0,0 +1,135 @@
+"""
+CUI Vault API - Database helpers for the GET endpoint
+Connection pool and record lookup used by vault-api-get-endpoint.py
+
+Deploy this file next to /opt/cui-vault/app.py so the endpoint can import it.
+scripts/benchmark-vault-get-endpoint.py drives these same helpers.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+
+# Connection pool sizing (one pool per worker process)
+DB_POOL_MIN = int(os.getenv("DB_POOL_MIN", "2"))
+DB_POOL_MAX = int(os.getenv("DB_POOL_MAX", "10"))
+# Pooled connections idle longer than this (seconds) are checked with SELECT 1 before use
+DB_POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("DB_POOL_HEALTH_CHECK_INTERVAL", "30"))
+
+# Server-side prepared statement for the record lookup (prepared once per connection)
+GET_CUI_STATEMENT = "get_cui_record"
+GET_CUI_SQL = """
+    SELECT id, ciphertext, nonce, tag, created_at
+    FROM public.cui_records
+    WHERE id = $1
+"""
+
+
+class VaultConnection(psycopg2.extensions.connection):
+    """Pooled connection that tracks its prepared statements and last health check"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Lookups are single reads; don't leave pooled connections idle in a transaction
+        self.autocommit = True
+        self.prepared = set()
+        self.last_checked = time.monotonic()
+
+
+class VaultConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that opens its connections with a given connect function"""
+    
+    def __init__(self, minconn, maxconn, *args, connect=psycopg2.connect, **kwargs):
+        self._connect_func = connect
+        super().__init__(minconn, maxconn, *args, **kwargs)
+    
+    def _connect(self, key=None):
+        """Open a connection and assign it to key, as AbstractConnectionPool._connect does"""
+        conn = self._connect_func(*self._args, **self._kwargs)
+        if key is not None:
+            self._used[key] = conn
+            self._rused[id(conn)] = key
+        else:
+            self._pool.append(conn)
+        return conn
+
+
+db_pool = None
+
+
+def init_db_pool(connect=psycopg2.connect, **connect_kwargs):
+    """
+    Create the process-wide connection pool
+    
+    Args:
+        connect: Function opening a connection (psycopg2.connect; the benchmark
+            passes a SQLite stand-in)
+        connect_kwargs: Connection parameters (default: the DB_* environment variables)
+    """
+    global db_pool
+    if not connect_kwargs:
+        connect_kwargs = {
+            "dbname": os.getenv("DB_NAME", "cuivault"),
+            "user": os.getenv("DB_USER", "cuivault_user"),
+            "password": os.getenv("DB_PASSWORD"),
+            "host": os.getenv("DB_HOST", "localhost"),
+            "port": os.getenv("DB_PORT", "5432"),
+        }
+    if connect is psycopg2.connect:
+        connect_kwargs["connection_factory"] = VaultConnection
+    db_pool = VaultConnectionPool(DB_POOL_MIN, DB_POOL_MAX, connect=connect, **connect_kwargs)
+
+
+def close_db_pool():
+    """Close every pooled connection"""
+    global db_pool
+    if db_pool:
+        db_pool.closeall()
+        db_pool = None
+
+
+def is_healthy(conn):
+    """Check a pooled connection that has been idle for a while"""
+    if conn.closed:
+        return False
+    if time.monotonic() - conn.last_checked < DB_POOL_HEALTH_CHECK_INTERVAL:
+        return True
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1")
+        conn.last_checked = time.monotonic()
+        return True
+    except psycopg2.Error:
+        return False
+
+
+@contextmanager
+def get_db_connection():
+    """Borrow a healthy connection from the pool; broken connections are discarded"""
+    conn = db_pool.getconn()
+    if not is_healthy(conn):
+        db_pool.putconn(conn, close=True)
+        conn = db_pool.getconn()
+    broken = False
+    try:
+        yield conn
+        conn.last_checked = time.monotonic()
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        broken = True
+        raise
+    finally:
+        db_pool.putconn(conn, close=broken or bool(conn.closed))
+
+
+def fetch_cui_record(conn, record_id):
+    """Look up a record with the connection's prepared statement"""
+    with conn.cursor() as cur:
+        if GET_CUI_STATEMENT not in conn.prepared:
+            cur.execute(f"PREPARE {GET_CUI_STATEMENT} AS {GET_CUI_SQL}")
+            conn.prepared.add(GET_CUI_STATEMENT)
+        cur.execute(f"EXECUTE {GET_CUI_STATEMENT} (%s)", (record_id,))
+        return cur.fetchone()